@@ -0,0 +1,191 @@
+"""
+Benchmark: ShellHighlighter (single-pass tokenizer + block states) vs the previous
+seven-QRegularExpression rule set, on a synthetic 100k-line bash run log.
+
+Measures a full highlight, appending lines one by one (live log) and a one-character edit in the
+middle of the document, counting how many blocks each highlighter re-runs. Before timing, checks the
+block states ShellHighlighter leaves on a few multi-line constructs and exits non-zero on a mismatch.
+
+Usage: python benchmarks/bench_highlighter.py [--lines N] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PySide6.QtCore import QRegularExpression  # noqa: E402
+from PySide6.QtGui import QColor, QFont, QSyntaxHighlighter, QTextCharFormat, QTextCursor  # noqa: E402
+from PySide6.QtWidgets import QApplication, QPlainTextEdit  # noqa: E402
+
+from highlighter import (  # noqa: E402
+    STATE_ARITHMETIC_BASE, STATE_DOUBLE_QUOTED, STATE_HEREDOC_BASE, STATE_NORMAL, ShellHighlighter,
+)
+from theme import DARK_PALETTE  # noqa: E402
+
+
+class LegacyShellHighlighter(QSyntaxHighlighter):
+    """The rule set ShellHighlighter replaced: one globalMatch pass per rule, no block state."""
+
+    def __init__(self, parent, palette: dict):
+        super().__init__(parent)
+        self._rules = []
+
+        def fmt(color: str, bold: bool = False) -> QTextCharFormat:
+            f = QTextCharFormat()
+            f.setForeground(QColor(color))
+            if bold:
+                f.setFontWeight(QFont.Weight.Bold)
+            return f
+
+        keywords = (
+            r"\b(if|then|else|elif|fi|for|while|do|done|case|esac|in|"
+            r"function|return|exit|export|local|declare|readonly|shift|"
+            r"source|echo|printf|cd|mkdir|rm|cp|mv|chmod|chown|grep|"
+            r"sed|awk|cat|ls|pwd|set|unset|true|false|test|exec)\b"
+        )
+        for pattern, f in (
+            (r"^#!.*$", fmt(palette["sh_shebang"], bold=True)),
+            (r"(?<!#!)#[^\n]*", fmt(palette["sh_comment"])),
+            (r'"[^"\\]*(?:\\.[^"\\]*)*"', fmt(palette["sh_string"])),
+            (r"'[^']*'", fmt(palette["sh_string"])),
+            (r"\$\{?[A-Za-z_][A-Za-z0-9_]*\}?|\$[0-9@#\*\?]", fmt(palette["sh_variable"])),
+            (keywords, fmt(palette["sh_keyword"], bold=True)),
+            (r"\b[0-9]+\b", fmt(palette["sh_number"])),
+        ):
+            self._rules.append((QRegularExpression(pattern), f))
+
+    def highlightBlock(self, text: str) -> None:
+        for pattern, f in self._rules:
+            it = pattern.globalMatch(text)
+            while it.hasNext():
+                match = it.next()
+                self.setFormat(match.capturedStart(), match.capturedLength(), f)
+
+
+def make_log(lines: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    templates = (
+        "[{n}] echo \"step {n}: deploying $SERVICE to ${{ENV}}\"  # retry {r}",
+        "+ cd /srv/app && export PATH=$HOME/bin:$PATH",
+        "INFO 2024-05-{d:02d} 12:{m:02d}:{s:02d} worker-{r} processed {n} items in {m}ms",
+        "if [ -f '/etc/app/{n}.conf' ]; then source /etc/app/{n}.conf; fi",
+        "WARN retrying request {n} (attempt {r} of 5)",
+        "    at step_{r} (deploy.sh:{n})",
+        "mask=$((1 << n)); (( flags |= 1 << bit_{r} ))",
+        "cat <<EOF > /tmp/out_{n}.txt",
+        "payload line {n} with $VAR and 'quotes'",
+        "EOF",
+    )
+    return [rng.choice(templates).format(n=i, r=rng.randint(1, 9), d=rng.randint(1, 28),
+                                          m=rng.randint(0, 59), s=rng.randint(0, 59)) for i in range(lines)]
+
+
+# (script, expected block state after each line); "<<" inside $((...)) / ((...)) is a shift.
+STATE_CHECKS = (
+    ("mask=$((1 << n))\necho $mask", [STATE_NORMAL, STATE_NORMAL]),
+    ("(( flags |= 1 << bit ))\ncat <<EOF\nbody\nEOF\ndone", [STATE_NORMAL, STATE_HEREDOC_BASE,
+                                                             STATE_HEREDOC_BASE, STATE_NORMAL, STATE_NORMAL]),
+    ("x=$(( (a <<\n b) ))\ny=1", [STATE_ARITHMETIC_BASE + 3, STATE_NORMAL, STATE_NORMAL]),
+    ('echo "open\nstill\nclosed" $((1 << n))', [STATE_DOUBLE_QUOTED, STATE_DOUBLE_QUOTED, STATE_NORMAL]),
+)
+
+
+def check_states(app: QApplication) -> list[str]:
+    failures = []
+    for script, expected in STATE_CHECKS:
+        editor = QPlainTextEdit()
+        editor.setPlainText(script)
+        highlighter = ShellHighlighter(editor.document(), DARK_PALETTE)
+        app.processEvents()
+        highlighter.rehighlight()
+        block = editor.document().begin()
+        states = []
+        while block.isValid():
+            states.append(block.userState())
+            block = block.next()
+        if states[:len(expected)] != expected:
+            failures.append(f"{script!r}: block states {states}, expected {expected}")
+    return failures
+
+
+def bench(app: QApplication, cls, text: str, append_lines: list[str]) -> dict:
+    calls = [0]
+
+    class Counting(cls):
+        def highlightBlock(self, block_text: str) -> None:
+            calls[0] += 1
+            super().highlightBlock(block_text)
+
+    editor = QPlainTextEdit()
+    editor.setPlainText(text)
+    doc = editor.document()
+    highlighter = Counting(doc, DARK_PALETTE)
+    # Let the highlighter's initial delayed rehighlight run; until then Qt ignores document edits.
+    app.processEvents()
+
+    calls[0] = 0
+    t0 = time.perf_counter()
+    highlighter.rehighlight()
+    full_s = time.perf_counter() - t0
+    full_blocks = calls[0]
+
+    calls[0] = 0
+    t0 = time.perf_counter()
+    for line in append_lines:
+        editor.appendPlainText(line)
+    append_s = time.perf_counter() - t0
+    append_blocks = calls[0]
+
+    calls[0] = 0
+    cursor = QTextCursor(doc.findBlockByNumber(doc.blockCount() // 2))
+    t0 = time.perf_counter()
+    cursor.insertText("x")
+    edit_s = time.perf_counter() - t0
+    edit_blocks = calls[0]
+    return {
+        "full_ms": round(full_s * 1000, 1),
+        "full_blocks": full_blocks,
+        "append_ms": round(append_s * 1000, 1),
+        "append_blocks": append_blocks,
+        "edit_ms": round(edit_s * 1000, 3),
+        "edit_blocks": edit_blocks,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--append", type=int, default=1_000)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    failures = check_states(app)
+    for failure in failures:
+        print(f"state check failed: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    lines = make_log(args.lines + args.append)
+    text = "\n".join(lines[:args.lines])
+    results = {
+        "lines": args.lines,
+        "legacy": bench(app, LegacyShellHighlighter, text, lines[args.lines:]),
+        "tokenizer": bench(app, ShellHighlighter, text, lines[args.lines:]),
+    }
+    for name in ("legacy", "tokenizer"):
+        r = results[name]
+        print(f"{name:10} full {r['full_ms']:9.1f} ms ({r['full_blocks']} blocks)   "
+              f"append {r['append_ms']:7.1f} ms ({r['append_blocks']} blocks)   "
+              f"edit {r['edit_ms']:7.3f} ms ({r['edit_blocks']} blocks)")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
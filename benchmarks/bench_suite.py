@@ -0,0 +1,369 @@
+"""
+Benchmark suite for the app's hot paths on synthetic data: script discovery, the sidebar tree and
+its filter, the search index, the history views, the scheduler check, log storage and process metrics.
+
+Projects of 1k/10k/50k scripts (deep folder trees), histories of 1k/100k runs and multi-MB logs are
+generated under --workdir (kept between runs, so only the first run pays for them). Qt runs
+offscreen. The app's config and Scheduler folder are redirected to the work directory; the real
+config.json is never touched. Each case runs --repeat times and records the best and median time.
+
+Usage: python benchmarks/bench_suite.py [--quick] [--scripts N ...] [--only SUBSTRING ...]
+                                        [--json results.json] [--compare previous.json] [--workdir DIR]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+import synthetic  # noqa: E402
+
+FULL_SIZES = {"scripts": (1_000, 10_000, 50_000), "history": (1_000, 100_000), "log_mb": (1, 8), "schedules": 1_000}
+QUICK_SIZES = {"scripts": (1_000,), "history": (1_000,), "log_mb": (1,), "schedules": 200}
+# label -> query: an exact token, token initials, a fuzzy subsequence, a term across a separator, two terms
+SEARCH_QUERIES = {"token": "deploy", "initials": "dbp", "fuzzy": "depbacpro", "separator": "deploy_b", "terms": "rst 12"}
+METRICS_CHILDREN = 8
+
+
+class _RunningProcess:
+    """Stands in for a live Popen in a script row's run."""
+
+    def poll(self):
+        return None
+
+
+_RUNNING = {"process": _RunningProcess(), "history_id": ""}
+
+
+def isolate_storage(home: str) -> None:
+    """Points config.json and the Scheduler folder at home (modules that imported get_config_path by name included)."""
+    import config
+    import content_index
+    import control_client
+    import scheduler_storage
+
+    def get_config_path() -> str:
+        return os.path.join(home, "config.json")
+
+    for module in (config, content_index, control_client, scheduler_storage):
+        module.get_config_path = get_config_path
+
+
+def timed(fn, repeat: int, setup=None) -> dict:
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return {"best_ms": round(min(times), 3), "median_ms": round(statistics.median(times), 3), "repeat": repeat}
+
+
+class Suite:
+    def __init__(self, workdir: str, sizes: dict, repeat: int, only: list[str]):
+        self.workdir = workdir
+        self.sizes = sizes
+        self.repeat = repeat
+        self.only = only
+        self.results: dict[str, dict] = {}
+        self._app = None
+
+    def want(self, name: str) -> bool:
+        return not self.only or any(part in name for part in self.only)
+
+    def record(self, name: str, result: dict, **info) -> None:
+        result.update(info)
+        self.results[name] = result
+        print(f"  {name:<44} best {result['best_ms']:10.2f} ms   median {result['median_ms']:10.2f} ms", flush=True)
+
+    def app(self):
+        if self._app is None:
+            from PySide6.QtWidgets import QApplication
+            from config import load_theme
+            from theme import get_stylesheet
+
+            self._app = QApplication.instance() or QApplication([])
+            self._app.setStyleSheet(get_stylesheet(load_theme()))
+        return self._app
+
+    def project(self, scripts: int) -> str:
+        return synthetic.make_project(os.path.join(self.workdir, f"project_{scripts}"), scripts)
+
+    def use_home(self, name: str) -> str:
+        import config
+
+        home = os.path.join(self.workdir, "home", name)
+        os.makedirs(home, exist_ok=True)
+        isolate_storage(home)
+        config.save_terminal_path(shutil.which("bash") or "bash")  # otherwise the window asks for one
+        return home
+
+    # ------------------------------------------------------------------
+    # Cases
+    # ------------------------------------------------------------------
+
+    def bench_get_scripts(self) -> None:
+        from script_manager import ScriptManager
+
+        for n in self.sizes["scripts"]:
+            name = f"get_scripts[{n}]"
+            if self.want(name):
+                project = self.project(n)
+                self.record(name, timed(lambda: ScriptManager(project).get_scripts(), self.repeat), scripts=n)
+
+    def bench_sidebar(self) -> None:
+        import config
+
+        for n in self.sizes["scripts"]:
+            names = [f"load_scripts[{n}]", f"_build_tree[{n}]", f"_apply_tree_filter[{n}]", f"_toggle_theme[{n}]",
+                     f"_refresh_sidebar_dots[{n}]"]
+            if not any(self.want(name) for name in names):
+                continue
+            project = self.project(n)
+            self.use_home(f"sidebar_{n}")
+            config.save_project_path(project)
+            window = self._window()
+            window.project_path = project
+            # A few repeats at most: every load rebuilds thousands of widgets.
+            repeat = min(self.repeat, 3)
+            if self.want(names[0]):
+                self.record(names[0], timed(window.load_scripts, repeat, self._pump), scripts=n)
+            else:
+                window.load_scripts()
+            while window._search_index_journal is not None:  # the index is built in the background
+                self._pump()
+                time.sleep(0.01)
+            if self.want(names[1]):
+                self.record(names[1], timed(window._build_tree, repeat, self._pump), scripts=n)
+            if self.want(names[2]):
+                for label, query, category in (("all", "", "All"), ("search", "deploy", "All"),
+                                               ("fuzzy", "bdp", "All"), ("category", "", "Backend")):
+                    def apply(query=query, category=category) -> None:
+                        window.search_edit.blockSignals(True)
+                        window.category_combo.blockSignals(True)
+                        window.search_edit.setText(query)
+                        window.category_combo.setCurrentText(category)
+                        window.search_edit.blockSignals(False)
+                        window.category_combo.blockSignals(False)
+                        window._apply_tree_filter()
+
+                    self.record(f"{names[2]}:{label}", timed(apply, self.repeat), scripts=n, query=query, category=category)
+            if self.want(names[3]):
+                window.search_edit.setText("")
+                window._apply_tree_filter()
+
+                def toggle() -> None:
+                    window._toggle_theme()
+                    self._pump()  # the repolish and repaint happen here
+
+                self.record(names[3], timed(toggle, self.repeat), scripts=n)
+            if self.want(names[4]):
+                # Every dot flips: a scheduler tick that starts or ends a run on each script.
+                def flip() -> None:
+                    for row in window.script_rows:
+                        row["runs"] = [] if row["runs"] else [_RUNNING]
+                    window._refresh_sidebar_dots()
+                    self._pump()
+
+                self.record(names[4], timed(flip, self.repeat), scripts=n)
+                for row in window.script_rows:
+                    row["runs"] = []
+            self._close(window)
+
+    def bench_search_index(self) -> None:
+        from search_index import ScriptSearchIndex
+
+        for n in self.sizes["scripts"]:
+            names = [f"search_index.build[{n}]"] + [f"search_index.search[{n}]:{label}" for label in SEARCH_QUERIES]
+            if not any(self.want(name) for name in names):
+                continue
+            project = self.project(n)
+            paths = synthetic.list_scripts(project)
+            index = ScriptSearchIndex()
+            if self.want(names[0]):
+                self.record(names[0], timed(lambda: index.build(paths, project), min(self.repeat, 3)), scripts=n)
+            else:
+                index.build(paths, project)
+            for name, (label, query) in zip(names[1:], SEARCH_QUERIES.items()):
+                if self.want(name):
+                    self.record(name, timed(lambda query=query: index.search(query), self.repeat), scripts=n, query=query)
+
+    def bench_history(self) -> None:
+        from scheduler_storage import load_history
+
+        scripts = synthetic.list_scripts(self.project(self.sizes["scripts"][0]))
+        schedules = synthetic.make_schedules(50, scripts)
+        for n in self.sizes["history"]:
+            names = [f"load_history[{n}]", f"refresh_history:scheduler[{n}]", f"refresh_history:manual[{n}]"]
+            if not any(self.want(name) for name in names):
+                continue
+            home = self.use_home(f"history_{n}")
+            synthetic.write_json(os.path.join(home, "Scheduler", "schedules.json"), {"schedules": schedules})
+            synthetic.write_json(os.path.join(home, "Scheduler", "scheduler_history.json"),
+                                 {"runs": synthetic.make_history(n, scripts, schedules)})
+            if self.want(names[0]):
+                self.record(names[0], timed(load_history, self.repeat), runs=n)
+            if not (self.want(names[1]) or self.want(names[2])):
+                continue
+            window = self._window()
+            window.project_path = os.path.dirname(os.path.dirname(scripts[0]))
+            repeat = min(self.repeat, 3)
+            if self.want(names[1]):
+                window._ensure_scheduler_widget()
+                self.record(names[1], timed(window._scheduler_widget.refresh_history, repeat, self._pump), runs=n)
+            if self.want(names[2]):
+                window._ensure_manual_history_widget()
+                self.record(names[2], timed(window._manual_history_widget.refresh_history, repeat, self._pump), runs=n)
+            self._close(window)
+
+    def bench_due_schedules(self) -> None:
+        from scheduler_engine import get_due_schedules
+
+        count = self.sizes["schedules"]
+        name = f"get_due_schedules[{count}]"
+        if not self.want(name):
+            return
+        scripts = synthetic.list_scripts(self.project(self.sizes["scripts"][0]))
+        schedules = synthetic.make_schedules(count, scripts)
+        self.record(name, timed(lambda: get_due_schedules(schedules), self.repeat * 10), schedules=count)
+
+    def bench_log_storage(self) -> None:
+        from scheduler_storage import replace_log
+
+        for mb in self.sizes["log_mb"]:
+            name = f"replace_log[{mb}MB]"
+            if not self.want(name):
+                continue
+            home = self.use_home(f"logs_{mb}")
+            log = synthetic.make_log(mb * 1024 * 1024)
+            # Existing logs of other runs make up the rest of history_logs.json, as in a long-lived install.
+            others = {f"{i:032x}": log[: len(log) // 8] for i in range(8)}
+            path = os.path.join(home, "Scheduler", "history_logs.json")
+
+            def reset() -> None:
+                synthetic.write_json(path, {**others, "bench": log})
+
+            styles = [[i * 80, 2, 2, None, 0] for i in range(0, len(log) // 80, 4)]
+            self.record(name, timed(lambda: replace_log("bench", log, styles), self.repeat, reset),
+                        log_bytes=len(log), style_runs=len(styles))
+
+    def bench_collect_metrics(self) -> None:
+        from metrics import collect_metrics
+
+        name = f"collect_metrics[{METRICS_CHILDREN + 1} pids]"
+        if not self.want(name):
+            return
+        children = [subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+                    for _ in range(METRICS_CHILDREN)]
+        try:
+            pids = [os.getpid()] + [p.pid for p in children]
+            primed: set[int] = set()
+            start = time.monotonic()
+            collect_metrics(pids, start, 0.0, primed)
+            self.record(name, timed(lambda: collect_metrics(pids, start, 0.0, primed), self.repeat * 10), pids=len(pids))
+        finally:
+            for child in children:
+                child.kill()
+                child.wait()
+
+    # ------------------------------------------------------------------
+    # Qt helpers
+    # ------------------------------------------------------------------
+
+    def _window(self):
+        self.app()
+        from gui import ShScriptHubApp
+
+        window = ShScriptHubApp()
+        window._startup_pending = False  # the benchmark loads the project itself
+        window._scheduler_timer.stop()  # synthetic schedules must not start scripts
+        window._tick_timer.stop()
+        window.resize(1050, 640)
+        window.show()
+        self._pump()
+        return window
+
+    def _pump(self) -> None:
+        self.app().processEvents()
+
+    def _close(self, window) -> None:
+        window._watcher.stop()
+        if window._content_index is not None:
+            window._content_index.close()
+        window.close()
+        window.deleteLater()
+        self._pump()
+
+    def run(self) -> dict:
+        for case in (self.bench_get_scripts, self.bench_sidebar, self.bench_search_index, self.bench_history,
+                     self.bench_due_schedules, self.bench_log_storage, self.bench_collect_metrics):
+            print(case.__name__.removeprefix("bench_"), flush=True)
+            case()
+        return self.results
+
+
+def compare(results: dict, previous_path: str) -> None:
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f).get("results", {})
+    print(f"\nCompared with {previous_path} (median):")
+    for name, result in results.items():
+        old = previous.get(name)
+        if old is None:
+            continue
+        ratio = result["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        flag = "  slower" if ratio > 1.1 else ("  faster" if ratio < 0.9 else "")
+        print(f"  {name:<44} {old['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms  x{ratio:5.2f}{flag}")
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="smallest sizes only")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scripts", type=int, nargs="+", help="project sizes to use instead of the defaults")
+    parser.add_argument("--only", nargs="*", default=[], help="run cases whose name contains one of these")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "shscripthub-bench"))
+    parser.add_argument("--json", dest="json_path")
+    parser.add_argument("--compare", dest="compare_path")
+    args = parser.parse_args()
+
+    sizes = dict(QUICK_SIZES if args.quick else FULL_SIZES)
+    if args.scripts:
+        sizes["scripts"] = tuple(args.scripts)
+    suite = Suite(args.workdir, sizes, args.repeat, args.only)
+    results = suite.run()
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": suite.sizes,
+        "results": results,
+    }
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare_path:
+        compare(results, args.compare_path)
+
+
+if __name__ == "__main__":
+    main()
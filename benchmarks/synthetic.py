@@ -0,0 +1,126 @@
+"""
+Synthetic data for the benchmarks: script projects with deep folder trees, scheduler histories,
+schedules and multi-MB run logs. Everything is seeded, so the same arguments give the same data.
+"""
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+TOP_FOLDERS = ("backend", "frontend", "api", "scripts", "infra", "tools", "jobs", "deploy")
+SCRIPT_WORDS = ("build", "deploy", "migrate", "seed", "backup", "restore", "lint", "test", "sync",
+                "clean", "release", "start", "stop", "report", "import", "export", "rotate", "warm")
+LOG_TEMPLATES = (
+    "INFO 2024-05-{d:02d} 12:{m:02d}:{s:02d} worker-{r} processed {n} items in {m}ms",
+    "\x1b[32mOK\x1b[0m step {n} finished ({r} retries)",
+    "\x1b[1;33mWARN\x1b[0m retrying request {n} (attempt {r} of 5)",
+    "\x1b[31mERROR\x1b[0m job {n} failed: connection reset by peer",
+    "+ cd /srv/app/{r} && ./run.sh --batch {n}",
+    "    at step_{r} (deploy.sh:{n})",
+)
+
+
+def make_project(root: str, scripts: int, max_depth: int = 6, seed: int = 1) -> str:
+    """Writes `scripts` .sh files under root, spread over folders up to max_depth deep. Reuses an existing tree."""
+    marker = os.path.join(root, ".synthetic")
+    if os.path.isfile(marker):
+        with open(marker, encoding="utf-8") as f:
+            if f.read() == f"{scripts} {max_depth} {seed}":
+                return root
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+    folders = [""]
+    for i in range(max(1, scripts // 20)):
+        depth = rng.randint(1, max_depth)
+        parts = [rng.choice(TOP_FOLDERS)] + [f"{rng.choice(SCRIPT_WORDS)}_{rng.randint(0, 99)}" for _ in range(depth - 1)]
+        folders.append(os.path.join(*parts))
+    for i in range(scripts):
+        folder = os.path.join(root, rng.choice(folders))
+        os.makedirs(folder, exist_ok=True)
+        name = f"{rng.choice(SCRIPT_WORDS)}_{rng.choice(SCRIPT_WORDS)}_{i}.sh"
+        with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+            f.write(f"#!/bin/bash\n# {rng.choice(SCRIPT_WORDS).title()} step {i}\n# @arg TARGET where to run\nset -e\necho \"run {i}\"\n")
+    with open(marker, "w", encoding="utf-8") as f:
+        f.write(f"{scripts} {max_depth} {seed}")
+    return root
+
+
+def list_scripts(root: str) -> list[str]:
+    paths = []
+    for dirpath, _dirnames, filenames in os.walk(root):
+        paths.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(".sh"))
+    return sorted(paths)
+
+
+def make_history(runs: int, script_paths: list[str], schedules: list[dict], manual_share: float = 0.3, seed: int = 2) -> list[dict]:
+    """History entries, oldest first, mixing scheduled and manual runs and every status."""
+    rng = random.Random(seed)
+    start = datetime.now().astimezone() - timedelta(days=30)
+    step = timedelta(days=30) / max(runs, 1)
+    entries = []
+    for i in range(runs):
+        triggered = start + step * i
+        manual = not schedules or rng.random() < manual_share
+        schedule = None if manual else rng.choice(schedules)
+        status = rng.choice(("exited", "exited", "exited", "killed", "failed"))
+        entry = {
+            "id": f"{i:032x}",
+            "schedule_id": "" if manual else schedule["id"],
+            "schedule_name": "Manual Run" if manual else schedule["name"],
+            "script_path": schedule["script_path"] if schedule else rng.choice(script_paths),
+            "triggered_at": triggered.isoformat(),
+            "started_at": None if status == "failed" else triggered.isoformat(),
+            "finished_at": None if status == "failed" else (triggered + timedelta(seconds=rng.randint(1, 600))).isoformat(),
+            "status": status,
+        }
+        if status == "failed":
+            entry["error_message"] = "Script not found"
+        entries.append(entry)
+    return entries
+
+
+def make_schedules(count: int, script_paths: list[str], seed: int = 3) -> list[dict]:
+    """Enabled time and interval schedules; interval bases are spread so that a few are due at any moment."""
+    rng = random.Random(seed)
+    now = datetime.now().astimezone()
+    schedules = []
+    for i in range(count):
+        schedule = {
+            "id": f"s{i:031x}",
+            "name": f"schedule {i}",
+            "script_path": rng.choice(script_paths),
+            "enabled": rng.random() < 0.9,
+            "created_at": now.isoformat(),
+        }
+        if i % 2:
+            hours, minutes = rng.choice(((0, 5), (0, 30), (1, 0), (6, 0)))
+            schedule["rule_type"] = "interval"
+            schedule["rule"] = {"hours": hours, "minutes": minutes}
+            schedule["interval_base_at"] = (now - timedelta(minutes=rng.randint(0, 600))).isoformat()
+        else:
+            schedule["rule_type"] = "time"
+            schedule["rule"] = {"hour": rng.randint(0, 23), "minute": rng.randint(0, 59),
+                                "days": sorted(rng.sample(range(7), rng.randint(1, 7)))}
+        schedules.append(schedule)
+    return schedules
+
+
+def make_log(size_bytes: int, seed: int = 4) -> str:
+    """Run output with ANSI colors, about size_bytes long."""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    n = 0
+    while total < size_bytes:
+        line = rng.choice(LOG_TEMPLATES).format(n=n, r=rng.randint(1, 9), d=rng.randint(1, 28),
+                                                m=rng.randint(0, 59), s=rng.randint(0, 59))
+        lines.append(line)
+        total += len(line) + 1
+        n += 1
+    return "\n".join(lines) + "\n"
+
+
+def write_json(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
@@ -0,0 +1,71 @@
+"""
+Admission control: whether the machine has room to start another run, and how much memory a run uses.
+Before a run starts, the host checks the admission limits from config: the 1-minute load average
+per CPU, the free memory, and the memory all running scripts use together (0 turns a limit off).
+Over a limit, the run waits with a "waiting" history entry; the host retries the oldest waiting
+run every ADMISSION_RETRY_SEC and starts at most one per retry, so runs started together do not
+all pass the same check. Pipeline steps do not wait in line: they stay pending until there is room.
+A script with a memory limit has runs that go over it killed, checked every MEMORY_CHECK_SEC.
+psutil is imported on first use, so hosts without limits never load it.
+Pure logic module with no UI dependencies.
+"""
+from metrics import BYTES_PER_MB
+
+ADMISSION_RETRY_SEC = 5.0
+MEMORY_CHECK_SEC = 2.0
+WAITING_MESSAGE = "Waiting for resources: {reason}."
+QUEUED_REASON = "earlier runs are waiting"
+MEMORY_LIMIT_MESSAGE = "Killed: used {rss_mb:.0f} MB, over the script's {limit_mb} MB memory limit."
+
+
+def tree_rss_mb(pids: list[int]) -> float:
+    """
+    Resident memory of the given processes and their current descendants together, in MB.
+    Processes that are gone count as 0.
+    """
+    import psutil
+
+    seen: set[int] = set()
+    total = 0
+    for pid in pids:
+        try:
+            proc = psutil.Process(pid)
+            procs = [proc] + proc.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        for p in procs:
+            if p.pid in seen:
+                continue
+            seen.add(p.pid)
+            try:
+                total += p.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    return total / BYTES_PER_MB
+
+
+def admission_block(limits: dict, running_pids: list[list[int]]) -> str | None:
+    """
+    Why a run cannot start now, or None if it can.
+    limits: from config.load_admission_limits(); running_pids: the process tree of each live run.
+    """
+    if not any(limits.values()):
+        return None
+    import psutil
+
+    max_load = limits.get("max_load_per_cpu", 0)
+    if max_load:
+        load = psutil.getloadavg()[0] / (psutil.cpu_count() or 1)
+        if load > max_load:
+            return f"load is {load:.2f} per CPU, over {max_load:g}"
+    min_free = limits.get("min_free_mb", 0)
+    if min_free:
+        free_mb = psutil.virtual_memory().available / BYTES_PER_MB
+        if free_mb < min_free:
+            return f"{free_mb:.0f} MB of memory free, under {min_free:.0f} MB"
+    max_rss = limits.get("max_running_rss_mb", 0)
+    if max_rss and running_pids:
+        rss_mb = sum(tree_rss_mb(pids) for pids in running_pids)
+        if rss_mb >= max_rss:
+            return f"running scripts use {rss_mb:.0f} MB, the limit is {max_rss:.0f} MB"
+    return None
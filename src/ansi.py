@@ -0,0 +1,172 @@
+"""
+ANSI escape sequence handling for captured run logs.
+AnsiParser turns a stream of text containing SGR sequences (ESC [ ... m) into (text, style) runs;
+it keeps state between chunks, so a sequence split across two reads is handled. All other escape
+sequences (cursor movement, erase, OSC titles) and carriage returns are dropped.
+A style is a (fg, bg, flags) tuple: colors are None (default), an xterm palette index 0-255 or a
+"#rrggbb" string; flags is a bitmask of the FLAG_* attributes. Styled text is stored as plain text
+plus a separate list of [start, length, fg, bg, flags] runs.
+Pure logic module with no UI dependencies.
+"""
+import re
+
+FLAG_BOLD = 1
+FLAG_DIM = 2
+FLAG_ITALIC = 4
+FLAG_UNDERLINE = 8
+FLAG_INVERSE = 16
+
+DEFAULT_STYLE = (None, None, 0)
+MAX_PENDING_ESCAPE = 256  # longer unterminated sequences are dropped
+SGR_CACHE_SIZE = 1024     # (style, params) -> style transitions remembered per parser
+
+# CSI (captures params + final byte), OSC terminated by BEL or ST, charset designation or a two-byte escape.
+ESCAPE_RE = re.compile(r"\x1b(?:\[([0-?]*)[ -/]*([@-~])|\][^\x07\x1b]*(?:\x07|\x1b\\)|[()][0-9A-Za-z]|[=>@-Z\\-_])")
+# What a sequence cut off at the end of a chunk can look like.
+PARTIAL_ESCAPE_RE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b]*|[()])?")
+
+_SET_FLAGS = {1: FLAG_BOLD, 2: FLAG_DIM, 3: FLAG_ITALIC, 4: FLAG_UNDERLINE, 7: FLAG_INVERSE}
+_CLEAR_FLAGS = {22: FLAG_BOLD | FLAG_DIM, 23: FLAG_ITALIC, 24: FLAG_UNDERLINE, 27: FLAG_INVERSE}
+
+# xterm default 16 colors
+BASE_COLORS = (
+    "#000000", "#cd3131", "#0dbc79", "#e5e510", "#2472c8", "#bc3fbc", "#11a8cd", "#e5e5e5",
+    "#666666", "#f14c4c", "#23d18b", "#f5f543", "#3b8eea", "#d670d6", "#29b8db", "#ffffff",
+)
+
+
+def color_hex(color) -> str | None:
+    """Style color (None, 0-255 index or '#rrggbb') -> '#rrggbb' (None for the default color)."""
+    if color is None or isinstance(color, str):
+        return color
+    if color < 16:
+        return BASE_COLORS[color]
+    if color < 232:
+        c = color - 16
+        levels = [0 if v == 0 else 55 + 40 * v for v in (c // 36, (c // 6) % 6, c % 6)]
+        return "#{:02x}{:02x}{:02x}".format(*levels)
+    gray = 8 + 10 * (color - 232)
+    return f"#{gray:02x}{gray:02x}{gray:02x}"
+
+
+def apply_sgr(style: tuple, params: str) -> tuple:
+    """Returns the style after an SGR sequence with the given ';'-separated params."""
+    fg, bg, flags = style
+    codes = [int(p) if p.isdigit() else 0 for p in params.replace(":", ";").split(";")] if params else [0]
+    i = 0
+    while i < len(codes):
+        code = codes[i]
+        if code == 0:
+            fg, bg, flags = DEFAULT_STYLE
+        elif code in _SET_FLAGS:
+            flags |= _SET_FLAGS[code]
+        elif code in _CLEAR_FLAGS:
+            flags &= ~_CLEAR_FLAGS[code]
+        elif 30 <= code <= 37:
+            fg = code - 30
+        elif 90 <= code <= 97:
+            fg = code - 90 + 8
+        elif 40 <= code <= 47:
+            bg = code - 40
+        elif 100 <= code <= 107:
+            bg = code - 100 + 8
+        elif code == 39:
+            fg = None
+        elif code == 49:
+            bg = None
+        elif code in (38, 48) and i + 1 < len(codes):
+            color = None
+            if codes[i + 1] == 5 and i + 2 < len(codes):
+                color = codes[i + 2] & 0xFF
+                i += 2
+            elif codes[i + 1] == 2 and i + 4 < len(codes):
+                color = "#{:02x}{:02x}{:02x}".format(*(min(v, 255) for v in codes[i + 2:i + 5]))
+                i += 4
+            if code == 38:
+                fg = color
+            else:
+                bg = color
+        i += 1
+    return fg, bg, flags
+
+
+class AnsiParser:
+    """Streaming parser: feed() text chunks, get back [(text, style)] runs with escapes removed."""
+
+    def __init__(self):
+        self.style = DEFAULT_STYLE
+        self._pending = ""
+        self._sgr_cache: dict[tuple, tuple] = {}
+
+    def feed(self, data: str) -> list[tuple[str, tuple]]:
+        data = self._pending + data
+        self._pending = ""
+        cut = data.rfind("\x1b")
+        if (
+            cut >= 0
+            and len(data) - cut <= MAX_PENDING_ESCAPE
+            and PARTIAL_ESCAPE_RE.fullmatch(data, cut) is not None
+        ):
+            # Possibly an incomplete sequence at the end of this chunk; keep it for the next one.
+            data, self._pending = data[:cut], data[cut:]
+
+        runs: list[tuple[str, tuple]] = []
+        pos = 0
+        for m in ESCAPE_RE.finditer(data):
+            if m.start() > pos:
+                self._emit(runs, data[pos:m.start()])
+            if m.group(2) == "m":
+                key = (self.style, m.group(1))
+                style = self._sgr_cache.get(key)
+                if style is None:
+                    if len(self._sgr_cache) >= SGR_CACHE_SIZE:
+                        self._sgr_cache.clear()
+                    style = self._sgr_cache[key] = apply_sgr(self.style, m.group(1))
+                self.style = style
+            pos = m.end()
+        if pos < len(data):
+            self._emit(runs, data[pos:])
+        return runs
+
+    def _emit(self, runs: list, text: str) -> None:
+        if "\r" in text or "\x1b" in text:
+            text = text.replace("\r", "").replace("\x1b", "")
+        if not text:
+            return
+        if runs and runs[-1][1] == self.style:
+            runs[-1] = (runs[-1][0] + text, self.style)
+        else:
+            runs.append((text, self.style))
+
+
+class StyledText:
+    """Accumulates parsed runs as plain text plus [start, length, fg, bg, flags] style runs."""
+
+    def __init__(self):
+        self._parts: list[str] = []
+        self.length = 0
+        self.runs: list[list] = []
+
+    def add(self, runs: list[tuple[str, tuple]]) -> None:
+        for text, style in runs:
+            if style != DEFAULT_STYLE:
+                last = self.runs[-1] if self.runs else None
+                if last is not None and last[0] + last[1] == self.length and tuple(last[2:]) == style:
+                    last[1] += len(text)
+                else:
+                    self.runs.append([self.length, len(text), *style])
+            self._parts.append(text)
+            self.length += len(text)
+
+    @property
+    def text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+
+def strip_ansi(text: str) -> tuple[str, list[list]]:
+    """Returns (text without escape sequences, style runs)."""
+    styled = StyledText()
+    styled.add(AnsiParser().feed(text))
+    return styled.text, styled.runs
@@ -0,0 +1,176 @@
+"""
+Per-run cgroups on Linux. When enabled, a run is launched through `systemd-run --user --scope`, so it
+gets its own cgroup v2 unit inside the user's delegated slice with the configured CPU weight and quota,
+memory.max and pids.max. Its metrics are then read from the cgroup (cpu.stat, memory.current less the
+page cache in memory.stat, pids.current), which counts every process of the run without walking the
+process tree.
+Pure logic module with no UI dependencies.
+"""
+import os
+import platform
+import shutil
+import subprocess
+import threading
+import time
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+UNIT_PREFIX = "shscripthub-run-"
+PROBE_TIMEOUT_SEC = 5
+MAX_CPU_SAMPLES = 256
+
+_scope_available: bool | None = None
+_scope_probed = threading.Event()
+_scope_probe_lock = threading.Lock()
+_scope_probe_started = False
+# cgroup path -> (usage_usec, time.monotonic()) from the previous cgroup_usage() call
+_cpu_samples: dict[str, tuple[int, float]] = {}
+
+
+def probe_scope() -> None:
+    """Starts the scope_available() probe on a background thread, once."""
+    global _scope_probe_started
+    with _scope_probe_lock:
+        if _scope_probe_started:
+            return
+        _scope_probe_started = True
+    threading.Thread(target=_probe_scope, name="scope-probe", daemon=True).start()
+
+
+def _probe_scope() -> None:
+    global _scope_available
+    available = False
+    if (
+        platform.system() == "Linux"
+        and os.path.isfile(os.path.join(CGROUP_ROOT, "cgroup.controllers"))
+        and shutil.which("systemd-run")
+    ):
+        try:
+            probe = subprocess.run(
+                ["systemd-run", "--user", "--scope", "--quiet", "--collect", "true"],
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                timeout=PROBE_TIMEOUT_SEC,
+            )
+            available = probe.returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+    _scope_available = available
+    _scope_probed.set()
+
+
+def scope_available(wait: bool = True) -> bool | None:
+    """
+    True if runs can be put in their own systemd user scope (cgroup v2 and a user manager). Probed once,
+    in the background (see probe_scope); with wait=False, returns None until the probe has finished.
+    """
+    probe_scope()
+    if wait:
+        _scope_probed.wait()
+    return _scope_available
+
+
+def scope_argv(run_id: str, settings: dict, wait: bool = True) -> list[str] | None:
+    """
+    Command prefix that runs a program in the run's own scope with the limits in settings
+    (see config.load_cgroup_settings), or None when per-run cgroups are off or not available.
+    With wait=False, a run started before scope_available() is known gets no scope.
+    """
+    if not settings.get("enabled") or not scope_available(wait):
+        return None
+    argv = ["systemd-run", "--user", "--scope", "--quiet", "--collect", f"--unit={UNIT_PREFIX}{run_id}"]
+    if settings.get("cpu_weight"):
+        argv.append(f"--property=CPUWeight={settings['cpu_weight']}")
+    if settings.get("cpu_quota_percent"):
+        argv.append(f"--property=CPUQuota={settings['cpu_quota_percent']}%")
+    if settings.get("memory_max_mb"):
+        argv.append(f"--property=MemoryMax={settings['memory_max_mb']}M")
+    if settings.get("pids_max"):
+        argv.append(f"--property=TasksMax={settings['pids_max']}")
+    return argv + ["--"]
+
+
+def run_cgroup(pid: int) -> str | None:
+    """The cgroup directory of a run launched in its own scope, from its main process; None otherwise."""
+    try:
+        with open(f"/proc/{pid}/cgroup", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    for line in lines:
+        if line.startswith("0::"):
+            rel = line[3:].strip().lstrip("/")
+            if os.path.basename(rel).startswith(UNIT_PREFIX):
+                return os.path.join(CGROUP_ROOT, rel)
+    return None
+
+
+def _read_int(path: str) -> int | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def _cpu_usage_usec(cgroup: str) -> int | None:
+    try:
+        with open(os.path.join(cgroup, "cpu.stat"), encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(" ")
+                if key == "usage_usec":
+                    return int(value)
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _file_bytes(cgroup: str) -> int:
+    """Page cache charged to the cgroup ("file" in memory.stat)."""
+    try:
+        with open(os.path.join(cgroup, "memory.stat"), encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(" ")
+                if key == "file":
+                    return int(value)
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def cgroup_usage(cgroup: str) -> dict | None:
+    """
+    Returns the run's totals from its cgroup: cpu_percent (since the previous call; 0 on the first),
+    cpu_time_sec, memory_bytes and tasks. None once the cgroup is gone. memory_bytes leaves out the page
+    cache that memory.current also counts (files the run read or wrote), so it compares with RSS.
+    """
+    usage_usec = _cpu_usage_usec(cgroup)
+    memory = _read_int(os.path.join(cgroup, "memory.current"))
+    if usage_usec is None or memory is None:
+        _cpu_samples.pop(cgroup, None)
+        return None
+    now = time.monotonic()
+    cpu_percent = 0.0
+    previous = _cpu_samples.get(cgroup)
+    if previous is not None and now > previous[1]:
+        cpu_percent = max(0, usage_usec - previous[0]) / 1e6 / (now - previous[1]) * 100
+    if cgroup not in _cpu_samples and len(_cpu_samples) >= MAX_CPU_SAMPLES:
+        for gone in [path for path in _cpu_samples if not os.path.isdir(path)]:
+            del _cpu_samples[gone]
+    _cpu_samples[cgroup] = (usage_usec, now)
+    return {
+        "cpu_percent": cpu_percent,
+        "cpu_time_sec": usage_usec / 1e6,
+        "memory_bytes": max(0, memory - _file_bytes(cgroup)),
+        "tasks": _read_int(os.path.join(cgroup, "pids.current")) or 0,
+    }
+
+
+def kill_cgroup(cgroup: str) -> None:
+    """Kills every process left in the run's cgroup (cgroup.kill, Linux 5.14+)."""
+    _cpu_samples.pop(cgroup, None)
+    try:
+        with open(os.path.join(cgroup, "cgroup.kill"), "w", encoding="utf-8") as f:
+            f.write("1")
+    except OSError:
+        pass
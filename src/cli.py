@@ -0,0 +1,685 @@
+"""
+shscripthub command-line client: `python src/cli.py <command>`.
+Talks to a running window or headless scheduler through the control API. Without one, list, run,
+logs, history, schedules and pipelines work directly on the project and the Scheduler folder (run
+then stays in the foreground until its scripts end). kill, status and pipelines run need a running hub.
+Each command imports only what it uses: PySide6, psutil and asyncio are never loaded.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from config import load_project_path
+from control_client import ControlClient, ControlClientError
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_NO_HUB = 3
+SINCE_RE = re.compile(r"^(\d+)([smhd])$")
+SINCE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+class CliError(Exception):
+    """Reported on stderr; the command exits with EXIT_ERROR."""
+
+
+def _connect(timeout: float | None = 10.0) -> ControlClient | None:
+    try:
+        return ControlClient(timeout=timeout)
+    except OSError:
+        return None
+
+
+def _require_hub() -> ControlClient:
+    client = _connect()
+    if client is None:
+        raise CliError("No ShScriptHub is running. Start the app or `python src/main.py --headless` first.")
+    return client
+
+
+def _project_path(client: ControlClient | None) -> str:
+    project_path = client.call("hub.status")["project_path"] if client is not None else load_project_path()
+    if not project_path or not os.path.isdir(project_path):
+        raise CliError("No project path set. Open the project once in the GUI first.")
+    return project_path
+
+
+def _resolve(path: str, project_path: str) -> str:
+    """Absolute script path: as given, relative to the current directory, or relative to the project."""
+    if os.path.isabs(path) or os.path.exists(path):
+        return os.path.abspath(path)
+    return os.path.normpath(os.path.join(project_path, path))
+
+
+def _rel(path: str, project_path: str | None) -> str:
+    if project_path and path:
+        rel = os.path.relpath(path, project_path)
+        if not rel.startswith(".."):
+            return rel.replace(os.sep, "/")
+    return path or ""
+
+
+def _print_json(data) -> None:
+    json.dump(data, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+def _parse_since(value: str):
+    from datetime import datetime, timedelta
+
+    match = SINCE_RE.match(value.strip())
+    if match:
+        return datetime.now().astimezone() - timedelta(seconds=int(match.group(1)) * SINCE_UNITS[match.group(2)])
+    try:
+        return datetime.fromisoformat(value).astimezone()
+    except ValueError:
+        raise CliError(f"--since: expected an ISO timestamp or a duration like 30m, 6h, 2d; got {value!r}.")
+
+
+class _LinePrinter:
+    """Writes streamed output, prefixing every line with the script name when several runs share the terminal."""
+
+    def __init__(self, prefix: str = ""):
+        self._prefix = prefix
+        self._partial = ""
+
+    def write(self, text: str) -> None:
+        if not self._prefix:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            return
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        if lines:
+            sys.stdout.write("".join(f"{self._prefix}{line}\n" for line in lines))
+            sys.stdout.flush()
+
+    def close(self) -> None:
+        if self._partial:
+            self.write("\n")
+
+
+# ----------------------------------------------------------------------
+# Commands
+# ----------------------------------------------------------------------
+
+def cmd_list(args) -> int:
+    client = _connect()
+    project_path = _project_path(client)
+    if client is not None:
+        with client:
+            scripts = client.call("scripts.list")
+    else:
+        from config import load_script_categories
+        from script_manager import ScriptManager, default_category
+
+        categories = load_script_categories()
+        scripts = [
+            {
+                "path": s["path"],
+                "name": s["name"],
+                "category": categories.get(s["path"]) or default_category(s["path"], project_path),
+                "running": False,
+            }
+            for s in sorted(ScriptManager(project_path).get_scripts(), key=lambda s: s["path"].lower())
+        ]
+    if args.running:
+        scripts = [s for s in scripts if s["running"]]
+    if args.category:
+        scripts = [s for s in scripts if (s["category"] or "None") == args.category]
+    if args.json:
+        _print_json(scripts)
+    elif args.long:
+        for s in scripts:
+            print(f"{'*' if s['running'] else ' '} {s['category'] or '-':<9} {_rel(s['path'], project_path)}")
+    else:
+        for s in scripts:
+            print(_rel(s["path"], project_path))
+    return EXIT_OK
+
+
+def _follow_runs(runs: list[tuple[str, str]]) -> None:
+    """Prints the output of (run_id, script name) runs until they all end."""
+    import threading
+
+    def follow(run_id: str, prefix: str) -> None:
+        printer = _LinePrinter(prefix)
+        client = _connect(timeout=None)
+        if client is None:
+            return
+        with client:
+            try:
+                client.call(
+                    "logs.tail", {"run_id": run_id, "follow": True},
+                    lambda method, params: printer.write(params.get("text", "")),
+                )
+            except (ControlClientError, ConnectionError) as exc:
+                print(f"{prefix}{exc}", file=sys.stderr)
+        printer.close()
+
+    threads = [
+        threading.Thread(target=follow, args=(run_id, f"[{name}] " if len(runs) > 1 else ""), daemon=True)
+        for run_id, name in runs
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        while thread.is_alive():
+            thread.join(0.2)  # short joins keep Ctrl+C responsive
+
+
+def cmd_run(args) -> int:
+    client = _connect()
+    project_path = _project_path(client)
+    paths = [_resolve(p, project_path) for p in args.paths]
+    if client is None:
+        return _run_local(paths, project_path)
+    started = []
+    failures = 0
+    with client:
+        for path in paths:
+            try:
+                run_id = client.call("scripts.run", {"path": path})["run_id"]
+            except ControlClientError as exc:
+                print(f"{_rel(path, project_path)}: {exc}", file=sys.stderr)
+                failures += 1
+                continue
+            started.append((run_id, os.path.basename(path)))
+            print(f"{run_id}\t{_rel(path, project_path)}", file=sys.stderr if args.wait else sys.stdout)
+    if args.wait and started:
+        _follow_runs(started)
+    return EXIT_ERROR if failures else EXIT_OK
+
+
+def _run_local(paths: list[str], project_path: str) -> int:
+    """Runs scripts without a hub: captured like a manual run in the window, waiting for them to end."""
+    from cgroups import run_cgroup, scope_argv
+    from config import load_cgroup_settings, load_script_categories, load_terminal_path, load_venv_activate_path
+    from log_capture import LOG_POLL_INTERVAL, LogCapture
+    from scheduler_data import create_history_entry, finished_fields, now_iso
+    from scheduler_engine import validate_trigger
+    from scheduler_storage import (
+        append_history_entry,
+        get_run_exit_file_path,
+        get_run_log_file_path,
+        take_run_exit_code,
+        update_history_entry,
+    )
+    from script_manager import default_category
+    from utils import kill_script_process, run_script_in_gitbash_captured
+
+    categories = load_script_categories()
+    terminal_path = load_terminal_path()
+    venv_activate_path = load_venv_activate_path()
+    cgroup_settings = load_cgroup_settings()
+    runs = []
+    failures = 0
+    for path in paths:
+        error = validate_trigger(path, project_path)
+        if error:
+            print(f"{_rel(path, project_path)}: {error}", file=sys.stderr)
+            failures += 1
+            continue
+        entry = create_history_entry(
+            schedule_id="",
+            schedule_name="Manual Run",
+            script_path=path,
+            triggered_at=now_iso(),
+            started_at=now_iso(),
+            status="started",
+        )
+        append_history_entry(entry)
+        log_file_path = get_run_log_file_path(entry["id"])
+        try:
+            proc = run_script_in_gitbash_captured(
+                path,
+                categories.get(path) or default_category(path, project_path),
+                project_path,
+                log_file_path=log_file_path,
+                terminal_path=terminal_path,
+                venv_activate_path=venv_activate_path,
+                scope_argv=scope_argv(entry["id"], cgroup_settings),
+                exit_file_path=get_run_exit_file_path(entry["id"]),
+            )
+        except Exception as exc:
+            update_history_entry(entry["id"], {"status": "failed", "started_at": None, "error_message": str(exc)})
+            print(f"{_rel(path, project_path)}: {exc}", file=sys.stderr)
+            failures += 1
+            continue
+        print(f"{entry['id']}\t{_rel(path, project_path)}", file=sys.stderr)
+        runs.append((proc, LogCapture(entry["id"], log_file_path)))
+
+    def finish(proc, capture: LogCapture, fields: dict) -> None:
+        capture.poll(final=True)
+        capture.save()
+        capture.remove_file()
+        update_history_entry(capture.run_id, fields)
+
+    try:
+        while runs:
+            time.sleep(LOG_POLL_INTERVAL)
+            for run in list(runs):
+                proc, capture = run
+                if proc.poll() is not None:
+                    fields = finished_fields(take_run_exit_code(capture.run_id))
+                    finish(proc, capture, fields)
+                    if fields["status"] == "failed":
+                        print(f"{capture.run_id}: {fields['error_message']}", file=sys.stderr)
+                        failures += 1
+                    runs.remove(run)
+                    continue
+                capture.poll()
+    except KeyboardInterrupt:
+        for proc, capture in runs:
+            kill_script_process(proc, [proc.pid], run_cgroup(proc.pid))
+            take_run_exit_code(capture.run_id)
+            finish(proc, capture, {"status": "killed", "finished_at": now_iso()})
+        return 130
+    return EXIT_ERROR if failures else EXIT_OK
+
+
+def cmd_kill(args) -> int:
+    with _require_hub() as client:
+        project_path = _project_path(client)
+        failures = 0
+        for run_id in args.run_ids or []:
+            killed = client.call("runs.kill", {"run_id": run_id})["killed"]
+            print(f"{'killed' if killed else 'not running'}\trun {run_id}")
+        if args.all:
+            paths = list(dict.fromkeys(run["path"] for run in client.call("runs.list")))
+        else:
+            paths = [_resolve(p, project_path) for p in args.paths]
+        for path in paths:
+            try:
+                killed = client.call("scripts.kill", {"path": path})["killed"]
+            except ControlClientError as exc:
+                print(f"{_rel(path, project_path)}: {exc}", file=sys.stderr)
+                failures += 1
+                continue
+            print(f"{'killed' if killed else 'not running'}\t{_rel(path, project_path)}")
+    return EXIT_ERROR if failures else EXIT_OK
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(max(seconds, 0))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def cmd_status(args) -> int:
+    client = _connect()
+    if client is None:
+        if args.json:
+            _print_json(None)
+        else:
+            print("No ShScriptHub is running.")
+        return EXIT_NO_HUB
+    with client:
+        status = client.call("hub.status")
+        runs = client.call("runs.list")
+    if args.json:
+        _print_json({**status, "runs": runs})
+        return EXIT_OK
+    project_path = status["project_path"]
+    print(f"ShScriptHub ({status['mode']}, pid {status['pid']}) - project {project_path or '(none)'}")
+    if not runs:
+        print("No scripts running.")
+        return EXIT_OK
+    print(f"{'RUN ID':<32}  {'PID':>7}  {'CPU%':>6}  {'RSS MB':>8}  {'ELAPSED':>8}  SCRIPT")
+    for run in runs:
+        metrics = run.get("metrics") or {}
+        cpu = f"{metrics['cpu_percent']:.1f}" if metrics else "-"
+        rss = f"{metrics['rss_mb']:.1f}" if metrics else "-"
+        elapsed = _format_duration(metrics["elapsed_sec"]) if metrics else "-"
+        print(f"{run['run_id'] or '-':<32}  {run['pid']:>7}  {cpu:>6}  {rss:>8}  {elapsed:>8}  {_rel(run['path'], project_path)}")
+    return EXIT_OK
+
+
+def cmd_logs(args) -> int:
+    client = _connect(timeout=None)
+    if client is None:
+        from scheduler_storage import load_log
+
+        if args.follow:
+            print("No ShScriptHub is running; showing the stored log.", file=sys.stderr)
+        sys.stdout.write(load_log(args.run_id))
+        return EXIT_OK
+    printer = _LinePrinter()
+    with client:
+        client.call(
+            "logs.tail", {"run_id": args.run_id, "follow": args.follow},
+            lambda method, params: printer.write(params.get("text", "")),
+        )
+    return EXIT_OK
+
+
+def cmd_history(args) -> int:
+    from metrics import format_elapsed
+    from scheduler_data import run_duration_sec, status_matches
+    from scheduler_storage import load_history
+
+    runs = load_history()
+    if args.since:
+        from datetime import datetime
+
+        since = _parse_since(args.since)
+        runs = [r for r in runs if r.get("triggered_at") and datetime.fromisoformat(r["triggered_at"]) >= since]
+    project_path = load_project_path()
+    if args.status:
+        runs = [r for r in runs if status_matches(r.get("status"), args.status)]
+    if args.schedule:
+        runs = [r for r in runs if args.schedule in (r.get("schedule_id"), r.get("schedule_name"))]
+    if args.script:
+        script_path = _resolve(args.script, project_path or "")
+        runs = [r for r in runs if r.get("script_path") == script_path]
+    if args.limit is not None:
+        runs = runs[-args.limit:] if args.limit > 0 else []
+    if args.json:
+        _print_json(runs)
+        return EXIT_OK
+    for r in runs:
+        when = (r.get("triggered_at") or "")[:19].replace("T", " ")
+        duration = run_duration_sec(r)
+        took = format_elapsed(duration) if duration is not None else "-"
+        print(
+            f"{when}  {r.get('status', ''):<9}  {took:>8}  {r.get('id', '')}  {r.get('schedule_name', '')}  "
+            f"{_rel(r.get('script_path'), project_path)}"
+        )
+    return EXIT_OK
+
+
+def cmd_schedules_export(args) -> int:
+    client = _connect()
+    if client is not None:
+        with client:
+            schedules = client.call("schedules.list")
+    else:
+        from scheduler_storage import load_schedules
+
+        schedules = load_schedules()
+    data = json.dumps({"schedules": schedules}, indent=2) + "\n"
+    if args.file in (None, "-"):
+        sys.stdout.write(data)
+    else:
+        with open(args.file, "w", encoding="utf-8") as f:
+            f.write(data)
+        print(f"Exported {len(schedules)} schedule(s) to {args.file}", file=sys.stderr)
+    return EXIT_OK
+
+
+def _read_import_file(path: str, kind: str = "schedules") -> list[dict]:
+    from scheduler_data import validate_pipeline, validate_schedule
+
+    validate = validate_pipeline if kind == "pipelines" else validate_schedule
+    try:
+        if path == "-":
+            data = json.load(sys.stdin)
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+    except (OSError, json.JSONDecodeError) as exc:
+        raise CliError(f"Could not read {path}: {exc}")
+    items = data.get(kind) if isinstance(data, dict) else data
+    if not isinstance(items, list) or not all(isinstance(s, dict) for s in items):
+        raise CliError(f"{path}: expected a list of {kind} or {{\"{kind}\": [...]}}.")
+    problems = []
+    for index, item in enumerate(items):
+        errors = validate(item)
+        if errors:
+            problems.append(f"  #{index + 1} {item.get('name', '')!r}: {' '.join(errors)}")
+    if problems:
+        raise CliError(f"Nothing imported; invalid {kind}:\n" + "\n".join(problems))
+    return items
+
+
+def cmd_schedules_import(args) -> int:
+    from scheduler_data import schedule_fields
+
+    incoming = _read_import_file(args.file)
+    incoming_ids = {s.get("id") for s in incoming if s.get("id")}
+    created = updated = deleted = 0
+    client = _connect()
+    if client is not None:
+        with client:
+            existing = {s["id"] for s in client.call("schedules.list")}
+            for schedule in incoming:
+                fields = schedule_fields(schedule)
+                if schedule.get("id") in existing:
+                    client.call("schedules.update", {**fields, "id": schedule["id"]})
+                    updated += 1
+                else:
+                    client.call("schedules.create", {**fields, "id": schedule.get("id")})
+                    created += 1
+            if args.replace:
+                for schedule_id in existing - incoming_ids:
+                    client.call("schedules.delete", {"id": schedule_id})
+                    deleted += 1
+    else:
+        from scheduler_data import schedule_from_fields, update_schedule
+        from scheduler_storage import load_schedules, save_schedules, storage_lock
+
+        with storage_lock():
+            schedules = load_schedules()
+            by_id = {s.get("id"): s for s in schedules}
+            imported_ids = set()
+            for schedule in incoming:
+                current = by_id.get(schedule.get("id"))
+                if current is not None:
+                    update_schedule(current, schedule)
+                    imported_ids.add(current["id"])
+                    updated += 1
+                    continue
+                new = schedule_from_fields(schedule)
+                if schedule.get("id"):
+                    new["id"] = schedule["id"]
+                schedules.append(new)
+                by_id[new["id"]] = new
+                imported_ids.add(new["id"])
+                created += 1
+            if args.replace:
+                kept = [s for s in schedules if s.get("id") in imported_ids]
+                deleted = len(schedules) - len(kept)
+                schedules = kept
+            save_schedules(schedules)
+    print(f"Imported {len(incoming)} schedule(s): {created} created, {updated} updated, {deleted} deleted.")
+    return EXIT_OK
+
+
+def _load_pipelines(client: ControlClient | None) -> list[dict]:
+    if client is not None:
+        return client.call("pipelines.list")
+    from scheduler_storage import load_pipelines
+
+    return load_pipelines()
+
+
+def _find_pipeline(pipelines: list[dict], key: str) -> dict:
+    matches = [p for p in pipelines if key in (p.get("id"), p.get("name"))]
+    if not matches:
+        raise CliError(f"No pipeline with id or name {key!r}.")
+    if len(matches) > 1:
+        raise CliError(f"Several pipelines are named {key!r}; use the id.")
+    return matches[0]
+
+
+def cmd_pipelines_list(args) -> int:
+    client = _connect()
+    if client is not None:
+        with client:
+            pipelines = _load_pipelines(client)
+    else:
+        pipelines = _load_pipelines(None)
+    if args.json:
+        _print_json(pipelines)
+        return EXIT_OK
+    for p in pipelines:
+        steps = p.get("steps", [])
+        print(f"{p.get('id', '')}  {p.get('name', '')}  ({len(steps)} step{'s' if len(steps) != 1 else ''}, max parallel {p.get('max_parallel', '')})")
+    return EXIT_OK
+
+
+def cmd_pipelines_run(args) -> int:
+    with _require_hub() as client:
+        pipeline = _find_pipeline(_load_pipelines(client), args.pipeline)
+        result = client.call("pipelines.run", {"id": pipeline["id"]})
+    print(f"Started pipeline '{pipeline['name']}' (pipeline run {result['pipeline_run_id']})")
+    return EXIT_OK
+
+
+def cmd_pipelines_export(args) -> int:
+    client = _connect()
+    if client is not None:
+        with client:
+            pipelines = _load_pipelines(client)
+    else:
+        pipelines = _load_pipelines(None)
+    data = json.dumps({"pipelines": pipelines}, indent=2) + "\n"
+    if args.file in (None, "-"):
+        sys.stdout.write(data)
+    else:
+        with open(args.file, "w", encoding="utf-8") as f:
+            f.write(data)
+        print(f"Exported {len(pipelines)} pipeline(s) to {args.file}", file=sys.stderr)
+    return EXIT_OK
+
+
+def cmd_pipelines_import(args) -> int:
+    from scheduler_data import DEFAULT_MAX_PARALLEL, PIPELINE_FIELDS
+
+    incoming = _read_import_file(args.file, "pipelines")
+    created = updated = 0
+    client = _connect()
+    if client is not None:
+        with client:
+            existing = {p["id"] for p in client.call("pipelines.list")}
+            for pipeline in incoming:
+                fields = {key: pipeline[key] for key in PIPELINE_FIELDS if key in pipeline}
+                if pipeline.get("id") in existing:
+                    client.call("pipelines.update", {**fields, "id": pipeline["id"]})
+                    updated += 1
+                else:
+                    client.call("pipelines.create", {**fields, "id": pipeline.get("id")})
+                    created += 1
+    else:
+        from scheduler_data import create_pipeline
+        from scheduler_storage import load_pipelines, save_pipelines, storage_lock
+
+        with storage_lock():
+            pipelines = load_pipelines()
+            by_id = {p.get("id"): p for p in pipelines}
+            for pipeline in incoming:
+                fields = {key: pipeline[key] for key in PIPELINE_FIELDS if key in pipeline}
+                current = by_id.get(pipeline.get("id"))
+                if current is not None:
+                    current.update(fields)
+                    updated += 1
+                    continue
+                new = create_pipeline(fields["name"], fields["steps"], fields.get("max_parallel", DEFAULT_MAX_PARALLEL))
+                if pipeline.get("id"):
+                    new["id"] = pipeline["id"]
+                pipelines.append(new)
+                by_id[new["id"]] = new
+                created += 1
+            save_pipelines(pipelines)
+    print(f"Imported {len(incoming)} pipeline(s): {created} created, {updated} updated.")
+    return EXIT_OK
+
+
+# ----------------------------------------------------------------------
+# Entry point
+# ----------------------------------------------------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="shscripthub", description="Control ShScriptHub from the command line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("list", help="list the project's scripts")
+    p.add_argument("-l", "--long", action="store_true", help="show running state and category")
+    p.add_argument("--running", action="store_true", help="only running scripts")
+    p.add_argument("--category", help="only scripts in this category (backend, frontend, None)")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser("run", help="run scripts (paths relative to the project or the current directory)")
+    p.add_argument("paths", nargs="+", metavar="PATH")
+    p.add_argument("-w", "--wait", action="store_true", help="print their output and wait until they end")
+    p.set_defaults(func=cmd_run)
+
+    p = commands.add_parser("kill", help="kill running scripts")
+    p.add_argument("paths", nargs="*", metavar="PATH")
+    p.add_argument("--all", action="store_true", help="kill every running script")
+    p.add_argument("--run", dest="run_ids", action="append", metavar="RUN_ID", help="kill one run (repeatable)")
+    p.set_defaults(func=cmd_kill)
+
+    p = commands.add_parser("status", help="show the running hub and its running scripts")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_status)
+
+    p = commands.add_parser("logs", help="print a run's log")
+    p.add_argument("run_id")
+    p.add_argument("-f", "--follow", action="store_true", help="keep printing new output until the run ends")
+    p.set_defaults(func=cmd_logs)
+
+    p = commands.add_parser("history", help="list recorded runs")
+    p.add_argument("--since", help="ISO timestamp or duration like 30m, 6h, 2d")
+    p.add_argument(
+        "--status",
+        choices=("failures", "waiting", "started", "succeeded", "failed", "timed_out", "killed", "exited", "skipped"),
+        help="'failures' lists failed and timed-out runs",
+    )
+    p.add_argument("--schedule", help="schedule id or name ('Manual Run' for manual runs)")
+    p.add_argument("--script", help="script path")
+    p.add_argument("-n", "--limit", type=int, help="only the last N runs")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_history)
+
+    p = commands.add_parser("schedules", help="export or import schedules")
+    actions = p.add_subparsers(dest="action", required=True)
+    a = actions.add_parser("export", help="write schedules as JSON")
+    a.add_argument("file", nargs="?", help="output file (default: stdout)")
+    a.set_defaults(func=cmd_schedules_export)
+    a = actions.add_parser("import", help="add or update schedules from a JSON export")
+    a.add_argument("file", help="input file, or - for stdin")
+    a.add_argument("--replace", action="store_true", help="delete schedules that are not in the file")
+    a.set_defaults(func=cmd_schedules_import)
+
+    p = commands.add_parser("pipelines", help="list, run, export or import pipelines")
+    actions = p.add_subparsers(dest="action", required=True)
+    a = actions.add_parser("list", help="list pipelines")
+    a.add_argument("--json", action="store_true")
+    a.set_defaults(func=cmd_pipelines_list)
+    a = actions.add_parser("run", help="start a run of a pipeline in the running hub")
+    a.add_argument("pipeline", help="pipeline id or name")
+    a.set_defaults(func=cmd_pipelines_run)
+    a = actions.add_parser("export", help="write pipelines as JSON")
+    a.add_argument("file", nargs="?", help="output file (default: stdout)")
+    a.set_defaults(func=cmd_pipelines_export)
+    a = actions.add_parser("import", help="add or update pipelines from a JSON file")
+    a.add_argument("file", help="input file, or - for stdin")
+    a.set_defaults(func=cmd_pipelines_import)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.func is cmd_kill and not args.all and not args.paths and not args.run_ids:
+        parser.error("kill: give script paths, --run RUN_ID or --all")
+    try:
+        return args.func(args)
+    except CliError as exc:
+        print(exc, file=sys.stderr)
+        return EXIT_ERROR
+    except ControlClientError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
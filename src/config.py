@@ -134,3 +134,69 @@ def save_scheduler_notification_enabled(enabled: bool) -> None:
     data = _load_all()
     data["scheduler_notification_enabled"] = bool(enabled)
     _save_all(data)
+
+
+ADMISSION_LIMIT_KEYS = ("max_load_per_cpu", "min_free_mb", "max_running_rss_mb")
+
+
+def load_admission_limits() -> dict:
+    """Returns the thresholds over which runs wait to start (see admission.py); 0 turns one off."""
+    raw = _load_all().get("admission_limits")
+    if not isinstance(raw, dict):
+        raw = {}
+    limits = {}
+    for key in ADMISSION_LIMIT_KEYS:
+        value = raw.get(key, 0)
+        limits[key] = value if isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0 else 0
+    return limits
+
+
+def save_admission_limits(limits: dict) -> None:
+    data = _load_all()
+    data["admission_limits"] = {key: limits.get(key, 0) for key in ADMISSION_LIMIT_KEYS}
+    _save_all(data)
+
+
+def load_script_memory_limits() -> dict:
+    """Returns dict script_path -> memory limit in MB; a run over it is killed."""
+    raw = _load_all().get("script_memory_limits")
+    if isinstance(raw, dict):
+        return {k: v for k, v in raw.items() if isinstance(v, int) and not isinstance(v, bool) and v > 0}
+    return {}
+
+
+def save_script_memory_limit(script_path: str, limit_mb: int) -> None:
+    """Sets a script's memory limit in MB; 0 removes it."""
+    data = _load_all()
+    if "script_memory_limits" not in data or not isinstance(data["script_memory_limits"], dict):
+        data["script_memory_limits"] = {}
+    if limit_mb > 0:
+        data["script_memory_limits"][script_path] = limit_mb
+    else:
+        data["script_memory_limits"].pop(script_path, None)
+    _save_all(data)
+
+
+CGROUP_LIMIT_KEYS = ("cpu_weight", "cpu_quota_percent", "memory_max_mb", "pids_max")
+
+
+def load_cgroup_settings() -> dict:
+    """
+    Returns {"enabled": bool, "cpu_weight", "cpu_quota_percent", "memory_max_mb", "pids_max"}:
+    whether runs get their own cgroup on Linux (see cgroups.py) and its limits; 0 leaves one unset.
+    """
+    raw = _load_all().get("cgroup_settings")
+    if not isinstance(raw, dict):
+        raw = {}
+    settings = {"enabled": raw.get("enabled") is True}
+    for key in CGROUP_LIMIT_KEYS:
+        value = raw.get(key, 0)
+        settings[key] = value if isinstance(value, int) and not isinstance(value, bool) and value > 0 else 0
+    return settings
+
+
+def save_cgroup_settings(settings: dict) -> None:
+    data = _load_all()
+    data["cgroup_settings"] = {"enabled": bool(settings.get("enabled"))}
+    data["cgroup_settings"].update({key: settings.get(key, 0) for key in CGROUP_LIMIT_KEYS})
+    _save_all(data)
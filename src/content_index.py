@@ -0,0 +1,297 @@
+"""
+Full-text search over script contents, backed by an on-disk SQLite FTS5 index (trigram tokenizer,
+so any substring of 3+ characters can be looked up without a scan).
+One index row per non-blank line; rowid = (file_id << LINE_BITS) | line number, so a hit maps
+straight to file:line and a file's rows can be dropped with a rowid range delete.
+Files are re-indexed only when their (mtime_ns, size) changes. Indexing runs in a background
+thread with its own connection; queries use a separate read connection (WAL mode), so searching
+stays interactive while the index is being built.
+Each file's header description (script_metadata.parse_header) is stored with it and reported through
+on_descriptions, so the sidebar can match descriptions of scripts that were never opened.
+The database lives in an "Index" folder next to config.json, one file per project.
+Pure logic module with no UI dependencies.
+"""
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+from typing import Callable
+
+from config import get_config_path
+from script_metadata import HEADER_READ_BYTES, parse_header
+
+INDEX_FOLDER = "Index"
+LINE_BITS = 20                        # up to ~1M lines per file
+MAX_INDEXED_FILE_BYTES = 2 * 1024 * 1024
+COMMIT_EVERY_FILES = 200
+MIN_QUERY_LENGTH = 3                  # trigram tokenizer cannot match shorter strings
+SNIPPET_MAX_CHARS = 160
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    description TEXT NOT NULL DEFAULT ''
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS lines USING fts5(text, tokenize='trigram');
+"""
+
+
+def get_content_index_path(project_path: str) -> str:
+    """Index database for a project: Index/<hash of project path>.sqlite3 next to config.json."""
+    digest = hashlib.sha1(os.path.normcase(os.path.abspath(project_path)).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(os.path.dirname(get_config_path()), INDEX_FOLDER, f"{digest}.sqlite3")
+
+
+def make_snippet(line: str, query: str) -> str:
+    """Trimmed line, cut to SNIPPET_MAX_CHARS around the first (case-insensitive) match."""
+    text = line.strip()
+    if len(text) <= SNIPPET_MAX_CHARS:
+        return text
+    pos = max(text.lower().find(query.lower()), 0)
+    start = max(0, min(pos - SNIPPET_MAX_CHARS // 3, len(text) - SNIPPET_MAX_CHARS))
+    snippet = text[start:start + SNIPPET_MAX_CHARS]
+    return ("…" if start > 0 else "") + snippet + ("…" if start + SNIPPET_MAX_CHARS < len(text) else "")
+
+
+def _read_text(path: str) -> str:
+    with open(path, "rb") as f:
+        data = f.read(MAX_INDEXED_FILE_BYTES)
+    return data.decode("utf-8", errors="replace")
+
+
+class ContentIndex:
+    """
+    Background-maintained content index for one project.
+    sync() / update() only queue work; search() can be called from any single thread.
+    on_progress(done, total) and on_descriptions({path: description}) are called from the worker thread;
+    a removed or unreadable script is reported with an empty description.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        on_progress: Callable[[int, int], None] | None = None,
+        on_descriptions: Callable[[dict[str, str]], None] | None = None,
+    ):
+        self.db_path = db_path
+        self._on_progress = on_progress
+        self._on_descriptions = on_descriptions
+        self._queue: queue.Queue = queue.Queue()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._read_conn: sqlite3.Connection | None = None
+        self._ready = threading.Event()
+        self.indexed = 0
+        self.total = 0
+        self.busy = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def sync(self, paths) -> None:
+        """Bring the index in line with the full list of project scripts (only changed files are read)."""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._queue.put(("sync", list(paths), generation))
+
+    def update(self, paths) -> None:
+        """Re-index specific scripts (added, modified or removed)."""
+        self._queue.put(("update", list(paths), None))
+
+    def close(self) -> None:
+        with self._lock:
+            self._generation += 1
+        self._queue.put(None)
+        if self._read_conn is not None:
+            self._read_conn.close()
+            self._read_conn = None
+
+    def search(self, query: str, limit: int = 200) -> list[dict]:
+        """Returns [{"path", "line", "text"}] for lines containing query (case-insensitive), by path then line."""
+        query = query.strip()
+        if len(query) < MIN_QUERY_LENGTH or not self._ready.is_set():
+            return []
+        if self._read_conn is None:
+            self._read_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._read_conn.execute("PRAGMA query_only = ON")
+        phrase = '"' + query.replace('"', '""') + '"'
+        try:
+            rows = self._read_conn.execute(
+                "SELECT rowid, text FROM lines WHERE lines MATCH ? ORDER BY rowid LIMIT ?", (phrase, limit)
+            ).fetchall()
+            file_ids = sorted({rowid >> LINE_BITS for rowid, _text in rows})
+            paths: dict[int, str] = {}
+            for i in range(0, len(file_ids), 500):
+                chunk = file_ids[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                paths.update(self._read_conn.execute(f"SELECT id, path FROM files WHERE id IN ({marks})", chunk))
+        except sqlite3.Error:
+            return []
+        line_mask = (1 << LINE_BITS) - 1
+        results = [
+            {"path": paths[rowid >> LINE_BITS], "line": rowid & line_mask, "text": make_snippet(text, query)}
+            for rowid, text in rows
+            if (rowid >> LINE_BITS) in paths
+        ]
+        results.sort(key=lambda r: (r["path"].lower(), r["line"]))
+        return results
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(_SCHEMA)
+        if "description" not in {row[1] for row in conn.execute("PRAGMA table_info(files)")}:
+            # Index from before descriptions were stored: add the column and re-read every file once.
+            conn.execute("ALTER TABLE files ADD COLUMN description TEXT NOT NULL DEFAULT ''")
+            conn.execute("UPDATE files SET mtime_ns = 0")
+            conn.commit()
+        return conn
+
+    def _run(self) -> None:
+        try:
+            conn = self._connect()
+        except (OSError, sqlite3.Error):
+            return
+        self._ready.set()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            kind, paths, generation = item
+            try:
+                if kind == "sync":
+                    self._sync(conn, paths, generation)
+                else:
+                    self._update(conn, paths)
+            except sqlite3.Error:
+                conn.rollback()
+                self.busy = False
+        conn.close()
+
+    def _report(self) -> None:
+        if self._on_progress is not None:
+            self._on_progress(self.indexed, self.total)
+
+    def _report_descriptions(self, descriptions: dict[str, str]) -> None:
+        if descriptions and self._on_descriptions is not None:
+            self._on_descriptions(descriptions)
+
+    def _cancelled(self, generation: int) -> bool:
+        with self._lock:
+            return generation != self._generation
+
+    @staticmethod
+    def _delete_file_rows(conn: sqlite3.Connection, file_id: int) -> None:
+        conn.execute(
+            "DELETE FROM lines WHERE rowid BETWEEN ? AND ?",
+            (file_id << LINE_BITS, ((file_id + 1) << LINE_BITS) - 1),
+        )
+
+    def _index_file(self, conn: sqlite3.Connection, path: str, st: os.stat_result, file_id: int | None) -> str:
+        """(Re-)indexes one file and returns its header description."""
+        if file_id is None:
+            file_id = conn.execute(
+                "INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)", (path, st.st_mtime_ns, st.st_size)
+            ).lastrowid
+        else:
+            self._delete_file_rows(conn, file_id)
+            conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, description = '' WHERE id = ?",
+                (st.st_mtime_ns, st.st_size, file_id),
+            )
+        try:
+            text = _read_text(path)
+        except OSError:
+            return ""
+        description = parse_header(text[:HEADER_READ_BYTES])["description"]
+        if description:
+            conn.execute("UPDATE files SET description = ? WHERE id = ?", (description, file_id))
+        lines = text.splitlines()
+        base = file_id << LINE_BITS
+        limit = (1 << LINE_BITS) - 1
+        conn.executemany(
+            "INSERT INTO lines (rowid, text) VALUES (?, ?)",
+            ((base | n, line) for n, line in enumerate(lines[:limit], start=1) if line.strip()),
+        )
+        return description
+
+    def _remove_file(self, conn: sqlite3.Connection, file_id: int) -> None:
+        self._delete_file_rows(conn, file_id)
+        conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _sync(self, conn: sqlite3.Connection, paths: list[str], generation: int) -> None:
+        known = {path: (fid, mtime_ns, size) for fid, path, mtime_ns, size in conn.execute(
+            "SELECT id, path, mtime_ns, size FROM files")}
+        wanted = set(paths)
+        for path, (fid, _m, _s) in known.items():
+            if path not in wanted:
+                self._remove_file(conn, fid)
+        conn.commit()
+        # Stored descriptions first; files that changed since are reported again once re-read.
+        self._report_descriptions({
+            path: description
+            for path, description in conn.execute("SELECT path, description FROM files WHERE description != ''")
+        })
+
+        self.busy = True
+        self.total = len(paths)
+        self.indexed = 0
+        pending = 0
+        descriptions: dict[str, str] = {}
+        for path in paths:
+            if self._cancelled(generation):
+                conn.commit()
+                self.busy = False
+                return
+            self.indexed += 1
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = known.get(path)
+            if entry is not None and entry[1] == st.st_mtime_ns and entry[2] == st.st_size:
+                continue
+            descriptions[path] = self._index_file(conn, path, st, entry[0] if entry else None)
+            pending += 1
+            if pending >= COMMIT_EVERY_FILES:
+                conn.commit()
+                pending = 0
+                self._report()
+                self._report_descriptions(descriptions)
+                descriptions = {}
+        conn.commit()
+        self.busy = False
+        self._report()
+        self._report_descriptions(descriptions)
+
+    def _update(self, conn: sqlite3.Connection, paths: list[str]) -> None:
+        descriptions: dict[str, str] = {}
+        for path in paths:
+            row = conn.execute("SELECT id, mtime_ns, size FROM files WHERE path = ?", (path,)).fetchone()
+            try:
+                st = os.stat(path)
+            except OSError:
+                if row is not None:
+                    self._remove_file(conn, row[0])
+                    descriptions[path] = ""
+                continue
+            if row is not None and row[1] == st.st_mtime_ns and row[2] == st.st_size:
+                continue
+            descriptions[path] = self._index_file(conn, path, st, row[0] if row else None)
+        conn.commit()
+        self._report()
+        self._report_descriptions(descriptions)
@@ -0,0 +1,118 @@
+"""
+Blocking client for the local control API (see control_server), and the endpoint address shared by
+both sides. Kept free of asyncio so the command-line client starts quickly.
+Pure logic module with no UI dependencies.
+"""
+import hashlib
+import json
+import os
+import socket
+import tempfile
+
+from config import get_config_path
+
+CONTROL_SOCKET_FILENAME = "control.sock"
+MAX_UNIX_SOCKET_PATH = 100     # sun_path is 104-108 bytes depending on the platform
+RECV_CHUNK = 64 * 1024
+
+
+def get_control_address() -> str:
+    """Socket path (or pipe name on Windows) for the hub whose config.json is in use."""
+    base = os.path.dirname(os.path.abspath(get_config_path()))
+    digest = hashlib.sha1(os.path.normcase(base).encode("utf-8")).hexdigest()[:12]
+    if os.name == "nt":
+        return rf"\\.\pipe\shscripthub-{digest}"
+    path = os.path.join(base, "Scheduler", CONTROL_SOCKET_FILENAME)
+    if len(path.encode("utf-8")) > MAX_UNIX_SOCKET_PATH:
+        path = os.path.join(tempfile.gettempdir(), f"shscripthub-{digest}.sock")
+    return path
+
+
+class ControlClientError(Exception):
+    """Error response from the hub."""
+
+    def __init__(self, message: str, code: int):
+        super().__init__(message)
+        self.code = code
+
+
+class ControlClient:
+    """
+    One connection to a running hub; requests are sent one at a time. Raises OSError from the
+    constructor when no hub is serving the address.
+    """
+
+    def __init__(self, address: str | None = None, timeout: float | None = 10.0):
+        self.address = address or get_control_address()
+        self._buffer = b""
+        self._next_id = 1
+        if os.name == "nt":
+            from multiprocessing.connection import Client
+
+            self._sock = None
+            self._pipe = Client(self.address, "AF_PIPE")  # one message per line, see control_server
+        else:
+            self._pipe = None
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            try:
+                self._sock.connect(self.address)
+            except OSError:
+                self._sock.close()
+                raise
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+        if self._pipe is not None:
+            self._pipe.close()
+
+    def __enter__(self) -> "ControlClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _send(self, message: dict) -> None:
+        data = json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+        if self._sock is not None:
+            self._sock.sendall(data)
+        else:
+            self._pipe.send_bytes(data)
+
+    def _receive(self) -> dict:
+        while b"\n" not in self._buffer:
+            chunk = self._sock.recv(RECV_CHUNK) if self._sock is not None else self._recv_pipe()
+            if not chunk:
+                raise ConnectionError("The hub closed the connection.")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return json.loads(line)
+
+    def _recv_pipe(self) -> bytes:
+        try:
+            return self._pipe.recv_bytes()
+        except EOFError:
+            return b""
+
+    def call(self, method: str, params: dict | None = None, on_notification=None):
+        """Sends one request and returns its result. Notifications that arrive meanwhile go to on_notification(method, params)."""
+        request_id = self._next_id
+        self._next_id += 1
+        self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+        while True:
+            message = self._receive()
+            if "id" not in message:
+                if on_notification is not None:
+                    on_notification(message.get("method"), message.get("params") or {})
+                continue
+            if message["id"] != request_id:
+                continue
+            if "error" in message:
+                error = message["error"]
+                raise ControlClientError(error.get("message", "Unknown error."), error.get("code", 0))
+            return message.get("result")
+
+    def set_timeout(self, timeout: float | None) -> None:
+        if self._sock is not None:
+            self._sock.settimeout(timeout)
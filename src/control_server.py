@@ -0,0 +1,630 @@
+"""
+Local control API: JSON-RPC 2.0 over a Unix domain socket (a named pipe on Windows, through
+multiprocessing.connection), one JSON message per line in each direction. It is served by the GUI,
+on a background thread, or by the headless daemon. Whichever starts first owns the endpoint; the
+other finds it taken and does not serve.
+
+Methods:
+  hub.status                              -> {"pid", "mode", "project_path"}
+  hub.perf                                -> {"enabled", "stats": [{"name", "count", "p50_ms", "p99_ms", "max_ms", "total_ms"}]}
+  scripts.list                            -> [{"path", "name", "category", "running"}]
+  scripts.run       {"path"}              -> {"run_id"}
+  scripts.kill      {"path"}              -> {"killed"}
+  runs.list                               -> [{"path", "run_id", "schedule_id", "pid", "started_at", "metrics"}]
+  runs.kill         {"run_id"}            -> {"killed"}  (one run; scripts.kill kills every run of the script)
+  logs.tail         {"run_id", "follow"}  -> "log" notifications {"run_id", "offset", "text"} with the
+                                             log so far (then new output while following), then
+                                             the result {"run_id", "ended"}
+  history.list      {"since", "limit", "schedule_id", "status", "script_path"} (all optional) -> [run entries]
+  schedules.list / schedules.get {"id"} / schedules.create {fields, optional "id"} / schedules.update {"id", fields}
+  schedules.delete  {"id"}
+  pipelines.list / pipelines.get {"id"} / pipelines.create {fields, optional "id"} / pipelines.update {"id", fields}
+  pipelines.delete  {"id"}
+  pipelines.run     {"id"}                -> {"pipeline_run_id"}
+
+Requests on one connection are handled concurrently, so a client can follow a log and run other
+methods on the same socket. Backend calls (anything touching runs or the GUI) go through
+ControlBackend.call, which the GUI routes to its own thread.
+Pure logic module with no UI dependencies.
+"""
+import asyncio
+import inspect
+import json
+import os
+import socket
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from control_client import get_control_address
+import perf
+from scheduler_data import (
+    DEFAULT_MAX_PARALLEL,
+    PIPELINE_FIELDS,
+    create_pipeline,
+    schedule_fields,
+    schedule_from_fields,
+    status_matches,
+    update_schedule,
+    validate_pipeline,
+    validate_schedule,
+)
+from scheduler_storage import (
+    load_history,
+    load_log,
+    load_pipelines,
+    load_schedules,
+    save_pipelines,
+    save_schedules,
+    storage_lock,
+)
+
+MAX_REQUEST_BYTES = 1024 * 1024
+TAIL_QUEUE_LIMIT = 10_000      # queued log chunks before a slow follower is dropped
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+APPLICATION_ERROR = -32000
+
+
+class ControlError(Exception):
+    """Raised by handlers and backends for errors reported to the client (JSON-RPC code -32000)."""
+
+    def __init__(self, message: str, code: int = APPLICATION_ERROR):
+        super().__init__(message)
+        self.code = code
+
+
+class ControlBackend(ABC):
+    """
+    What the server needs from its host (GUI or daemon). Methods are run through call(), on the
+    host's thread; they may be coroutine functions when the host is the daemon's loop.
+    """
+
+    mode = ""
+    project_path: str | None = None
+
+    async def call(self, fn, *args):
+        result = fn(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    @abstractmethod
+    def list_scripts(self) -> list[dict]:
+        pass
+
+    @abstractmethod
+    def run_script(self, path: str) -> str:
+        """Starts a captured manual run; returns its history/run id. Raises ControlError."""
+
+    @abstractmethod
+    def kill_script(self, path: str) -> bool:
+        pass
+
+    @abstractmethod
+    def kill_run(self, run_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def running_runs(self) -> list[dict]:
+        pass
+
+    @abstractmethod
+    def log_snapshot(self, run_id: str) -> tuple[str, list[list]] | None:
+        """Log captured so far for a run still going, else None."""
+
+    @abstractmethod
+    def run_pipeline(self, pipeline_id: str) -> str:
+        """Starts a run of a pipeline; returns the pipeline run id. Raises ControlError."""
+
+    def schedules_changed(self) -> None:
+        """Called after a schedule was created, updated or deleted through the API."""
+
+
+def _find_schedule(schedules: list[dict], schedule_id) -> dict:
+    for schedule in schedules:
+        if schedule.get("id") == schedule_id:
+            return schedule
+    raise ControlError(f"No schedule with id {schedule_id!r}.")
+
+
+def _find_pipeline(pipelines: list[dict], pipeline_id) -> dict:
+    for pipeline in pipelines:
+        if pipeline.get("id") == pipeline_id:
+            return pipeline
+    raise ControlError(f"No pipeline with id {pipeline_id!r}.")
+
+
+def _pipeline_fields(params: dict) -> dict:
+    return {key: params[key] for key in PIPELINE_FIELDS if key in params}
+
+
+class _PipeWriter:
+    """The parts of asyncio.StreamWriter that _handle_client uses, for a named-pipe connection."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._pending: list[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self._pending.append(data)
+
+    async def drain(self) -> None:
+        data, self._pending = b"".join(self._pending), []
+        await asyncio.to_thread(self._conn.send_bytes, data)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class ControlServer:
+    def __init__(self, backend: ControlBackend, address: str | None = None):
+        self.backend = backend
+        self.address = address or get_control_address()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server = None
+        self._listener = None  # multiprocessing.connection.Listener serving the named pipe (Windows)
+        self._thread: threading.Thread | None = None
+        self._tails: dict[str, set[asyncio.Queue]] = {}
+        self._handlers = {
+            "hub.status": self._hub_status,
+            "hub.perf": self._hub_perf,
+            "scripts.list": self._scripts_list,
+            "scripts.run": self._scripts_run,
+            "scripts.kill": self._scripts_kill,
+            "runs.list": self._runs_list,
+            "runs.kill": self._runs_kill,
+            "logs.tail": self._logs_tail,
+            "history.list": self._history_list,
+            "schedules.list": self._schedules_list,
+            "schedules.get": self._schedules_get,
+            "schedules.create": self._schedules_create,
+            "schedules.update": self._schedules_update,
+            "schedules.delete": self._schedules_delete,
+            "pipelines.list": self._pipelines_list,
+            "pipelines.get": self._pipelines_get,
+            "pipelines.create": self._pipelines_create,
+            "pipelines.update": self._pipelines_update,
+            "pipelines.delete": self._pipelines_delete,
+            "pipelines.run": self._pipelines_run,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> bool:
+        """Starts serving on the running loop. Returns False if another hub already serves the address."""
+        self._loop = asyncio.get_running_loop()
+        if os.name == "nt":
+            from multiprocessing.connection import Client, Listener
+
+            try:
+                (await asyncio.to_thread(Client, self.address, "AF_PIPE")).close()
+                return False
+            except OSError:
+                pass
+            self._listener = Listener(self.address, "AF_PIPE")
+            threading.Thread(target=self._accept_pipes, args=(self._listener,), name="control-pipe", daemon=True).start()
+            return True
+        if os.path.exists(self.address):
+            try:
+                _reader, writer = await asyncio.open_unix_connection(self.address)
+                writer.close()
+                return False
+            except OSError:
+                os.remove(self.address)  # left behind by a hub that did not shut down cleanly
+        os.makedirs(os.path.dirname(self.address), exist_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)  # the socket file is owner-only from the moment it exists
+        try:
+            sock.bind(self.address)
+        except OSError:
+            sock.close()
+            raise
+        finally:
+            os.umask(umask)
+        self._server = await asyncio.start_unix_server(self._handle_client, sock=sock, limit=MAX_REQUEST_BYTES)
+        return True
+
+    def _accept_pipes(self, listener) -> None:
+        """Accepts named-pipe connections until close(); each one is served on the loop like a socket."""
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError:
+                return
+            if self._listener is not listener:
+                conn.close()
+                return
+            asyncio.run_coroutine_threadsafe(self._serve_pipe(conn), self._loop)
+
+    async def _serve_pipe(self, conn) -> None:
+        reader = asyncio.StreamReader(limit=MAX_REQUEST_BYTES)
+        threading.Thread(target=self._read_pipe, args=(conn, reader), name="control-pipe-reader", daemon=True).start()
+        await self._handle_client(reader, _PipeWriter(conn))
+
+    def _read_pipe(self, conn, reader: asyncio.StreamReader) -> None:
+        while True:
+            try:
+                data = conn.recv_bytes()
+            except (EOFError, OSError):
+                self._loop.call_soon_threadsafe(reader.feed_eof)
+                return
+            self._loop.call_soon_threadsafe(reader.feed_data, data)
+
+    async def close(self) -> None:
+        for queues in list(self._tails.values()):
+            for queue in list(queues):
+                self._end_stream(queue)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+        if self._listener is not None:
+            from multiprocessing.connection import Client
+
+            listener, self._listener = self._listener, None
+            listener.close()
+            try:
+                # The accept thread waits on a pipe instance of its own; connecting wakes it up to exit.
+                (await asyncio.to_thread(Client, self.address, "AF_PIPE")).close()
+            except OSError:
+                pass
+
+    def start_in_thread(self) -> bool:
+        """Serves from a private event loop on a daemon thread (for the GUI). Returns False if not serving."""
+        started = threading.Event()
+        result = [False]
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                result[0] = loop.run_until_complete(self.start())
+            except Exception:
+                result[0] = False
+            finally:
+                started.set()
+            if result[0]:
+                loop.run_forever()
+                loop.run_until_complete(self.close())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="control-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        return result[0]
+
+    def stop_thread(self) -> None:
+        if self._thread is not None and self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2)
+
+    # ------------------------------------------------------------------
+    # Log streaming (thread-safe entry points for the capture threads/tasks)
+    # ------------------------------------------------------------------
+
+    def publish_log(self, run_id: str, offset: int, text: str) -> None:
+        if self._tails and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._dispatch, run_id, (offset, text))
+
+    def publish_log_end(self, run_id: str) -> None:
+        if self._tails and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._dispatch, run_id, None)
+
+    def _dispatch(self, run_id: str, item) -> None:
+        for queue in list(self._tails.get(run_id, ())):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # Too slow to keep up: end its stream rather than buffer without bound.
+                self._unsubscribe(run_id, queue)
+                self._end_stream(queue, "Log stream dropped: the client did not keep up.")
+
+    @staticmethod
+    def _end_stream(queue: asyncio.Queue, error: str | None = None) -> None:
+        """Queues the end marker: None, or an error message for the follower."""
+        while queue.full():
+            queue.get_nowait()
+        queue.put_nowait(error)
+
+    def _subscribe(self, run_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=TAIL_QUEUE_LIMIT)
+        self._tails.setdefault(run_id, set()).add(queue)
+        return queue
+
+    def _unsubscribe(self, run_id: str, queue: asyncio.Queue) -> None:
+        queues = self._tails.get(run_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._tails[run_id]
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+
+        async def send(message: dict) -> None:
+            data = json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+            async with write_lock:
+                writer.write(data)
+                await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await send(self._error(None, INVALID_REQUEST, "Request too large."))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self._handle_line(line, send))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    @staticmethod
+    def _error(request_id, code: int, message: str) -> dict:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+    async def _handle_line(self, line: bytes, send) -> None:
+        try:
+            request = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            await send(self._error(None, PARSE_ERROR, "Invalid JSON."))
+            return
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            await send(self._error(None, INVALID_REQUEST, "Expected a JSON-RPC request object."))
+            return
+        request_id = request.get("id")
+        handler = self._handlers.get(request["method"])
+        params = request.get("params") or {}
+        try:
+            if handler is None:
+                raise ControlError(f"Unknown method {request['method']!r}.", METHOD_NOT_FOUND)
+            if not isinstance(params, dict):
+                raise ControlError("Params must be an object.", INVALID_PARAMS)
+            result = await handler(params, request_id, send)
+        except ControlError as exc:
+            if request_id is not None:
+                await send(self._error(request_id, exc.code, str(exc)))
+            return
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as exc:
+            if request_id is not None:
+                await send(self._error(request_id, INTERNAL_ERROR, f"{type(exc).__name__}: {exc}"))
+            return
+        if request_id is not None:
+            await send({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+    # ------------------------------------------------------------------
+    # Methods
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _require(params: dict, key: str):
+        value = params.get(key)
+        if not isinstance(value, str) or not value:
+            raise ControlError(f"Missing string parameter {key!r}.", INVALID_PARAMS)
+        return value
+
+    async def _hub_status(self, params, request_id, send):
+        return {"pid": os.getpid(), "mode": self.backend.mode, "project_path": self.backend.project_path}
+
+    async def _hub_perf(self, params, request_id, send):
+        return {"enabled": perf.enabled(), "stats": perf.snapshot()}
+
+    async def _scripts_list(self, params, request_id, send):
+        return await self.backend.call(self.backend.list_scripts)
+
+    async def _scripts_run(self, params, request_id, send):
+        path = self._require(params, "path")
+        return {"run_id": await self.backend.call(self.backend.run_script, path)}
+
+    async def _scripts_kill(self, params, request_id, send):
+        path = self._require(params, "path")
+        return {"killed": bool(await self.backend.call(self.backend.kill_script, path))}
+
+    async def _runs_list(self, params, request_id, send):
+        return await self.backend.call(self.backend.running_runs)
+
+    async def _runs_kill(self, params, request_id, send):
+        run_id = self._require(params, "run_id")
+        return {"killed": bool(await self.backend.call(self.backend.kill_run, run_id))}
+
+    async def _logs_tail(self, params, request_id, send):
+        run_id = self._require(params, "run_id")
+        follow = params.get("follow", True)
+
+        async def notify(offset: int, text: str) -> None:
+            await send({"jsonrpc": "2.0", "method": "log", "params": {
+                "request_id": request_id, "run_id": run_id, "offset": offset, "text": text,
+            }})
+
+        # Subscribe before taking the snapshot so no chunk falls between the two.
+        queue = self._subscribe(run_id)
+        try:
+            snapshot = await self.backend.call(self.backend.log_snapshot, run_id)
+            if snapshot is None:
+                text = await asyncio.to_thread(load_log, run_id)
+                if text:
+                    await notify(0, text)
+                return {"run_id": run_id, "ended": True}
+            received = len(snapshot[0])
+            if snapshot[0]:
+                await notify(0, snapshot[0])
+            if not follow:
+                return {"run_id": run_id, "ended": False}
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return {"run_id": run_id, "ended": True}
+                if isinstance(item, str):
+                    raise ControlError(item)
+                offset, text = item
+                if offset + len(text) <= received:
+                    continue
+                if offset < received:
+                    text, offset = text[received - offset:], received
+                await notify(offset, text)
+                received = offset + len(text)
+        finally:
+            self._unsubscribe(run_id, queue)
+
+    async def _history_list(self, params, request_id, send):
+        runs = await asyncio.to_thread(load_history)
+        since = params.get("since")
+        if since:
+            try:
+                since_dt = datetime.fromisoformat(since).astimezone()
+            except (TypeError, ValueError):
+                raise ControlError("'since' must be an ISO 8601 timestamp.", INVALID_PARAMS)
+            runs = [r for r in runs if r.get("triggered_at") and datetime.fromisoformat(r["triggered_at"]) >= since_dt]
+        for key in ("schedule_id", "script_path"):
+            if params.get(key) is not None:
+                runs = [r for r in runs if r.get(key) == params[key]]
+        if params.get("status") is not None:
+            runs = [r for r in runs if status_matches(r.get("status"), params["status"])]
+        limit = params.get("limit")
+        if isinstance(limit, int) and limit >= 0:
+            runs = runs[-limit:] if limit else []
+        return runs
+
+    async def _schedules_list(self, params, request_id, send):
+        return await asyncio.to_thread(load_schedules)
+
+    async def _schedules_get(self, params, request_id, send):
+        return _find_schedule(await asyncio.to_thread(load_schedules), self._require(params, "id"))
+
+    def _create(self, params: dict) -> dict:
+        fields = schedule_fields(params)
+        errors = validate_schedule(fields)
+        if errors:
+            raise ControlError(" ".join(errors), INVALID_PARAMS)
+        if fields.get("pipeline_id") and not any(p.get("id") == fields["pipeline_id"] for p in load_pipelines()):
+            raise ControlError(f"No pipeline with id {fields['pipeline_id']!r}.", INVALID_PARAMS)
+        schedule = schedule_from_fields(fields)
+        with storage_lock():
+            schedules = load_schedules()
+            if params.get("id") is not None:
+                # Imported schedules keep their id so that importing the same file again updates them.
+                if any(s.get("id") == params["id"] for s in schedules):
+                    raise ControlError(f"A schedule with id {params['id']!r} already exists.", INVALID_PARAMS)
+                schedule["id"] = str(params["id"])
+            schedules.append(schedule)
+            save_schedules(schedules)
+        return schedule
+
+    def _update(self, params: dict) -> dict:
+        with storage_lock():
+            schedules = load_schedules()
+            schedule = _find_schedule(schedules, self._require(params, "id"))
+            errors = validate_schedule({**schedule, **schedule_fields(params)})
+            if errors:
+                raise ControlError(" ".join(errors), INVALID_PARAMS)
+            update_schedule(schedule, params)
+            save_schedules(schedules)
+        return schedule
+
+    def _delete(self, params: dict) -> dict:
+        with storage_lock():
+            schedules = load_schedules()
+            schedule = _find_schedule(schedules, self._require(params, "id"))
+            schedules.remove(schedule)
+            save_schedules(schedules)
+        return {"deleted": schedule["id"]}
+
+    # Schedule and pipeline writes run on a worker thread, serialized with the GUI's own edits and the
+    # daemon's ticks by storage_lock(); only the refresh afterwards runs on the host's thread.
+    async def _schedules_write(self, fn, params):
+        result = await asyncio.to_thread(fn, params)
+        await self.backend.call(self.backend.schedules_changed)
+        return result
+
+    async def _schedules_create(self, params, request_id, send):
+        return await self._schedules_write(self._create, params)
+
+    async def _schedules_update(self, params, request_id, send):
+        return await self._schedules_write(self._update, params)
+
+    async def _schedules_delete(self, params, request_id, send):
+        return await self._schedules_write(self._delete, params)
+
+    async def _pipelines_list(self, params, request_id, send):
+        return await asyncio.to_thread(load_pipelines)
+
+    async def _pipelines_get(self, params, request_id, send):
+        return _find_pipeline(await asyncio.to_thread(load_pipelines), self._require(params, "id"))
+
+    def _create_pipeline(self, params: dict) -> dict:
+        fields = _pipeline_fields(params)
+        errors = validate_pipeline(fields)
+        if errors:
+            raise ControlError(" ".join(errors), INVALID_PARAMS)
+        pipeline = create_pipeline(fields["name"], fields["steps"], fields.get("max_parallel", DEFAULT_MAX_PARALLEL))
+        with storage_lock():
+            pipelines = load_pipelines()
+            if params.get("id") is not None:
+                if any(p.get("id") == params["id"] for p in pipelines):
+                    raise ControlError(f"A pipeline with id {params['id']!r} already exists.", INVALID_PARAMS)
+                pipeline["id"] = str(params["id"])
+            pipelines.append(pipeline)
+            save_pipelines(pipelines)
+        return pipeline
+
+    def _update_pipeline(self, params: dict) -> dict:
+        with storage_lock():
+            pipelines = load_pipelines()
+            pipeline = _find_pipeline(pipelines, self._require(params, "id"))
+            merged = {**pipeline, **_pipeline_fields(params)}
+            errors = validate_pipeline(merged)
+            if errors:
+                raise ControlError(" ".join(errors), INVALID_PARAMS)
+            pipeline.update(merged)
+            save_pipelines(pipelines)
+        return pipeline
+
+    def _delete_pipeline(self, params: dict) -> dict:
+        with storage_lock():
+            pipelines = load_pipelines()
+            pipeline = _find_pipeline(pipelines, self._require(params, "id"))
+            if any(s.get("pipeline_id") == pipeline["id"] for s in load_schedules()):
+                raise ControlError(f"Pipeline '{pipeline['name']}' is used by a schedule; delete the schedule first.")
+            pipelines.remove(pipeline)
+            save_pipelines(pipelines)
+        return {"deleted": pipeline["id"]}
+
+    async def _pipelines_create(self, params, request_id, send):
+        return await asyncio.to_thread(self._create_pipeline, params)
+
+    async def _pipelines_update(self, params, request_id, send):
+        return await asyncio.to_thread(self._update_pipeline, params)
+
+    async def _pipelines_delete(self, params, request_id, send):
+        return await asyncio.to_thread(self._delete_pipeline, params)
+
+    async def _pipelines_run(self, params, request_id, send):
+        pipeline_id = self._require(params, "id")
+        return {"pipeline_run_id": await self.backend.call(self.backend.run_pipeline, pipeline_id)}
@@ -0,0 +1,389 @@
+"""
+Headless scheduler daemon, started with `main.py --headless`.
+Runs the scheduler without the Qt GUI on an asyncio loop: once a second it starts due schedules
+with output capture, tails their logs into history_logs.json, and records start/kill/exit in the
+scheduler history. What to start and when (overlap and misfire policies, retries, pipelines, the
+admission and memory limits) is decided by the same SchedulerRunner as in the main window (see
+scheduler_runner.py); it runs on a worker thread, so storage I/O and kills never stall the loop.
+While it runs, Scheduler/daemon.json holds its pid, a heartbeat and the runs in progress. A GUI
+opened at the same time finds it there and becomes a viewer: it stops firing schedules itself and
+shows the daemon's history and live logs. Scheduler/daemon.lock keeps a second daemon from starting.
+Pure logic module with no UI dependencies.
+"""
+import asyncio
+import os
+import signal
+import sys
+import time
+
+from cgroups import run_cgroup, scope_argv
+from config import (
+    load_cgroup_settings,
+    load_project_path,
+    load_script_categories,
+    load_terminal_path,
+    load_venv_activate_path,
+)
+from control_server import ControlBackend, ControlError, ControlServer
+from lag_watchdog import HEARTBEAT_INTERVAL, LagWatchdog
+from log_capture import LOG_POLL_INTERVAL, LogCapture
+from metrics import collect_metrics
+import perf
+from scheduler_data import now_iso
+from scheduler_engine import validate_trigger
+from scheduler_runner import RunnerHost, SchedulerRunner
+from scheduler_storage import (
+    acquire_daemon_lock,
+    clear_daemon_status,
+    get_diagnostics_log_path,
+    get_run_exit_file_path,
+    get_run_log_file_path,
+    load_daemon_status,
+    release_daemon_lock,
+    save_daemon_status,
+)
+from script_manager import ScriptManager, default_category
+from utils import TREE_CAPTURE_DELAY_SEC, get_process_tree_after_spawn, kill_script_process, run_script_in_gitbash_captured
+
+TICK_INTERVAL = 1.0
+STATUS_INTERVAL = 5.0       # heartbeat period; must stay well below DAEMON_HEARTBEAT_TIMEOUT
+SHUTDOWN_CAPTURE_WAIT = 5.0
+
+
+def _log(message: str) -> None:
+    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {message}", flush=True)
+
+
+class SchedulerDaemon(RunnerHost):
+    """
+    Process supervision and log capture for one project, without a GUI; the scheduling itself is
+    done by its SchedulerRunner. The runner runs on a worker thread, one call at a time (_state_lock).
+    """
+
+    def __init__(self, project_path: str | None = None):
+        self.project_path = project_path or load_project_path()
+        self.terminal_path = load_terminal_path()
+        self.venv_activate_path = load_venv_activate_path()
+        self.started_at = now_iso()
+        self.runner = SchedulerRunner(self)
+        # run id -> {"process", "kill_pids", "cgroup", "start_time", "peak_rss", "cpu_primed_pids", "capture"}
+        self._processes: dict[str, dict] = {}
+        self._captures: dict[str, LogCapture] = {}  # run_id -> capture, until its log is saved
+        self._capture_tasks: set[asyncio.Task] = set()
+        self._history_version = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+        self._state_lock: asyncio.Lock | None = None  # held around every runner call
+        self.control: ControlServer | None = None
+
+    # ------------------------------------------------------------------
+    # Main loop
+    # ------------------------------------------------------------------
+
+    async def run(self) -> None:
+        self._stop = asyncio.Event()
+        self._state_lock = asyncio.Lock()
+        loop = self._loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stop.set)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass  # Windows: Ctrl+C arrives as KeyboardInterrupt instead
+        _log(f"Headless scheduler started for {self.project_path} (pid {os.getpid()})")
+        control = ControlServer(DaemonControlBackend(self))
+        try:
+            if await control.start():
+                self.control = control
+                _log(f"Control API listening on {control.address}")
+            else:
+                _log(f"Control API not started: {control.address} is served by another ShScriptHub")
+        except OSError as exc:
+            _log(f"Control API not started: {exc}")
+        await self._write_status()
+        status_at = time.monotonic()
+        watchdog = LagWatchdog(get_diagnostics_log_path("daemon"))
+        watchdog.start()
+        heartbeat = asyncio.create_task(self._heartbeat(watchdog))
+        try:
+            while not self._stop.is_set():
+                changed = await self._tick()
+                if changed or time.monotonic() - status_at >= STATUS_INTERVAL:
+                    await self._write_status()
+                    status_at = time.monotonic()
+                try:
+                    await asyncio.wait_for(self._stop.wait(), TICK_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            heartbeat.cancel()
+            watchdog.stop()
+            if self.control is not None:
+                await self.control.close()
+            await self._shutdown()
+            clear_daemon_status()
+            _log("Headless scheduler stopped")
+
+    async def _heartbeat(self, watchdog: LagWatchdog) -> None:
+        while True:
+            watchdog.beat()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+
+    async def call_runner(self, fn, *args):
+        """Runs fn (a runner method) on a worker thread, so storage I/O and kills never stall the loop."""
+        async with self._state_lock:
+            return await asyncio.to_thread(fn, *args)
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "project_path": self.project_path,
+            "started_at": self.started_at,
+            "history_version": self._history_version,
+            "running": [
+                {
+                    "run_id": run_id,
+                    "script_path": run["script_path"],
+                    "schedule_id": run["schedule_id"],
+                    "started_at": run["started_at"],
+                }
+                for run_id, run in self.runner.runs.items()
+            ],
+            "waiting": [
+                {"run_id": run_id, "script_path": waiting["script_path"], "schedule_id": waiting["schedule_id"]}
+                for run_id, waiting in self.runner.waiting.items()
+            ],
+        }
+
+    async def _write_status(self) -> None:
+        async with self._state_lock:
+            status = self.status()
+        try:
+            await asyncio.to_thread(save_daemon_status, status)
+        except OSError as exc:
+            _log(f"Could not write daemon status: {exc}")
+
+    def _pass(self) -> bool:
+        changed = self.runner.check_runs()
+        return self.runner.tick() or changed
+
+    @perf.timed("daemon.tick")
+    async def _tick(self) -> bool:
+        """One scheduler pass. Returns True if runs started or ended."""
+        return await self.call_runner(self._pass)
+
+    async def _shutdown(self) -> None:
+        await self.call_runner(self.runner.kill_all)
+        if self._capture_tasks:
+            await asyncio.wait(self._capture_tasks, timeout=SHUTDOWN_CAPTURE_WAIT)
+
+    # ------------------------------------------------------------------
+    # RunnerHost (called on the runner's worker thread)
+    # ------------------------------------------------------------------
+
+    def launch(self, run_id: str, run: dict) -> None:
+        script_path = run["script_path"]
+        log_file_path = get_run_log_file_path(run_id)
+        proc = run_script_in_gitbash_captured(
+            script_path,
+            load_script_categories().get(script_path) or default_category(script_path, self.project_path),
+            self.project_path,
+            terminal_path=self.terminal_path,
+            venv_activate_path=self.venv_activate_path,
+            log_file_path=log_file_path,
+            scope_argv=scope_argv(run_id, load_cgroup_settings()),
+            exit_file_path=get_run_exit_file_path(run_id),
+        )
+        process = {
+            "process": proc,
+            "kill_pids": None,
+            "cgroup": None,
+            "start_time": time.monotonic(),
+            "peak_rss": 0.0,
+            "cpu_primed_pids": set(),
+            "capture": LogCapture(run_id, log_file_path),
+        }
+        self._processes[run_id] = process
+        self._captures[run_id] = process["capture"]
+        self._loop.call_soon_threadsafe(self._watch_process, process)
+
+    def alive(self, run_id: str) -> bool:
+        process = self._processes.get(run_id)
+        return process is not None and process["process"].poll() is None
+
+    def pids(self, run_id: str) -> list[int]:
+        process = self._processes[run_id]
+        return process["kill_pids"] or [process["process"].pid]
+
+    def kill_process(self, run_id: str) -> None:
+        process = self._processes[run_id]
+        kill_script_process(process["process"], self.pids(run_id), process["cgroup"])
+
+    def run_ended(self, run_id: str, run: dict, fields: dict) -> None:
+        self._processes.pop(run_id, None)
+
+    def history_changed(self) -> None:
+        self._history_version += 1
+
+    def log(self, message: str) -> None:
+        _log(message)
+
+    # ------------------------------------------------------------------
+    # Log capture (on the loop)
+    # ------------------------------------------------------------------
+
+    def _watch_process(self, process: dict) -> None:
+        task = asyncio.create_task(self._capture_log(process))
+        self._capture_tasks.add(task)
+        task.add_done_callback(self._capture_tasks.discard)
+        self._loop.call_later(TREE_CAPTURE_DELAY_SEC, self._capture_kill_pids, process)
+
+    @staticmethod
+    def _capture_kill_pids(process: dict) -> None:
+        proc = process["process"]
+        if proc.poll() is None:
+            process["kill_pids"] = get_process_tree_after_spawn(proc)
+            process["cgroup"] = run_cgroup(proc.pid)
+
+    async def _capture_log(self, process: dict) -> None:
+        capture = process["capture"]
+        proc = process["process"]
+        while proc.poll() is None:
+            await asyncio.sleep(LOG_POLL_INTERVAL)
+            self._publish(capture.poll(), capture.run_id)
+        self._publish(capture.poll(final=True), capture.run_id)
+        await asyncio.to_thread(capture.save)
+        capture.remove_file()
+        self._captures.pop(capture.run_id, None)
+        if self.control is not None:
+            self.control.publish_log_end(capture.run_id)
+
+    def _publish(self, chunk: tuple | None, run_id: str) -> None:
+        if chunk is not None and self.control is not None:
+            offset, text, _runs = chunk
+            self.control.publish_log(run_id, offset, text)
+
+
+class DaemonControlBackend(ControlBackend):
+    """Control API backend for the headless daemon; methods run on the daemon's event loop."""
+
+    mode = "daemon"
+
+    def __init__(self, daemon: SchedulerDaemon):
+        self._daemon = daemon
+        self._runner = daemon.runner
+        self.project_path = daemon.project_path
+
+    def _script_path(self, path: str) -> str:
+        script_path = os.path.abspath(path)
+        error = validate_trigger(script_path, self.project_path)
+        if error:
+            raise ControlError(error)
+        return script_path
+
+    async def list_scripts(self) -> list[dict]:
+        categories = load_script_categories()
+        scripts = await asyncio.to_thread(ScriptManager(self.project_path).get_scripts)
+        scripts.sort(key=lambda s: s["path"].lower())
+        async with self._daemon._state_lock:
+            return [
+                {
+                    "path": s["path"],
+                    "name": s["name"],
+                    "category": categories.get(s["path"]) or default_category(s["path"], self.project_path),
+                    "running": bool(self._runner.path_runs(s["path"])),
+                }
+                for s in scripts
+            ]
+
+    def _request_run(self, script_path: str) -> str:
+        if self._runner.path_runs(script_path):
+            raise ControlError(f"{os.path.basename(script_path)} is already running.")
+        if self._runner.waiting_runs(script_path):
+            raise ControlError(f"{os.path.basename(script_path)} is already waiting for resources.")
+        try:
+            run_id = self._runner.request_run(script_path)
+        except Exception as exc:
+            raise ControlError(str(exc))
+        if run_id not in self._runner.waiting:
+            _log(f"Started {os.path.basename(script_path)} via control API (run {run_id})")
+        return run_id
+
+    async def run_script(self, path: str) -> str:
+        run_id = await self._daemon.call_runner(self._request_run, self._script_path(path))
+        await self._daemon._write_status()
+        return run_id
+
+    async def kill_script(self, path: str) -> bool:
+        killed = await self._daemon.call_runner(self._runner.kill_script, os.path.abspath(path))
+        if killed:
+            await self._daemon._write_status()
+        return killed
+
+    def _kill_run(self, run_id: str) -> bool:
+        if run_id not in self._runner.waiting and not self._daemon.alive(run_id):
+            return False
+        return self._runner.kill_run(run_id)
+
+    async def kill_run(self, run_id: str) -> bool:
+        killed = await self._daemon.call_runner(self._kill_run, run_id)
+        if killed:
+            await self._daemon._write_status()
+        return killed
+
+    async def running_runs(self) -> list[dict]:
+        async with self._daemon._state_lock:
+            return [self._running_run(run_id, run) for run_id, run in self._runner.runs.items() if self._daemon.alive(run_id)]
+
+    def _running_run(self, run_id: str, run: dict) -> dict:
+        process = self._daemon._processes[run_id]
+        try:
+            metrics = collect_metrics(
+                self._daemon.pids(run_id), process["start_time"], process["peak_rss"], process["cpu_primed_pids"],
+                process["cgroup"],
+            )
+            process["peak_rss"] = metrics["peak_rss_bytes"]
+        except Exception:
+            metrics = None
+        return {
+            "path": run["script_path"],
+            "run_id": run_id,
+            "schedule_id": run["schedule_id"] or None,
+            "pid": process["process"].pid,
+            "started_at": run["started_at"],
+            "metrics": metrics,
+        }
+
+    def log_snapshot(self, run_id: str) -> tuple[str, list[list]] | None:
+        capture = self._daemon._captures.get(run_id)
+        return capture.snapshot() if capture is not None else None
+
+    async def run_pipeline(self, pipeline_id: str) -> str:
+        try:
+            run = await self._daemon.call_runner(self._runner.start_pipeline, pipeline_id)
+        except LookupError as exc:
+            raise ControlError(str(exc))
+        return run.id
+
+
+def run_daemon() -> int:
+    """Entry point for --headless. Returns the process exit code."""
+    daemon = SchedulerDaemon()
+    if not daemon.project_path or not os.path.isdir(daemon.project_path):
+        print("No project path set. Open the project once in the GUI first.", file=sys.stderr)
+        return 1
+    lock = acquire_daemon_lock()
+    if lock is None:
+        existing = load_daemon_status() or {}
+        print(f"A headless scheduler is already running (pid {existing.get('pid', '?')}).", file=sys.stderr)
+        return 1
+    try:
+        asyncio.run(daemon.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        release_daemon_lock(lock)
+    return 0
@@ -0,0 +1,265 @@
+"""
+Project tree watcher — reports added, removed and modified .sh files.
+Directories are watched with QFileSystemWatcher (inotify on Linux, ReadDirectoryChangesW on
+Windows). Only the MAX_WATCHED_DIRS shallowest directories get a native watch; the rest of the
+tree is polled round-robin in small batches so watch-handle usage stays bounded on huge trees.
+"""
+import os
+from collections import deque
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+from script_manager import scan_dir
+
+MAX_WATCHED_DIRS = 1024
+DEBOUNCE_MS = 200
+POLL_INTERVAL_MS = 2000
+POLL_BATCH_DIRS = 200
+
+
+class ProjectWatcher(QObject):
+    """Emits lists of script paths when .sh files under the project are added, removed or modified."""
+
+    scripts_added = Signal(list)
+    scripts_removed = Signal(list)
+    scripts_modified = Signal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root: str | None = None
+        self._files: dict[str, dict[str, tuple[int, int]]] = {}  # dir -> {script_path: (mtime_ns, size)}
+        self._subdirs: dict[str, set[str]] = {}
+        self._watched_dirs: set[str] = set()
+        self._polled_dirs: deque[str] = deque()
+        self._watched_file: str | None = None
+        self._watched_file_stat: tuple[int, int] | None = None
+        self._pending_dirs: set[str] = set()
+
+        self._qt_watcher = QFileSystemWatcher(self)
+        self._qt_watcher.directoryChanged.connect(self._on_directory_changed)
+        self._qt_watcher.fileChanged.connect(self._on_file_changed)
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(DEBOUNCE_MS)
+        self._debounce_timer.timeout.connect(self._flush_pending)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(POLL_INTERVAL_MS)
+        self._poll_timer.timeout.connect(self._poll_batch)
+
+    @property
+    def watched_dir_count(self) -> int:
+        return len(self._watched_dirs)
+
+    @property
+    def polled_dir_count(self) -> int:
+        return len(self._polled_dirs)
+
+    def start(self, project_path: str, tree: dict | None = None) -> None:
+        """
+        Snapshot the tree under project_path and begin watching it. Emits nothing for the initial scan.
+        tree is an already walked snapshot (ScriptManager.scan); without it the tree is scanned here.
+        """
+        self.stop()
+        self._root = project_path
+        self._add_tree(project_path, tree)
+
+    def stop(self) -> None:
+        self._debounce_timer.stop()
+        self._poll_timer.stop()
+        paths = self._qt_watcher.directories() + self._qt_watcher.files()
+        if paths:
+            self._qt_watcher.removePaths(paths)
+        self._root = None
+        self._files.clear()
+        self._subdirs.clear()
+        self._watched_dirs.clear()
+        self._polled_dirs.clear()
+        self._pending_dirs.clear()
+        self._watched_file = None
+        self._watched_file_stat = None
+
+    def watch_file(self, path: str | None) -> None:
+        """Watch a single script for in-place edits (directory watches only report create/delete/rename)."""
+        if self._watched_file == path:
+            return
+        if self._watched_file:
+            self._qt_watcher.removePath(self._watched_file)
+        self._watched_file = path
+        self._watched_file_stat = self._stat(path) if path else None
+        if path and os.path.isfile(path):
+            self._qt_watcher.addPath(path)
+
+    # ------------------------------------------------------------------
+    # Snapshot maintenance
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _stat(path: str) -> tuple[int, int] | None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _add_tree(self, top: str, tree: dict | None = None) -> list[str]:
+        """
+        Breadth-first scan of top, reusing the entries of tree where given; shallow dirs get native
+        watches first. Returns new script paths.
+        """
+        added: list[str] = []
+        to_watch: list[str] = []
+        queue = deque([top])
+        while queue:
+            d = queue.popleft()
+            if d in self._files:
+                continue
+            files, subdirs = tree[d] if tree and d in tree else scan_dir(d)
+            self._files[d] = files
+            self._subdirs[d] = set(subdirs)
+            added.extend(files)
+            if len(self._watched_dirs) + len(to_watch) < MAX_WATCHED_DIRS:
+                to_watch.append(d)
+            else:
+                self._polled_dirs.append(d)
+            queue.extend(subdirs)
+        if to_watch:
+            failed = set(self._qt_watcher.addPaths(to_watch))
+            for d in to_watch:
+                if d in failed:
+                    self._polled_dirs.append(d)
+                else:
+                    self._watched_dirs.add(d)
+        if self._polled_dirs and not self._poll_timer.isActive():
+            self._poll_timer.start()
+        return added
+
+    def _remove_tree(self, top: str) -> list[str]:
+        """Drop top and everything below it from the snapshot. Returns removed script paths."""
+        removed: list[str] = []
+        stack = [top]
+        unwatch: list[str] = []
+        while stack:
+            d = stack.pop()
+            files = self._files.pop(d, None)
+            if files is None:
+                continue
+            removed.extend(files)
+            stack.extend(self._subdirs.pop(d, ()))
+            if d in self._watched_dirs:
+                self._watched_dirs.discard(d)
+                unwatch.append(d)
+        if unwatch:
+            self._qt_watcher.removePaths(unwatch)
+        if self._polled_dirs:
+            self._polled_dirs = deque(d for d in self._polled_dirs if d in self._files)
+            self._promote_polled()
+        return removed
+
+    def _promote_polled(self) -> None:
+        """Give native watches freed by a removal to the shallowest polled directories."""
+        free = MAX_WATCHED_DIRS - len(self._watched_dirs)
+        if free <= 0 or not self._polled_dirs:
+            return
+        promote = sorted(self._polled_dirs, key=lambda d: d.count(os.sep))[:free]
+        failed = set(self._qt_watcher.addPaths(promote))
+        promoted = {d for d in promote if d not in failed}
+        if not promoted:
+            return
+        self._watched_dirs |= promoted
+        self._polled_dirs = deque(d for d in self._polled_dirs if d not in promoted)
+        # Changes since their last poll would otherwise go unnoticed
+        self._pending_dirs |= promoted
+        self._debounce_timer.start()
+
+    def _rescan_dir(self, d: str) -> tuple[list[str], list[str], list[str]]:
+        """Diff one directory against the snapshot. Returns (added, removed, modified) script paths."""
+        if d not in self._files:
+            return [], [], []
+        if not os.path.isdir(d):
+            return [], self._remove_tree(d), []
+        files, subdirs = scan_dir(d)
+        old_files = self._files[d]
+        added = [p for p in files if p not in old_files]
+        removed = [p for p in old_files if p not in files]
+        modified = [p for p, st in files.items() if p in old_files and old_files[p] != st]
+        self._files[d] = files
+
+        new_subdirs = set(subdirs)
+        old_subdirs = self._subdirs.get(d, set())
+        self._subdirs[d] = new_subdirs
+        for sub in old_subdirs - new_subdirs:
+            removed.extend(self._remove_tree(sub))
+        for sub in new_subdirs - old_subdirs:
+            added.extend(self._add_tree(sub))
+        return added, removed, modified
+
+    def _emit(self, added: list[str], removed: list[str], modified: list[str]) -> None:
+        if removed:
+            self.scripts_removed.emit(sorted(set(removed)))
+        if added:
+            self.scripts_added.emit(sorted(set(added)))
+        if modified:
+            self.scripts_modified.emit(sorted(set(modified)))
+
+    # ------------------------------------------------------------------
+    # Event sources
+    # ------------------------------------------------------------------
+
+    def _on_directory_changed(self, path: str) -> None:
+        self._pending_dirs.add(path)
+        self._debounce_timer.start()
+
+    def _on_file_changed(self, path: str) -> None:
+        if path != self._watched_file:
+            return
+        st = self._stat(path)
+        if st is None:
+            # Deleted or replaced by rename; the parent directory watch reports the removal.
+            self._pending_dirs.add(os.path.dirname(path))
+            self._debounce_timer.start()
+            return
+        if os.path.isfile(path) and path not in self._qt_watcher.files():
+            # Atomic-save editors replace the inode, which drops the watch.
+            self._qt_watcher.addPath(path)
+        if st != self._watched_file_stat:
+            self._watched_file_stat = st
+            d = os.path.dirname(path)
+            if d in self._files and path in self._files[d]:
+                self._files[d][path] = st
+            self.scripts_modified.emit([path])
+
+    def _flush_pending(self) -> None:
+        pending, self._pending_dirs = self._pending_dirs, set()
+        added: list[str] = []
+        removed: list[str] = []
+        modified: list[str] = []
+        for d in pending:
+            a, r, m = self._rescan_dir(d)
+            added.extend(a)
+            removed.extend(r)
+            modified.extend(m)
+        self._emit(added, removed, modified)
+
+    def _poll_batch(self) -> None:
+        """Rescan the next POLL_BATCH_DIRS unwatched directories."""
+        if not self._polled_dirs:
+            self._poll_timer.stop()
+            return
+        added: list[str] = []
+        removed: list[str] = []
+        modified: list[str] = []
+        for _ in range(min(POLL_BATCH_DIRS, len(self._polled_dirs))):
+            if not self._polled_dirs:
+                break
+            d = self._polled_dirs.popleft()
+            if d not in self._files:
+                continue
+            a, r, m = self._rescan_dir(d)
+            added.extend(a)
+            removed.extend(r)
+            modified.extend(m)
+            if d in self._files:
+                self._polled_dirs.append(d)
+        self._emit(added, removed, modified)
@@ -1,10 +1,12 @@
+import bisect
 import os
+import sys
 import threading
 import time
-from typing import Callable, Optional
+from typing import Callable, Iterable, Optional
 
-from PySide6.QtCore import QRect, QSize, Qt, QTimer
-from PySide6.QtGui import QAction, QColor, QFont, QPainter, QTextCharFormat, QTextCursor, QWheelEvent
+from PySide6.QtCore import QEvent, QRect, QSize, Qt, QTimer, Signal
+from PySide6.QtGui import QAction, QColor, QFont, QFontMetrics, QKeySequence, QPainter, QTextCharFormat, QTextCursor, QWheelEvent
 from PySide6.QtWidgets import (
     QApplication,
     QComboBox,
@@ -14,21 +16,26 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
+    QListWidget,
+    QListWidgetItem,
     QMainWindow,
     QMenu,
     QMessageBox,
     QPlainTextEdit,
     QPushButton,
     QScrollArea,
+    QScrollBar,
     QSplitter,
     QStackedWidget,
+    QStyle,
+    QStyleOption,
     QVBoxLayout,
     QWidget,
 )
 
 from datetime import datetime
 
-import utils
+from cgroups import run_cgroup
 from config import (
     load_favorites,
     load_project_path,
@@ -45,33 +52,58 @@ from config import (
     save_venv_activate_path,
     toggle_favorite,
 )
-from metrics import PLACEHOLDER, collect_metrics, format_cpu_time, format_elapsed
-from script_manager import ScriptManager
+from metrics import PLACEHOLDER, collect_metrics, combine_metrics, format_cpu_time, format_elapsed
+from script_manager import ScriptManager, default_category
+from fs_watcher import ProjectWatcher
+from script_metadata import MetadataCache
+from search_index import SEARCH_RESULT_LIMIT, ScriptSearchIndex
+from content_index import MIN_QUERY_LENGTH, ContentIndex, get_content_index_path
 from highlighter import ShellHighlighter
+from large_file import HIGHLIGHT_MAX_BYTES, LARGE_FILE_BYTES, LargeFileReader
+from log_capture import LOG_POLL_INTERVAL, LogCapture
+from pipeline_engine import PipelineRun
 from theme import DARK_PALETTE, LIGHT_PALETTE, get_stylesheet
-from utils import get_process_tree_after_spawn, kill_script_process, run_script_in_gitbash, run_script_in_gitbash_captured
+from utils import get_process_tree_after_spawn
 
-from scheduler_data import create_history_entry, now_iso
-from scheduler_engine import format_rule_display, get_due_schedules, get_next_run, validate_trigger
+from gui_runner import GuiRunnerHost
+from scheduler_engine import (
+    format_rule_display,
+    get_next_run,
+    jitter_offsets,
+)
+from scheduler_runner import SchedulerRunner
 from scheduler_storage import (
-    append_history_entry,
-    append_log,
+    get_diagnostics_log_path,
     get_run_log_file_path,
+    load_daemon_status,
     load_history,
     load_schedules,
-    replace_log,
-    save_schedules,
-    update_history_entry,
 )
-from scheduler_ui import SchedulerContentWidget
-from notifications import show_notification, update_notification_theme
-from manual_history_ui import ManualHistoryWidget
+import perf
+import startup_profile
 
 CATEGORY_OPTIONS = ("None", "backend", "frontend")
 CATEGORY_FILTER_OPTIONS = ("All", "Backend", "Frontend", "Running")
+SEARCH_MODE_OPTIONS = ("Names", "Contents")
+CONTENT_SEARCH_LIMIT = 300
+LARGE_WINDOW_LINES = 3000   # lines kept in the viewer document for large files
+LARGE_WINDOW_MARGIN = 1000  # lines loaded above the visible top
 SIDEBAR_WIDTH = 220
 
 
+def show_notification(**kwargs) -> None:
+    # The toast module is loaded with the first notification rather than at startup.
+    from notifications import show_notification as show
+
+    show(**kwargs)
+
+
+def update_notification_theme(palette: dict) -> None:
+    notifications = sys.modules.get("notifications")
+    if notifications is not None:  # otherwise no toast was ever shown; the next one gets the palette
+        notifications.update_notification_theme(palette)
+
+
 class NoWheelComboBox(QComboBox):
     """QComboBox that ignores mouse wheel to avoid accidental option change."""
 
@@ -87,6 +119,9 @@ class LineNumberGutter(QWidget):
     def __init__(self, editor: "QPlainTextEdit", palette: dict):
         super().__init__(editor.parent())
         self._editor = editor
+        self._line_offset = 0
+        self._line_count_hint = 0
+        self._width = 0
         self._update_colors(palette)
 
         editor.blockCountChanged.connect(self._update_width)
@@ -101,17 +136,29 @@ class LineNumberGutter(QWidget):
         self._update_colors(palette)
         self.update()
 
+    def set_line_offset(self, offset: int, total_lines: int = 0) -> None:
+        """Number lines from offset + 1 (windowed viewer); total_lines sizes the gutter for the whole file."""
+        self._line_offset = offset
+        self._line_count_hint = total_lines
+        self._update_width()
+        self.update()
+
     def gutter_width(self) -> int:
-        digits = max(len(str(self._editor.blockCount())), 2)
+        lines = max(self._editor.blockCount() + self._line_offset, self._line_count_hint)
+        digits = max(len(str(lines)), 2)
         return self.PADDING + self._editor.fontMetrics().horizontalAdvance("9") * digits + self.PADDING
 
     def _update_width(self) -> None:
-        self._editor.setViewportMargins(self.gutter_width(), 0, 0, 0)
+        # Only touch the viewport margins when the digit count changes; resetting them relayouts the editor.
+        width = self.gutter_width()
+        if width != self._width:
+            self._width = width
+            self._editor.setViewportMargins(width, 0, 0, 0)
         self._reposition()
 
     def _reposition(self) -> None:
         cr = self._editor.contentsRect()
-        self.setGeometry(QRect(cr.left(), cr.top(), self.gutter_width(), cr.height()))
+        self.setGeometry(QRect(cr.left(), cr.top(), self._width, cr.height()))
 
     def _on_update_request(self, rect: QRect, dy: int) -> None:
         if dy:
@@ -122,7 +169,7 @@ class LineNumberGutter(QWidget):
             self._update_width()
 
     def sizeHint(self) -> QSize:
-        return QSize(self.gutter_width(), 0)
+        return QSize(self._width, 0)
 
     def paintEvent(self, event) -> None:
         painter = QPainter(self)
@@ -146,7 +193,7 @@ class LineNumberGutter(QWidget):
                     self.width() - self.PADDING,
                     self._editor.fontMetrics().height(),
                     Qt.AlignRight | Qt.AlignVCenter,
-                    str(block_number + 1),
+                    str(block_number + 1 + self._line_offset),
                 )
             block = block.next()
             block_number += 1
@@ -154,13 +201,125 @@ class LineNumberGutter(QWidget):
             bottom = top + self._editor.blockBoundingRect(block).height()
 
 
+class SidebarRow(QWidget):
+    """
+    One script in the sidebar, painted by a single widget: running dot, name, favorite star and the
+    selected highlight. Changing the running or selected state repaints the row; there are no child
+    labels and no dynamic stylesheet properties to repolish, so a theme switch has fewer widgets to
+    restyle. Hover and the base look still come from the #sidebarRow stylesheet rule.
+    """
+
+    MARGIN_X = 8
+    MARGIN_Y = 3
+    SPACING = 6
+
+    def __init__(
+        self, path: str, text: str, tooltip: str, palette: dict,
+        running: bool, selected: bool, starred: bool, on_click: Callable[[str], None],
+    ):
+        super().__init__()
+        self.setObjectName("sidebarRow")
+        self.setCursor(Qt.PointingHandCursor)
+        self.setToolTip(tooltip)
+        self.path = path
+        self._text = text
+        self._colors = palette
+        self._running = running
+        self._selected = selected
+        self._starred = starred
+        self._on_click = on_click
+        self._size_hints: Optional[tuple[QSize, QSize]] = None  # (hint, minimum), until the font changes
+
+    def set_running(self, running: bool) -> None:
+        if running != self._running:
+            self._running = running
+            self.update()
+
+    def set_selected(self, selected: bool) -> None:
+        if selected != self._selected:
+            self._selected = selected
+            self.update()
+
+    def update_palette(self, palette: dict) -> None:
+        self._colors = palette
+        self.update()
+
+    def _hints(self) -> tuple[QSize, QSize]:
+        if self._size_hints is None:
+            metrics = self.fontMetrics()
+            height = metrics.height() + 2 * self.MARGIN_Y
+            width = 2 * self.MARGIN_X + 2 * self.SPACING + metrics.horizontalAdvance(f"o{self._text}★")
+            self._size_hints = (QSize(width, height), QSize(0, height))
+        return self._size_hints
+
+    def sizeHint(self) -> QSize:
+        return self._hints()[0]
+
+    def minimumSizeHint(self) -> QSize:
+        return self._hints()[1]
+
+    def changeEvent(self, event) -> None:
+        if event.type() == QEvent.FontChange:
+            self._size_hints = None
+        super().changeEvent(event)
+
+    def mousePressEvent(self, event) -> None:
+        self._on_click(self.path)
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        option = QStyleOption()
+        option.initFrom(self)
+        self.style().drawPrimitive(QStyle.PE_Widget, option, painter, self)
+        rect = self.rect()
+        if self._selected:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(self._colors["sidebar_selected_bg"]))
+            painter.drawRoundedRect(rect, 4, 4)
+            painter.setRenderHint(QPainter.Antialiasing, False)
+            painter.fillRect(0, 0, 2, rect.height(), QColor(self._colors["sidebar_selected_border"]))
+
+        left = self.MARGIN_X
+        right = rect.width() - self.MARGIN_X
+        height = rect.height()
+        bold = QFont(self.font())
+        bold.setBold(True)
+        painter.setFont(bold)
+        dot_width = max(QFontMetrics(bold).horizontalAdvance(glyph) for glyph in ("o", "•"))
+        painter.setPen(QColor(self._colors["dot_running" if self._running else "dot_stopped"]))
+        painter.drawText(QRect(left, 0, dot_width, height), Qt.AlignLeft | Qt.AlignVCenter, "•" if self._running else "o")
+        left += dot_width + self.SPACING
+
+        painter.setFont(self.font())
+        metrics = self.fontMetrics()
+        if self._starred:
+            star_width = metrics.horizontalAdvance("★")
+            painter.setPen(QColor(self._colors["fav_btn"]))
+            painter.drawText(QRect(right - star_width, 0, star_width, height), Qt.AlignRight | Qt.AlignVCenter, "★")
+            right -= star_width + self.SPACING
+        painter.setPen(QColor(self._colors["text_secondary"]))
+        text = metrics.elidedText(self._text, Qt.ElideRight, max(0, right - left))
+        painter.drawText(QRect(left, 0, max(0, right - left), height), Qt.AlignLeft | Qt.AlignVCenter, text)
+
+
 class ShScriptHubApp(QMainWindow):
+    # Emitted from the content index worker thread; delivered on the GUI thread.
+    content_index_progress = Signal(int, int)
+    content_descriptions = Signal(dict)
+    # Emitted from the search index build thread: (build generation, the built ScriptSearchIndex).
+    search_index_built = Signal(int, object)
+    # Emitted from log capture threads: (run_id, offset in log, text, style runs relative to text).
+    run_log_appended = Signal(str, int, str, list)
+    run_log_finished = Signal(str)
+
     def __init__(self):
         super().__init__()
 
         self.script_manager = None
         self.scripts = []
         self.script_rows = []
+        self._script_index: dict[str, dict] = {}  # path -> row in script_rows
         self.script_categories = {}
         self.terminal_path = load_terminal_path()
         self.venv_activate_path = load_venv_activate_path()
@@ -169,10 +328,39 @@ class ShScriptHubApp(QMainWindow):
         self._selected_script_path: Optional[str] = None
         self._folder_expanded: dict[str, bool] = {}
         # Permanent tree widget references — built once, filtered via setVisible
-        self._tree_script_rows: dict[str, QWidget] = {}   # path -> row widget
-        self._tree_script_dots: dict[str, QLabel] = {}    # path -> dot label
+        self._tree_script_rows: dict[str, SidebarRow] = {}   # path -> row widget
+        self._fav_row_refs: list[tuple[str, SidebarRow]] = []
         self._tree_folder_headers: dict[str, QWidget] = {}
         self._tree_children_widgets: dict[str, QWidget] = {}
+        self._tree_folder_paths: dict[str, list[str]] = {}  # folder -> child paths in alphabetical order
+        self._search_index = ScriptSearchIndex()
+        self._search_index_generation = 0
+        # Index changes made while a new index is built in the background, replayed on it once it is in
+        self._search_index_journal: Optional[list] = None
+        self.search_index_built.connect(self._on_search_index_built)
+        self._tree_ranked_paths: dict[str, list[str]] = {}  # folder -> rows moved to the top by a ranked search
+        self._tree_folders_ranked = False
+        # Sidebar state changes waiting for the next _flush_sidebar
+        self._sidebar_dirty_paths: set[str] = set()
+        self._sidebar_dots_all_dirty = False
+        self._sidebar_selection_dirty = False
+        self._sidebar_flush_pending = False
+        self._content_index: Optional[ContentIndex] = None
+        self.content_index_progress.connect(self._on_content_index_progress)
+        self.content_descriptions.connect(self._on_content_descriptions)
+        self._live_logs: dict[str, LogCapture] = {}  # run_id -> capture of a run still going
+        self._live_logs_lock = threading.Lock()
+        self._daemon_status: Optional[dict] = None  # headless daemon this window is attached to
+        # Runs started from this window, with their queues, retries and pipeline runs (see scheduler_runner.py)
+        self._runner = SchedulerRunner(GuiRunnerHost(self))
+        self._metadata_cache = MetadataCache()
+        self._viewer_key: Optional[tuple] = None  # (path, mtime_ns, size) currently shown in script viewer
+        self._pending_removals: set[str] = set()  # deleted scripts whose rows stay until their runs end
+
+        self._watcher = ProjectWatcher(self)
+        self._watcher.scripts_added.connect(self._on_scripts_added)
+        self._watcher.scripts_removed.connect(self._on_scripts_removed)
+        self._watcher.scripts_modified.connect(self._on_scripts_modified)
 
         self._update_title()
         central = QWidget()
@@ -193,25 +381,26 @@ class ShScriptHubApp(QMainWindow):
         self.body_splitter = QSplitter(Qt.Horizontal)
         self.sidebar_panel = self._build_sidebar()
         self.detail_panel = self._build_detail_panel()
-        self._scheduler_widget = SchedulerContentWidget(self)
+        self._scheduler_widget = None  # SchedulerContentWidget, built on first switch to the Scheduler page
         self._content_stack = QStackedWidget()
         self._content_stack.addWidget(self.detail_panel)
-        self._content_stack.addWidget(self._scheduler_widget)
+        self._content_stack.addWidget(QWidget())  # placeholder until then
         self.body_splitter.addWidget(self.sidebar_panel)
         self.body_splitter.addWidget(self._content_stack)
         self.body_splitter.setStretchFactor(0, 0)
         self.body_splitter.setStretchFactor(1, 1)
         self.body_splitter.setSizes([SIDEBAR_WIDTH, 900])
         layout.addWidget(self.body_splitter, 1)
+        startup_profile.mark("build widgets")
 
         self._update_path_labels()
         saved = load_project_path()
         if saved and os.path.isdir(saved):
             self.project_path = saved
             self._update_title()
-            self.load_scripts()
         self._update_path_labels()
         self._render_detail_panel()
+        self._startup_pending = True  # the project is scanned after the first paint, see paintEvent
 
         self._tick_timer = QTimer(self)
         self._tick_timer.timeout.connect(self._tick_process_check)
@@ -221,6 +410,82 @@ class ShScriptHubApp(QMainWindow):
         self._scheduler_timer = QTimer(self)
         self._scheduler_timer.timeout.connect(self._scheduler_tick)
         self._scheduler_timer.start(1000)
+        self._control_server = None  # started with the project scan, after the first paint
+        self._watchdog = None  # LagWatchdog, from the first paint on
+
+        self._perf_dialog = None
+        self._lag_probe = None
+        perf_action = QAction("Performance", self)
+        perf_action.setShortcut(QKeySequence("Ctrl+Shift+P"))
+        perf_action.triggered.connect(self._show_perf_dialog)
+        self.addAction(perf_action)
+        if perf.enabled():
+            self._ensure_lag_probe().start()
+        startup_profile.mark("timers")
+
+    def paintEvent(self, event) -> None:
+        super().paintEvent(event)
+        if self._startup_pending:
+            self._startup_pending = False
+            startup_profile.mark("first paint")
+            self._start_watchdog()
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self) -> None:
+        if self.project_path and not self.script_rows:
+            self.load_scripts()
+            startup_profile.mark("project scan")
+        self._start_control_server()
+        startup_profile.mark("control API")
+        startup_profile.report()
+
+    def _start_watchdog(self) -> None:
+        from lag_watchdog import HEARTBEAT_INTERVAL, LagWatchdog
+
+        self._watchdog = LagWatchdog(get_diagnostics_log_path("gui"))
+        beat_timer = QTimer(self)
+        beat_timer.setTimerType(Qt.PreciseTimer)
+        beat_timer.timeout.connect(self._watchdog.beat)
+        beat_timer.start(int(HEARTBEAT_INTERVAL * 1000))
+        self._watchdog.start()
+
+    def _start_control_server(self) -> None:
+        from control_server import ControlServer
+        from gui_control import GuiControlBackend
+
+        server = ControlServer(GuiControlBackend(self))
+        if not server.start_in_thread():
+            return  # another ShScriptHub (GUI or headless) serves the control API
+        self._control_server = server
+        self.run_log_appended.connect(self._publish_run_log)
+        self.run_log_finished.connect(server.publish_log_end)
+
+    def _publish_run_log(self, run_id: str, offset: int, text: str, _runs: list) -> None:
+        self._control_server.publish_log(run_id, offset, text)
+
+    def _ensure_lag_probe(self):
+        if self._lag_probe is None:
+            from perf_dialog import EventLoopLagProbe
+
+            self._lag_probe = EventLoopLagProbe(self)
+        return self._lag_probe
+
+    def _show_perf_dialog(self) -> None:
+        if self._perf_dialog is None:
+            from perf_dialog import PerfDialog
+
+            self._perf_dialog = PerfDialog(self._ensure_lag_probe(), self)
+        self._perf_dialog.show()
+        self._perf_dialog.raise_()
+        self._perf_dialog.activateWindow()
+
+    def closeEvent(self, event) -> None:
+        self._runner.cancel_all_waiting()
+        if self._watchdog is not None:
+            self._watchdog.stop()
+        if self._control_server is not None:
+            self._control_server.stop_thread()
+        super().closeEvent(event)
 
     @property
     def _palette(self) -> dict:
@@ -229,7 +494,7 @@ class ShScriptHubApp(QMainWindow):
     def _format_next_run_for_notification(self, schedule: dict) -> str:
         if not schedule.get("enabled", False):
             return "—"
-        next_run = get_next_run(schedule)
+        next_run = get_next_run(schedule, jitter_offsets(load_schedules()).get(schedule.get("id"), 0.0))
         if next_run is None:
             return "—"
         now = datetime.now(next_run.tzinfo) if next_run.tzinfo is not None else datetime.now()
@@ -338,6 +603,13 @@ class ShScriptHubApp(QMainWindow):
         )
         row.addWidget(notification_btn)
 
+        limits_btn = QPushButton("Limits")
+        limits_btn.setObjectName("topBarBtn")
+        limits_btn.clicked.connect(
+            lambda: self._show_button_menu(limits_btn, [("Resource limits…", self._show_limits_dialog)])
+        )
+        row.addWidget(limits_btn)
+
         row.addStretch()
 
         theme_label = "☀ Light" if self._theme == "dark" else "🌙 Dark"
@@ -348,6 +620,11 @@ class ShScriptHubApp(QMainWindow):
 
         return bar
 
+    def _show_limits_dialog(self) -> None:
+        from limits_dialog import LimitsDialog
+
+        LimitsDialog(self._selected_script_path, self).exec()
+
     def _toggle_scheduler_notifications(self) -> None:
         enabled = load_scheduler_notification_enabled()
         save_scheduler_notification_enabled(not enabled)
@@ -355,11 +632,17 @@ class ShScriptHubApp(QMainWindow):
     def _toggle_theme(self) -> None:
         self._theme = "light" if self._theme == "dark" else "dark"
         save_theme(self._theme)
-        QApplication.instance().setStyleSheet(get_stylesheet(self._theme))
+        app = QApplication.instance()
+        # Replacing one application stylesheet with another is several times slower than clearing it
+        # and applying the new one (seconds with thousands of sidebar rows, see bench_suite.py).
+        app.setStyleSheet("")
+        app.setStyleSheet(get_stylesheet(self._theme))
+        for row_w in list(self._tree_script_rows.values()) + [row_w for _path, row_w in self._fav_row_refs]:
+            row_w.update_palette(self._palette)
         self._theme_btn.setText("☀ Light" if self._theme == "dark" else "🌙 Dark")
         self._sh_highlighter.update_palette(self._palette)
         self._line_gutter.update_palette(self._palette)
-        if hasattr(self, "_scheduler_widget"):
+        if self._scheduler_widget is not None:
             self._scheduler_widget.update_log_highlighter_palette(self._palette)
             self._scheduler_widget.refresh_current_view()
         update_notification_theme(self._palette)
@@ -422,11 +705,20 @@ class ShScriptHubApp(QMainWindow):
         filter_row.addWidget(self.category_combo, 1)
         layout.addLayout(filter_row)
 
+        search_row = QHBoxLayout()
+        search_row.setContentsMargins(0, 0, 0, 0)
+        search_row.setSpacing(6)
         self.search_edit = QLineEdit()
         self.search_edit.setObjectName("searchEdit")
         self.search_edit.setPlaceholderText("Search...")
         self.search_edit.setClearButtonEnabled(True)
-        layout.addWidget(self.search_edit)
+        search_row.addWidget(self.search_edit, 1)
+        self.search_mode_combo = NoWheelComboBox()
+        self.search_mode_combo.setObjectName("searchModeCombo")
+        self.search_mode_combo.addItems(SEARCH_MODE_OPTIONS)
+        self.search_mode_combo.setToolTip("Search script names or script contents")
+        search_row.addWidget(self.search_mode_combo)
+        layout.addLayout(search_row)
 
         layout.addWidget(self._build_divider())
 
@@ -445,12 +737,24 @@ class ShScriptHubApp(QMainWindow):
         self.tree_scroll.setWidget(self.tree_container)
         layout.addWidget(self.tree_scroll, 1)
 
+        self.content_index_status = QLabel()
+        self.content_index_status.setObjectName("contentIndexStatus")
+        self.content_index_status.setVisible(False)
+        layout.addWidget(self.content_index_status)
+        self.content_results_list = QListWidget()
+        self.content_results_list.setObjectName("contentResultsList")
+        self.content_results_list.setVisible(False)
+        self.content_results_list.itemClicked.connect(self._open_content_result)
+        self.content_results_list.itemActivated.connect(self._open_content_result)
+        layout.addWidget(self.content_results_list, 1)
+
         self._search_debounce_timer = QTimer(self)
         self._search_debounce_timer.setSingleShot(True)
         self._search_debounce_timer.setInterval(180)
         self._search_debounce_timer.timeout.connect(self._on_filter_changed)
 
         self.category_combo.currentTextChanged.connect(self._on_filter_changed)
+        self.search_mode_combo.currentTextChanged.connect(self._on_search_mode_changed)
         self.search_edit.textChanged.connect(self._search_debounce_timer.start)
 
         return panel
@@ -461,6 +765,7 @@ class ShScriptHubApp(QMainWindow):
             self._detail_nav_btn.setProperty("active", "true")
             self._history_nav_btn.setProperty("active", "false")
         else:
+            self._ensure_manual_history_widget()
             self._detail_stack.setCurrentIndex(1)
             self._manual_history_widget.refresh_history()
             self._detail_nav_btn.setProperty("active", "false")
@@ -470,6 +775,18 @@ class ShScriptHubApp(QMainWindow):
         self._history_nav_btn.style().unpolish(self._history_nav_btn)
         self._history_nav_btn.style().polish(self._history_nav_btn)
 
+    def _ensure_manual_history_widget(self) -> None:
+        if self._manual_history_widget is not None:
+            return
+        from manual_history_ui import ManualHistoryWidget
+
+        widget = ManualHistoryWidget(self)
+        placeholder = self._detail_stack.widget(1)
+        self._detail_stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self._detail_stack.insertWidget(1, widget)
+        self._manual_history_widget = widget
+
     def _build_detail_panel(self) -> QWidget:
         panel = QWidget()
         panel.setObjectName("detailPanel")
@@ -516,9 +833,9 @@ class ShScriptHubApp(QMainWindow):
         content.setSpacing(8)
         details_layout.addWidget(self._detail_content, 1)
 
-        self._manual_history_widget = ManualHistoryWidget(self)
+        self._manual_history_widget = None  # ManualHistoryWidget, built when the History tab is first opened
         self._detail_stack.addWidget(self._details_container)
-        self._detail_stack.addWidget(self._manual_history_widget)
+        self._detail_stack.addWidget(QWidget())  # placeholder until then
         
         self._switch_detail_tab("details")
 
@@ -526,6 +843,16 @@ class ShScriptHubApp(QMainWindow):
         self.detail_title.setObjectName("detailTitle")
         content.addWidget(self.detail_title)
 
+        self.detail_description_label = QLabel("")
+        self.detail_description_label.setObjectName("detailDescription")
+        self.detail_description_label.setWordWrap(True)
+        content.addWidget(self.detail_description_label)
+
+        self.detail_annotations_label = QLabel("")
+        self.detail_annotations_label.setObjectName("detailAnnotations")
+        self.detail_annotations_label.setWordWrap(True)
+        content.addWidget(self.detail_annotations_label)
+
         detail_row = QHBoxLayout()
         detail_row.setSpacing(8)
         detail_row.addWidget(QLabel("Category:"))
@@ -587,14 +914,34 @@ class ShScriptHubApp(QMainWindow):
             metrics_grid.addWidget(value, r, c + 1)
         content.addLayout(metrics_grid)
 
+        # One child row per live run when the script runs more than once; the metrics above are then totals.
+        self._instances_header = QLabel("Instances")
+        self._instances_header.setObjectName("detailSectionHeader")
+        self._instances_header.setVisible(False)
+        content.addWidget(self._instances_header)
+        self._instances_box = QWidget()
+        self._instances_layout = QVBoxLayout(self._instances_box)
+        self._instances_layout.setContentsMargins(0, 0, 0, 0)
+        self._instances_layout.setSpacing(2)
+        self._instances_box.setVisible(False)
+        content.addWidget(self._instances_box)
+        self._instance_rows: dict[str, tuple[QWidget, QLabel]] = {}  # run id -> (child row, metrics label)
+
+        script_header_row = QHBoxLayout()
         script_header = QLabel("Script")
         script_header.setObjectName("detailSectionHeader")
-        content.addWidget(script_header)
+        script_header_row.addWidget(script_header)
+        script_header_row.addStretch()
+        self.viewer_mode_label = QLabel()
+        self.viewer_mode_label.setObjectName("viewerModeLabel")
+        self.viewer_mode_label.setVisible(False)
+        script_header_row.addWidget(self.viewer_mode_label)
+        content.addLayout(script_header_row)
 
         # Container gives the gutter a shared parent with the editor
         viewer_container = QFrame()
         viewer_container.setObjectName("scriptViewer")
-        viewer_container_layout = QVBoxLayout(viewer_container)
+        viewer_container_layout = QHBoxLayout(viewer_container)
         viewer_container_layout.setContentsMargins(0, 0, 0, 0)
         viewer_container_layout.setSpacing(0)
 
@@ -607,11 +954,20 @@ class ShScriptHubApp(QMainWindow):
         self.script_viewer.setLineWrapMode(QPlainTextEdit.NoWrap)
         # Remove the editor's own frame — the container provides it
         self.script_viewer.setFrameShape(QFrame.NoFrame)
-        viewer_container_layout.addWidget(self.script_viewer)
+        viewer_container_layout.addWidget(self.script_viewer, 1)
+        # Large files: the document holds a window of lines; this bar spans the whole file.
+        self.script_viewer_scrollbar = QScrollBar(Qt.Vertical, viewer_container)
+        self.script_viewer_scrollbar.setVisible(False)
+        viewer_container_layout.addWidget(self.script_viewer_scrollbar)
         content.addWidget(viewer_container, 1)
 
         self._sh_highlighter = ShellHighlighter(self.script_viewer.document(), self._palette)
         self._line_gutter = LineNumberGutter(self.script_viewer, self._palette)
+        self._large_reader: Optional[LargeFileReader] = None
+        self._large_window_start = -1
+        self._syncing_large_scroll = False
+        self.script_viewer_scrollbar.valueChanged.connect(self._on_large_scrollbar_changed)
+        self.script_viewer.verticalScrollBar().valueChanged.connect(self._on_viewer_scrolled)
 
         self.detail_run_btn.clicked.connect(self._run_selected_script)
         self.detail_kill_btn.clicked.connect(self._kill_selected_script)
@@ -703,13 +1059,7 @@ class ShScriptHubApp(QMainWindow):
         self._choose_terminal_path()
 
     def _get_default_category(self, script_path: str) -> str:
-        rel = os.path.relpath(script_path, self.project_path)
-        parts = os.path.normpath(rel).split(os.sep)
-        if parts and parts[0].lower() == "backend":
-            return "backend"
-        if parts and parts[0].lower() == "frontend":
-            return "frontend"
-        return "none"
+        return default_category(script_path, self.project_path)
 
     def _get_category_for_script(self, script_path: str) -> str:
         return self.script_categories.get(script_path) or self._get_default_category(script_path)
@@ -754,15 +1104,6 @@ class ShScriptHubApp(QMainWindow):
         save_project_path(self.project_path)
         self.load_scripts()
 
-    def _matches_search(self, script: dict, search_text: str) -> bool:
-        if not search_text or not search_text.strip():
-            return True
-        q = search_text.strip().lower()
-        rel = os.path.relpath(script["path"], self.project_path).replace("\\", "/").lower()
-        name = script["name"].lower()
-        folder = os.path.basename(os.path.dirname(script["path"])).lower()
-        return q in rel or q in name or q in folder
-
     def _script_folder(self, script: dict) -> str:
         rel = os.path.relpath(script["path"], self.project_path)
         parts = os.path.normpath(rel).split(os.sep)
@@ -773,16 +1114,21 @@ class ShScriptHubApp(QMainWindow):
     def _get_row(self, path: Optional[str]) -> Optional[dict]:
         if not path:
             return None
-        for row in self.script_rows:
-            if row["script"]["path"] == path:
-                return row
-        return None
+        return self._script_index.get(path)
 
     def _is_row_running(self, row: Optional[dict]) -> bool:
+        return bool(self._live_runs(row))
+
+    def _is_row_waiting(self, row: Optional[dict]) -> bool:
+        """True if a run of the row's script is waiting for resources."""
+        return row is not None and bool(self._runner.waiting_runs(row["script"]["path"]))
+
+    @staticmethod
+    def _live_runs(row: Optional[dict]) -> list[dict]:
+        """The row's runs whose process is still going, oldest first."""
         if row is None:
-            return False
-        proc = row.get("process")
-        return proc is not None and proc.poll() is None
+            return []
+        return [run for run in row["runs"] if run["process"].poll() is None]
 
     def _set_detail_status(self, text: str) -> None:
         self.detail_status_label.setText(text)
@@ -826,10 +1172,12 @@ class ShScriptHubApp(QMainWindow):
 
     def _select_script(self, path: str) -> None:
         self._selected_script_path = path
+        self._watcher.watch_file(path)
         self._switch_page("home")
         self._render_detail_panel()
         self._refresh_sidebar_selection()
 
+    @perf.timed("ui.render_detail_panel")
     def _render_detail_panel(self) -> None:
         row = self._get_row(self._selected_script_path)
         if row is None:
@@ -846,16 +1194,24 @@ class ShScriptHubApp(QMainWindow):
         running = self._is_row_running(row)
 
         self.detail_title.setText(rel)
+        self._render_script_metadata(path)
         self.detail_category_combo.blockSignals(True)
         self.detail_category_combo.setCurrentText("None" if category == "none" else category)
         self.detail_category_combo.blockSignals(False)
         self.detail_env_label.setText(self._get_env_display(row["script"], category))
 
-        self._set_detail_status("Running" if running else "Stopped")
-        proc = row.get("process")
-        self.detail_pid_label.setText(str(proc.pid) if running and proc is not None else PLACEHOLDER)
+        if running:
+            self._set_detail_status("Running")
+        elif self._is_row_waiting(row):
+            self._set_detail_status("Waiting for resources")
+        else:
+            self._set_detail_status("Stopped")
+        runs = self._live_runs(row)
+        self.detail_pid_label.setText(", ".join(str(run["process"].pid) for run in runs) if runs else PLACEHOLDER)
         self.detail_fav_btn.setText("★" if path in load_favorites() else "☆")
-        self.detail_kill_btn.setVisible(running)
+        self.detail_kill_btn.setVisible(running or self._is_row_waiting(row))
+        self.detail_kill_btn.setText("Kill all" if len(runs) > 1 else "Kill")
+        self._render_instances(runs)
 
         if running:
             self._update_row_metrics(row)
@@ -873,14 +1229,183 @@ class ShScriptHubApp(QMainWindow):
 
         self._load_script_viewer(path)
 
-    def _load_script_viewer(self, path: str) -> None:
+    def _render_instances(self, runs: list[dict]) -> None:
+        """Child rows for the selected script's live runs, shown when there is more than one."""
+        shown = runs if len(runs) > 1 else []
+        if [run["history_id"] for run in shown] != list(self._instance_rows):
+            for widget, _metrics_lbl in self._instance_rows.values():
+                self._instances_layout.removeWidget(widget)
+                widget.deleteLater()
+            self._instance_rows = {run["history_id"]: self._make_instance_row(run) for run in shown}
+        self._instances_header.setVisible(bool(shown))
+        self._instances_box.setVisible(bool(shown))
+
+    def _make_instance_row(self, run: dict) -> tuple[QWidget, QLabel]:
+        widget = QWidget()
+        layout = QHBoxLayout(widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(8)
+        started = datetime.fromisoformat(run["started_at"]).strftime("%H:%M:%S")
+        title = QLabel(f"PID {run['process'].pid}  ·  {run['schedule_name']}  ·  started {started}")
+        title.setToolTip(f"Run {run['history_id']}")
+        layout.addWidget(title)
+        layout.addStretch()
+        metrics_lbl = QLabel(PLACEHOLDER)
+        layout.addWidget(metrics_lbl)
+        kill_btn = QPushButton("Kill")
+        kill_btn.setObjectName("killBtn")
+        kill_btn.clicked.connect(lambda _checked=False, run_id=run["history_id"]: self._kill_run_by_id(run_id))
+        layout.addWidget(kill_btn)
+        self._instances_layout.addWidget(widget)
+        return widget, metrics_lbl
+
+    def _render_script_metadata(self, path: str) -> None:
+        meta = self._metadata_cache.get(path)
+        description = meta["description"] if meta else ""
+        self._update_search_index(ScriptSearchIndex.set_description, path, description)
+        self.detail_description_label.setText(description)
+        self.detail_description_label.setVisible(bool(description))
+
+        parts = []
+        if meta and meta["shebang"]:
+            parts.append(f"Interpreter: {meta['shebang']}")
+        if meta and meta["args"]:
+            parts.append("Args: " + ", ".join(a["name"] for a in meta["args"]))
+        if meta and meta["env"]:
+            parts.append("Env vars: " + ", ".join(e["name"] for e in meta["env"]))
+        self.detail_annotations_label.setText("  |  ".join(parts))
+        self.detail_annotations_label.setVisible(bool(parts))
+        tooltip_lines = [
+            f"{a['name']}: {a['description']}" if a["description"] else a["name"]
+            for a in (meta["args"] + meta["env"] if meta else [])
+        ]
+        self.detail_annotations_label.setToolTip("\n".join(tooltip_lines))
+
+    def _load_script_viewer(self, path: str, keep_position: bool = False) -> None:
+        meta = self._metadata_cache.peek(path)
+        key = (path, meta["mtime_ns"], meta["size"]) if meta else None
+        if key is not None and key == self._viewer_key:
+            # Same file, unchanged on disk — the viewer already shows it.
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        if size > LARGE_FILE_BYTES:
+            self._load_large_script(path, key, keep_position)
+            return
+        self._leave_large_file_mode()
         try:
             with open(path, encoding="utf-8", errors="replace") as f:
                 content = f.read()
         except OSError:
             content = f"# Could not read file: {path}"
+            key = None
+        self._viewer_key = key
+        v_scroll = self.script_viewer.verticalScrollBar().value()
+        h_scroll = self.script_viewer.horizontalScrollBar().value()
         self.script_viewer.setPlainText(content)
-        self.script_viewer.moveCursor(QTextCursor.MoveOperation.Start)
+        if keep_position:
+            self.script_viewer.verticalScrollBar().setValue(v_scroll)
+            self.script_viewer.horizontalScrollBar().setValue(h_scroll)
+        else:
+            self.script_viewer.moveCursor(QTextCursor.MoveOperation.Start)
+
+    # ------------------------------------------------------------------
+    # Script viewer – large files (windowed, memory-mapped)
+    # ------------------------------------------------------------------
+
+    def _load_large_script(self, path: str, key: Optional[tuple], keep_position: bool) -> None:
+        same_file = self._large_reader is not None and self._large_reader.path == path
+        top = self._large_top_line() if keep_position and same_file else 0
+        try:
+            reader = LargeFileReader(path)
+        except OSError:
+            self._leave_large_file_mode()
+            self._viewer_key = None
+            self.script_viewer.setPlainText(f"# Could not read file: {path}")
+            return
+        self._viewer_key = key
+        self._large_reader = reader
+        self._large_window_start = -1
+
+        highlight = reader.size <= HIGHLIGHT_MAX_BYTES
+        if highlight and self._sh_highlighter.document() is None:
+            self._sh_highlighter.setDocument(self.script_viewer.document())
+        elif not highlight and self._sh_highlighter.document() is not None:
+            self._sh_highlighter.setDocument(None)
+        mode = f"Large file: {reader.size / (1024 * 1024):.1f} MB, {reader.line_count:,} lines"
+        self.viewer_mode_label.setText(mode if highlight else mode + ", highlighting off")
+        self.viewer_mode_label.setVisible(True)
+        self.script_viewer.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.script_viewer_scrollbar.setVisible(True)
+        self._show_large_line(top)
+
+    def _leave_large_file_mode(self) -> None:
+        if self._large_reader is None:
+            return
+        self._large_reader = None
+        self._large_window_start = -1
+        self.viewer_mode_label.setVisible(False)
+        self.script_viewer_scrollbar.setVisible(False)
+        self.script_viewer.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self._line_gutter.set_line_offset(0)
+        if self._sh_highlighter.document() is None:
+            self.script_viewer.clear()
+            self._sh_highlighter.setDocument(self.script_viewer.document())
+
+    def _viewer_visible_lines(self) -> int:
+        return max(1, self.script_viewer.viewport().height() // max(1, self.script_viewer.fontMetrics().lineSpacing()))
+
+    def _large_top_line(self) -> int:
+        return max(0, self._large_window_start) + self.script_viewer.verticalScrollBar().value()
+
+    def _show_large_line(self, top: int, reload: bool = False) -> None:
+        """Scroll a large file so 0-based line top is first visible, loading a new window if needed."""
+        reader = self._large_reader
+        visible = self._viewer_visible_lines()
+        top = max(0, min(top, reader.line_count - visible))
+        start = self._large_window_start
+        window_end = min(start + LARGE_WINDOW_LINES, reader.line_count)
+        self._syncing_large_scroll = True
+        try:
+            if reload or start < 0 or top < start or top + visible > window_end:
+                start = max(0, top - LARGE_WINDOW_MARGIN)
+                self._large_window_start = start
+                try:
+                    text = reader.read_lines(start, LARGE_WINDOW_LINES)
+                except OSError:
+                    text = f"# Could not read file: {reader.path}"
+                self.script_viewer.setPlainText(text)
+                self._line_gutter.set_line_offset(start, reader.line_count)
+            self.script_viewer_scrollbar.setRange(0, max(0, reader.line_count - visible))
+            self.script_viewer_scrollbar.setPageStep(visible)
+            self.script_viewer_scrollbar.setValue(top)
+            self.script_viewer.verticalScrollBar().setValue(top - start)
+        finally:
+            self._syncing_large_scroll = False
+
+    def _on_large_scrollbar_changed(self, value: int) -> None:
+        if self._syncing_large_scroll or self._large_reader is None:
+            return
+        self._show_large_line(value)
+
+    def _on_viewer_scrolled(self, value: int) -> None:
+        """Wheel/keyboard scrolling inside the window: mirror it on the file scrollbar, re-window near edges."""
+        if self._syncing_large_scroll or self._large_reader is None:
+            return
+        start = self._large_window_start
+        top = start + value
+        end = start + self.script_viewer.blockCount()
+        edge = LARGE_WINDOW_MARGIN // 4
+        near_top = start > 0 and value < edge
+        near_bottom = end < self._large_reader.line_count and end - (top + self._viewer_visible_lines()) < edge
+        if near_top or near_bottom:
+            self._show_large_line(top, reload=True)
+            return
+        self._syncing_large_scroll = True
+        self.script_viewer_scrollbar.setValue(top)
+        self._syncing_large_scroll = False
 
     # ------------------------------------------------------------------
     # Sidebar – favorites (rebuilt on load/favorite-toggle only)
@@ -896,7 +1421,7 @@ class ShScriptHubApp(QMainWindow):
                 w.setParent(None)
 
         # Favorites sidebar refs are separate from tree refs
-        self._fav_row_refs: list[tuple[str, QWidget, QLabel]] = []
+        self._fav_row_refs: list[tuple[str, SidebarRow]] = []
 
         favorites = sorted(load_favorites())
         favorites = [p for p in favorites if self._get_row(p) is not None]
@@ -906,14 +1431,15 @@ class ShScriptHubApp(QMainWindow):
             self.favorites_layout.addWidget(empty)
             return
         for script_path in favorites:
-            row_w, dot = self._make_sidebar_row_widget(script_path, show_star=True)
+            row_w = self._make_sidebar_row_widget(script_path, starred=True)
             self.favorites_layout.addWidget(row_w)
-            self._fav_row_refs.append((script_path, row_w, dot))
+            self._fav_row_refs.append((script_path, row_w))
 
     # ------------------------------------------------------------------
     # Sidebar – tree (built ONCE on load_scripts, filtered via setVisible)
     # ------------------------------------------------------------------
 
+    @perf.timed("ui.build_tree")
     def _build_tree(self) -> None:
         """Build the full tree from scratch. Called only from load_scripts."""
         # Clear any previous tree widgets
@@ -925,9 +1451,11 @@ class ShScriptHubApp(QMainWindow):
                 w.setParent(None)
 
         self._tree_script_rows.clear()
-        self._tree_script_dots.clear()
         self._tree_folder_headers.clear()
         self._tree_children_widgets.clear()
+        self._tree_folder_paths.clear()
+        self._tree_ranked_paths.clear()
+        self._tree_folders_ranked = False
 
         # Group ALL scripts by folder (no filtering here)
         grouped: dict[str, list[dict]] = {}
@@ -935,54 +1463,150 @@ class ShScriptHubApp(QMainWindow):
             folder = self._script_folder(row["script"])
             grouped.setdefault(folder, []).append(row)
 
-        folders = sorted(f for f in grouped if f != "root")
-        if "root" in grouped:
-            folders.append("root")
-
-        for folder in folders:
-            expanded = self._folder_expanded.get(folder, True)
-
-            folder_header = QWidget()
-            header_layout = QHBoxLayout(folder_header)
-            header_layout.setContentsMargins(6, 4, 6, 2)
-            header_layout.setSpacing(6)
-            toggle_btn = QPushButton("▼" if expanded else "►")
-            toggle_btn.setObjectName("folderToggleBtn")
-            toggle_btn.setFixedSize(22, 22)
-            folder_lbl = QLabel(folder)
-            folder_lbl.setObjectName("folderLabel")
-            header_layout.addWidget(toggle_btn, 0)
-            header_layout.addWidget(folder_lbl, 1)
-            self.tree_layout.addWidget(folder_header)
-            self._tree_folder_headers[folder] = folder_header
-
-            children_widget = QWidget()
-            children_layout = QVBoxLayout(children_widget)
-            children_layout.setContentsMargins(18, 0, 0, 4)
-            children_layout.setSpacing(2)
-
+        favorites = load_favorites()
+        self.tree_layout.addStretch()
+        for folder in self._sorted_folders(grouped):
+            self._create_tree_folder(folder)
+            children_layout = self._tree_children_widgets[folder].layout()
+            paths = self._tree_folder_paths[folder]
             for row in sorted(grouped[folder], key=lambda r: r["script"]["path"].lower()):
                 script = row["script"]
-                row_w, dot = self._make_sidebar_row_widget(script["path"], display_text=script["name"])
+                row_w = self._make_sidebar_row_widget(script["path"], script["path"] in favorites, script["name"])
                 children_layout.addWidget(row_w)
+                paths.append(script["path"])
                 self._tree_script_rows[script["path"]] = row_w
-                self._tree_script_dots[script["path"]] = dot
-
-            children_widget.setVisible(expanded)
-            self.tree_layout.addWidget(children_widget)
-            self._tree_children_widgets[folder] = children_widget
-
-            toggle_btn.clicked.connect(
-                lambda checked=False, f=folder, w=children_widget, b=toggle_btn: self._toggle_folder(f, w, b)
-            )
 
-        self.tree_layout.addStretch()
+    @staticmethod
+    def _sorted_folders(folders) -> list[str]:
+        """Folder display order: alphabetical, with the project root group last."""
+        ordered = sorted(f for f in folders if f != "root")
+        if "root" in folders:
+            ordered.append("root")
+        return ordered
+
+    def _create_tree_folder(self, folder: str) -> None:
+        """Insert an empty folder header + children container at its sorted position in the tree."""
+        expanded = self._folder_expanded.get(folder, True)
+        ordered = self._sorted_folders(list(self._tree_folder_headers) + [folder])
+        insert_at = 2 * ordered.index(folder)
+
+        folder_header = QWidget()
+        header_layout = QHBoxLayout(folder_header)
+        header_layout.setContentsMargins(6, 4, 6, 2)
+        header_layout.setSpacing(6)
+        toggle_btn = QPushButton("▼" if expanded else "►")
+        toggle_btn.setObjectName("folderToggleBtn")
+        toggle_btn.setFixedSize(22, 22)
+        folder_lbl = QLabel(folder)
+        folder_lbl.setObjectName("folderLabel")
+        header_layout.addWidget(toggle_btn, 0)
+        header_layout.addWidget(folder_lbl, 1)
+        self.tree_layout.insertWidget(insert_at, folder_header)
+        self._tree_folder_headers[folder] = folder_header
+
+        children_widget = QWidget()
+        children_layout = QVBoxLayout(children_widget)
+        children_layout.setContentsMargins(18, 0, 0, 4)
+        children_layout.setSpacing(2)
+        children_widget.setVisible(expanded)
+        self.tree_layout.insertWidget(insert_at + 1, children_widget)
+        self._tree_children_widgets[folder] = children_widget
+        self._tree_folder_paths[folder] = []
+
+        toggle_btn.clicked.connect(
+            lambda checked=False, f=folder, w=children_widget, b=toggle_btn: self._toggle_folder(f, w, b)
+        )
 
+    def _insert_tree_row(self, row: dict) -> None:
+        """Add one script row to the tree without rebuilding it (used for watcher events)."""
+        self._restore_tree_order()
+        script = row["script"]
+        folder = self._script_folder(script)
+        if folder not in self._tree_children_widgets:
+            self._create_tree_folder(folder)
+        paths = self._tree_folder_paths[folder]
+        idx = bisect.bisect_left(paths, script["path"].lower(), key=str.lower)
+        row_w = self._make_sidebar_row_widget(script["path"], script["path"] in load_favorites(), script["name"])
+        self._tree_children_widgets[folder].layout().insertWidget(idx, row_w)
+        paths.insert(idx, script["path"])
+        self._tree_script_rows[script["path"]] = row_w
+
+    def _remove_tree_row(self, path: str, folder: str) -> None:
+        """Remove one script row from the tree; drops the folder group when it becomes empty."""
+        row_w = self._tree_script_rows.pop(path, None)
+        if row_w is not None:
+            row_w.hide()
+            row_w.setParent(None)
+        paths = self._tree_folder_paths.get(folder)
+        if paths is None:
+            return
+        if path in paths:
+            paths.remove(path)
+        if not paths:
+            for w in (self._tree_folder_headers.pop(folder, None), self._tree_children_widgets.pop(folder, None)):
+                if w is not None:
+                    w.hide()
+                    w.setParent(None)
+            del self._tree_folder_paths[folder]
+        moved = self._tree_ranked_paths.get(folder)
+        if moved and path in moved:
+            moved.remove(path)
+
+    def _restore_tree_order(self) -> None:
+        """Undo the reordering done by a ranked search: rows and folders back to alphabetical order."""
+        for folder, moved in self._tree_ranked_paths.items():
+            children_widget = self._tree_children_widgets.get(folder)
+            if children_widget is None:
+                continue
+            layout = children_widget.layout()
+            for path in moved:
+                layout.removeWidget(self._tree_script_rows[path])
+            # Every other row is still in alphabetical order, so inserting in ascending index order is exact.
+            paths = self._tree_folder_paths[folder]
+            for path in sorted(moved, key=paths.index):
+                layout.insertWidget(paths.index(path), self._tree_script_rows[path])
+        self._tree_ranked_paths.clear()
+        if self._tree_folders_ranked:
+            self._place_tree_folders(self._sorted_folders(self._tree_folder_headers))
+            self._tree_folders_ranked = False
+
+    def _place_tree_folders(self, ordered: list[str]) -> None:
+        """Move the given folder groups (header + children) to the top of the tree, in order."""
+        for i, folder in enumerate(ordered):
+            header = self._tree_folder_headers[folder]
+            children_widget = self._tree_children_widgets[folder]
+            self.tree_layout.removeWidget(header)
+            self.tree_layout.removeWidget(children_widget)
+            self.tree_layout.insertWidget(2 * i, header)
+            self.tree_layout.insertWidget(2 * i + 1, children_widget)
+
+    def _rank_tree(self, ranked: list[str]) -> None:
+        """Reorder the tree by search rank: best-matching folder first, best rows first within a folder."""
+        by_folder: dict[str, list[str]] = {}
+        for path in ranked:
+            row = self._script_index.get(path)
+            if row is not None and path in self._tree_script_rows:
+                by_folder.setdefault(self._script_folder(row["script"]), []).append(path)
+        for folder, paths in by_folder.items():
+            layout = self._tree_children_widgets[folder].layout()
+            for i, path in enumerate(paths):
+                row_w = self._tree_script_rows[path]
+                layout.removeWidget(row_w)
+                layout.insertWidget(i, row_w)
+        self._tree_ranked_paths = by_folder
+        self._place_tree_folders(list(by_folder))
+        self._tree_folders_ranked = True
+
+    @perf.timed("ui.apply_tree_filter")
     def _apply_tree_filter(self) -> None:
-        """Show/hide existing tree widgets based on current filter and search. No widget creation."""
+        """Show/hide existing tree widgets based on current filter and search. No widget creation.
+        With a search query, matches are shown in rank order instead of alphabetically."""
         filter_text = self.category_combo.currentText()
-        query = self.search_edit.text().strip().lower()
+        query = self.search_edit.text().strip()
 
+        self._restore_tree_order()
+        ranked = self._search_scripts(query) if query else None
+        rank_set = set(ranked) if ranked is not None else None
         for row in self.script_rows:
             script = row["script"]
             path = script["path"]
@@ -990,9 +1614,7 @@ class ShScriptHubApp(QMainWindow):
             if row_w is None:
                 continue
 
-            visible = True
-            if query and not self._matches_search(script, query):
-                visible = False
+            visible = rank_set is None or path in rank_set
             if visible and filter_text == "Backend":
                 visible = self._get_category_for_script(path) == "backend"
             if visible and filter_text == "Frontend":
@@ -1018,6 +1640,8 @@ class ShScriptHubApp(QMainWindow):
             if header:
                 header.setVisible(folder_has_visible)
             children_widget.setVisible(folder_has_visible and expanded)
+        if ranked:
+            self._rank_tree(ranked)
 
     def _toggle_folder(self, folder: str, widget: QWidget, toggle_btn: QPushButton) -> None:
         current = self._folder_expanded.get(folder, True)
@@ -1027,36 +1651,19 @@ class ShScriptHubApp(QMainWindow):
         toggle_btn.setText("▼" if new_state else "►")
 
     def _make_sidebar_row_widget(
-        self, script_path: str, show_star: bool = False, display_text: Optional[str] = None
-    ) -> tuple[QWidget, QLabel]:
-        """Create a sidebar row widget. Returns (row_widget, dot_label)."""
-        row = QWidget()
-        row.setObjectName("sidebarRow")
-        row.setProperty("selected", script_path == self._selected_script_path)
-        row.setCursor(Qt.PointingHandCursor)
-        row_layout = QHBoxLayout(row)
-        row_layout.setContentsMargins(8, 3, 8, 3)
-        row_layout.setSpacing(6)
-
-        running = self._is_row_running(self._get_row(script_path))
-        dot = QLabel("•" if running else "o")
-        dot.setObjectName("dotLabel")
-        dot.setProperty("running", "true" if running else "false")
-        row_layout.addWidget(dot)
-
-        if display_text is None:
-            display_text = os.path.relpath(script_path, self.project_path).replace("\\", "/")
-        name_lbl = QLabel(display_text)
-        name_lbl.setToolTip(os.path.relpath(script_path, self.project_path).replace("\\", "/"))
-        row_layout.addWidget(name_lbl, 1)
-
-        if show_star or script_path in load_favorites():
-            star = QLabel("★")
-            star.setStyleSheet(f"color: {self._palette['fav_btn']};")
-            row_layout.addWidget(star)
-
-        row.mousePressEvent = lambda event, p=script_path: self._select_script(p)
-        return row, dot
+        self, script_path: str, starred: bool, display_text: Optional[str] = None
+    ) -> SidebarRow:
+        relative = os.path.relpath(script_path, self.project_path).replace("\\", "/")
+        return SidebarRow(
+            script_path,
+            display_text if display_text is not None else relative,
+            relative,
+            self._palette,
+            running=self._is_row_running(self._get_row(script_path)),
+            selected=script_path == self._selected_script_path,
+            starred=starred,
+            on_click=self._select_script,
+        )
 
     def _refresh_sidebar(self) -> None:
         """Full sidebar refresh — called on load and favorite toggle."""
@@ -1064,64 +1671,224 @@ class ShScriptHubApp(QMainWindow):
         self._build_tree()
         self._refresh_sidebar_selection()
 
-    def _refresh_sidebar_dots(self) -> None:
-        """Update dot state on all visible sidebar rows without any widget creation."""
-        all_refs = list(self._tree_script_dots.items())
-        fav_refs = getattr(self, "_fav_row_refs", [])
-
-        for path, dot in all_refs:
-            running = self._is_row_running(self._get_row(path))
-            dot.setText("•" if running else "o")
-            dot.setProperty("running", "true" if running else "false")
-            dot.style().unpolish(dot)
-            dot.style().polish(dot)
-
-        for path, _row_w, dot in fav_refs:
-            running = self._is_row_running(self._get_row(path))
-            dot.setText("•" if running else "o")
-            dot.setProperty("running", "true" if running else "false")
-            dot.style().unpolish(dot)
-            dot.style().polish(dot)
-
-        self._refresh_sidebar_selection()
+    def _refresh_sidebar_dots(self, paths: Optional[Iterable[str]] = None) -> None:
+        """
+        Marks the running dots of paths (all scripts when None) as stale. Every change made before
+        control returns to the event loop is applied in one pass, see _flush_sidebar.
+        """
+        if paths is None:
+            self._sidebar_dots_all_dirty = True
+        else:
+            self._sidebar_dirty_paths.update(paths)
+        self._schedule_sidebar_flush()
 
     def _refresh_sidebar_selection(self) -> None:
-        """Update selected highlight on all sidebar rows."""
-        all_rows: list[tuple[str, QWidget]] = list(self._tree_script_rows.items())
-        all_rows += [(p, w) for p, w, _d in getattr(self, "_fav_row_refs", [])]
-        for path, widget in all_rows:
-            widget.setProperty("selected", path == self._selected_script_path)
-            widget.style().unpolish(widget)
-            widget.style().polish(widget)
+        """Marks the selected highlight as stale; applied with the next _flush_sidebar."""
+        self._sidebar_selection_dirty = True
+        self._schedule_sidebar_flush()
+
+    def _schedule_sidebar_flush(self) -> None:
+        if not self._sidebar_flush_pending:
+            self._sidebar_flush_pending = True
+            QTimer.singleShot(0, self._flush_sidebar)
+
+    @perf.timed("ui.flush_sidebar")
+    def _flush_sidebar(self) -> None:
+        self._sidebar_flush_pending = False
+        fav_refs = self._fav_row_refs
+        if self._sidebar_dots_all_dirty or self._sidebar_dirty_paths:
+            dirty = None if self._sidebar_dots_all_dirty else self._sidebar_dirty_paths
+            self._sidebar_dots_all_dirty = False
+            self._sidebar_dirty_paths = set()
+            if dirty is None:
+                rows = list(self._tree_script_rows.items())
+            else:
+                rows = [(path, self._tree_script_rows[path]) for path in dirty if path in self._tree_script_rows]
+            rows += [(path, row_w) for path, row_w in fav_refs if dirty is None or path in dirty]
+            for path, row_w in rows:
+                row_w.set_running(self._is_row_running(self._get_row(path)))
+        if self._sidebar_selection_dirty:
+            self._sidebar_selection_dirty = False
+            selected = self._selected_script_path
+            for path, row_w in list(self._tree_script_rows.items()) + fav_refs:
+                row_w.set_selected(path == selected)
 
     def _on_filter_changed(self, _value=None) -> None:
+        if self._content_search_active():
+            self._run_content_search()
+            return
         self._apply_tree_filter()
         self._refresh_sidebar_selection()
 
+    # ------------------------------------------------------------------
+    # Sidebar – content search (on-disk index maintained in the background)
+    # ------------------------------------------------------------------
+
+    def _content_search_active(self) -> bool:
+        return self.search_mode_combo.currentText() == "Contents"
+
+    def _on_search_mode_changed(self, _mode: str) -> None:
+        content = self._content_search_active()
+        self.search_edit.setPlaceholderText("Search in scripts..." if content else "Search...")
+        self.tree_scroll.setVisible(not content)
+        self.content_results_list.setVisible(content)
+        self.content_index_status.setVisible(content)
+        if content:
+            self._run_content_search()
+        else:
+            self._apply_tree_filter()
+            self._refresh_sidebar_selection()
+
+    def _start_content_index(self) -> None:
+        if self._content_index is not None:
+            self._content_index.close()
+        self._content_index = ContentIndex(
+            get_content_index_path(self.project_path),
+            on_progress=self.content_index_progress.emit,
+            on_descriptions=self.content_descriptions.emit,
+        )
+        self._content_index.sync(s["path"] for s in self.scripts)
+        self._update_content_index_status()
+
+    def _update_content_index_status(self) -> None:
+        index = self._content_index
+        if index is None:
+            self.content_index_status.setText("")
+        elif index.busy:
+            self.content_index_status.setText(f"Indexing {index.indexed}/{index.total} scripts...")
+        else:
+            self.content_index_status.setText(f"{len(self.scripts)} scripts indexed")
+
+    def _on_content_index_progress(self, _done: int, _total: int) -> None:
+        self._update_content_index_status()
+        if self._content_search_active() and self.search_edit.text().strip():
+            self._run_content_search()
+
+    def _on_content_descriptions(self, descriptions: dict) -> None:
+        for path, description in descriptions.items():
+            self._update_search_index(ScriptSearchIndex.set_description, path, description)
+        if not self._content_search_active() and self.search_edit.text().strip():
+            self._apply_tree_filter()
+
+    def _run_content_search(self) -> None:
+        query = self.search_edit.text().strip()
+        self.content_results_list.clear()
+        if not query or self._content_index is None:
+            self._update_content_index_status()
+            return
+        if len(query) < MIN_QUERY_LENGTH:
+            self.content_index_status.setText(f"Type at least {MIN_QUERY_LENGTH} characters")
+            return
+        results = self._content_index.search(query, CONTENT_SEARCH_LIMIT)
+        for result in results:
+            rel = os.path.relpath(result["path"], self.project_path).replace("\\", "/")
+            item = QListWidgetItem(f"{rel}:{result['line']}  {result['text']}")
+            item.setToolTip(f"{rel}:{result['line']}")
+            item.setData(Qt.UserRole, (result["path"], result["line"]))
+            self.content_results_list.addItem(item)
+        if self._content_index.busy:
+            self._update_content_index_status()
+        elif len(results) >= CONTENT_SEARCH_LIMIT:
+            self.content_index_status.setText(f"First {CONTENT_SEARCH_LIMIT} matches")
+        else:
+            self.content_index_status.setText(f"{len(results)} matches" if results else "No matches")
+
+    def _open_content_result(self, item: QListWidgetItem) -> None:
+        path, line = item.data(Qt.UserRole)
+        if path not in self._script_index:
+            return
+        self._select_script(path)
+        self._scroll_viewer_to_line(line)
+
+    def _scroll_viewer_to_line(self, line: int) -> None:
+        """Select line (1-based) in the script viewer and center it."""
+        if self._large_reader is not None:
+            self._show_large_line(line - 1 - self._viewer_visible_lines() // 2)
+            line -= self._large_window_start
+        block = self.script_viewer.document().findBlockByNumber(line - 1)
+        if not block.isValid():
+            return
+        cursor = QTextCursor(block)
+        cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
+        self.script_viewer.setTextCursor(cursor)
+        self.script_viewer.centerCursor()
+
+    def _start_search_index_build(self) -> None:
+        """Indexes self.scripts for the sidebar search on a background thread; it replaces the index once built."""
+        self._search_index_generation += 1
+        self._search_index_journal = []
+        threading.Thread(
+            target=self._search_index_build_thread,
+            args=(self._search_index_generation, [s["path"] for s in self.scripts], self.project_path),
+            name="search-index",
+            daemon=True,
+        ).start()
+
+    def _search_index_build_thread(self, generation: int, paths: list[str], project_path: str) -> None:
+        index = ScriptSearchIndex()
+        index.build(paths, project_path)
+        self.search_index_built.emit(generation, index)
+
+    def _on_search_index_built(self, generation: int, index: ScriptSearchIndex) -> None:
+        if generation != self._search_index_generation:
+            return  # a newer load_scripts is building its own
+        for method, args in self._search_index_journal:
+            method(index, *args)
+        self._search_index_journal = None
+        self._search_index = index
+        if not self._content_search_active() and self.search_edit.text().strip():
+            self._apply_tree_filter()
+
+    def _update_search_index(self, method: Callable, *args) -> None:
+        """Applies a ScriptSearchIndex add/remove/set_description, or queues it while an index is being built."""
+        if self._search_index_journal is not None:
+            self._search_index_journal.append((method, args))
+        else:
+            method(self._search_index, *args)
+
+    def _search_scripts(self, query: str) -> list[str]:
+        if self._search_index_journal is None:
+            return self._search_index.search(query)
+        # Still indexing: plain substring matches on the relative path, ranked once the index is in.
+        terms = query.lower().split()
+        start = len(os.path.join(self.project_path, ""))
+        return [
+            s["path"] for s in self.scripts
+            if all(term in s["path"][start:].replace("\\", "/").lower() for term in terms)
+        ][:SEARCH_RESULT_LIMIT]
+
+    @staticmethod
+    def _new_script_row(script: dict) -> dict:
+        # runs: one dict per live run, {"process", "kill_pids", "start_time", "peak_rss", "cpu_primed_pids",
+        # "history_id", "schedule_name", "started_at"}
+        return {"script": script, "runs": []}
+
+    @perf.timed("ui.load_scripts")
     def load_scripts(self) -> None:
         try:
             self.script_rows = []
+            self._script_index = {}
+            self._pending_removals.clear()
             self.script_manager = ScriptManager(self.project_path)
-            self.scripts = self.script_manager.get_scripts()
+            self.scripts, tree = self.script_manager.scan()
         except Exception as exc:
             QMessageBox.critical(self, "ShScriptHub - Error", f"Failed to load scripts: {str(exc)}")
             return
 
         self.script_categories = load_script_categories()
+        self._metadata_cache.clear()
+        self._viewer_key = None
         self.scripts.sort(key=lambda s: s["path"].lower())
+        self._start_search_index_build()
         for script in self.scripts:
-            row = {
-                "script": script,
-                "process": None,
-                "kill_pids": None,
-                "start_time": None,
-                "peak_rss": 0.0,
-                "cpu_primed_pids": None,
-                "scheduler_history_id": None,
-            }
+            row = self._new_script_row(script)
             self.script_rows.append(row)
+            self._script_index[script["path"]] = row
 
         self._refresh_sidebar()
+        self._watcher.start(self.project_path, tree)
+        self._start_content_index()
+        self._watcher.watch_file(self._selected_script_path)
         if self.scripts:
             paths = {s["path"] for s in self.scripts}
             if self._selected_script_path not in paths:
@@ -1132,158 +1899,142 @@ class ShScriptHubApp(QMainWindow):
             self._selected_script_path = None
             self._render_detail_panel()
 
+    # ------------------------------------------------------------------
+    # Project watcher – incremental index / tree / viewer updates
+    # ------------------------------------------------------------------
+
+    def _on_scripts_added(self, paths: list) -> None:
+        if not self.project_path:
+            return
+        added = False
+        for path in paths:
+            self._pending_removals.discard(path)
+            if path in self._script_index:
+                continue
+            script = {"name": os.path.basename(path), "path": path}
+            row = self._new_script_row(script)
+            idx = bisect.bisect_left(self.scripts, path.lower(), key=lambda s: s["path"].lower())
+            self.scripts.insert(idx, script)
+            self.script_rows.insert(idx, row)
+            self._script_index[path] = row
+            self._update_search_index(ScriptSearchIndex.add, path)
+            self._insert_tree_row(row)
+            added = True
+        if self._content_index is not None:
+            self._content_index.update(paths)
+        if not added:
+            return
+        if any(p in load_favorites() for p in paths):
+            self._rebuild_favorites()
+        self._apply_tree_filter()
+        if self._selected_script_path is None:
+            self._select_script(self.scripts[0]["path"])
+        else:
+            self._refresh_sidebar_selection()
+
+    def _on_scripts_removed(self, paths: list) -> None:
+        removed = False
+        for path in paths:
+            self._pending_removals.discard(path)
+            row = self._script_index.get(path)
+            if row is None:
+                continue
+            if self._is_row_running(row):
+                # A running script keeps its row so it can still be monitored and killed;
+                # check_processes removes it once its last run has ended.
+                self._pending_removals.add(path)
+                continue
+            folder = self._script_folder(row["script"])
+            self._metadata_cache.invalidate(path)
+            del self._script_index[path]
+            self._update_search_index(ScriptSearchIndex.remove, path)
+            self.script_rows.remove(row)
+            self.scripts.remove(row["script"])
+            self._remove_tree_row(path, folder)
+            removed = True
+        if self._content_index is not None:
+            self._content_index.update(paths)
+        if not removed:
+            return
+        if any(p in paths for p, _w in self._fav_row_refs):
+            self._rebuild_favorites()
+        self._apply_tree_filter()
+        if self._selected_script_path not in self._script_index:
+            if self.scripts:
+                self._select_script(self.scripts[0]["path"])
+            else:
+                self._selected_script_path = None
+                self._watcher.watch_file(None)
+                self._render_detail_panel()
+
+    def _on_scripts_modified(self, paths: list) -> None:
+        if self._content_index is not None:
+            self._content_index.update(paths)
+        if self._selected_script_path in paths:
+            self._render_script_metadata(self._selected_script_path)
+            self._load_script_viewer(self._selected_script_path, keep_position=True)
+
     def _run_script_row(self, row: dict) -> None:
         try:
-            category = self._get_category_for_script(row["script"]["path"])
-            
-            entry = create_history_entry(
-                schedule_id="",
-                schedule_name="Manual Run",
-                script_path=row["script"]["path"],
-                triggered_at=now_iso(),
-                started_at=now_iso(),
-                status="started",
-            )
-            append_history_entry(entry)
-            append_log(entry["id"], "")
-            log_file_path = get_run_log_file_path(entry["id"])
-            
-            proc = run_script_in_gitbash_captured(
-                row["script"]["path"],
-                category,
-                self.project_path,
-                log_file_path=log_file_path,
-                terminal_path=self.terminal_path,
-                venv_activate_path=self.venv_activate_path,
-            )
-            
-            poller = threading.Thread(
-                target=self._log_file_poll_thread,
-                args=(proc, entry["id"], log_file_path),
-                daemon=True,
-            )
-            poller.start()
-            
-            row["process"] = proc
-            row["kill_pids"] = None
-            row["start_time"] = time.monotonic()
-            row["peak_rss"] = 0.0
-            row["cpu_primed_pids"] = set()
-            row["scheduler_history_id"] = entry["id"]
-            
-            delay_ms = int(utils.TREE_CAPTURE_DELAY_SEC * 1000)
-            QTimer.singleShot(delay_ms, lambda: self._capture_kill_pids(row))
-            if row["script"]["path"] == self._selected_script_path:
-                self._render_detail_panel()
-            self._refresh_sidebar_dots()
-            QMessageBox.information(self, "ShScriptHub", f"Script '{row['script']['name']}' started.")
+            run_id = self._runner.request_run(row["script"]["path"])
         except Exception as exc:
-            if 'entry' in locals():
-                update_history_entry(entry["id"], {
-                    "status": "failed",
-                    "started_at": None,
-                    "error_message": str(exc),
-                })
             QMessageBox.critical(self, "ShScriptHub - Error", str(exc))
+            return
+        if run_id in self._runner.waiting:
+            QMessageBox.information(
+                self, "ShScriptHub", f"Script '{row['script']['name']}' is waiting for resources and starts once there is room.",
+            )
+            return
+        QMessageBox.information(self, "ShScriptHub", f"Script '{row['script']['name']}' started.")
 
-    def _capture_kill_pids(self, row: dict) -> None:
-        proc = row.get("process")
-        if proc is None or proc.poll() is not None:
+    @staticmethod
+    def _capture_kill_pids(run: dict) -> None:
+        proc = run["process"]
+        if proc.poll() is not None:
             return
-        row["kill_pids"] = get_process_tree_after_spawn(proc)
+        run["kill_pids"] = get_process_tree_after_spawn(proc)
+        run["cgroup"] = run_cgroup(proc.pid)
 
     def _kill_script_row(self, row: dict) -> None:
-        proc = row.get("process")
-        if proc is None:
-            return
-        history_id = row.get("scheduler_history_id")
-        if history_id:
-            if load_scheduler_notification_enabled():
-                schedule, history = self._get_schedule_and_history_for_id(history_id)
-                if schedule:
-                    payload = self._build_notification_payload(schedule)
-                    show_notification(
-                        event_type="finished_killed",
-                        schedule_name=payload["schedule_name"],
-                        script_name=payload["script_name"],
-                        rule_type=payload["rule_type"],
-                        next_run=payload["next_run"],
-                        palette=self._palette,
-                    )
-            update_history_entry(history_id, {
-                "status": "killed",
-                "finished_at": now_iso(),
-            })
-            row["scheduler_history_id"] = None
-        kill_pids = row.get("kill_pids")
-        if not kill_pids and proc.poll() is None:
-            kill_pids = [proc.pid]
-        kill_script_process(proc, kill_pids=kill_pids)
-        row["process"] = None
-        row["kill_pids"] = None
-        row["start_time"] = None
-        row["peak_rss"] = 0.0
-        row["cpu_primed_pids"] = None
-        if row["script"]["path"] == self._selected_script_path:
-            self._render_detail_panel()
-        self._refresh_sidebar_dots()
+        """Kills every run of the row's script, and drops its runs waiting for resources."""
+        self._runner.kill_script(row["script"]["path"])
 
+    def _kill_run_by_id(self, run_id: str) -> bool:
+        if run_id not in self._runner.waiting and not self._runner.host.alive(run_id):
+            return False
+        return self._runner.kill_run(run_id)
+
+    @perf.timed("timer.check_processes")
     def check_processes(self) -> None:
-        changed = False
-        for row in self.script_rows:
-            proc = row.get("process")
-            if proc is None:
-                continue
-            if proc.poll() is None:
-                continue
-            history_id = row.get("scheduler_history_id")
-            if history_id:
-                if load_scheduler_notification_enabled():
-                    schedule, history = self._get_schedule_and_history_for_id(history_id)
-                    if schedule:
-                        payload = self._build_notification_payload(schedule)
-                        show_notification(
-                            event_type="finished_exited",
-                            schedule_name=payload["schedule_name"],
-                            script_name=payload["script_name"],
-                            rule_type=payload["rule_type"],
-                            next_run=payload["next_run"],
-                            palette=self._palette,
-                        )
-                update_history_entry(history_id, {
-                    "status": "exited",
-                    "finished_at": now_iso(),
-                })
-                row["scheduler_history_id"] = None
-            row["process"] = None
-            row["kill_pids"] = None
-            row["start_time"] = None
-            row["peak_rss"] = 0.0
-            row["cpu_primed_pids"] = None
-            changed = True
-            if row["script"]["path"] == self._selected_script_path:
-                self._render_detail_panel()
-        if changed:
-            self._refresh_sidebar_dots()
+        self._runner.check_runs()
+        if self._pending_removals:
+            ended = [p for p in self._pending_removals if not self._is_row_running(self._script_index.get(p))]
+            if ended:
+                self._on_scripts_removed(ended)
 
+    @perf.timed("metrics.update_row")
     def _update_row_metrics(self, row: dict) -> None:
         if row["script"]["path"] != self._selected_script_path:
             return
-        proc = row.get("process")
-        if proc is None or proc.poll() is not None:
-            return
-        pids = row.get("kill_pids") or [proc.pid]
-        start_time = row.get("start_time") or 0
-        peak_rss = row.get("peak_rss") or 0.0
-        cpu_primed_pids = row.get("cpu_primed_pids")
-        if cpu_primed_pids is None:
-            cpu_primed_pids = set()
-            row["cpu_primed_pids"] = cpu_primed_pids
-        try:
-            metrics = collect_metrics(pids, start_time, peak_rss, cpu_primed_pids)
-        except Exception:
+        samples = []
+        for run in self._live_runs(row):
+            try:
+                sample = collect_metrics(
+                    run["kill_pids"] or [run["process"].pid], run["start_time"], run["peak_rss"], run["cpu_primed_pids"],
+                    run["cgroup"],
+                )
+            except Exception:
+                continue
+            run["peak_rss"] = sample["peak_rss_bytes"]
+            samples.append(sample)
+            child = self._instance_rows.get(run["history_id"])
+            if child is not None:
+                child[1].setText(
+                    f"{sample['cpu_percent']:.1f}%  ·  {sample['rss_mb']:.2f} MB  ·  {format_elapsed(sample['elapsed_sec'])}"
+                )
+        if not samples:
             return
-        row["peak_rss"] = metrics["peak_rss_bytes"]
+        metrics = samples[0] if len(samples) == 1 else combine_metrics(samples)
         self.detail_cpu_pct_label.setText(f"{metrics['cpu_percent']:.1f}%")
         self.detail_ram_rss_label.setText(f"{metrics['rss_mb']:.2f} MB")
         self.detail_ram_pct_label.setText(f"{metrics['ram_percent']:.1f}%")
@@ -1292,6 +2043,7 @@ class ShScriptHubApp(QMainWindow):
         self.detail_cpu_time_label.setText(format_cpu_time(metrics["cpu_time_sec"]))
         self.detail_threads_label.setText(str(metrics["num_threads"]))
 
+    @perf.timed("timer.process_check")
     def _tick_process_check(self) -> None:
         self.check_processes()
         row = self._get_row(self._selected_script_path)
@@ -1331,10 +2083,24 @@ class ShScriptHubApp(QMainWindow):
         if page == "home":
             self._content_stack.setCurrentIndex(0)
         else:
+            self._ensure_scheduler_widget()
             self._content_stack.setCurrentIndex(1)
             self._scheduler_widget.refresh_schedules()
         self._update_page_selector_styles()
 
+    def _ensure_scheduler_widget(self) -> None:
+        if self._scheduler_widget is not None:
+            return
+        from scheduler_ui import SchedulerContentWidget
+
+        widget = SchedulerContentWidget(self)
+        placeholder = self._content_stack.widget(1)
+        self._content_stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self._content_stack.insertWidget(1, widget)
+        self._scheduler_widget = widget
+        widget.set_daemon_status(self._daemon_status)
+
     def _update_page_selector_styles(self) -> None:
         self._home_page_btn.setProperty("active", "true" if self._current_page == "home" else "false")
         self._scheduler_page_btn.setProperty("active", "true" if self._current_page == "scheduler" else "false")
@@ -1346,182 +2112,109 @@ class ShScriptHubApp(QMainWindow):
     # Scheduler engine integration
     # ------------------------------------------------------------------
 
+    def _update_daemon_status(self) -> None:
+        previous = self._daemon_status
+        daemon = self._daemon_status = load_daemon_status()
+        if self._scheduler_widget is None:
+            return  # the page picks up the status when it is built
+        if (daemon or {}).get("pid") != (previous or {}).get("pid"):
+            self._scheduler_widget.set_daemon_status(daemon)
+            self._scheduler_widget.on_history_changed()
+        elif daemon is not None and daemon.get("history_version") != previous.get("history_version"):
+            self._scheduler_widget.on_history_changed()
+
+    def daemon_running_paths(self) -> set[str]:
+        """Scripts the attached headless daemon is currently running."""
+        if self._daemon_status is None:
+            return set()
+        return {r.get("script_path") for r in self._daemon_status.get("running", [])}
+
+    @perf.timed("timer.scheduler_tick")
     def _scheduler_tick(self) -> None:
-        if not self.project_path:
-            return
-        schedules = load_schedules()
-        due = get_due_schedules(schedules)
-        if not due:
-            return
-        for schedule in due:
-            self._execute_scheduled_run(schedule)
-        save_schedules(schedules)
-        self._refresh_sidebar_dots()
+        self._update_daemon_status()
+        # Runs started here (queued, catch-up, retried, pipeline steps) carry on here even once a daemon
+        # is attached; only firing due schedules is left to the daemon.
+        self._runner.tick(fire=self._daemon_status is None)
+
+    def start_pipeline(self, pipeline_id: str, schedule_id: str = "", schedule_name: Optional[str] = None) -> PipelineRun:
+        """Starts a run of the pipeline; its steps start on the next scheduler ticks. Raises LookupError if it does not exist."""
+        return self._runner.start_pipeline(pipeline_id, schedule_id, schedule_name)
+
+    def pipeline_schedule_running(self, schedule_id: str) -> bool:
+        return self._runner.pipeline_schedule_running(schedule_id)
 
     def _log_file_poll_thread(self, process, run_id: str, log_file_path: str) -> None:
-        """Polls log file written by script (redirect inside bash). Avoids Git Bash pipe issues on Windows."""
+        """
+        Polls log file written by script (redirect inside bash). Avoids Git Bash pipe issues on Windows.
+        New output is published to open log viewers through run_log_appended; the log is stored
+        once the run ends.
+        """
+        capture = LogCapture(run_id, log_file_path)
+        with self._live_logs_lock:
+            self._live_logs[run_id] = capture
         while process.poll() is None:
-            time.sleep(0.25)
-            try:
-                with open(log_file_path, encoding="utf-8", errors="replace") as f:
-                    content = f.read()
-                replace_log(run_id, content)
-            except (OSError, FileNotFoundError):
-                pass
-        try:
-            with open(log_file_path, encoding="utf-8", errors="replace") as f:
-                content = f.read()
-            replace_log(run_id, content)
-        except (OSError, FileNotFoundError):
-            pass
-        try:
-            os.remove(log_file_path)
-        except OSError:
-            pass
-
-    def _execute_scheduled_run(self, schedule: dict) -> None:
-        script_path = schedule["script_path"]
-        triggered_at = now_iso()
-
-        error = validate_trigger(script_path, self.project_path)
-        if error:
-            entry = create_history_entry(
-                schedule_id=schedule["id"],
-                schedule_name=schedule["name"],
-                script_path=script_path,
-                triggered_at=triggered_at,
-                started_at=None,
-                status="failed",
-                error_message=error,
-            )
-            append_history_entry(entry)
-            self._mark_schedule_triggered(schedule)
-            if load_scheduler_notification_enabled():
-                payload = self._build_notification_payload(schedule, error_message=error)
-                if not script_path:
-                    payload["script_name"] = error
-                show_notification(
-                    event_type="error",
-                    schedule_name=payload["schedule_name"],
-                    script_name=payload["script_name"],
-                    rule_type=payload["rule_type"],
-                    next_run=payload["next_run"],
-                    palette=self._palette,
-                    error_message=payload["error_message"],
-                )
+            time.sleep(LOG_POLL_INTERVAL)
+            chunk = capture.poll()
+            if chunk:
+                self.run_log_appended.emit(run_id, *chunk)
+        chunk = capture.poll(final=True)
+        if chunk:
+            self.run_log_appended.emit(run_id, *chunk)
+        capture.save()
+        with self._live_logs_lock:
+            self._live_logs.pop(run_id, None)
+        self.run_log_finished.emit(run_id)
+        capture.remove_file()
+
+    def _daemon_log_follow_thread(self, capture: LogCapture) -> None:
+        """Tails the capture file of a run owned by the headless daemon, which stores the log itself."""
+        while os.path.isfile(capture.log_file_path):
+            time.sleep(LOG_POLL_INTERVAL)
+            chunk = capture.poll()
+            if chunk:
+                self.run_log_appended.emit(capture.run_id, *chunk)
+        with self._live_logs_lock:
+            self._live_logs.pop(capture.run_id, None)
+        self.run_log_finished.emit(capture.run_id)
+
+    def _attach_daemon_log(self, run_id: str) -> Optional[LogCapture]:
+        daemon = self._daemon_status
+        if daemon is None or run_id not in {r.get("run_id") for r in daemon.get("running", [])}:
+            return None
+        log_file_path = get_run_log_file_path(run_id)
+        if not os.path.isfile(log_file_path):
+            return None
+        capture = LogCapture(run_id, log_file_path)
+        capture.poll()
+        with self._live_logs_lock:
+            self._live_logs[run_id] = capture
+        threading.Thread(target=self._daemon_log_follow_thread, args=(capture,), daemon=True).start()
+        return capture
+
+    def live_log_snapshot(self, run_id: str) -> tuple[str, list[list]] | None:
+        """(text, style runs) captured so far for a run that is still going, else None."""
+        with self._live_logs_lock:
+            capture = self._live_logs.get(run_id)
+        if capture is None:
+            capture = self._attach_daemon_log(run_id)
+        return capture.snapshot() if capture is not None else None
+
+    def _notify_schedule_event(
+        self,
+        event_type: str,
+        schedule: dict,
+        script_name: Optional[str] = None,
+        error_message: Optional[str] = None,
+    ) -> None:
+        if not load_scheduler_notification_enabled():
             return
-
-        row = self._get_row(script_path)
-
-        if row and self._is_row_running(row):
-            history_id = row.get("scheduler_history_id")
-            if history_id:
-                if load_scheduler_notification_enabled():
-                    schedule_row, history = self._get_schedule_and_history_for_id(history_id)
-                    if schedule_row:
-                        payload = self._build_notification_payload(schedule_row)
-                        show_notification(
-                            event_type="finished_killed",
-                            schedule_name=payload["schedule_name"],
-                            script_name=payload["script_name"],
-                            rule_type=payload["rule_type"],
-                            next_run=payload["next_run"],
-                            palette=self._palette,
-                        )
-                update_history_entry(history_id, {
-                    "status": "killed",
-                    "finished_at": now_iso(),
-                })
-                row["scheduler_history_id"] = None
-            kill_script_process(row.get("process"), kill_pids=row.get("kill_pids"))
-            try:
-                proc = row.get("process")
-                if proc:
-                    proc.wait(timeout=3)
-            except Exception:
-                pass
-            row["process"] = None
-            row["kill_pids"] = None
-            row["start_time"] = None
-            row["peak_rss"] = 0.0
-            row["cpu_primed_pids"] = None
-
-        entry = create_history_entry(
-            schedule_id=schedule["id"],
-            schedule_name=schedule["name"],
-            script_path=script_path,
-            triggered_at=triggered_at,
-            started_at=now_iso(),
-            status="started",
+        payload = self._build_notification_payload(schedule, script_name=script_name, error_message=error_message)
+        show_notification(
+            event_type=event_type,
+            schedule_name=payload["schedule_name"],
+            script_name=payload["script_name"],
+            rule_type=payload["rule_type"],
+            next_run=payload["next_run"],
+            palette=self._palette,
+            error_message=payload["error_message"],
         )
-        append_history_entry(entry)
-        append_log(entry["id"], "")
-
-        try:
-            category = self._get_category_for_script(script_path)
-            log_file_path = get_run_log_file_path(entry["id"])
-            proc = run_script_in_gitbash_captured(
-                script_path,
-                category,
-                self.project_path,
-                terminal_path=self.terminal_path,
-                venv_activate_path=self.venv_activate_path,
-                log_file_path=log_file_path,
-            )
-
-            poller = threading.Thread(
-                target=self._log_file_poll_thread,
-                args=(proc, entry["id"], log_file_path),
-                daemon=True,
-            )
-            poller.start()
-
-            if row:
-                row["process"] = proc
-                row["kill_pids"] = None
-                row["start_time"] = time.monotonic()
-                row["peak_rss"] = 0.0
-                row["cpu_primed_pids"] = set()
-                delay_ms = int(utils.TREE_CAPTURE_DELAY_SEC * 1000)
-                QTimer.singleShot(delay_ms, lambda r=row: self._capture_kill_pids(r))
-
-            if row:
-                row["scheduler_history_id"] = entry["id"]
-
-            self._mark_schedule_triggered(schedule)
-
-            if script_path == self._selected_script_path:
-                self._render_detail_panel()
-            if load_scheduler_notification_enabled():
-                payload = self._build_notification_payload(schedule)
-                show_notification(
-                    event_type="start",
-                    schedule_name=payload["schedule_name"],
-                    script_name=payload["script_name"],
-                    rule_type=payload["rule_type"],
-                    next_run=payload["next_run"],
-                    palette=self._palette,
-                )
-        except Exception as exc:
-            update_history_entry(entry["id"], {
-                "status": "failed",
-                "started_at": None,
-                "error_message": str(exc),
-            })
-            self._mark_schedule_triggered(schedule)
-            if load_scheduler_notification_enabled():
-                payload = self._build_notification_payload(schedule, error_message=str(exc))
-                show_notification(
-                    event_type="error",
-                    schedule_name=payload["schedule_name"],
-                    script_name=payload["script_name"],
-                    rule_type=payload["rule_type"],
-                    next_run=payload["next_run"],
-                    palette=self._palette,
-                    error_message=payload["error_message"],
-                )
-
-    def _mark_schedule_triggered(self, schedule: dict) -> None:
-        schedule["last_triggered_at"] = now_iso()
-        if schedule["rule_type"] == "interval":
-            schedule["interval_base_at"] = now_iso()
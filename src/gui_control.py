@@ -0,0 +1,128 @@
+"""
+Control API backend for the GUI. The server runs on its own thread; every backend call is handed
+to the GUI thread through a queued signal, so API clients never block the window and the window's
+state is only touched from its own thread.
+"""
+import asyncio
+import concurrent.futures
+import os
+
+from PySide6.QtCore import QObject, Signal
+
+from control_server import ControlBackend, ControlError
+from metrics import collect_metrics
+
+
+class _Invoker(QObject):
+    """Lives on the GUI thread; runs (fn, args, future) jobs emitted from other threads."""
+
+    invoke = Signal(object)
+
+    def __init__(self, parent: QObject):
+        super().__init__(parent)
+        self.invoke.connect(self._run)
+
+    @staticmethod
+    def _run(job) -> None:
+        fn, args, future = job
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+
+class GuiControlBackend(ControlBackend):
+    mode = "gui"
+
+    def __init__(self, main_window):
+        self._main = main_window
+        self._invoker = _Invoker(main_window)
+
+    @property
+    def project_path(self) -> str | None:
+        return self._main.project_path
+
+    async def call(self, fn, *args):
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._invoker.invoke.emit((fn, args, future))
+        return await asyncio.wrap_future(future)
+
+    def _row(self, path: str) -> dict:
+        row = self._main._get_row(os.path.abspath(path))
+        if row is None:
+            raise ControlError(f"No script {path!r} in the current project.")
+        return row
+
+    def list_scripts(self) -> list[dict]:
+        main = self._main
+        return [
+            {
+                "path": row["script"]["path"],
+                "name": row["script"]["name"],
+                "category": main._get_category_for_script(row["script"]["path"]),
+                "running": main._is_row_running(row),
+            }
+            for row in main.script_rows
+        ]
+
+    def run_script(self, path: str) -> str:
+        row = self._row(path)
+        if self._main._is_row_running(row):
+            raise ControlError(f"{row['script']['name']} is already running.")
+        if self._main._is_row_waiting(row):
+            raise ControlError(f"{row['script']['name']} is already waiting for resources.")
+        try:
+            return self._main._runner.request_run(row["script"]["path"])
+        except Exception as exc:
+            raise ControlError(str(exc))
+
+    def kill_script(self, path: str) -> bool:
+        row = self._row(path)
+        if not self._main._is_row_running(row) and not self._main._is_row_waiting(row):
+            return False
+        self._main._kill_script_row(row)
+        return True
+
+    def kill_run(self, run_id: str) -> bool:
+        return self._main._kill_run_by_id(run_id)
+
+    def running_runs(self) -> list[dict]:
+        runner = self._main._runner
+        result = []
+        for run_id, meta in runner.runs.items():
+            _row, run = runner.host.live_run(run_id)
+            if run is None or run["process"].poll() is not None:
+                continue
+            proc = run["process"]
+            try:
+                metrics = collect_metrics(
+                    run["kill_pids"] or [proc.pid], run["start_time"], run["peak_rss"], run["cpu_primed_pids"],
+                    run["cgroup"],
+                )
+                run["peak_rss"] = metrics["peak_rss_bytes"]
+            except Exception:
+                metrics = None
+            result.append({
+                "path": meta["script_path"],
+                "run_id": run_id,
+                "schedule_id": meta["schedule_id"] or None,
+                "pid": proc.pid,
+                "started_at": meta["started_at"],
+                "metrics": metrics,
+            })
+        return result
+
+    def log_snapshot(self, run_id: str) -> tuple[str, list[list]] | None:
+        return self._main.live_log_snapshot(run_id)
+
+    def run_pipeline(self, pipeline_id: str) -> str:
+        try:
+            return self._main.start_pipeline(pipeline_id).id
+        except LookupError as exc:
+            raise ControlError(str(exc))
+
+    def schedules_changed(self) -> None:
+        if self._main._scheduler_widget is not None:
+            self._main._scheduler_widget.refresh_current_view()
@@ -0,0 +1,98 @@
+"""
+SchedulerRunner host for the GUI. Runs live in their script's sidebar row (row["runs"]), where the
+detail panel, the metrics and the kill buttons find them; a script under the project that is not
+in the sidebar gets a row of its own that is never shown. Everything runs on the GUI thread.
+"""
+import os
+import threading
+import time
+
+from PySide6.QtCore import QTimer
+
+from cgroups import probe_scope, scope_argv
+from config import load_cgroup_settings, load_scheduler_notification_enabled
+from scheduler_runner import RunnerHost
+from scheduler_storage import get_run_exit_file_path, get_run_log_file_path
+from utils import TREE_CAPTURE_DELAY_SEC, kill_script_process, run_script_in_gitbash_captured
+
+NOTIFICATION_FOR_STATUS = {"killed": "finished_killed", "timed_out": "finished_killed", "failed": "finished_failed"}
+
+
+class GuiRunnerHost(RunnerHost):
+    def __init__(self, main_window):
+        self._main = main_window
+        self._live: dict[str, tuple[dict, dict]] = {}  # run id -> (row, run in row["runs"])
+        if load_cgroup_settings()["enabled"]:
+            probe_scope()  # launch() does not wait for the probe
+
+    @property
+    def project_path(self) -> str | None:
+        return self._main.project_path
+
+    def live_run(self, run_id: str) -> tuple[dict | None, dict | None]:
+        """(row, run) of a live run, or (None, None)."""
+        return self._live.get(run_id, (None, None))
+
+    def launch(self, run_id: str, run: dict) -> None:
+        main = self._main
+        script_path = run["script_path"]
+        row = main._get_row(script_path) or main._new_script_row({"path": script_path, "name": os.path.basename(script_path)})
+        log_file_path = get_run_log_file_path(run_id)
+        proc = run_script_in_gitbash_captured(
+            script_path,
+            main._get_category_for_script(script_path),
+            self.project_path,
+            log_file_path=log_file_path,
+            terminal_path=main.terminal_path,
+            venv_activate_path=main.venv_activate_path,
+            scope_argv=scope_argv(run_id, load_cgroup_settings(), wait=False),
+            exit_file_path=get_run_exit_file_path(run_id),
+        )
+        threading.Thread(target=main._log_file_poll_thread, args=(proc, run_id, log_file_path), daemon=True).start()
+        live = {
+            "process": proc,
+            "kill_pids": None,
+            "cgroup": None,
+            "start_time": time.monotonic(),
+            "peak_rss": 0.0,
+            "cpu_primed_pids": set(),
+            "history_id": run_id,
+            "schedule_name": run["schedule_name"],
+            "started_at": run["started_at"],
+        }
+        row["runs"].append(live)
+        self._live[run_id] = (row, live)
+        QTimer.singleShot(int(TREE_CAPTURE_DELAY_SEC * 1000), lambda: main._capture_kill_pids(live))
+
+    def alive(self, run_id: str) -> bool:
+        _row, live = self.live_run(run_id)
+        return live is not None and live["process"].poll() is None
+
+    def pids(self, run_id: str) -> list[int]:
+        _row, live = self._live[run_id]
+        return live["kill_pids"] or [live["process"].pid]
+
+    def kill_process(self, run_id: str) -> None:
+        _row, live = self._live[run_id]
+        kill_script_process(live["process"], kill_pids=self.pids(run_id), cgroup=live["cgroup"])
+
+    def run_ended(self, run_id: str, run: dict, fields: dict) -> None:
+        row, live = self._live.pop(run_id)
+        row["runs"].remove(live)
+        if not run["schedule_id"] or not load_scheduler_notification_enabled():
+            return
+        schedule, _history = self._main._get_schedule_and_history_for_id(run_id)
+        if schedule:
+            event_type = NOTIFICATION_FOR_STATUS.get(fields["status"], "finished_exited")
+            error_message = fields.get("error_message") if event_type == "finished_failed" else None
+            self._main._notify_schedule_event(event_type, schedule, error_message=error_message)
+
+    def script_changed(self, script_path: str) -> None:
+        if script_path == self._main._selected_script_path:
+            self._main._render_detail_panel()
+        self._main._refresh_sidebar_dots([script_path])
+
+    def schedule_event(
+        self, event_type: str, schedule: dict, script_name: str | None = None, error_message: str | None = None,
+    ) -> None:
+        self._main._notify_schedule_event(event_type, schedule, script_name=script_name, error_message=error_message)
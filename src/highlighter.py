@@ -1,8 +1,45 @@
 """
 Shell/bash syntax highlighter for script viewer and run log viewer.
+Each line is tokenized in a single pass with one alternation regex. Constructs that span lines
+(unterminated quoted strings, heredoc bodies, open $((...)) / ((...)) arithmetic) are carried in the
+block state, so Qt only rehighlights the blocks that follow an edit or append while their incoming state
+changes.
 """
+import re
+
 from PySide6.QtGui import QColor, QFont, QSyntaxHighlighter, QTextCharFormat
-from PySide6.QtCore import QRegularExpression
+
+KEYWORDS = (
+    "if", "then", "else", "elif", "fi", "for", "while", "do", "done", "case", "esac", "in",
+    "function", "return", "exit", "export", "local", "declare", "readonly", "shift",
+    "source", "echo", "printf", "cd", "mkdir", "rm", "cp", "mv", "chmod", "chown", "grep",
+    "sed", "awk", "cat", "ls", "pwd", "set", "unset", "true", "false", "test", "exec",
+)
+
+# Alternatives are tried left to right at each position, so earlier kinds win overlaps.
+# A "#" only starts a comment at the beginning of a word ($#, ${#x} and foo#bar are not comments).
+# Parentheses are only counted inside arithmetic, where "<<" is a shift and never starts a heredoc.
+TOKEN_RE = re.compile(
+    r"(?P<comment>(?<![^\s;|&()])#.*)"
+    r'|(?P<dq>"(?:[^"\\]|\\.?)*(?P<dq_end>"?))'
+    r"|(?P<sq>'[^']*(?P<sq_end>'?))"
+    r"|(?P<heredoc><<(?P<hd_dash>-?)\s*(?P<hd_quote>['\"]?)(?P<hd_delim>[A-Za-z_][A-Za-z0-9_]*)(?P=hd_quote))"
+    r"|(?P<var>\$\{[^}]*\}?|\$[A-Za-z_][A-Za-z0-9_]*|\$[0-9@#*?$!-])"
+    r"|(?P<keyword>\b(?:" + "|".join(KEYWORDS) + r")\b)"
+    r"|(?P<number>\b[0-9]+\b)"
+    r"|(?P<paren_open>\$?\(\(|\()"
+    r"|(?P<paren_close>\))"
+)
+VAR_RE = re.compile(r"\$\{[^}]*\}?|\$[A-Za-z_][A-Za-z0-9_]*|\$[0-9@#*?$!-]")
+DQ_REST_RE = re.compile(r'(?:[^"\\]|\\.?)*"')
+SQ_REST_RE = re.compile(r"[^']*'")
+
+STATE_NORMAL = 0
+STATE_DOUBLE_QUOTED = 1
+STATE_SINGLE_QUOTED = 2
+STATE_ARITHMETIC_BASE = 2  # + open parentheses inside $((...)) / ((...)), up to MAX_ARITHMETIC_DEPTH
+MAX_ARITHMETIC_DEPTH = 13
+STATE_HEREDOC_BASE = 16  # + index into ShellHighlighter._heredocs
 
 
 class ShellHighlighter(QSyntaxHighlighter):
@@ -10,8 +47,10 @@ class ShellHighlighter(QSyntaxHighlighter):
 
     def __init__(self, parent, palette: dict):
         super().__init__(parent)
-        self._rules: list[tuple[QRegularExpression, QTextCharFormat]] = []
-        self._build_rules(palette)
+        self._formats: dict[str, QTextCharFormat] = {}
+        self._heredocs: list[tuple[str, bool]] = []  # (delimiter, strip leading tabs)
+        self._heredoc_ids: dict[tuple[str, bool], int] = {}
+        self._build_formats(palette)
 
     def _fmt(self, color: str, bold: bool = False) -> QTextCharFormat:
         fmt = QTextCharFormat()
@@ -20,58 +59,89 @@ class ShellHighlighter(QSyntaxHighlighter):
             fmt.setFontWeight(QFont.Weight.Bold)
         return fmt
 
-    def _build_rules(self, palette: dict) -> None:
-        self._rules = []
-
-        # Shebang line (#!...)
-        self._rules.append((
-            QRegularExpression(r"^#!.*$"),
-            self._fmt(palette["sh_shebang"], bold=True),
-        ))
-        # Comments (# not shebang)
-        self._rules.append((
-            QRegularExpression(r"(?<!#!)#[^\n]*"),
-            self._fmt(palette["sh_comment"]),
-        ))
-        # Double-quoted strings
-        self._rules.append((
-            QRegularExpression(r'"[^"\\]*(?:\\.[^"\\]*)*"'),
-            self._fmt(palette["sh_string"]),
-        ))
-        # Single-quoted strings
-        self._rules.append((
-            QRegularExpression(r"'[^']*'"),
-            self._fmt(palette["sh_string"]),
-        ))
-        # Variables: $VAR, ${VAR}, $1 etc.
-        self._rules.append((
-            QRegularExpression(r"\$\{?[A-Za-z_][A-Za-z0-9_]*\}?|\$[0-9@#\*\?]"),
-            self._fmt(palette["sh_variable"]),
-        ))
-        # Keywords
-        keywords = (
-            r"\b(if|then|else|elif|fi|for|while|do|done|case|esac|in|"
-            r"function|return|exit|export|local|declare|readonly|shift|"
-            r"source|echo|printf|cd|mkdir|rm|cp|mv|chmod|chown|grep|"
-            r"sed|awk|cat|ls|pwd|set|unset|true|false|test|exec)\b"
-        )
-        self._rules.append((
-            QRegularExpression(keywords),
-            self._fmt(palette["sh_keyword"], bold=True),
-        ))
-        # Numbers
-        self._rules.append((
-            QRegularExpression(r"\b[0-9]+\b"),
-            self._fmt(palette["sh_number"]),
-        ))
+    def _build_formats(self, palette: dict) -> None:
+        self._formats = {
+            "shebang": self._fmt(palette["sh_shebang"], bold=True),
+            "comment": self._fmt(palette["sh_comment"]),
+            "string": self._fmt(palette["sh_string"]),
+            "var": self._fmt(palette["sh_variable"]),
+            "keyword": self._fmt(palette["sh_keyword"], bold=True),
+            "number": self._fmt(palette["sh_number"]),
+        }
 
     def update_palette(self, palette: dict) -> None:
-        self._build_rules(palette)
+        self._build_formats(palette)
         self.rehighlight()
 
+    def _heredoc_state(self, delimiter: str, strip_tabs: bool) -> int:
+        key = (delimiter, strip_tabs)
+        idx = self._heredoc_ids.get(key)
+        if idx is None:
+            idx = self._heredoc_ids[key] = len(self._heredocs)
+            self._heredocs.append(key)
+        return STATE_HEREDOC_BASE + idx
+
+    def _format_string(self, text: str, start: int, end: int, expand_vars: bool) -> None:
+        self.setFormat(start, end - start, self._formats["string"])
+        if expand_vars:
+            var_fmt = self._formats["var"]
+            for m in VAR_RE.finditer(text, start, end):
+                self.setFormat(m.start(), m.end() - m.start(), var_fmt)
+
     def highlightBlock(self, text: str) -> None:
-        for pattern, fmt in self._rules:
-            it = pattern.globalMatch(text)
-            while it.hasNext():
-                match = it.next()
-                self.setFormat(match.capturedStart(), match.capturedLength(), fmt)
+        state = self.previousBlockState()
+        pos = 0
+        depth = 0
+
+        if state >= STATE_HEREDOC_BASE:
+            delimiter, strip_tabs = self._heredocs[state - STATE_HEREDOC_BASE]
+            self.setFormat(0, len(text), self._formats["string"])
+            line = text.lstrip("\t") if strip_tabs else text
+            self.setCurrentBlockState(STATE_NORMAL if line == delimiter else state)
+            return
+        if state in (STATE_DOUBLE_QUOTED, STATE_SINGLE_QUOTED):
+            double = state == STATE_DOUBLE_QUOTED
+            m = (DQ_REST_RE if double else SQ_REST_RE).match(text)
+            if m is None:
+                self._format_string(text, 0, len(text), double)
+                self.setCurrentBlockState(state)
+                return
+            pos = m.end()
+            self._format_string(text, 0, pos, double)
+        elif STATE_ARITHMETIC_BASE < state < STATE_HEREDOC_BASE:
+            depth = state - STATE_ARITHMETIC_BASE
+        elif text.startswith("#!") and self.currentBlock().blockNumber() == 0:
+            self.setFormat(0, len(text), self._formats["shebang"])
+            self.setCurrentBlockState(STATE_NORMAL)
+            return
+
+        next_state = STATE_NORMAL
+        formats = self._formats
+        for m in TOKEN_RE.finditer(text, pos):
+            kind = m.lastgroup
+            start, end = m.span()
+            if kind == "dq":
+                self._format_string(text, start, end, True)
+                if not m.group("dq_end"):
+                    next_state = STATE_DOUBLE_QUOTED
+            elif kind == "sq":
+                self._format_string(text, start, end, False)
+                if not m.group("sq_end"):
+                    next_state = STATE_SINGLE_QUOTED
+            elif kind == "paren_open":
+                if depth or end - start > 1:
+                    depth += end - start - (text[start] == "$")
+            elif kind == "paren_close":
+                if depth:
+                    depth -= 1
+            elif kind == "heredoc":
+                if depth:
+                    continue
+                self.setFormat(start, end - start, formats["string"])
+                if next_state == STATE_NORMAL:
+                    next_state = self._heredoc_state(m.group("hd_delim"), bool(m.group("hd_dash")))
+            else:
+                self.setFormat(start, end - start, formats[kind])
+        if next_state == STATE_NORMAL and depth:
+            next_state = STATE_ARITHMETIC_BASE + min(depth, MAX_ARITHMETIC_DEPTH)
+        self.setCurrentBlockState(next_state)
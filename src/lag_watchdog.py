@@ -0,0 +1,116 @@
+"""
+Stall watchdog for the main thread. The watched loop (the Qt event loop or the daemon's asyncio
+loop) calls beat() every HEARTBEAT_INTERVAL; a background thread checks the time since the last
+beat and, while it exceeds the threshold, samples the main thread's Python stack with
+sys._current_frames(). When the loop beats again the stall is written to a rotating diagnostics
+log with its duration and the stack seen most often, so slow paths show up without a profiler.
+Stalls that last longer than LONG_STALL are also logged while they are still going.
+Pure logic module with no UI dependencies.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from logging.handlers import RotatingFileHandler
+
+import perf
+
+HEARTBEAT_INTERVAL = 0.1    # seconds between beats of the watched loop
+CHECK_INTERVAL = 0.05       # seconds between watchdog checks (and stack samples during a stall)
+STALL_THRESHOLD = 0.5       # seconds without a beat, on top of HEARTBEAT_INTERVAL, before it is a stall
+LONG_STALL = 10.0           # seconds after which an unfinished stall is logged anyway
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+STACK_LIMIT = 40            # innermost frames kept per sample
+
+_LOGGER_NAME = "shscripthub.stalls"
+
+
+def _open_log(path: str) -> logging.Logger:
+    logger = logging.getLogger(f"{_LOGGER_NAME}.{path}")
+    logger.propagate = False
+    logger.setLevel(logging.WARNING)
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+    return logger
+
+
+class LagWatchdog:
+    """Watches the thread that creates it; that thread's loop must call beat()."""
+
+    def __init__(self, log_path: str, threshold: float = STALL_THRESHOLD):
+        self.log_path = log_path
+        self.threshold = threshold
+        self._target = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._logger: logging.Logger | None = None
+        self.stalls = 0
+
+    def beat(self) -> None:
+        self._last_beat = time.monotonic()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._logger = _open_log(self.log_path)
+        self.beat()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="lag-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=1)
+        self._thread = None
+
+    def _sample(self) -> tuple | None:
+        frame = sys._current_frames().get(self._target)
+        if frame is None:
+            return None
+        return tuple(traceback.format_stack(frame, limit=STACK_LIMIT))
+
+    def _watch(self) -> None:
+        limit = HEARTBEAT_INTERVAL + self.threshold
+        while not self._stop.wait(CHECK_INTERVAL):
+            beat = self._last_beat
+            if time.monotonic() - beat < limit:
+                continue
+            samples: Counter = Counter()
+            reported_long = False
+            while self._last_beat == beat and not self._stop.is_set():
+                stack = self._sample()
+                if stack is not None:
+                    samples[stack] += 1
+                if not reported_long and time.monotonic() - beat >= LONG_STALL:
+                    reported_long = True
+                    self._report(time.monotonic() - beat, samples, ongoing=True)
+                self._stop.wait(CHECK_INTERVAL)
+            if self._stop.is_set():
+                return
+            self._report(self._last_beat - beat - HEARTBEAT_INTERVAL, samples, ongoing=False)
+
+    def _report(self, duration: float, samples: Counter, ongoing: bool) -> None:
+        if not ongoing:
+            self.stalls += 1
+            if perf.enabled():
+                perf.record("event_loop.stall", time.perf_counter() - duration, duration)
+        total = sum(samples.values())
+        lines = [
+            f"Main loop {'still blocked after' if ongoing else 'blocked for'} {duration * 1000:.0f} ms"
+            f" ({total} stack sample{'s' if total != 1 else ''})"
+        ]
+        if samples:
+            stack, count = samples.most_common(1)[0]
+            lines.append(f"Most frequent stack ({count}/{total}):")
+            lines.append("".join(stack).rstrip())
+        self._logger.warning("\n".join(lines))
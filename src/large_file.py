@@ -0,0 +1,83 @@
+"""
+Random access by line number into large text files, for the windowed script viewer.
+The file is memory-mapped only while it is being scanned or read (no handle is kept open, so
+editors can still replace or truncate it). One scan counts newlines per CHECKPOINT_BYTES chunk;
+locating a line then costs a bisect plus a scan of a single chunk.
+Pure logic module with no UI dependencies.
+"""
+import bisect
+import mmap
+import os
+from contextlib import contextmanager
+
+LARGE_FILE_BYTES = 256 * 1024           # above this the viewer loads a window of lines only
+HIGHLIGHT_MAX_BYTES = 16 * 1024 * 1024  # above this syntax highlighting is turned off
+CHECKPOINT_BYTES = 64 * 1024
+
+
+class LargeFileReader:
+    """Line-indexed reader for one file snapshot. Raises OSError if the file cannot be read."""
+
+    def __init__(self, path: str):
+        self.path = path
+        st = os.stat(path)
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        self._newlines_before: list[int] = []  # chunk index -> newlines in all earlier chunks
+        total = 0
+        last_byte = b""
+        with self._mapped() as mm:
+            for start in range(0, self.size, CHECKPOINT_BYTES):
+                self._newlines_before.append(total)
+                total += mm[start:start + CHECKPOINT_BYTES].count(b"\n")
+            if self.size:
+                last_byte = mm[self.size - 1:self.size]
+        self._newline_count = total
+        self.line_count = total + (1 if self.size and last_byte != b"\n" else 0)
+
+    @contextmanager
+    def _mapped(self):
+        """
+        The file mapped read-only. b"" when it is empty or was truncated since the scan, since the
+        line offsets no longer apply; the viewer reloads it on the watcher's modified event.
+        """
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size and size >= self.size else None
+            except ValueError:
+                mm = None  # truncated to empty between the fstat and the map
+            if mm is None:
+                yield b""
+                return
+            try:
+                yield mm
+            finally:
+                mm.close()
+
+    def _line_offset(self, mm, line: int) -> int:
+        """Byte offset where 0-based line starts (size if past the end)."""
+        if line <= 0:
+            return 0
+        if line > self._newline_count:
+            return self.size
+        # Chunk holding the line-th newline, then walk newlines inside it.
+        chunk = bisect.bisect_left(self._newlines_before, line) - 1
+        pos = chunk * CHECKPOINT_BYTES - 1
+        for _ in range(line - self._newlines_before[chunk]):
+            pos = mm.find(b"\n", pos + 1)
+        return pos + 1
+
+    def read_lines(self, start: int, count: int) -> str:
+        """Decoded text of lines [start, start + count), without the trailing newline."""
+        start = max(0, min(start, self.line_count))
+        end = min(self.line_count, start + max(0, count))
+        with self._mapped() as mm:
+            if not self.size:
+                return ""
+            begin = self._line_offset(mm, start)
+            stop = self._line_offset(mm, end)
+            data = mm[begin:stop]
+        text = data.decode("utf-8", errors="replace")
+        text = text.replace("\r\n", "\n")
+        return text[:-1] if text.endswith("\n") else text
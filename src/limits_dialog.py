@@ -0,0 +1,159 @@
+"""
+Resource limits dialog: the admission limits over which runs wait to start (see admission.py),
+the selected script's memory limit and, on Linux, the per-run cgroup limits (see cgroups.py).
+Values are saved to config when the dialog is accepted.
+"""
+import os
+import platform
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QDialog,
+    QDoubleSpinBox,
+    QFormLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QSpinBox,
+    QVBoxLayout,
+)
+
+from cgroups import scope_available
+from config import (
+    load_admission_limits,
+    load_cgroup_settings,
+    load_script_memory_limits,
+    save_admission_limits,
+    save_cgroup_settings,
+    save_script_memory_limit,
+)
+
+MAX_LIMIT_MB = 1024 * 1024
+MAX_CPU_WEIGHT = 10000
+MAX_CPU_QUOTA_PERCENT = 100 * 1024
+MAX_PIDS = 4194304
+OFF_TEXT = "Off"
+SCOPE_POLL_MS = 200
+
+
+def _mb_spin(value: int) -> QSpinBox:
+    spin = QSpinBox()
+    spin.setRange(0, MAX_LIMIT_MB)
+    spin.setSingleStep(256)
+    spin.setSuffix(" MB")
+    spin.setSpecialValueText(OFF_TEXT)
+    spin.setValue(int(value))
+    return spin
+
+
+class LimitsDialog(QDialog):
+    def __init__(self, script_path: str | None = None, parent=None):
+        super().__init__(parent)
+        self.setObjectName("limitsDialog")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.setWindowTitle("Resource limits")
+        self._script_path = script_path
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(16, 12, 16, 12)
+        layout.setSpacing(8)
+
+        layout.addWidget(QLabel("Runs wait to start while any of these is exceeded:"))
+        limits = load_admission_limits()
+        form = QFormLayout()
+        self._load_spin = QDoubleSpinBox()
+        self._load_spin.setRange(0, 64)
+        self._load_spin.setSingleStep(0.25)
+        self._load_spin.setDecimals(2)
+        self._load_spin.setSpecialValueText(OFF_TEXT)
+        self._load_spin.setValue(limits["max_load_per_cpu"])
+        form.addRow("Load average per CPU above", self._load_spin)
+        self._free_spin = _mb_spin(limits["min_free_mb"])
+        form.addRow("Free memory below", self._free_spin)
+        self._rss_spin = _mb_spin(limits["max_running_rss_mb"])
+        form.addRow("Memory used by running scripts above", self._rss_spin)
+        layout.addLayout(form)
+
+        self._memory_spin = None
+        if script_path:
+            layout.addWidget(QLabel(f"Kill a run of {os.path.basename(script_path)} that uses more than:"))
+            self._memory_spin = _mb_spin(load_script_memory_limits().get(script_path, 0))
+            layout.addWidget(self._memory_spin)
+
+        self._cgroup_check = None
+        if platform.system() == "Linux":
+            self._add_cgroup_section(layout)
+
+        btn_row = QHBoxLayout()
+        btn_row.addStretch()
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        btn_row.addWidget(cancel_btn)
+        save_btn = QPushButton("Save")
+        save_btn.setObjectName("runBtn")
+        save_btn.clicked.connect(self.accept)
+        btn_row.addWidget(save_btn)
+        layout.addLayout(btn_row)
+
+    def _update_cgroup_note(self) -> None:
+        available = scope_available(wait=False)
+        if available is None:
+            self._cgroup_note.setText("Checking whether this is available here…")
+            QTimer.singleShot(SCOPE_POLL_MS, self, self._update_cgroup_note)
+        elif available:
+            self._cgroup_note.hide()
+        else:
+            self._cgroup_note.setText("Not available here: needs cgroup v2 and a systemd user session. Runs start normally.")
+
+    def _add_cgroup_section(self, layout: QVBoxLayout) -> None:
+        settings = load_cgroup_settings()
+        self._cgroup_check = QCheckBox("Run each script in its own cgroup (systemd user scope)")
+        self._cgroup_check.setChecked(settings["enabled"])
+        layout.addWidget(self._cgroup_check)
+        self._cgroup_note = QLabel()
+        self._cgroup_note.setWordWrap(True)
+        layout.addWidget(self._cgroup_note)
+        self._update_cgroup_note()
+        form = QFormLayout()
+        self._cpu_weight_spin = QSpinBox()
+        self._cpu_weight_spin.setRange(0, MAX_CPU_WEIGHT)
+        self._cpu_weight_spin.setSpecialValueText(OFF_TEXT)
+        self._cpu_weight_spin.setValue(settings["cpu_weight"])
+        self._cpu_weight_spin.setToolTip("Share of CPU under contention; the default weight is 100.")
+        form.addRow("CPU weight", self._cpu_weight_spin)
+        self._cpu_quota_spin = QSpinBox()
+        self._cpu_quota_spin.setRange(0, MAX_CPU_QUOTA_PERCENT)
+        self._cpu_quota_spin.setSingleStep(50)
+        self._cpu_quota_spin.setSuffix(" %")
+        self._cpu_quota_spin.setSpecialValueText(OFF_TEXT)
+        self._cpu_quota_spin.setValue(settings["cpu_quota_percent"])
+        self._cpu_quota_spin.setToolTip("100% is one full CPU.")
+        form.addRow("CPU quota", self._cpu_quota_spin)
+        self._memory_max_spin = _mb_spin(settings["memory_max_mb"])
+        form.addRow("Memory max", self._memory_max_spin)
+        self._pids_max_spin = QSpinBox()
+        self._pids_max_spin.setRange(0, MAX_PIDS)
+        self._pids_max_spin.setSingleStep(64)
+        self._pids_max_spin.setSpecialValueText(OFF_TEXT)
+        self._pids_max_spin.setValue(settings["pids_max"])
+        form.addRow("Processes and threads max", self._pids_max_spin)
+        layout.addLayout(form)
+
+    def accept(self) -> None:
+        save_admission_limits({
+            "max_load_per_cpu": self._load_spin.value(),
+            "min_free_mb": self._free_spin.value(),
+            "max_running_rss_mb": self._rss_spin.value(),
+        })
+        if self._memory_spin is not None:
+            save_script_memory_limit(self._script_path, self._memory_spin.value())
+        if self._cgroup_check is not None:
+            save_cgroup_settings({
+                "enabled": self._cgroup_check.isChecked(),
+                "cpu_weight": self._cpu_weight_spin.value(),
+                "cpu_quota_percent": self._cpu_quota_spin.value(),
+                "memory_max_mb": self._memory_max_spin.value(),
+                "pids_max": self._pids_max_spin.value(),
+            })
+        super().accept()
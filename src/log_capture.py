@@ -0,0 +1,67 @@
+"""
+Incremental capture of a run's output file (Scheduler/logs/<run_id>.log, written by tee).
+Each poll reads only the bytes appended since the previous one, decodes them (UTF-8, split
+multi-byte characters are carried over), strips ANSI escapes into style runs and returns the new
+chunk. The accumulated log is written to history_logs.json by save(), once the run has ended;
+until then readers in other processes get it from the capture file (scheduler_storage.load_log).
+Used by the GUI capture threads and by the headless daemon.
+Pure logic module with no UI dependencies.
+"""
+import codecs
+import os
+import threading
+
+from ansi import AnsiParser, StyledText
+from scheduler_storage import replace_log
+
+LOG_POLL_INTERVAL = 0.05  # seconds between reads of a run's capture file
+
+
+class LogCapture:
+    """
+    Tails one capture file. poll() and save() belong to a single capture thread or task;
+    snapshot() may be called from any thread.
+    """
+
+    def __init__(self, run_id: str, log_file_path: str):
+        self.run_id = run_id
+        self.log_file_path = log_file_path
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._parser = AnsiParser()
+        self._styled = StyledText()
+        self._lock = threading.Lock()
+        self._offset = 0
+
+    def poll(self, final: bool = False) -> tuple[int, str, list[list]] | None:
+        """Reads new output. Returns (offset in log, text, style runs relative to text), or None."""
+        try:
+            with open(self.log_file_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except OSError:
+            return None
+        self._offset += len(data)
+        runs = self._parser.feed(self._decoder.decode(data, final=final))
+        if not runs:
+            return None
+        chunk = StyledText()
+        chunk.add(runs)
+        with self._lock:
+            start = self._styled.length
+            self._styled.add(runs)
+        return start, chunk.text, chunk.runs
+
+    def snapshot(self) -> tuple[str, list[list]]:
+        """(text, style runs) captured so far."""
+        with self._lock:
+            return self._styled.text, [run[:] for run in self._styled.runs]
+
+    def save(self) -> None:
+        text, runs = self.snapshot()
+        replace_log(self.run_id, text, runs)
+
+    def remove_file(self) -> None:
+        try:
+            os.remove(self.log_file_path)
+        except OSError:
+            pass
@@ -0,0 +1,251 @@
+"""
+Read-only run log viewer.
+Logs are shown as plain text. If the captured output had ANSI colors, the stored style runs
+(see ansi.py) are applied by a syntax highlighter, one block at a time, instead of building an
+HTML document. Logs without style runs get the regular shell highlighting.
+In follow mode the viewer tails a running script: chunks from the capture thread are buffered
+and appended as whole lines (appendPlainText) at most every FOLLOW_FLUSH_MS, the document is
+capped at MAX_LOG_BLOCKS lines, and auto-scroll stops while the user is scrolled up.
+"""
+import bisect
+import re
+
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QColor, QFont, QTextCharFormat
+from PySide6.QtWidgets import QPlainTextEdit
+
+from ansi import FLAG_BOLD, FLAG_DIM, FLAG_INVERSE, FLAG_ITALIC, FLAG_UNDERLINE, color_hex
+from highlighter import ShellHighlighter
+
+DIM_ALPHA = 0.6
+MAX_LOG_BLOCKS = 100_000   # older lines are dropped from the viewer (not from the stored log)
+FOLLOW_FLUSH_MS = 50
+_ASTRAL_RE = re.compile("[\U00010000-\U0010ffff]")
+
+
+def _split_runs(text: str, runs: list[list], base: int, first_line: int) -> dict[int, list[tuple]]:
+    """
+    Maps style runs (absolute [start, length, fg, bg, flags], text starting at offset base) to
+    {line number: [(column, length, style)]}, line numbers counted from first_line.
+    """
+    if not runs:
+        return {}
+    line_starts = [0]
+    line_starts.extend(m.end() for m in re.finditer("\n", text))
+    line_runs: dict[int, list[tuple]] = {}
+    for start, length, *style in runs:
+        pos, end = max(start - base, 0), min(start + length - base, len(text))
+        line = bisect.bisect_right(line_starts, pos) - 1
+        while pos < end:
+            line_start = line_starts[line]
+            line_end = line_starts[line + 1] - 1 if line + 1 < len(line_starts) else len(text)
+            seg_end = min(end, line_end)
+            if seg_end > pos:
+                line_runs.setdefault(first_line + line, []).append((pos - line_start, seg_end - pos, tuple(style)))
+            pos = line_end + 1
+            line += 1
+    return line_runs
+
+
+class LogHighlighter(ShellHighlighter):
+    """
+    ShellHighlighter that applies ANSI style runs instead, once the log has any.
+    In ANSI mode each block's state holds its absolute line number in the log, so runs still line
+    up after the document drops its first blocks.
+    """
+
+    def __init__(self, parent, palette: dict):
+        super().__init__(parent, palette)
+        self._line_runs: dict[int, list[tuple]] = {}
+        self.ansi = False
+        self.first_line = 0  # log line number of the document's first block
+
+    def _build_formats(self, palette: dict) -> None:
+        super()._build_formats(palette)
+        self._palette = palette
+        self._ansi_formats: dict[tuple, QTextCharFormat] = {}
+
+    def set_line_runs(self, line_runs: dict[int, list[tuple]], first_line: int) -> None:
+        """Replaces all runs; takes effect for blocks highlighted afterwards."""
+        self._line_runs = line_runs
+        self.ansi = bool(line_runs)
+        self.first_line = first_line
+
+    def add_line_runs(self, line_runs: dict[int, list[tuple]]) -> bool:
+        """Adds runs for new lines. Returns True if this switched from shell to ANSI highlighting."""
+        self._line_runs.update(line_runs)
+        switched = bool(line_runs) and not self.ansi
+        self.ansi = self.ansi or bool(line_runs)
+        return switched
+
+    def drop_lines_before(self, line: int) -> None:
+        if self._line_runs and min(self._line_runs) < line:
+            self._line_runs = {n: runs for n, runs in self._line_runs.items() if n >= line}
+
+    def _ansi_format(self, style: tuple) -> QTextCharFormat:
+        fmt = self._ansi_formats.get(style)
+        if fmt is not None:
+            return fmt
+        fg, bg, flags = style
+        fg_hex, bg_hex = color_hex(fg), color_hex(bg)
+        if flags & FLAG_INVERSE:
+            fg_hex, bg_hex = bg_hex or self._palette["sh_bg"], fg_hex or self._palette["sh_text"]
+        fmt = QTextCharFormat()
+        if fg_hex or flags & FLAG_DIM:
+            color = QColor(fg_hex or self._palette["sh_text"])
+            if flags & FLAG_DIM:
+                color.setAlphaF(DIM_ALPHA)
+            fmt.setForeground(color)
+        if bg_hex:
+            fmt.setBackground(QColor(bg_hex))
+        if flags & FLAG_BOLD:
+            fmt.setFontWeight(QFont.Weight.Bold)
+        if flags & FLAG_ITALIC:
+            fmt.setFontItalic(True)
+        if flags & FLAG_UNDERLINE:
+            fmt.setFontUnderline(True)
+        self._ansi_formats[style] = fmt
+        return fmt
+
+    def highlightBlock(self, text: str) -> None:
+        if not self.ansi:
+            super().highlightBlock(text)
+            return
+        prev = self.previousBlockState()
+        line = prev + 1 if prev >= 0 else self.first_line
+        self.setCurrentBlockState(line)
+        runs = self._line_runs.get(line)
+        if not runs:
+            return
+        # Qt columns count UTF-16 code units; shift past characters outside the BMP.
+        astral = [m.start() for m in _ASTRAL_RE.finditer(text)]
+        for column, length, style in runs:
+            if astral:
+                before = bisect.bisect_left(astral, column)
+                length += bisect.bisect_left(astral, column + length) - before
+                column += before
+            self.setFormat(column, length, self._ansi_format(style))
+
+
+class LogView(QPlainTextEdit):
+    """Monospace, non-wrapping, read-only log viewer."""
+
+    def __init__(self, palette: dict, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.setMaximumBlockCount(MAX_LOG_BLOCKS)
+        log_font = QFont("Consolas")
+        log_font.setStyleHint(QFont.StyleHint.Monospace)
+        log_font.setPointSize(9)
+        self.setFont(log_font)
+        self._highlighter = LogHighlighter(self.document(), palette)
+
+        self._following = False
+        self._end = 0            # log offset just past the last displayed line
+        self._next_line = 0      # log line number of the next appended line
+        self._pending = ""       # received but not yet displayed (incomplete line or waiting for flush)
+        self._pending_runs: list[list] = []
+        self._auto_scroll = True
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FOLLOW_FLUSH_MS)
+        self._flush_timer.timeout.connect(self._flush)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+
+    @property
+    def following(self) -> bool:
+        return self._following
+
+    def set_log(self, text: str, runs: list[list] | None = None, follow: bool = False) -> None:
+        """
+        Shows text; runs are [start, length, fg, bg, flags] ANSI style runs over it.
+        With follow=True the log is still being written: a trailing incomplete line is held back and
+        later append_log() chunks are displayed.
+        """
+        self._flush_timer.stop()
+        runs = runs or []
+        cut = text.rfind("\n") + 1 if follow else len(text)
+        shown = text[:cut]
+        self._pending = text[cut:]
+        self._pending_runs = [run for run in runs if run[0] + run[1] > cut]
+
+        display = shown[:-1] if shown.endswith("\n") else shown
+        line_count = display.count("\n") + 1 if shown else 0
+        skip = max(0, line_count - MAX_LOG_BLOCKS)
+        start = 0
+        for _ in range(skip):
+            start = display.find("\n", start) + 1
+        display = display[start:]
+        self._highlighter.set_line_runs(_split_runs(display, runs, start, skip), skip)
+        self.setPlainText(display)
+
+        self._end = cut
+        self._next_line = line_count
+        self._following = follow
+        self._auto_scroll = True
+        if follow:
+            self._scroll_to_bottom()
+
+    def append_log(self, offset: int, text: str, runs: list[list]) -> None:
+        """Queues a chunk of a followed log; offset is its position in the log, runs are relative to text."""
+        if not self._following:
+            return
+        received = self._end + len(self._pending)
+        if offset + len(text) <= received or offset > received:
+            return
+        skip = received - offset
+        if skip:
+            text = text[skip:]
+            runs = [[max(s - skip, 0), s + n - max(s, skip), *style] for s, n, *style in runs if s + n > skip]
+        self._pending += text
+        self._pending_runs.extend([s + received, n, *style] for s, n, *style in runs)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def finish(self) -> None:
+        """The followed run ended: show everything received, including an unterminated last line."""
+        if not self._following:
+            return
+        self._flush_timer.stop()
+        self._flush(final=True)
+        self._following = False
+
+    def update_palette(self, palette: dict) -> None:
+        self._highlighter.update_palette(palette)
+
+    def _on_scrolled(self, value: int) -> None:
+        self._auto_scroll = value >= self.verticalScrollBar().maximum()
+
+    def _scroll_to_bottom(self) -> None:
+        bar = self.verticalScrollBar()
+        bar.setValue(bar.maximum())
+
+    def _flush(self, final: bool = False) -> None:
+        text = self._pending
+        cut = len(text) if final else text.rfind("\n") + 1
+        if cut <= 0:
+            return
+        chunk, self._pending = text[:cut], text[cut:]
+        chunk_end = self._end + cut
+        runs = [run for run in self._pending_runs if run[0] < chunk_end]
+        self._pending_runs = [run for run in self._pending_runs if run[0] + run[1] > chunk_end]
+
+        display = chunk[:-1] if chunk.endswith("\n") else chunk
+        line_count = display.count("\n") + 1
+        doc = self.document()
+        blocks_before = 0 if doc.isEmpty() else doc.blockCount()
+        highlighter = self._highlighter
+        switched = highlighter.add_line_runs(_split_runs(display, runs, self._end, self._next_line))
+        # Qt drops blocks from the top after the append and rehighlights the new first block,
+        # so it needs the post-trim first line number already.
+        highlighter.first_line += max(0, blocks_before + line_count - MAX_LOG_BLOCKS)
+        auto_scroll = self._auto_scroll
+        self.appendPlainText(display)
+        highlighter.drop_lines_before(highlighter.first_line)
+        if switched:
+            highlighter.rehighlight()
+        self._end = chunk_end
+        self._next_line += line_count
+        if auto_scroll:
+            self._scroll_to_bottom()
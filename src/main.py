@@ -1,21 +1,28 @@
 import sys
 import os
-from PySide6.QtWidgets import QApplication
-from PySide6.QtGui import QIcon
-from PySide6.QtCore import Qt
-from theme import get_stylesheet
-from config import load_theme
-from gui import ShScriptHubApp
-from utils import get_resource_path
 
 
-def main():
+def run_gui():
+    import startup_profile
+    if "--profile-startup" in sys.argv[1:]:
+        startup_profile.enable()
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QIcon
+    from PySide6.QtCore import Qt
+    from theme import get_stylesheet
+    from config import load_theme
+    from gui import ShScriptHubApp
+    from utils import get_resource_path
+    startup_profile.mark("imports")
+
     app = QApplication(sys.argv)
+    startup_profile.mark("QApplication")
     app.setStyleSheet(get_stylesheet(load_theme()))
     try:
         app.setAttribute(Qt.AA_UseStyleSheetPalette)
     except AttributeError:
         pass
+    startup_profile.mark("stylesheet")
     icon_path = get_resource_path("assets/icon.ico")
     if os.path.exists(icon_path):
         try:
@@ -26,8 +33,20 @@ def main():
     window.resize(1050, 640)
     # window.setMinimumSize(520, 360)
     window.show()
+    startup_profile.mark("show")
     sys.exit(app.exec())
 
 
+def main():
+    if "--perf" in sys.argv[1:]:
+        import perf
+        perf.set_enabled(True)
+    if "--headless" in sys.argv[1:]:
+        # Scheduler only, no Qt: PySide6 is never imported on this path.
+        from daemon import run_daemon
+        sys.exit(run_daemon())
+    run_gui()
+
+
 if __name__ == "__main__":
     main()
@@ -11,7 +11,6 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
-    QPlainTextEdit,
     QPushButton,
     QScrollArea,
     QSizePolicy,
@@ -20,8 +19,11 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from highlighter import ShellHighlighter
-from scheduler_storage import load_history, load_log
+from log_view import LogView
+import perf
+from metrics import format_elapsed
+from scheduler_data import run_duration_sec, status_matches
+from scheduler_storage import load_history, load_log, load_log_styles
 from scheduler_ui import STATUS_DISPLAY, HISTORY_FILTER_OPTIONS
 
 class ManualHistoryWidget(QWidget):
@@ -113,18 +115,11 @@ class ManualHistoryWidget(QWidget):
         log_header.addWidget(close_btn)
         log_layout.addLayout(log_header)
 
-        self._history_log_edit = QPlainTextEdit()
-        self._history_log_edit.setReadOnly(True)
-        self._history_log_edit.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
-        log_font = QFont("Consolas")
-        log_font.setStyleHint(QFont.StyleHint.Monospace)
-        log_font.setPointSize(9)
-        self._history_log_edit.setFont(log_font)
+        self._history_log_edit = LogView(self._main._palette)
         self._history_log_edit.setPlaceholderText("Select a history entry to view its log.")
-        self._history_log_highlighter = ShellHighlighter(
-            self._history_log_edit.document(), self._main._palette
-        )
         log_layout.addWidget(self._history_log_edit, 1)
+        self._main.run_log_appended.connect(self._on_run_log_appended)
+        self._main.run_log_finished.connect(self._on_run_log_finished)
 
         splitter.addWidget(self._history_log_viewer_panel)
         splitter.setStretchFactor(0, 0)
@@ -145,23 +140,39 @@ class ManualHistoryWidget(QWidget):
         return os.path.basename(script_path)
 
     def update_log_highlighter_palette(self, palette: dict) -> None:
-        if hasattr(self, "_history_log_highlighter"):
-            self._history_log_highlighter.update_palette(palette)
+        if hasattr(self, "_history_log_edit"):
+            self._history_log_edit.update_palette(palette)
 
     def _on_close_log_viewer(self):
         self._history_log_viewer_panel.setVisible(False)
 
+    def _on_run_log_appended(self, run_id: str, offset: int, text: str, runs: list) -> None:
+        if run_id == self._selected_history_run_id:
+            self._history_log_edit.append_log(offset, text, runs)
+
+    def _on_run_log_finished(self, run_id: str) -> None:
+        if run_id == self._selected_history_run_id:
+            self._history_log_edit.finish()
+
     def _on_history_row_clicked(self, run):
         self._selected_history_run_id = run.get("id")
         for rid, row_w in self._history_row_map.items():
             row_w.setProperty("selected", rid == self._selected_history_run_id)
             row_w.style().unpolish(row_w)
             row_w.style().polish(row_w)
-        log_text = load_log(run["id"]) if run.get("id") else ""
         self._history_log_edit.setPlaceholderText("")
-        self._history_log_edit.setPlainText(log_text if log_text else "No log recorded.")
+        live = self._main.live_log_snapshot(run["id"]) if run.get("id") else None
+        if live is not None:
+            self._history_log_edit.set_log(*live, follow=True)
+        else:
+            log_text = load_log(run["id"]) if run.get("id") else ""
+            if log_text:
+                self._history_log_edit.set_log(log_text, load_log_styles(run["id"]))
+            else:
+                self._history_log_edit.set_log("No log recorded.")
         self._history_log_viewer_panel.setVisible(True)
 
+    @perf.timed("ui.manual_history.refresh_history")
     def refresh_history(self):
         self._history_row_map.clear()
         while self._history_layout.count() > 2:
@@ -201,7 +212,7 @@ class ManualHistoryWidget(QWidget):
 
         filter_status = self._history_filter.currentText()
         if filter_status != "All":
-            runs = [r for r in runs if r.get("status") == filter_status]
+            runs = [r for r in runs if status_matches(r.get("status"), filter_status)]
 
         script_combo_text = self._history_script_combo.currentText().strip()
         if script_combo_text and script_combo_text != "All scripts":
@@ -271,6 +282,9 @@ class ManualHistoryWidget(QWidget):
             time_parts.append(f"Started: {started_str}")
         if finished_str:
             time_parts.append(f"Finished: {finished_str}")
+        duration = run_duration_sec(run)
+        if duration is not None:
+            time_parts.append(f"Duration: {format_elapsed(duration)}")
         time_column_text = "\n".join(time_parts) if time_parts else "—"
         time_lbl = QLabel(time_column_text)
         time_lbl.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
@@ -287,6 +301,8 @@ class ManualHistoryWidget(QWidget):
         sub_text = None
         if status == "failed":
             sub_text = run.get("error_message", "Unknown error")
+        elif status in ("waiting", "killed"):
+            sub_text = run.get("error_message")
 
         sub_lbl = None
         if sub_text:
@@ -1,15 +1,19 @@
 """
 Aggregate process metrics for a list of PIDs (process tree) using psutil.
 Used to display CPU %, RAM RSS/%, active time, peak memory, CPU time, thread count.
+psutil is imported on the first collect_metrics() call, so formatting helpers stay cheap to import.
+Runs launched in their own cgroup are measured from the cgroup instead (see cgroups.py).
 """
 import time
-import psutil
+
+import perf
+from cgroups import cgroup_usage
 
 BYTES_PER_MB = 1024 * 1024
 PLACEHOLDER = "—"
 
 
-def _safe_process(pid: int):
+def _safe_process(psutil, pid: int):
     try:
         return psutil.Process(pid)
     except (psutil.NoSuchProcess, psutil.AccessDenied):
@@ -36,19 +40,25 @@ def format_cpu_time(seconds: float) -> str:
     return f"{h}:{m:02d}:{s:.1f}"
 
 
+@perf.timed("metrics.collect")
 def collect_metrics(
     pids: list[int],
     start_time: float,
     peak_rss_bytes: float,
     cpu_primed_pids: set[int],
+    cgroup: str | None = None,
 ) -> dict:
     """
     Aggregate metrics over the given PIDs (process tree).
     start_time: time.monotonic() when run started.
     peak_rss_bytes: previous peak RSS in bytes; returned updated.
     cpu_primed_pids: set of PIDs that have had at least one cpu_percent() call (first returns 0).
+    cgroup: the run's own cgroup; when readable, every figure comes from it and pids is not walked
+    (num_threads is then the cgroup's task count).
     Returns dict: cpu_percent, rss_mb, ram_percent, elapsed_sec, peak_rss_mb, cpu_time_sec, num_threads.
     """
+    import psutil
+
     total_rss = 0.0
     total_cpu_percent = 0.0
     total_cpu_time = 0.0
@@ -60,8 +70,23 @@ def collect_metrics(
     except Exception:
         mem_total = 1
 
+    usage = cgroup_usage(cgroup) if cgroup else None
+    if usage is not None:
+        elapsed = time.monotonic() - start_time if start_time else 0
+        new_peak_rss = max(peak_rss_bytes, usage["memory_bytes"])
+        return {
+            "cpu_percent": usage["cpu_percent"],
+            "rss_mb": usage["memory_bytes"] / BYTES_PER_MB,
+            "ram_percent": (usage["memory_bytes"] / mem_total * 100) if mem_total else 0,
+            "elapsed_sec": elapsed,
+            "peak_rss_mb": new_peak_rss / BYTES_PER_MB,
+            "peak_rss_bytes": new_peak_rss,
+            "cpu_time_sec": usage["cpu_time_sec"],
+            "num_threads": usage["tasks"],
+        }
+
     for pid in pids:
-        proc = _safe_process(pid)
+        proc = _safe_process(psutil, pid)
         if proc is None:
             continue
         try:
@@ -102,3 +127,10 @@ def collect_metrics(
         "cpu_time_sec": total_cpu_time,
         "num_threads": total_threads,
     }
+
+
+def combine_metrics(samples: list[dict]) -> dict:
+    """Totals over several runs' collect_metrics() results; elapsed is the longest run's."""
+    combined = {key: sum(sample[key] for sample in samples) for key in samples[0]}
+    combined["elapsed_sec"] = max(sample["elapsed_sec"] for sample in samples)
+    return combined
@@ -31,6 +31,7 @@ NOTIFICATION_DURATION_MS = 4000
 EVENT_START = "start"
 EVENT_FINISHED_EXITED = "finished_exited"
 EVENT_FINISHED_KILLED = "finished_killed"
+EVENT_FINISHED_FAILED = "finished_failed"
 EVENT_ERROR = "error"
 
 
@@ -122,7 +123,7 @@ class _NotificationToast(QWidget):
         body_label.setWordWrap(True)
         layout.addWidget(body_label)
 
-        if self._payload.get("event_type") == EVENT_ERROR and error_message:
+        if self._payload.get("event_type") in (EVENT_ERROR, EVENT_FINISHED_FAILED) and error_message:
             error_label = QLabel(str(error_message))
             error_label.setObjectName("notificationError")
             error_label.setWordWrap(True)
@@ -139,6 +140,8 @@ class _NotificationToast(QWidget):
             return "Scheduled run finished"
         if event_type == EVENT_FINISHED_KILLED:
             return "Scheduled run killed"
+        if event_type == EVENT_FINISHED_FAILED:
+            return "Scheduled run failed"
         if event_type == EVENT_ERROR:
             return "Scheduled run error"
         return "Scheduled run"
@@ -0,0 +1,159 @@
+"""
+Hot-path timing: the timed() decorator and span() context manager record how long timer callbacks,
+storage calls, metrics collection and widget rebuilds take. While disabled (the default) both cost
+one flag check. While enabled, each name keeps its last ROLLING_WINDOW durations for percentiles,
+and every span is also kept in a bounded trace buffer that export_chrome_trace() writes in the
+Chrome trace event format (chrome://tracing, Perfetto).
+Pure logic module with no UI dependencies.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+ROLLING_WINDOW = 1000      # durations kept per name for p50/p99
+TRACE_BUFFER = 200_000     # spans kept for trace export
+
+_enabled = False
+_lock = threading.Lock()
+_stats: dict[str, "_Stat"] = {}
+_trace: deque = deque(maxlen=TRACE_BUFFER)
+_trace_origin = time.perf_counter()
+
+
+class _Stat:
+    __slots__ = ("durations", "count", "total", "max")
+
+    def __init__(self):
+        self.durations: deque = deque(maxlen=ROLLING_WINDOW)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(value: bool) -> None:
+    global _enabled
+    _enabled = value
+
+
+def record(name: str, start: float, duration: float) -> None:
+    """Adds one measurement (perf_counter start and duration, in seconds)."""
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            stat = _stats[name] = _Stat()
+        stat.durations.append(duration)
+        stat.count += 1
+        stat.total += duration
+        if duration > stat.max:
+            stat.max = duration
+        _trace.append((name, start, duration, threading.get_ident()))
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        record(self.name, self.start, time.perf_counter() - self.start)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    """Context manager timing its block under name."""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def timed(name: str | None = None):
+    """Decorator timing every call of the function under name (default: its qualified name)."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(label, start, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def snapshot() -> list[dict]:
+    """Per-name statistics in milliseconds, slowest p99 first."""
+    with _lock:
+        items = [(name, sorted(stat.durations), stat.count, stat.total, stat.max) for name, stat in _stats.items()]
+    rows = [
+        {
+            "name": name,
+            "count": count,
+            "p50_ms": _percentile(ordered, 0.5) * 1000,
+            "p99_ms": _percentile(ordered, 0.99) * 1000,
+            "max_ms": peak * 1000,
+            "total_ms": total * 1000,
+        }
+        for name, ordered, count, total, peak in items
+    ]
+    rows.sort(key=lambda row: row["p99_ms"], reverse=True)
+    return rows
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+        _trace.clear()
+
+
+def export_chrome_trace(path: str) -> int:
+    """Writes the buffered spans as complete ("X") trace events. Returns the number of events."""
+    with _lock:
+        spans = list(_trace)
+    pid = os.getpid()
+    events = [
+        {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": round((start - _trace_origin) * 1e6, 1),
+            "dur": round(duration * 1e6, 1),
+            "pid": pid,
+            "tid": tid,
+        }
+        for name, start, duration, tid in spans
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(events)
@@ -0,0 +1,160 @@
+"""
+Performance dialog (Ctrl+Shift+P): per-callback p50/p99 from perf, the event-loop lag, and Chrome
+trace export. EventLoopLagProbe measures how late a short repeating timer fires, which is how long
+the GUI thread was busy.
+"""
+import time
+
+from PySide6.QtCore import QObject, Qt, QTimer
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QMessageBox,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+import perf
+
+LAG_PROBE_MS = 100
+LAG_NAME = "event_loop.lag"
+REFRESH_MS = 500
+COLUMNS = ("Name", "Calls", "p50 ms", "p99 ms", "Max ms", "Total ms")
+
+
+class EventLoopLagProbe(QObject):
+    """Records, while perf is enabled, how much later than scheduled each LAG_PROBE_MS tick runs."""
+
+    def __init__(self, parent: QObject):
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(LAG_PROBE_MS)
+        self._timer.timeout.connect(self._tick)
+        self._last = 0.0
+
+    def start(self) -> None:
+        self._last = time.perf_counter()
+        self._timer.start()
+
+    def stop(self) -> None:
+        self._timer.stop()
+
+    def _tick(self) -> None:
+        now = time.perf_counter()
+        expected = self._last + LAG_PROBE_MS / 1000
+        self._last = now
+        if perf.enabled():
+            perf.record(LAG_NAME, expected, max(0.0, now - expected))
+
+
+class PerfDialog(QDialog):
+    def __init__(self, lag_probe: EventLoopLagProbe, parent=None):
+        super().__init__(parent)
+        self.setObjectName("perfDialog")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.setWindowTitle("Performance")
+        self.resize(720, 460)
+        self._lag_probe = lag_probe
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(16, 12, 16, 12)
+        layout.setSpacing(8)
+
+        controls = QHBoxLayout()
+        self._record_check = QCheckBox("Record timings")
+        self._record_check.setChecked(perf.enabled())
+        self._record_check.toggled.connect(self._set_recording)
+        controls.addWidget(self._record_check)
+        controls.addStretch()
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self._reset)
+        controls.addWidget(reset_btn)
+        export_btn = QPushButton("Export trace…")
+        export_btn.clicked.connect(self._export_trace)
+        controls.addWidget(export_btn)
+        layout.addLayout(controls)
+
+        self._lag_label = QLabel()
+        layout.addWidget(self._lag_label)
+
+        self._table = QTableWidget(0, len(COLUMNS))
+        self._table.setHorizontalHeaderLabels(COLUMNS)
+        self._table.verticalHeader().setVisible(False)
+        self._table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self._table.setSelectionMode(QTableWidget.NoSelection)
+        header = self._table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        for column in range(1, len(COLUMNS)):
+            header.setSectionResizeMode(column, QHeaderView.ResizeToContents)
+        layout.addWidget(self._table, 1)
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(REFRESH_MS)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.refresh()
+        self._refresh_timer.start()
+
+    def hideEvent(self, event) -> None:
+        self._refresh_timer.stop()
+        super().hideEvent(event)
+
+    def _set_recording(self, on: bool) -> None:
+        perf.set_enabled(on)
+        if on:
+            self._lag_probe.start()
+        else:
+            self._lag_probe.stop()
+        self.refresh()
+
+    def _reset(self) -> None:
+        perf.reset()
+        self.refresh()
+
+    def _export_trace(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(self, "Export trace", "shscripthub-trace.json", "Trace (*.json)")
+        if not path:
+            return
+        try:
+            count = perf.export_chrome_trace(path)
+        except OSError as exc:
+            QMessageBox.critical(self, "ShScriptHub - Error", f"Could not write the trace: {exc}")
+            return
+        QMessageBox.information(
+            self, "ShScriptHub", f"Wrote {count} events. Open the file in chrome://tracing or ui.perfetto.dev.",
+        )
+
+    def refresh(self) -> None:
+        rows = perf.snapshot()
+        lag = next((row for row in rows if row["name"] == LAG_NAME), None)
+        if not perf.enabled():
+            self._lag_label.setText("Recording is off. Timings are only collected while it is on.")
+        elif lag is None:
+            self._lag_label.setText("Event-loop lag: measuring…")
+        else:
+            self._lag_label.setText(
+                f"Event-loop lag: p50 {lag['p50_ms']:.1f} ms, p99 {lag['p99_ms']:.1f} ms, max {lag['max_ms']:.1f} ms"
+            )
+        self._table.setRowCount(len(rows))
+        for index, row in enumerate(rows):
+            values = (
+                row["name"], str(row["count"]), f"{row['p50_ms']:.2f}", f"{row['p99_ms']:.2f}",
+                f"{row['max_ms']:.2f}", f"{row['total_ms']:.0f}",
+            )
+            for column, value in enumerate(values):
+                item = self._table.item(index, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    if column:
+                        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                    self._table.setItem(index, column, item)
+                item.setText(value)
@@ -0,0 +1,130 @@
+"""
+Pipeline runs: which steps of a pipeline can start, which are skipped, and when the run is over.
+On each pass the host (the main window or the headless daemon) kills and reports the steps
+timed_out_steps() lists, records the steps resolve_skips() returns, then starts the steps
+ready_steps() returns (a step whose script is busy can be left pending for the next pass) and
+reports each step's end with step_finished(). Independent branches run at the same time, up to
+the pipeline's max_parallel.
+A step waits for every step it runs after. A "success" edge needs that step to succeed; if it
+did not, the step is skipped, and so are the steps that need it to succeed in turn.
+Pipeline runs live in memory: a run cut short by closing the app does not resume.
+Pure logic module with no UI dependencies.
+"""
+import os
+import time
+
+from scheduler_data import DEFAULT_MAX_PARALLEL, generate_id, now_iso
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+KILLED = "killed"
+TIMED_OUT = "timed_out"
+SKIPPED = "skipped"
+FINISHED_STATES = (SUCCEEDED, FAILED, KILLED, TIMED_OUT, SKIPPED)
+
+# Step state for each history status a finished run can end with.
+# "exited" (exit code unknown) counts as success, as it did before exit codes were recorded.
+STEP_STATE_FOR_STATUS = {
+    "succeeded": SUCCEEDED, "exited": SUCCEEDED, "failed": FAILED, "killed": KILLED, "timed_out": TIMED_OUT,
+}
+
+
+def resolve_step_script(step: dict, project_path: str | None) -> str:
+    """A step's script path; relative paths are taken from the project root."""
+    path = step["script_path"]
+    if project_path and not os.path.isabs(path):
+        path = os.path.join(project_path, path.replace("/", os.sep))
+    return os.path.normpath(path)
+
+
+class PipelineRun:
+    def __init__(self, pipeline: dict, schedule_id: str = "", schedule_name: str | None = None):
+        self.id = generate_id()
+        self.pipeline = pipeline
+        self.schedule_id = schedule_id
+        self.name = schedule_name or pipeline["name"]
+        self.triggered_at = now_iso()
+        self.max_parallel = pipeline.get("max_parallel", DEFAULT_MAX_PARALLEL)
+        self.steps = {step["id"]: step for step in pipeline["steps"]}
+        self.states = {step_id: PENDING for step_id in self.steps}
+        self.history_ids: dict[str, str] = {}      # step id -> history entry id, once started
+        self.skip_reasons: dict[str, str] = {}
+        self._started_at: dict[str, float] = {}    # step id -> monotonic start
+
+    def history_fields(self, step_id: str) -> dict:
+        """Fields linking a step's history entry to this run (see create_history_entry)."""
+        return {"pipeline_id": self.pipeline["id"], "pipeline_run_id": self.id, "step_id": step_id}
+
+    def running_count(self) -> int:
+        return sum(1 for state in self.states.values() if state == RUNNING)
+
+    def resolve_skips(self) -> list[str]:
+        """Skips pending steps that need a step which did not succeed. Returns the newly skipped steps."""
+        skipped = []
+        changed = True
+        while changed:
+            changed = False
+            for step_id, step in self.steps.items():
+                if self.states[step_id] != PENDING:
+                    continue
+                for edge in step.get("after", []):
+                    dep_state = self.states[edge["step"]]
+                    if edge.get("when", "success") == "success" and dep_state in FINISHED_STATES and dep_state != SUCCEEDED:
+                        self.states[step_id] = SKIPPED
+                        self.skip_reasons[step_id] = f"Skipped: step '{edge['step']}' did not succeed ({dep_state})."
+                        skipped.append(step_id)
+                        changed = True
+                        break
+        return skipped
+
+    def ready_steps(self) -> list[dict]:
+        """Pending steps whose dependencies have all ended, at most max_parallel running in total."""
+        room = self.max_parallel - self.running_count()
+        ready = []
+        for step_id, step in self.steps.items():
+            if room <= 0:
+                break
+            if self.states[step_id] != PENDING:
+                continue
+            if all(self.states[edge["step"]] in FINISHED_STATES for edge in step.get("after", [])):
+                ready.append(step)
+                room -= 1
+        return ready
+
+    def step_started(self, step_id: str, history_id: str) -> None:
+        self.states[step_id] = RUNNING
+        self.history_ids[step_id] = history_id
+        self._started_at[step_id] = time.monotonic()
+
+    def step_finished(self, step_id: str, state: str) -> None:
+        self.states[step_id] = state
+
+    def step_for_history(self, history_id: str) -> str | None:
+        for step_id, hid in self.history_ids.items():
+            if hid == history_id and self.states[step_id] == RUNNING:
+                return step_id
+        return None
+
+    def timed_out_steps(self) -> list[str]:
+        now = time.monotonic()
+        return [
+            step_id for step_id, state in self.states.items()
+            if state == RUNNING and self.steps[step_id].get("timeout_sec", 0)
+            and now - self._started_at[step_id] >= self.steps[step_id]["timeout_sec"]
+        ]
+
+    @property
+    def done(self) -> bool:
+        return all(state in FINISHED_STATES for state in self.states.values())
+
+    @property
+    def succeeded(self) -> bool:
+        return all(state == SUCCEEDED for state in self.states.values())
+
+    def summary(self) -> str:
+        counts: dict[str, int] = {}
+        for state in self.states.values():
+            counts[state] = counts.get(state, 0) + 1
+        return ", ".join(f"{count} {state.replace('_', ' ')}" for state, count in sorted(counts.items()))
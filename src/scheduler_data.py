@@ -1,15 +1,61 @@
 """
-Schedule and history entity definitions, validation, and factory functions.
+Schedule, pipeline and history entity definitions, validation, and factory functions.
+A schedule runs either one script (script_path) or a pipeline (pipeline_id). A pipeline is a DAG of
+script steps: each step lists the steps it runs after, each edge with a condition ("success": only
+if that step succeeded, "always": once it has ended either way), and an optional timeout.
+A script schedule's overlap_policy says what happens when it fires while its script is still
+running: "restart" kills the running instances first, "skip" records the run as skipped, "queue"
+starts it once the script is free (one waiting run per schedule), and "parallel" starts another
+instance, up to max_instances.
+A schedule's misfire_policy says what happens to the runs it missed while the scheduler was not
+running (the app closed, the machine asleep): "once" runs it once on resume, "all" runs each missed
+run, up to max_catchup, and "skip" drops them. Skipped missed runs are recorded in history.
+last_slot_at is the latest run time already handled; runs before it are never caught up.
+A schedule with a jitter window (jitter_sec) starts each run that many seconds after its slot at
+most: "hash" delays it by a fixed share of the window taken from its id, "spread" spaces the
+schedules that share its slots evenly across the window.
+A finished run's history status comes from its script's exit code: "succeeded" for 0, "failed" for
+any other (launch errors are "failed" too), "exited" when the code could not be read. A script
+schedule with max_retries starts a failed or timed-out run again retry_delay_sec later, up to that
+many more times; each history entry records its attempt.
 """
 import uuid
 from datetime import datetime, timezone
 
 VALID_RULE_TYPES = ("time", "interval")
-VALID_STATUSES = ("started", "killed", "exited", "failed")
+VALID_STATUSES = ("waiting", "started", "succeeded", "failed", "timed_out", "killed", "exited", "skipped")
+FAILURE_STATUSES = ("failed", "timed_out")
+FAILURES_FILTER = "failures"  # history filter matching every FAILURE_STATUSES entry
+EXIT_CODE_MESSAGE = "Exited with code {code}."
+MAX_RETRIES_LIMIT = 10
+DEFAULT_RETRY_DELAY_SEC = 60
+MAX_RETRY_DELAY_SEC = 24 * 3600
 MAX_NAME_LENGTH = 128
 HISTORY_RETENTION = 1000
 MAX_INTERVAL_HOURS = 24
 DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+SCHEDULE_FIELDS = (
+    "name", "script_path", "pipeline_id", "rule_type", "rule", "enabled", "overlap_policy", "max_instances",
+    "misfire_policy", "max_catchup", "jitter_sec", "jitter_mode", "max_retries", "retry_delay_sec",
+)  # set by the user; the rest is bookkeeping
+OVERLAP_POLICIES = ("restart", "skip", "queue", "parallel")
+DEFAULT_OVERLAP_POLICY = "restart"
+DEFAULT_MAX_INSTANCES = 2
+MAX_INSTANCES_LIMIT = 16
+SKIPPED_OVERLAP_MESSAGE = "Skipped: the previous run was still going."
+MISFIRE_POLICIES = ("once", "all", "skip")
+DEFAULT_MISFIRE_POLICY = "once"
+DEFAULT_MAX_CATCHUP = 3
+MAX_CATCHUP_LIMIT = 100
+SKIPPED_MISFIRE_MESSAGE = "Skipped: {count} run(s) missed while the scheduler was not running."
+JITTER_MODES = ("hash", "spread")
+DEFAULT_JITTER_MODE = "hash"
+MAX_JITTER_SEC = 3600
+EDGE_CONDITIONS = ("success", "always")
+PIPELINE_FIELDS = ("name", "max_parallel", "steps")
+DEFAULT_MAX_PARALLEL = 2
+MAX_PARALLEL_LIMIT = 32
+MAX_PIPELINE_STEPS = 200
 
 
 def now_iso() -> str:
@@ -73,10 +119,38 @@ def validate_schedule(data: dict) -> list[str]:
     errors = []
     errors.extend(validate_name(data.get("name", "")))
 
-    script_path = data.get("script_path", "")
-    if not script_path or not script_path.strip():
+    script_path = data.get("script_path") or ""
+    pipeline_id = data.get("pipeline_id") or ""
+    if pipeline_id and script_path:
+        errors.append("A schedule runs either a script or a pipeline, not both.")
+    elif not pipeline_id and not script_path.strip():
         errors.append("Script path is required.")
 
+    policy = data.get("overlap_policy", DEFAULT_OVERLAP_POLICY)
+    if policy not in OVERLAP_POLICIES:
+        errors.append(f"Overlap policy must be one of: {', '.join(OVERLAP_POLICIES)}.")
+    max_instances = data.get("max_instances", DEFAULT_MAX_INSTANCES)
+    if not isinstance(max_instances, int) or isinstance(max_instances, bool) or not 1 <= max_instances <= MAX_INSTANCES_LIMIT:
+        errors.append(f"Max instances must be an integer between 1 and {MAX_INSTANCES_LIMIT}.")
+    misfire = data.get("misfire_policy", DEFAULT_MISFIRE_POLICY)
+    if misfire not in MISFIRE_POLICIES:
+        errors.append(f"Misfire policy must be one of: {', '.join(MISFIRE_POLICIES)}.")
+    max_catchup = data.get("max_catchup", DEFAULT_MAX_CATCHUP)
+    if not isinstance(max_catchup, int) or isinstance(max_catchup, bool) or not 1 <= max_catchup <= MAX_CATCHUP_LIMIT:
+        errors.append(f"Max catch-up runs must be an integer between 1 and {MAX_CATCHUP_LIMIT}.")
+    if data.get("jitter_mode", DEFAULT_JITTER_MODE) not in JITTER_MODES:
+        errors.append(f"Jitter mode must be one of: {', '.join(JITTER_MODES)}.")
+    jitter = data.get("jitter_sec", 0)
+    if not isinstance(jitter, int) or isinstance(jitter, bool) or not 0 <= jitter <= MAX_JITTER_SEC:
+        errors.append(f"Jitter must be an integer between 0 and {MAX_JITTER_SEC} seconds.")
+        jitter = 0
+    max_retries = data.get("max_retries", 0)
+    if not isinstance(max_retries, int) or isinstance(max_retries, bool) or not 0 <= max_retries <= MAX_RETRIES_LIMIT:
+        errors.append(f"Retries must be an integer between 0 and {MAX_RETRIES_LIMIT}.")
+    retry_delay = data.get("retry_delay_sec", DEFAULT_RETRY_DELAY_SEC)
+    if not isinstance(retry_delay, int) or isinstance(retry_delay, bool) or not 0 <= retry_delay <= MAX_RETRY_DELAY_SEC:
+        errors.append(f"Retry delay must be an integer between 0 and {MAX_RETRY_DELAY_SEC} seconds.")
+
     rule_type = data.get("rule_type")
     if rule_type not in VALID_RULE_TYPES:
         errors.append(f"Rule type must be one of: {', '.join(VALID_RULE_TYPES)}.")
@@ -87,7 +161,11 @@ def validate_schedule(data: dict) -> list[str]:
     elif rule_type == "time":
         errors.extend(validate_time_rule(rule))
     elif rule_type == "interval":
-        errors.extend(validate_interval_rule(rule))
+        interval_errors = validate_interval_rule(rule)
+        errors.extend(interval_errors)
+        interval_sec = (rule.get("hours", 0) * 60 + rule.get("minutes", 0)) * 60 if not interval_errors else 0
+        if jitter and interval_sec and jitter >= interval_sec:
+            errors.append("Jitter must be shorter than the interval.")
 
     return errors
 
@@ -98,6 +176,15 @@ def create_schedule(
     rule_type: str,
     rule: dict,
     enabled: bool = True,
+    pipeline_id: str | None = None,
+    overlap_policy: str = DEFAULT_OVERLAP_POLICY,
+    max_instances: int = DEFAULT_MAX_INSTANCES,
+    misfire_policy: str = DEFAULT_MISFIRE_POLICY,
+    max_catchup: int = DEFAULT_MAX_CATCHUP,
+    jitter_sec: int = 0,
+    jitter_mode: str = DEFAULT_JITTER_MODE,
+    max_retries: int = 0,
+    retry_delay_sec: int = DEFAULT_RETRY_DELAY_SEC,
 ) -> dict:
     now = now_iso()
     schedule = {
@@ -109,11 +196,151 @@ def create_schedule(
         "enabled": enabled,
         "created_at": now,
     }
+    if pipeline_id:
+        schedule["pipeline_id"] = pipeline_id
+    if overlap_policy != DEFAULT_OVERLAP_POLICY:
+        schedule["overlap_policy"] = overlap_policy
+    if overlap_policy == "parallel":
+        schedule["max_instances"] = max_instances
+    if misfire_policy != DEFAULT_MISFIRE_POLICY:
+        schedule["misfire_policy"] = misfire_policy
+    if misfire_policy == "all":
+        schedule["max_catchup"] = max_catchup
+    if jitter_sec:
+        schedule["jitter_sec"] = jitter_sec
+        schedule["jitter_mode"] = jitter_mode
+    if max_retries:
+        schedule["max_retries"] = max_retries
+        schedule["retry_delay_sec"] = retry_delay_sec
     if rule_type == "interval":
         schedule["interval_base_at"] = now
     return schedule
 
 
+def schedule_fields(data: dict) -> dict:
+    """The SCHEDULE_FIELDS values in data (control API params, a schedule from an export file)."""
+    return {key: data[key] for key in SCHEDULE_FIELDS if key in data}
+
+
+def schedule_from_fields(data: dict) -> dict:
+    """A new schedule from the SCHEDULE_FIELDS values in data, with the defaults for the rest."""
+    fields = schedule_fields(data)
+    fields["script_path"] = fields.get("script_path") or ""
+    return create_schedule(**fields)
+
+
+def update_schedule(schedule: dict, data: dict) -> None:
+    """Sets the SCHEDULE_FIELDS values in data on a schedule; a new rule, or enabling it, resets its clock."""
+    fields = schedule_fields(data)
+    restart = (
+        fields.get("rule_type", schedule.get("rule_type")) != schedule.get("rule_type")
+        or fields.get("rule", schedule.get("rule")) != schedule.get("rule")
+        or (fields.get("enabled") and not schedule.get("enabled"))
+    )
+    schedule.update(fields)
+    if restart:
+        reset_schedule_clock(schedule)
+
+
+def reset_schedule_clock(schedule: dict) -> None:
+    """Starts a schedule's runs afresh from now, after it is enabled or its rule changes: nothing is caught up."""
+    now = now_iso()
+    schedule["last_slot_at"] = now
+    if schedule.get("rule_type") == "interval":
+        schedule["interval_base_at"] = now
+    else:
+        schedule.pop("interval_base_at", None)
+
+
+def validate_pipeline(data: dict) -> list[str]:
+    errors = []
+    errors.extend(validate_name(data.get("name", "")))
+
+    max_parallel = data.get("max_parallel", DEFAULT_MAX_PARALLEL)
+    if not isinstance(max_parallel, int) or isinstance(max_parallel, bool) or not 1 <= max_parallel <= MAX_PARALLEL_LIMIT:
+        errors.append(f"Max parallel must be an integer between 1 and {MAX_PARALLEL_LIMIT}.")
+
+    steps = data.get("steps")
+    if not isinstance(steps, list) or not steps:
+        errors.append("A pipeline needs at least one step.")
+        return errors
+    if len(steps) > MAX_PIPELINE_STEPS:
+        errors.append(f"A pipeline can have at most {MAX_PIPELINE_STEPS} steps.")
+        return errors
+
+    ids = set()
+    for index, step in enumerate(steps, 1):
+        if not isinstance(step, dict):
+            errors.append(f"Step {index} must be an object.")
+            return errors
+        step_id = step.get("id")
+        if not isinstance(step_id, str) or not step_id.strip():
+            errors.append(f"Step {index} needs an id.")
+        elif step_id in ids:
+            errors.append(f"Step id '{step_id}' is used twice.")
+        ids.add(step_id)
+        script_path = step.get("script_path")
+        if not isinstance(script_path, str) or not script_path.strip():
+            errors.append(f"Step {index} needs a script path.")
+        timeout = step.get("timeout_sec", 0)
+        if not isinstance(timeout, int) or isinstance(timeout, bool) or timeout < 0:
+            errors.append(f"Step {index}: timeout must be a non-negative number of seconds (0 = none).")
+    if errors:
+        return errors
+
+    for step in steps:
+        after = step.get("after", [])
+        if not isinstance(after, list):
+            errors.append(f"Step '{step['id']}': 'after' must be a list.")
+            continue
+        for edge in after:
+            if not isinstance(edge, dict) or edge.get("step") not in ids:
+                errors.append(f"Step '{step['id']}' runs after an unknown step: {edge!r}.")
+            elif edge["step"] == step["id"]:
+                errors.append(f"Step '{step['id']}' cannot run after itself.")
+            elif edge.get("when", "success") not in EDGE_CONDITIONS:
+                errors.append(f"Step '{step['id']}': condition must be one of: {', '.join(EDGE_CONDITIONS)}.")
+    if not errors:
+        cycle = find_cycle(steps)
+        if cycle:
+            errors.append("Steps depend on each other in a cycle: " + " -> ".join(cycle) + ".")
+    return errors
+
+
+def find_cycle(steps: list[dict]) -> list[str] | None:
+    """A list of step ids forming a dependency cycle (first id repeated at the end), or None."""
+    after = {step["id"]: [edge["step"] for edge in step.get("after", [])] for step in steps}
+    state: dict[str, int] = {}  # 1 = on the current path, 2 = done
+    for root in after:
+        if root in state:
+            continue
+        path = [root]
+        stack = [iter(after[root])]
+        state[root] = 1
+        while stack:
+            nxt = next(stack[-1], None)
+            if nxt is None:
+                state[path.pop()] = 2
+                stack.pop()
+            elif state.get(nxt) == 1:
+                return path[path.index(nxt):] + [nxt]
+            elif nxt not in state:
+                state[nxt] = 1
+                path.append(nxt)
+                stack.append(iter(after[nxt]))
+    return None
+
+
+def create_pipeline(name: str, steps: list[dict], max_parallel: int = DEFAULT_MAX_PARALLEL) -> dict:
+    return {
+        "id": generate_id(),
+        "name": name.strip(),
+        "max_parallel": max_parallel,
+        "steps": steps,
+        "created_at": now_iso(),
+    }
+
+
 def create_history_entry(
     schedule_id: str,
     schedule_name: str,
@@ -122,7 +349,13 @@ def create_history_entry(
     started_at: str | None,
     status: str,
     error_message: str | None = None,
+    pipeline_run: dict | None = None,
+    attempt: int = 1,
 ) -> dict:
+    """
+    pipeline_run ({"pipeline_id", "pipeline_run_id", "step_id"}) links a step's run to its pipeline run.
+    attempt counts the run's retries (see max_retries); it is stored from the first retry on.
+    """
     entry = {
         "id": generate_id(),
         "schedule_id": schedule_id,
@@ -135,4 +368,40 @@ def create_history_entry(
     }
     if error_message:
         entry["error_message"] = error_message
+    if pipeline_run:
+        entry.update(pipeline_run)
+    if attempt > 1:
+        entry["attempt"] = attempt
     return entry
+
+
+def finished_fields(exit_code: int | None) -> dict:
+    """History fields for a run that ended by itself, from its script's exit code (None if unknown)."""
+    fields = {"finished_at": now_iso()}
+    if exit_code is None:
+        fields["status"] = "exited"
+    elif exit_code == 0:
+        fields.update(status="succeeded", exit_code=0)
+    else:
+        fields.update(status="failed", exit_code=exit_code, error_message=EXIT_CODE_MESSAGE.format(code=exit_code))
+    return fields
+
+
+def status_matches(status: str | None, status_filter: str) -> bool:
+    """Whether a history status passes a filter: a status, FAILURES_FILTER, or "All"."""
+    if status_filter == "All":
+        return True
+    if status_filter == FAILURES_FILTER:
+        return status in FAILURE_STATUSES
+    return status == status_filter
+
+
+def run_duration_sec(entry: dict) -> float | None:
+    """Seconds from a history entry's start to its end, or None if it has not both."""
+    started_at, finished_at = entry.get("started_at"), entry.get("finished_at")
+    if not started_at or not finished_at:
+        return None
+    try:
+        return max(0.0, (datetime.fromisoformat(finished_at) - datetime.fromisoformat(started_at)).total_seconds())
+    except (TypeError, ValueError):
+        return None
@@ -1,12 +1,34 @@
 """
 Scheduler engine — next-run calculation, due-schedule detection, trigger validation.
+A schedule's runs fall on fixed slots: every interval from its base time, or a time of day. The
+slots due since the last one handled are counted without walking them, so a schedule that missed
+a week of runs costs the same as one that missed none. A slot more than TRIGGER_TOLERANCE_SEC
+overdue was missed; the schedule's misfire policy decides how many missed runs are caught up, and
+CatchUpQueue starts those one at a time so a machine waking from sleep does not start them all at once.
+A schedule with jitter runs a fixed offset after each slot; jitter_offsets() works the offsets out
+for a whole schedule list, and the functions below take a schedule's offset in seconds. Slots stay
+nominal (last_slot_at included), so a changed offset never runs a slot twice.
+A script schedule's failed runs are retried through RetryQueue; next_retry_attempt() says whether one is.
 Pure logic module with no UI dependencies.
 """
 import math
 import os
-from datetime import datetime, time as dt_time, timedelta, timezone
+import time
+import zlib
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+from scheduler_data import (
+    DEFAULT_JITTER_MODE,
+    DEFAULT_MAX_CATCHUP,
+    DEFAULT_MAX_INSTANCES,
+    DEFAULT_MISFIRE_POLICY,
+    DEFAULT_OVERLAP_POLICY,
+    DEFAULT_RETRY_DELAY_SEC,
+    FAILURE_STATUSES,
+)
 
 TRIGGER_TOLERANCE_SEC = 90
+CATCHUP_SPACING_SEC = 10    # catch-up runs start at least this far apart
 
 
 def _parse_iso(iso_str: str) -> datetime:
@@ -17,39 +39,7 @@ def _now_local() -> datetime:
     return datetime.now(timezone.utc).astimezone()
 
 
-def _next_run_time_based(schedule: dict) -> datetime | None:
-    rule = schedule["rule"]
-    hour = rule["hour"]
-    minute = rule["minute"]
-    days = rule.get("days")
-
-    last_triggered = schedule.get("last_triggered_at")
-    last_dt = _parse_iso(last_triggered) if last_triggered else None
-
-    now = _now_local()
-    today = now.date()
-
-    for offset in range(8):
-        candidate_date = today + timedelta(days=offset)
-        weekday = candidate_date.weekday()
-
-        if days is not None and len(days) > 0 and weekday not in days:
-            continue
-
-        candidate = datetime.combine(
-            candidate_date, dt_time(hour, minute), tzinfo=now.tzinfo,
-        )
-
-        if last_dt and candidate <= last_dt:
-            continue
-
-        return candidate
-
-    return None
-
-
-def _next_run_interval_based(schedule: dict) -> datetime | None:
-    rule = schedule["rule"]
+def _interval_delta(rule: dict) -> timedelta:
     minutes = rule.get("minutes")
     hours = rule.get("hours")
     if minutes is None and hours is None and "value" in rule and "unit" in rule:
@@ -60,53 +50,257 @@ def _next_run_interval_based(schedule: dict) -> datetime | None:
     else:
         minutes = (minutes or 0) if minutes is not None else 0
         hours = (hours or 0) if hours is not None else 0
+    return timedelta(hours=hours, minutes=minutes)
 
-    base_str = schedule.get("interval_base_at") or schedule.get("created_at")
-    if not base_str:
-        return None
 
+def _handled_until(schedule: dict) -> datetime | None:
+    """The latest slot already handled: slots at or before it are never due."""
+    if schedule.get("rule_type") == "interval":
+        stamps = [schedule.get("last_slot_at"), schedule.get("interval_base_at") or schedule.get("created_at")]
+        stamps = [_parse_iso(stamp) for stamp in stamps if stamp]
+        return max(stamps) if stamps else None
+    # Before last_slot_at existed, the fire time stood in for the slot.
+    stamp = schedule.get("last_slot_at") or schedule.get("last_triggered_at") or schedule.get("created_at")
+    return _parse_iso(stamp) if stamp else None
+
+
+def _interval_slots(schedule: dict, after: datetime, until: datetime) -> tuple[int, datetime | None]:
+    """Slots in (after, until]: their count and the latest one."""
+    delta = _interval_delta(schedule["rule"])
+    delta_seconds = delta.total_seconds()
+    base_str = schedule.get("interval_base_at") or schedule.get("created_at")
+    if not base_str or delta_seconds <= 0:
+        return 0, None
     base = _parse_iso(base_str)
-    now = _now_local()
-    delta = timedelta(hours=hours, minutes=minutes)
+    first = max(1, math.floor((after - base).total_seconds() / delta_seconds) + 1)
+    last = math.floor((until - base).total_seconds() / delta_seconds)
+    if last < first:
+        return 0, None
+    return last - first + 1, base + last * delta
+
+
+def _next_interval_slot(schedule: dict, after: datetime) -> datetime | None:
+    delta = _interval_delta(schedule["rule"])
     delta_seconds = delta.total_seconds()
+    base_str = schedule.get("interval_base_at") or schedule.get("created_at")
+    if not base_str or delta_seconds <= 0:
+        return None
+    base = _parse_iso(base_str)
+    return base + max(1, math.floor((after - base).total_seconds() / delta_seconds) + 1) * delta
 
-    if delta_seconds <= 0:
+
+def _time_slot(rule: dict, day: date, tz) -> datetime | None:
+    """The slot on that day, or None if the rule skips that weekday."""
+    days = rule.get("days")
+    if days and day.weekday() not in days:
         return None
+    return datetime.combine(day, dt_time(rule["hour"], rule["minute"]), tzinfo=tz)
 
-    elapsed = (now - base).total_seconds()
 
-    if elapsed <= 0:
-        return base + delta
+def _time_slots(schedule: dict, after: datetime, until: datetime) -> tuple[int, datetime | None]:
+    """Slots in (after, until]: their count and the latest one."""
+    rule = schedule["rule"]
+    tz = until.tzinfo
+    first_day, last_day = after.astimezone(tz).date(), until.date()
+    if last_day < first_day:
+        return 0, None
+    weekdays = set(rule.get("days") or range(7))
+    span = (last_day - first_day).days + 1
+    count = span // 7 * len(weekdays)
+    for offset in range(span - span % 7, span):
+        if (first_day + timedelta(days=offset)).weekday() in weekdays:
+            count += 1
+    # The first and last day count in full above; drop their slot if it falls outside the range.
+    for day in {first_day, last_day}:
+        slot = _time_slot(rule, day, tz)
+        if slot is not None and not after < slot <= until:
+            count -= 1
+    if count <= 0:
+        return 0, None
+    for offset in range(8):
+        slot = _time_slot(rule, last_day - timedelta(days=offset), tz)
+        if slot is not None and after < slot <= until:
+            return count, slot
+    return 0, None
 
-    n = max(1, math.floor(elapsed / delta_seconds))
-    candidate = base + n * delta
-    seconds_past = (now - candidate).total_seconds()
 
-    if seconds_past >= 0 and seconds_past <= TRIGGER_TOLERANCE_SEC:
-        return candidate
+def _next_time_slot(schedule: dict, after: datetime) -> datetime | None:
+    for offset in range(9):
+        slot = _time_slot(schedule["rule"], after.date() + timedelta(days=offset), after.tzinfo)
+        if slot is not None and slot > after:
+            return slot
+    return None
 
-    if seconds_past > TRIGGER_TOLERANCE_SEC:
-        return base + (n + 1) * delta
 
-    return candidate
+def _slot_key(schedule: dict) -> tuple | None:
+    """Equal for schedules whose slots fall at the same times."""
+    rule = schedule.get("rule") or {}
+    if schedule.get("rule_type") == "time":
+        return "time", rule.get("hour"), rule.get("minute"), tuple(sorted(rule.get("days") or range(7)))
+    if schedule.get("rule_type") == "interval":
+        delta_seconds = _interval_delta(rule).total_seconds()
+        base_str = schedule.get("interval_base_at") or schedule.get("created_at")
+        if delta_seconds <= 0 or not base_str:
+            return None
+        return "interval", delta_seconds, round(_parse_iso(base_str).timestamp() % delta_seconds)
+    return None
 
 
-def get_next_run(schedule: dict) -> datetime | None:
-    if not schedule.get("enabled", False):
-        return None
+def jitter_offsets(schedules: list[dict]) -> dict[str, float]:
+    """Seconds after each slot that each schedule with jitter runs, by schedule id."""
+    offsets = {}
+    groups: dict[tuple, list[dict]] = {}
+    for schedule in schedules:
+        window = schedule.get("jitter_sec", 0)
+        if not window or not schedule.get("id"):
+            continue
+        if schedule.get("jitter_mode", DEFAULT_JITTER_MODE) == "spread":
+            key = _slot_key(schedule)
+            if key is not None:
+                groups.setdefault((key, window), []).append(schedule)
+                continue
+        # crc32 rather than hash(): the offset must not change between runs of the app.
+        offsets[schedule["id"]] = zlib.crc32(schedule["id"].encode()) / 2 ** 32 * window
+    for (_key, window), group in groups.items():
+        group.sort(key=lambda s: s["id"])
+        for index, schedule in enumerate(group):
+            offsets[schedule["id"]] = window * index / len(group)
+    return offsets
+
+
+def pending_runs(schedule: dict, now: datetime | None = None, offset: float = 0.0) -> tuple[int, datetime | None]:
+    """Slots due since the last one handled: their count and the latest one (without the offset)."""
+    now = now or _now_local()
+    handled = _handled_until(schedule)
+    if handled is None:
+        return 0, None
+    until = now - timedelta(seconds=offset)
     rule_type = schedule.get("rule_type")
     if rule_type == "time":
-        return _next_run_time_based(schedule)
+        return _time_slots(schedule, handled, until)
     if rule_type == "interval":
-        return _next_run_interval_based(schedule)
-    return None
+        return _interval_slots(schedule, handled, until)
+    return 0, None
+
+
+def get_next_run(schedule: dict, offset: float = 0.0) -> datetime | None:
+    """When the latest due slot runs if one is waiting, else when the next one does."""
+    if not schedule.get("enabled", False):
+        return None
+    now = _now_local()
+    count, slot = pending_runs(schedule, now, offset)
+    if not count:
+        rule_type = schedule.get("rule_type")
+        until = now - timedelta(seconds=offset)
+        if rule_type == "time":
+            slot = _next_time_slot(schedule, until)
+        elif rule_type == "interval":
+            slot = _next_interval_slot(schedule, until)
+    return slot + timedelta(seconds=offset) if slot is not None else None
+
+
+def plan_due_run(schedule: dict, now: datetime | None = None, offset: float = 0.0) -> tuple[bool, int, int]:
+    """
+    For a due schedule: whether its latest slot is on time (to run now), how many slots it
+    missed, and how many of those its misfire policy catches up.
+    """
+    now = now or _now_local()
+    count, latest = pending_runs(schedule, now, offset)
+    if not count:
+        return False, 0, 0
+    on_time = (now - latest).total_seconds() - offset <= TRIGGER_TOLERANCE_SEC
+    missed = count - 1 if on_time else count
+    policy = schedule.get("misfire_policy", DEFAULT_MISFIRE_POLICY)
+    if policy == "all":
+        catch_up = min(missed, schedule.get("max_catchup", DEFAULT_MAX_CATCHUP))
+    elif policy == "once":
+        catch_up = 1 if missed and not on_time else 0
+    else:
+        catch_up = 0
+    return on_time, missed, catch_up
+
+
+def mark_schedule_fired(schedule: dict, offset: float = 0.0) -> None:
+    """Marks every slot due so far as handled. The interval base stays put, so slots do not drift."""
+    now = _now_local()
+    _count, latest = pending_runs(schedule, now, offset)
+    schedule["last_triggered_at"] = now.isoformat()
+    schedule["last_slot_at"] = (latest or now).isoformat()
+
+
+class CatchUpQueue:
+    """Missed runs waiting to start, taken in turn from each schedule, CATCHUP_SPACING_SEC apart."""
+
+    def __init__(self):
+        self._pending: dict[str, int] = {}  # schedule id -> runs left, in turn order
+        self._released_at: float | None = None
+
+    def __bool__(self) -> bool:
+        return bool(self._pending)
+
+    def add(self, schedule_id: str, count: int) -> None:
+        if count > 0:
+            self._pending[schedule_id] = self._pending.get(schedule_id, 0) + count
+
+    def discard(self, schedule_id: str) -> None:
+        self._pending.pop(schedule_id, None)
+
+    def pending(self, schedule_id: str) -> int:
+        return self._pending.get(schedule_id, 0)
+
+    def pop_ready(self) -> str | None:
+        """The schedule whose catch-up run starts now, or None if none is waiting or it is too soon."""
+        now = time.monotonic()
+        if not self._pending or (self._released_at is not None and now - self._released_at < CATCHUP_SPACING_SEC):
+            return None
+        schedule_id = next(iter(self._pending))
+        left = self._pending.pop(schedule_id) - 1
+        if left:
+            self._pending[schedule_id] = left  # back of the line
+        self._released_at = now
+        return schedule_id
+
+
+def next_retry_attempt(schedule: dict | None, entry: dict) -> int | None:
+    """The attempt to start after a scheduled run ended, or None if it is not retried."""
+    if not schedule or not schedule.get("enabled") or schedule.get("pipeline_id") or entry.get("pipeline_run_id"):
+        return None
+    if entry.get("status") not in FAILURE_STATUSES:
+        return None
+    attempt = entry.get("attempt", 1)
+    return attempt + 1 if attempt <= schedule.get("max_retries", 0) else None
+
+
+class RetryQueue:
+    """Failed scheduled runs waiting to start again, at most one per schedule."""
+
+    def __init__(self):
+        self._pending: dict[str, tuple[int, float]] = {}  # schedule id -> (attempt, time.monotonic() due)
+
+    def __bool__(self) -> bool:
+        return bool(self._pending)
+
+    def add(self, schedule: dict, attempt: int) -> None:
+        delay = schedule.get("retry_delay_sec", DEFAULT_RETRY_DELAY_SEC)
+        self._pending[schedule["id"]] = (attempt, time.monotonic() + delay)
+
+    def discard(self, schedule_id: str) -> None:
+        self._pending.pop(schedule_id, None)
+
+    def pop_ready(self) -> list[tuple[str, int]]:
+        """(schedule id, attempt) of each retry that is due now."""
+        now = time.monotonic()
+        ready = [(schedule_id, attempt) for schedule_id, (attempt, due) in self._pending.items() if due <= now]
+        for schedule_id, _attempt in ready:
+            del self._pending[schedule_id]
+        return ready
 
 
-def format_next_run(schedule: dict) -> str:
+def format_next_run(schedule: dict, offset: float = 0.0) -> str:
     if not schedule.get("enabled", False):
         return "Disabled"
 
-    next_run = get_next_run(schedule)
+    next_run = get_next_run(schedule, offset)
     if next_run is None:
         return "—"
 
@@ -137,12 +331,12 @@ def format_next_run(schedule: dict) -> str:
     return next_run.strftime("%a %H:%M")
 
 
-def format_next_run_countdown(schedule: dict) -> str:
-    """Second-precision countdown for live display. Returns 'Disabled' when disabled."""
+def format_next_run_countdown(schedule: dict, offset: float = 0.0) -> str:
+    """Second-precision countdown for live display, jitter offset included. Returns 'Disabled' when disabled."""
     if not schedule.get("enabled", False):
         return "Disabled"
 
-    next_run = get_next_run(schedule)
+    next_run = get_next_run(schedule, offset)
     if next_run is None:
         return "—"
 
@@ -192,19 +386,65 @@ def format_rule_display(schedule: dict) -> str:
     return "—"
 
 
-def get_due_schedules(schedules: list[dict]) -> list[dict]:
+def get_due_schedules(schedules: list[dict], offsets: dict[str, float] | None = None) -> list[dict]:
+    """Enabled schedules whose next run is now; offsets from jitter_offsets() (worked out here if not given)."""
+    if offsets is None:
+        offsets = jitter_offsets(schedules)
     now = _now_local()
     due = []
     for schedule in schedules:
         if not schedule.get("enabled", False):
             continue
-        next_run = get_next_run(schedule)
+        next_run = get_next_run(schedule, offsets.get(schedule.get("id"), 0.0))
         if next_run is not None and next_run <= now:
             due.append(schedule)
     due.sort(key=lambda s: s.get("id", ""))
     return due
 
 
+def overlap_action(schedule: dict, running: int) -> str:
+    """
+    What a script schedule firing while `running` instances of its script are live should do:
+    "start", "restart" (kill them, then start), "skip" or "queue".
+    """
+    if running <= 0:
+        return "start"
+    policy = schedule.get("overlap_policy", DEFAULT_OVERLAP_POLICY)
+    if policy == "parallel":
+        return "start" if running < schedule.get("max_instances", DEFAULT_MAX_INSTANCES) else "skip"
+    return policy
+
+
+def format_overlap_policy(schedule: dict) -> str:
+    policy = schedule.get("overlap_policy", DEFAULT_OVERLAP_POLICY)
+    if policy == "parallel":
+        return f"Parallel (max {schedule.get('max_instances', DEFAULT_MAX_INSTANCES)})"
+    return {"restart": "Kill and restart", "skip": "Skip if running", "queue": "Queue one"}.get(policy, policy)
+
+
+def format_misfire_policy(schedule: dict) -> str:
+    policy = schedule.get("misfire_policy", DEFAULT_MISFIRE_POLICY)
+    if policy == "all":
+        return f"Run each (up to {schedule.get('max_catchup', DEFAULT_MAX_CATCHUP)})"
+    return {"once": "Run once", "skip": "Skip"}.get(policy, policy)
+
+
+def format_jitter(schedule: dict) -> str:
+    window = schedule.get("jitter_sec", 0)
+    if not window:
+        return "None"
+    if schedule.get("jitter_mode", DEFAULT_JITTER_MODE) == "spread":
+        return f"Spread over {window}s with same-time schedules"
+    return f"Fixed delay within {window}s"
+
+
+def format_retries(schedule: dict) -> str:
+    retries = schedule.get("max_retries", 0)
+    if not retries:
+        return "None"
+    return f"Up to {retries}, {schedule.get('retry_delay_sec', DEFAULT_RETRY_DELAY_SEC)}s apart"
+
+
 def validate_trigger(script_path: str, project_path: str | None) -> str | None:
     if not project_path:
         return "Project path is not set."
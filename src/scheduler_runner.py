@@ -0,0 +1,571 @@
+"""
+Runs scripts for the scheduler, the same way in the main window and in the headless daemon: history
+entries of every run, the overlap queue, catch-up of missed runs, retries, pipelines and the
+admission and memory limits (see admission.py). The host starts, watches and kills the processes
+(see RunnerHost); everything else happens here. Not thread-safe: the window calls the runner on its
+own thread, the daemon on one worker thread at a time.
+Pure logic module with no UI dependencies.
+"""
+import os
+import time
+from abc import ABC, abstractmethod
+
+from admission import (
+    ADMISSION_RETRY_SEC,
+    MEMORY_CHECK_SEC,
+    MEMORY_LIMIT_MESSAGE,
+    QUEUED_REASON,
+    WAITING_MESSAGE,
+    admission_block,
+    tree_rss_mb,
+)
+from config import load_admission_limits, load_script_memory_limits
+from pipeline_engine import FAILED, STEP_STATE_FOR_STATUS, TIMED_OUT, PipelineRun, resolve_step_script
+from scheduler_data import (
+    SKIPPED_MISFIRE_MESSAGE,
+    SKIPPED_OVERLAP_MESSAGE,
+    create_history_entry,
+    finished_fields,
+    now_iso,
+)
+from scheduler_engine import (
+    CatchUpQueue,
+    RetryQueue,
+    get_due_schedules,
+    jitter_offsets,
+    mark_schedule_fired,
+    next_retry_attempt,
+    overlap_action,
+    plan_due_run,
+    validate_trigger,
+)
+from scheduler_storage import (
+    append_history_entry,
+    load_pipelines,
+    load_schedules,
+    save_fired_schedules,
+    take_run_exit_code,
+    update_history_entry,
+)
+
+
+class RunnerHost(ABC):
+    """
+    What SchedulerRunner needs from its host (GUI or daemon): the processes of runs, plus hooks for
+    the host's display, notifications and log. A run is described by its entry in SchedulerRunner.runs.
+    """
+
+    project_path: str | None = None
+
+    @abstractmethod
+    def launch(self, run_id: str, run: dict) -> None:
+        """Starts the captured process of a run whose history entry exists. Raises on failure."""
+
+    @abstractmethod
+    def alive(self, run_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def pids(self, run_id: str) -> list[int]:
+        """The run's process tree, for the admission and memory limits."""
+
+    @abstractmethod
+    def kill_process(self, run_id: str) -> None:
+        """Kills a run's process tree; returns once it is gone."""
+
+    def run_ended(self, run_id: str, run: dict, fields: dict) -> None:
+        """Called after a run ended on its own or was killed, with the history fields recorded for it."""
+
+    def script_changed(self, script_path: str) -> None:
+        """Called when a run of the script starts, ends, starts waiting or stops waiting."""
+
+    def schedule_event(
+        self, event_type: str, schedule: dict, script_name: str | None = None, error_message: str | None = None,
+    ) -> None:
+        """A scheduled run started ("start") or could not be started ("error")."""
+
+    def history_changed(self) -> None:
+        pass
+
+    def log(self, message: str) -> None:
+        pass
+
+
+class SchedulerRunner:
+    """Runs, waiting runs, queued and missed scheduled runs, retries and pipeline runs of one host."""
+
+    def __init__(self, host: RunnerHost):
+        self.host = host
+        # run id -> {"script_path", "schedule_id", "schedule_name", "attempt", "pipeline_run_id", "started_at"}
+        self.runs: dict[str, dict] = {}
+        # run id -> {"script_path", "schedule_id", "schedule_name", "triggered_at", "attempt"}, waiting for resources, oldest first
+        self.waiting: dict[str, dict] = {}
+        self.queued: dict[str, tuple[dict, str, int]] = {}  # schedule id -> (schedule, triggered_at, attempt), waiting for its script
+        self.catch_up = CatchUpQueue()
+        self.retries = RetryQueue()
+        self.pipeline_runs: list[PipelineRun] = []
+        self._admission_checked_at = 0.0
+        self._memory_checked_at = 0.0
+
+    def path_runs(self, script_path: str) -> list[str]:
+        """Ids of the live runs of a script, oldest first."""
+        return [
+            run_id for run_id, run in self.runs.items()
+            if run["script_path"] == script_path and self.host.alive(run_id)
+        ]
+
+    def waiting_runs(self, script_path: str) -> list[str]:
+        """Ids of the runs of a script waiting for resources."""
+        return [run_id for run_id, waiting in self.waiting.items() if waiting["script_path"] == script_path]
+
+    def pipeline_schedule_running(self, schedule_id: str) -> bool:
+        return any(run.schedule_id == schedule_id for run in self.pipeline_runs)
+
+    def admission_block(self) -> str | None:
+        """Why a run cannot start now (see admission.py), or None."""
+        limits = load_admission_limits()
+        if not any(limits.values()):
+            return None
+        running = [self.host.pids(run_id) for run_id in self.runs if self.host.alive(run_id)]
+        return admission_block(limits, running)
+
+    # ------------------------------------------------------------------
+    # Passes
+    # ------------------------------------------------------------------
+
+    def check_runs(self) -> bool:
+        """
+        Records ended runs, starts the oldest waiting run once there is room and kills runs over their
+        memory limit. Returns True if runs started or ended.
+        """
+        changed = self.reap()
+        if self.waiting:
+            changed = self._start_waiting() or changed
+        if time.monotonic() - self._memory_checked_at >= MEMORY_CHECK_SEC:
+            self._memory_checked_at = time.monotonic()
+            changed = self._enforce_memory_limits() or changed
+        return changed
+
+    def tick(self, fire: bool = True) -> bool:
+        """
+        One scheduler pass: queued runs, pipeline steps, catch-up runs and retries, then (if fire)
+        the schedules that are due. Returns True if anything started or was recorded.
+        """
+        changed = False
+        if self.queued:
+            changed = self._start_queued() or changed
+        if self.pipeline_runs:
+            changed = self._advance_pipelines() or changed
+        if not self.host.project_path or not (fire or self.catch_up or self.retries):
+            return changed
+        schedules = load_schedules()
+        if self.catch_up:
+            changed = self._start_catch_up(schedules) or changed
+        if self.retries:
+            changed = self._start_retries(schedules) or changed
+        if not fire:
+            return changed
+        offsets = jitter_offsets(schedules)
+        due = get_due_schedules(schedules, offsets)
+        if not due:
+            return changed
+        for schedule in due:
+            offset = offsets.get(schedule["id"], 0.0)
+            on_time, missed, catch_up = plan_due_run(schedule, offset=offset)
+            mark_schedule_fired(schedule, offset)
+            if on_time:
+                self.execute_scheduled_run(schedule)
+            if missed > catch_up:
+                self._record_skipped(schedule, now_iso(), SKIPPED_MISFIRE_MESSAGE.format(count=missed - catch_up))
+            if catch_up:
+                self.catch_up.add(schedule["id"], catch_up)
+                self.host.log(f"Schedule '{schedule['name']}' missed {missed} run(s); catching up {catch_up}")
+        save_fired_schedules(due)
+        return True
+
+    def _start_catch_up(self, schedules: list[dict]) -> bool:
+        """Starts the next catch-up run when its turn comes. Returns True if one was due."""
+        schedule_id = self.catch_up.pop_ready()
+        if schedule_id is None:
+            return False
+        schedule = next((s for s in schedules if s.get("id") == schedule_id and s.get("enabled")), None)
+        if schedule is None:
+            self.catch_up.discard(schedule_id)  # deleted or disabled since
+            return False
+        self.execute_scheduled_run(schedule)
+        return True
+
+    def _start_retries(self, schedules: list[dict]) -> bool:
+        """Starts the retries that are due. Returns True if any was."""
+        ready = self.retries.pop_ready()
+        for schedule_id, attempt in ready:
+            schedule = next((s for s in schedules if s.get("id") == schedule_id and s.get("enabled")), None)
+            if schedule is not None:  # else deleted or disabled since
+                self.host.log(f"Schedule '{schedule['name']}' retrying (attempt {attempt})")
+                self.execute_scheduled_run(schedule, attempt)
+        return bool(ready)
+
+    def _queue_retry(self, run: dict, status: str) -> None:
+        """Queues a retry of a scheduled run that ended with status, if its schedule retries it."""
+        if not run["schedule_id"]:
+            return
+        schedule = next((s for s in load_schedules() if s.get("id") == run["schedule_id"]), None)
+        entry = {"status": status, "attempt": run["attempt"], "pipeline_run_id": run["pipeline_run_id"]}
+        attempt = next_retry_attempt(schedule, entry)
+        if attempt is not None:
+            self.retries.add(schedule, attempt)
+
+    # ------------------------------------------------------------------
+    # Scheduled runs
+    # ------------------------------------------------------------------
+
+    def execute_scheduled_run(self, schedule: dict, attempt: int = 1) -> None:
+        """Fires a schedule now, following its overlap policy while its script is still running."""
+        name = schedule["name"]
+        if schedule.get("pipeline_id"):
+            try:
+                self.start_pipeline(schedule["pipeline_id"], schedule["id"], name)
+            except LookupError as exc:
+                self.host.schedule_event("error", schedule, script_name=str(exc), error_message=str(exc))
+                self.host.log(f"Schedule '{name}' failed: {exc}")
+            return
+        script_path = schedule["script_path"]
+        triggered_at = now_iso()
+        error = validate_trigger(script_path, self.host.project_path)
+        if error:
+            append_history_entry(create_history_entry(
+                schedule_id=schedule["id"],
+                schedule_name=name,
+                script_path=script_path,
+                triggered_at=triggered_at,
+                started_at=None,
+                status="failed",
+                error_message=error,
+                attempt=attempt,
+            ))
+            self.host.history_changed()
+            self.host.schedule_event("error", schedule, script_name=None if script_path else error, error_message=error)
+            self.host.log(f"Schedule '{name}' failed: {error}")
+            return
+
+        action = overlap_action(schedule, len(self.path_runs(script_path)))
+        if action == "skip" or (action == "queue" and schedule["id"] in self.queued):
+            self._record_skipped(schedule, triggered_at)
+            return
+        if action == "queue":
+            self.queued[schedule["id"]] = (dict(schedule), triggered_at, attempt)
+            self.host.log(f"Schedule '{name}' queued: {os.path.basename(script_path)} is still running")
+            return
+        if action == "restart":
+            for run_id in self.path_runs(script_path):
+                self.kill_run(run_id)
+        run_id = self._start_scheduled_run(schedule, triggered_at, attempt)
+        if run_id is not None and run_id not in self.waiting:
+            self.host.log(f"Schedule '{name}' started {os.path.basename(script_path)} (run {run_id})")
+
+    def _start_scheduled_run(self, schedule: dict, triggered_at: str, attempt: int) -> str | None:
+        try:
+            run_id = self.request_run(schedule["script_path"], schedule["id"], schedule["name"], triggered_at, attempt)
+        except Exception as exc:
+            self.host.schedule_event("error", schedule, error_message=str(exc))
+            self.host.log(f"Schedule '{schedule['name']}' failed: {exc}")
+            return None
+        self.host.schedule_event("start", schedule)
+        return run_id
+
+    def _record_skipped(self, schedule: dict, triggered_at: str, message: str = SKIPPED_OVERLAP_MESSAGE) -> None:
+        append_history_entry(create_history_entry(
+            schedule_id=schedule["id"],
+            schedule_name=schedule["name"],
+            script_path=schedule.get("script_path", ""),
+            triggered_at=triggered_at,
+            started_at=None,
+            status="skipped",
+            error_message=message,
+        ))
+        self.host.history_changed()
+        self.host.log(f"Schedule '{schedule['name']}' {message[0].lower()}{message[1:]}")
+
+    def _start_queued(self) -> bool:
+        """Starts queued runs whose script is free. Returns True if any started."""
+        started = False
+        for schedule_id, (schedule, triggered_at, attempt) in list(self.queued.items()):
+            if self.path_runs(schedule["script_path"]):
+                continue
+            del self.queued[schedule_id]
+            run_id = self._start_scheduled_run(schedule, triggered_at, attempt)
+            if run_id is None:
+                continue
+            started = True
+            if run_id not in self.waiting:
+                self.host.log(f"Schedule '{schedule['name']}' started its queued run (run {run_id})")
+        return started
+
+    # ------------------------------------------------------------------
+    # Runs
+    # ------------------------------------------------------------------
+
+    def request_run(
+        self, script_path: str, schedule_id: str = "", schedule_name: str = "Manual Run",
+        triggered_at: str | None = None, attempt: int = 1,
+    ) -> str:
+        """
+        Starts a run (manual unless given a schedule), or queues it while the machine is over its
+        admission limits. Returns the run id; raises on failure.
+        """
+        triggered_at = triggered_at or now_iso()
+        reason = QUEUED_REASON if self.waiting else self.admission_block()
+        if reason is None:
+            return self._start_run(script_path, schedule_id, schedule_name, triggered_at, attempt=attempt)
+        entry = create_history_entry(
+            schedule_id=schedule_id,
+            schedule_name=schedule_name,
+            script_path=script_path,
+            triggered_at=triggered_at,
+            started_at=None,
+            status="waiting",
+            error_message=WAITING_MESSAGE.format(reason=reason),
+            attempt=attempt,
+        )
+        append_history_entry(entry)
+        self.host.history_changed()
+        self.waiting[entry["id"]] = {
+            "script_path": script_path, "schedule_id": schedule_id, "schedule_name": schedule_name,
+            "triggered_at": triggered_at, "attempt": attempt,
+        }
+        self.host.script_changed(script_path)
+        self.host.log(f"{os.path.basename(script_path)} is waiting for resources: {reason} (run {entry['id']})")
+        return entry["id"]
+
+    def _start_run(
+        self, script_path: str, schedule_id: str, schedule_name: str, triggered_at: str,
+        pipeline_run: dict | None = None, run_id: str | None = None, attempt: int = 1,
+    ) -> str:
+        """
+        Launches a run and records it in history (run_id: the entry of a run that was waiting for
+        resources). Returns the run id; raises (after recording the failure).
+        """
+        started_at = now_iso()
+        if run_id is None:
+            entry = create_history_entry(
+                schedule_id=schedule_id,
+                schedule_name=schedule_name,
+                script_path=script_path,
+                triggered_at=triggered_at,
+                started_at=started_at,
+                status="started",
+                pipeline_run=pipeline_run,
+                attempt=attempt,
+            )
+            append_history_entry(entry)
+            run_id = entry["id"]
+        else:
+            update_history_entry(run_id, {"status": "started", "started_at": started_at, "error_message": None})
+        self.host.history_changed()
+        run = {
+            "script_path": script_path,
+            "schedule_id": schedule_id,
+            "schedule_name": schedule_name,
+            "attempt": attempt,
+            "pipeline_run_id": (pipeline_run or {}).get("pipeline_run_id"),
+            "started_at": started_at,
+        }
+        try:
+            self.host.launch(run_id, run)
+        except Exception as exc:
+            update_history_entry(run_id, {
+                "status": "failed",
+                "started_at": None,
+                "error_message": str(exc),
+            })
+            raise
+        self.runs[run_id] = run
+        self.host.script_changed(script_path)
+        return run_id
+
+    def _start_waiting(self) -> bool:
+        """Starts the oldest waiting run once there is room; at most one per ADMISSION_RETRY_SEC. Returns True if it started."""
+        if time.monotonic() - self._admission_checked_at < ADMISSION_RETRY_SEC:
+            return False
+        self._admission_checked_at = time.monotonic()
+        run_id = next(iter(self.waiting))
+        reason = self.admission_block()
+        if reason:
+            update_history_entry(run_id, {"error_message": WAITING_MESSAGE.format(reason=reason)})
+            return False
+        waiting = self.waiting.pop(run_id)
+        name = os.path.basename(waiting["script_path"])
+        try:
+            self._start_run(
+                waiting["script_path"], waiting["schedule_id"], waiting["schedule_name"], waiting["triggered_at"],
+                run_id=run_id, attempt=waiting["attempt"],
+            )
+        except Exception as exc:
+            self.host.script_changed(waiting["script_path"])
+            self.host.log(f"{name} failed to start: {exc}")
+            return True
+        self.host.log(f"Started waiting run {run_id} of {name}")
+        return True
+
+    def cancel_waiting(self, run_id: str, status: str = "killed") -> None:
+        waiting = self.waiting.pop(run_id)
+        update_history_entry(run_id, {"status": status, "finished_at": now_iso(), "error_message": None})
+        self.host.history_changed()
+        self.host.script_changed(waiting["script_path"])
+        self.host.log(f"Dropped waiting run {run_id} of {os.path.basename(waiting['script_path'])}")
+
+    def cancel_all_waiting(self) -> None:
+        for run_id in list(self.waiting):
+            self.cancel_waiting(run_id)
+
+    def kill_run(self, run_id: str, status: str = "killed", message: str | None = None) -> bool:
+        """
+        Kills a run, or drops it if it is waiting for resources, and records it with status (and error
+        message). Returns False if there is no such run.
+        """
+        if run_id in self.waiting:
+            self.cancel_waiting(run_id, status)
+            return True
+        run = self.runs.pop(run_id, None)
+        if run is None:
+            return False
+        fields = {"status": status, "finished_at": now_iso()}
+        if message:
+            fields["error_message"] = message
+        update_history_entry(run_id, fields)
+        self.host.history_changed()
+        self._pipeline_step_ended(run_id, status)
+        self.host.kill_process(run_id)
+        take_run_exit_code(run_id)  # the status is already set
+        self.host.run_ended(run_id, run, fields)
+        self.host.script_changed(run["script_path"])
+        self.host.log(f"Killed {os.path.basename(run['script_path'])} (run {run_id})")
+        return True
+
+    def kill_script(self, script_path: str, status: str = "killed") -> bool:
+        """Kills every live run of a script and drops its waiting ones. Returns False if it had none."""
+        run_ids = self.path_runs(script_path) + self.waiting_runs(script_path)
+        for run_id in run_ids:
+            self.kill_run(run_id, status)
+        return bool(run_ids)
+
+    def kill_all(self) -> None:
+        """Drops the waiting runs and kills the live ones, e.g. when the host shuts down."""
+        self.cancel_all_waiting()
+        for run_id in list(self.runs):
+            self.kill_run(run_id)
+
+    def reap(self) -> bool:
+        """Records runs that ended on their own with their script's outcome. Returns True if any ended."""
+        ended = [run_id for run_id in self.runs if not self.host.alive(run_id)]
+        for run_id in ended:
+            run = self.runs.pop(run_id)
+            fields = finished_fields(take_run_exit_code(run_id))
+            update_history_entry(run_id, fields)
+            self._pipeline_step_ended(run_id, fields["status"])
+            self._queue_retry(run, fields["status"])
+            self.host.run_ended(run_id, run, fields)
+            self.host.script_changed(run["script_path"])
+            self.host.log(f"{os.path.basename(run['script_path'])} {fields['status']} (run {run_id})")
+        if ended:
+            self.host.history_changed()
+        return bool(ended)
+
+    def _enforce_memory_limits(self) -> bool:
+        """Kills runs over their script's memory limit. Returns True if any was killed."""
+        limits = load_script_memory_limits()
+        if not limits:
+            return False
+        killed = False
+        for run_id, run in list(self.runs.items()):
+            limit_mb = limits.get(run["script_path"])
+            if not limit_mb or not self.host.alive(run_id):
+                continue
+            rss_mb = tree_rss_mb(self.host.pids(run_id))
+            if rss_mb > limit_mb:
+                self.kill_run(run_id, message=MEMORY_LIMIT_MESSAGE.format(rss_mb=rss_mb, limit_mb=limit_mb))
+                killed = True
+        return killed
+
+    # ------------------------------------------------------------------
+    # Pipelines
+    # ------------------------------------------------------------------
+
+    def start_pipeline(self, pipeline_id: str, schedule_id: str = "", schedule_name: str | None = None) -> PipelineRun:
+        """Starts a run of the pipeline; its steps start on the next passes. Raises LookupError if it does not exist."""
+        pipeline = next((p for p in load_pipelines() if p.get("id") == pipeline_id), None)
+        if pipeline is None:
+            raise LookupError(f"Pipeline not found: {pipeline_id}")
+        run = PipelineRun(pipeline, schedule_id, schedule_name)
+        self.pipeline_runs.append(run)
+        self.host.log(f"Pipeline '{pipeline['name']}' started (pipeline run {run.id})")
+        return run
+
+    def _pipeline_step_ended(self, history_id: str, status: str) -> None:
+        for run in self.pipeline_runs:
+            step_id = run.step_for_history(history_id)
+            if step_id is not None:
+                run.step_finished(step_id, STEP_STATE_FOR_STATUS.get(status, FAILED))
+                return
+
+    def _advance_pipelines(self) -> bool:
+        """Kills timed-out steps, records skipped ones and starts ready ones. Returns True if anything changed."""
+        changed = False
+        for run in list(self.pipeline_runs):
+            for step_id in run.timed_out_steps():
+                self.kill_run(run.history_ids[step_id], status="timed_out")
+                run.step_finished(step_id, TIMED_OUT)
+                changed = True
+            for step_id in run.resolve_skips():
+                append_history_entry(create_history_entry(
+                    schedule_id=run.schedule_id,
+                    schedule_name=run.name,
+                    script_path=resolve_step_script(run.steps[step_id], self.host.project_path),
+                    triggered_at=run.triggered_at,
+                    started_at=None,
+                    status="skipped",
+                    error_message=run.skip_reasons[step_id],
+                    pipeline_run=run.history_fields(step_id),
+                ))
+                changed = True
+            for step in run.ready_steps():
+                changed = self._start_pipeline_step(run, step) or changed
+            if run.done:
+                self.pipeline_runs.remove(run)
+                self.host.log(f"Pipeline '{run.name}' finished: {run.summary()} (pipeline run {run.id})")
+        if changed:
+            self.host.history_changed()
+        return changed
+
+    def _start_pipeline_step(self, run: PipelineRun, step: dict) -> bool:
+        """
+        Starts one step. Returns False if it has to wait: its script is busy with another run, or there
+        is no room under the admission limits (steps never take a waiting entry of their own).
+        """
+        script_path = resolve_step_script(step, self.host.project_path)
+        error = validate_trigger(script_path, self.host.project_path)
+        if error:
+            append_history_entry(create_history_entry(
+                schedule_id=run.schedule_id,
+                schedule_name=run.name,
+                script_path=script_path,
+                triggered_at=run.triggered_at,
+                started_at=None,
+                status="failed",
+                error_message=error,
+                pipeline_run=run.history_fields(step["id"]),
+            ))
+            run.step_finished(step["id"], FAILED)
+            return True
+        if self.path_runs(script_path) or self.waiting or self.admission_block():
+            return False  # busy, or no room: the step stays pending
+        try:
+            run_id = self._start_run(
+                script_path, run.schedule_id, run.name, run.triggered_at, run.history_fields(step["id"]),
+            )
+        except Exception as exc:
+            run.step_finished(step["id"], FAILED)
+            self.host.log(f"Pipeline '{run.name}' step '{step['id']}' failed: {exc}")
+            return True
+        run.step_started(step["id"], run_id)
+        return True
@@ -1,23 +1,45 @@
 """
 Persistence for schedules, run history, and terminal logs.
 All live under a "Scheduler" folder next to config.json (same dir as .exe or repo root).
-JSON files: Scheduler/schedules.json, Scheduler/scheduler_history.json, Scheduler/history_logs.json.
-Temporary .log files: Scheduler/logs/<run_id>.log
+JSON files: Scheduler/schedules.json, Scheduler/pipelines.json, Scheduler/scheduler_history.json,
+Scheduler/history_logs.json.
+Logs are stored as plain text; ANSI color/attribute runs stripped from them are kept separately in
+Scheduler/history_log_styles.json as [start, length, fg, bg, flags] lists (see ansi.py). Both are
+written once per run, when it ends, and pruned together with the history entries they belong to.
+Temporary .log files: Scheduler/logs/<run_id>.log; until a run's log is stored, it is read from there.
+Scheduler/daemon.json describes the headless scheduler daemon while it runs (see daemon.py).
+The GUI, the headless daemon and the CLI may use these files at the same time: every read and write
+holds storage_lock(), which also spans processes (Scheduler/storage.lock), and callers that load,
+change and save a file hold it around the whole sequence. The daemon holds Scheduler/daemon.lock
+for as long as it runs.
 """
 import json
 import os
 import threading
+import time
+from contextlib import contextmanager
 
+from ansi import AnsiParser, StyledText
 from config import get_config_path
+import perf
 from scheduler_data import HISTORY_RETENTION
 
 SCHEDULES_FILENAME = "schedules.json"
 HISTORY_FILENAME = "scheduler_history.json"
 HISTORY_LOGS_FILENAME = "history_logs.json"
+HISTORY_LOG_STYLES_FILENAME = "history_log_styles.json"
+DAEMON_STATUS_FILENAME = "daemon.json"
+PIPELINES_FILENAME = "pipelines.json"
+DIAGNOSTICS_LOG_FILENAME = "diagnostics-{process}.log"
+STORAGE_LOCK_FILENAME = "storage.lock"
+DAEMON_LOCK_FILENAME = "daemon.lock"
+DAEMON_HEARTBEAT_TIMEOUT = 15  # seconds without a status update before the daemon counts as gone
 SCHEDULER_FOLDER = "Scheduler"
 LOGS_SUBFOLDER = "logs"
 
-_history_logs_lock = threading.Lock()
+_storage_lock = threading.RLock()
+_storage_lock_depth = 0
+_storage_lock_file = None
 
 
 def _get_storage_dir() -> str:
@@ -33,123 +55,239 @@ def _storage_path(filename: str) -> str:
     return os.path.join(_get_storage_dir(), filename)
 
 
-def load_schedules() -> list[dict]:
-    path = _storage_path(SCHEDULES_FILENAME)
-    if not os.path.isfile(path):
-        return []
+def _open_lock_file(filename: str):
+    path = _storage_path(filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return open(path, "a+b")
+
+
+def _lock_file(f, blocking: bool = True) -> bool:
+    """Takes an exclusive lock on an open lock file. Returns False if blocking is False and another holds it."""
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.01)
+    import fcntl
     try:
-        with open(path, encoding="utf-8") as f:
-            data = json.load(f)
-        if isinstance(data, dict) and isinstance(data.get("schedules"), list):
-            return data["schedules"]
-    except (json.JSONDecodeError, OSError):
-        pass
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _unlock_file(f) -> None:
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    finally:
+        f.close()
+
+
+@contextmanager
+def storage_lock():
+    """
+    Serializes access to the Scheduler JSON files between threads and between processes.
+    Re-entrant, so a load-change-save sequence can hold it around calls that take it themselves.
+    """
+    global _storage_lock_depth, _storage_lock_file
+    with _storage_lock:
+        if _storage_lock_depth == 0:
+            f = _open_lock_file(STORAGE_LOCK_FILENAME)
+            _lock_file(f)
+            _storage_lock_file = f
+        _storage_lock_depth += 1
+        try:
+            yield
+        finally:
+            _storage_lock_depth -= 1
+            if _storage_lock_depth == 0:
+                f, _storage_lock_file = _storage_lock_file, None
+                _unlock_file(f)
+
+
+def _load_json(filename: str):
+    """Parsed contents of a Scheduler file, or None if it is missing or unreadable."""
+    path = _storage_path(filename)
+    with storage_lock():
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None
+
+
+def _save_json(filename: str, data, compact: bool = False) -> None:
+    path = _storage_path(filename)
+    with storage_lock():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            if compact:
+                json.dump(data, f, separators=(",", ":"))
+            else:
+                json.dump(data, f, indent=2)
+
+
+@perf.timed("storage.load_schedules")
+def load_schedules() -> list[dict]:
+    data = _load_json(SCHEDULES_FILENAME)
+    if isinstance(data, dict) and isinstance(data.get("schedules"), list):
+        return data["schedules"]
     return []
 
 
+@perf.timed("storage.save_schedules")
 def save_schedules(schedules: list[dict]) -> None:
-    path = _storage_path(SCHEDULES_FILENAME)
-    storage_dir = os.path.dirname(path)
-    if storage_dir:
-        os.makedirs(storage_dir, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({"schedules": schedules}, f, indent=2)
+    _save_json(SCHEDULES_FILENAME, {"schedules": schedules})
+
+
+def save_fired_schedules(fired: list[dict]) -> None:
+    """Saves the fire times of schedules that just fired, keeping edits saved since they were loaded."""
+    by_id = {s["id"]: s for s in fired}
+    with storage_lock():
+        schedules = load_schedules()
+        for schedule in schedules:
+            done = by_id.get(schedule.get("id"))
+            if done is not None:
+                for key in ("last_triggered_at", "last_slot_at"):
+                    if key in done:
+                        schedule[key] = done[key]
+        save_schedules(schedules)
+
+
+@perf.timed("storage.load_pipelines")
+def load_pipelines() -> list[dict]:
+    data = _load_json(PIPELINES_FILENAME)
+    if isinstance(data, dict) and isinstance(data.get("pipelines"), list):
+        return data["pipelines"]
+    return []
 
 
+def save_pipelines(pipelines: list[dict]) -> None:
+    _save_json(PIPELINES_FILENAME, {"pipelines": pipelines})
+
+
+@perf.timed("storage.load_history")
 def load_history() -> list[dict]:
-    path = _storage_path(HISTORY_FILENAME)
-    if not os.path.isfile(path):
-        return []
-    try:
-        with open(path, encoding="utf-8") as f:
-            data = json.load(f)
-        if isinstance(data, dict) and isinstance(data.get("runs"), list):
-            return data["runs"]
-    except (json.JSONDecodeError, OSError):
-        pass
+    data = _load_json(HISTORY_FILENAME)
+    if isinstance(data, dict) and isinstance(data.get("runs"), list):
+        return data["runs"]
     return []
 
 
+@perf.timed("storage._save_history")
 def _save_history(runs: list[dict]) -> None:
-    path = _storage_path(HISTORY_FILENAME)
-    storage_dir = os.path.dirname(path)
-    if storage_dir:
-        os.makedirs(storage_dir, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({"runs": runs}, f, indent=2)
+    _save_json(HISTORY_FILENAME, {"runs": runs})
 
 
 def append_history_entry(entry: dict) -> None:
-    runs = load_history()
-    runs.append(entry)
-    if len(runs) > HISTORY_RETENTION:
-        runs = runs[-HISTORY_RETENTION:]
-    _save_history(runs)
+    with storage_lock():
+        runs = load_history()
+        runs.append(entry)
+        if len(runs) > HISTORY_RETENTION:
+            runs = runs[-HISTORY_RETENTION:]
+        _save_history(runs)
 
 
 def update_history_entry(entry_id: str, updates: dict) -> None:
-    runs = load_history()
-    for run in runs:
-        if run.get("id") == entry_id:
-            run.update(updates)
-            break
-    _save_history(runs)
+    with storage_lock():
+        runs = load_history()
+        for run in runs:
+            if run.get("id") == entry_id:
+                run.update(updates)
+                break
+        _save_history(runs)
+
+
+def _load_capture_file(run_id: str) -> tuple[str, list[list]] | None:
+    """(text, style runs) of a log that is still being captured (or whose capture never finished)."""
+    try:
+        with open(os.path.join(_get_logs_dir(), f"{run_id}.log"), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    styled = StyledText()
+    styled.add(AnsiParser().feed(data.decode("utf-8", errors="replace")))
+    return styled.text, styled.runs
 
 
+@perf.timed("storage.load_log")
 def load_log(run_id: str) -> str:
-    with _history_logs_lock:
-        path = _storage_path(HISTORY_LOGS_FILENAME)
-        if not os.path.isfile(path):
-            return ""
-        try:
-            with open(path, encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, dict):
-                return data.get(run_id, "") or ""
-        except (json.JSONDecodeError, OSError):
-            pass
-        return ""
+    data = _load_json(HISTORY_LOGS_FILENAME)
+    text = (data.get(run_id, "") or "") if isinstance(data, dict) else ""
+    if not text:
+        captured = _load_capture_file(run_id)
+        if captured is not None:
+            text = captured[0]
+    return text
 
 
-def append_log(run_id: str, text: str) -> None:
-    with _history_logs_lock:
-        path = _storage_path(HISTORY_LOGS_FILENAME)
-        data = {}
-        if os.path.isfile(path):
-            try:
-                with open(path, encoding="utf-8") as f:
-                    data = json.load(f)
-                if not isinstance(data, dict):
-                    data = {}
-            except (json.JSONDecodeError, OSError):
-                data = {}
-        data[run_id] = data.get(run_id, "") + text
-        storage_dir = os.path.dirname(path)
-        if storage_dir:
-            os.makedirs(storage_dir, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+@perf.timed("storage.load_log_styles")
+def load_log_styles(run_id: str) -> list[list]:
+    """Style runs for the log of run_id ([] when the output had no ANSI styling)."""
+    data = _load_json(HISTORY_LOG_STYLES_FILENAME)
+    if isinstance(data, dict) and isinstance(data.get(run_id), list):
+        return data[run_id]
+    captured = _load_capture_file(run_id)
+    return captured[1] if captured is not None else []
 
 
-def replace_log(run_id: str, content: str) -> None:
-    """Replace the entire log for run_id with content. Used when reading from temp file."""
-    with _history_logs_lock:
-        path = _storage_path(HISTORY_LOGS_FILENAME)
+def _replace_log_styles(run_id: str, styles: list[list] | None, kept: set[str] | None) -> None:
+    data = _load_json(HISTORY_LOG_STYLES_FILENAME)
+    if not isinstance(data, dict):
         data = {}
-        if os.path.isfile(path):
-            try:
-                with open(path, encoding="utf-8") as f:
-                    data = json.load(f)
-                if not isinstance(data, dict):
-                    data = {}
-            except (json.JSONDecodeError, OSError):
-                data = {}
+    dropped = [rid for rid in data if rid not in kept] if kept is not None else []
+    if not styles and run_id not in data and not dropped:
+        return
+    for rid in dropped:
+        del data[rid]
+    if styles:
+        data[run_id] = styles
+    else:
+        data.pop(run_id, None)
+    _save_json(HISTORY_LOG_STYLES_FILENAME, data, compact=True)
+
+
+@perf.timed("storage.replace_log")
+def replace_log(run_id: str, content: str, styles: list[list] | None = None) -> None:
+    """
+    Replace the entire log for run_id with content (and its ANSI style runs). Used when reading from
+    temp file. Logs and styles of runs no longer in the history are dropped at the same time.
+    """
+    with storage_lock():
+        data = _load_json(HISTORY_LOGS_FILENAME)
+        if not isinstance(data, dict):
+            data = {}
         data[run_id] = content
-        storage_dir = os.path.dirname(path)
-        if storage_dir:
-            os.makedirs(storage_dir, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        kept = None
+        if len(data) > HISTORY_RETENTION:
+            kept = {run.get("id") for run in load_history()}
+            kept.add(run_id)
+            for rid in [rid for rid in data if rid not in kept]:
+                del data[rid]
+        _save_json(HISTORY_LOGS_FILENAME, data)
+        _replace_log_styles(run_id, styles, kept)
+
+
+def get_diagnostics_log_path(process: str) -> str:
+    """
+    Rotating log of main-loop stalls (see lag_watchdog), in the Scheduler folder. Each process ("gui",
+    "daemon") has its own, since a RotatingFileHandler must be the only writer of its file.
+    """
+    return _storage_path(DIAGNOSTICS_LOG_FILENAME.format(process=process))
 
 
 def get_run_log_file_path(run_id: str) -> str:
@@ -157,3 +295,91 @@ def get_run_log_file_path(run_id: str) -> str:
     logs_dir = _get_logs_dir()
     os.makedirs(logs_dir, exist_ok=True)
     return os.path.join(logs_dir, f"{run_id}.log")
+
+
+def get_run_exit_file_path(run_id: str) -> str:
+    """Path the launcher writes the script's exit code to. Lives in Scheduler/logs/."""
+    logs_dir = _get_logs_dir()
+    os.makedirs(logs_dir, exist_ok=True)
+    return os.path.join(logs_dir, f"{run_id}.exit")
+
+
+def take_run_exit_code(run_id: str) -> int | None:
+    """Reads and removes a finished run's exit code file. None if it was not written."""
+    path = os.path.join(_get_logs_dir(), f"{run_id}.exit")
+    try:
+        with open(path, encoding="utf-8") as f:
+            value = f.read().strip()
+        os.remove(path)
+    except OSError:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def save_daemon_status(status: dict) -> None:
+    """Writes the daemon status with a fresh heartbeat (atomically, the GUI reads it every second)."""
+    path = _storage_path(DAEMON_STATUS_FILENAME)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({**status, "heartbeat": time.time()}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def clear_daemon_status() -> None:
+    try:
+        os.remove(_storage_path(DAEMON_STATUS_FILENAME))
+    except OSError:
+        pass
+
+
+def acquire_daemon_lock():
+    """
+    Takes Scheduler/daemon.lock for the life of a headless daemon. Returns the open lock file (keep it
+    open; closing it or exiting releases the lock), or None if another daemon holds it.
+    """
+    f = _open_lock_file(DAEMON_LOCK_FILENAME)
+    if not _lock_file(f, blocking=False):
+        f.close()
+        return None
+    return f
+
+
+def release_daemon_lock(f) -> None:
+    _unlock_file(f)
+
+
+def _daemon_lock_held() -> bool:
+    try:
+        f = _open_lock_file(DAEMON_LOCK_FILENAME)
+    except OSError:
+        return False
+    if _lock_file(f, blocking=False):
+        _unlock_file(f)
+        return False
+    f.close()
+    return True
+
+
+def load_daemon_status() -> dict | None:
+    """
+    Status of a live headless daemon, or None if none is running. A stale heartbeat only counts as
+    gone once Scheduler/daemon.lock is free too, so a daemon whose loop stalls is not taken over.
+    """
+    path = _storage_path(DAEMON_STATUS_FILENAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    heartbeat = data.get("heartbeat")
+    if not isinstance(heartbeat, (int, float)):
+        return None
+    if time.time() - heartbeat > DAEMON_HEARTBEAT_TIMEOUT and not _daemon_lock_held():
+        return None
+    return data
@@ -22,7 +22,6 @@ from PySide6.QtWidgets import (
     QLabel,
     QLineEdit,
     QMessageBox,
-    QPlainTextEdit,
     QPushButton,
     QRadioButton,
     QScrollArea,
@@ -36,23 +35,77 @@ from PySide6.QtWidgets import (
 
 from scheduler_data import (
     DAY_NAMES,
+    DEFAULT_MAX_CATCHUP,
+    DEFAULT_MAX_INSTANCES,
+    DEFAULT_JITTER_MODE,
+    DEFAULT_MISFIRE_POLICY,
+    DEFAULT_OVERLAP_POLICY,
+    DEFAULT_RETRY_DELAY_SEC,
+    FAILURES_FILTER,
+    MAX_CATCHUP_LIMIT,
+    MAX_INSTANCES_LIMIT,
+    MAX_JITTER_SEC,
     MAX_INTERVAL_HOURS,
     MAX_NAME_LENGTH,
+    MAX_RETRIES_LIMIT,
+    MAX_RETRY_DELAY_SEC,
     create_schedule,
-    now_iso,
+    reset_schedule_clock,
+    run_duration_sec,
+    status_matches,
     validate_schedule,
 )
-from highlighter import ShellHighlighter
-from scheduler_engine import format_next_run_countdown, format_rule_display
-from scheduler_storage import load_history, load_log, load_schedules, save_schedules
+from log_view import LogView
+from metrics import format_elapsed
+from scheduler_engine import (
+    format_jitter,
+    format_misfire_policy,
+    format_next_run_countdown,
+    format_overlap_policy,
+    format_retries,
+    format_rule_display,
+    jitter_offsets,
+)
+from scheduler_storage import (
+    load_history,
+    load_log,
+    load_log_styles,
+    load_pipelines,
+    load_schedules,
+    save_schedules,
+    storage_lock,
+)
 import utils
+import perf
 
-HISTORY_FILTER_OPTIONS = ("All", "started", "killed", "exited", "failed")
+OVERLAP_POLICY_OPTIONS = (
+    ("restart", "Kill it and start again"),
+    ("skip", "Skip this run"),
+    ("queue", "Queue one run for when it ends"),
+    ("parallel", "Start another instance"),
+)
+MISFIRE_POLICY_OPTIONS = (
+    ("once", "Run once when the scheduler is back"),
+    ("all", "Run each missed run"),
+    ("skip", "Skip them"),
+)
+JITTER_OPTIONS = (
+    ("", "Start on time"),
+    ("hash", "Start after a fixed delay of up to"),
+    ("spread", "Spread with same-time schedules over"),
+)
+HISTORY_FILTER_OPTIONS = (
+    "All", FAILURES_FILTER, "waiting", "started", "succeeded", "failed", "timed_out", "killed", "exited", "skipped",
+)
 STATUS_DISPLAY = {
+    "waiting": "WAITING",
     "started": "STARTED",
+    "succeeded": "SUCCEEDED",
     "killed": "KILLED",
     "exited": "EXITED",
     "failed": "FAILED",
+    "timed_out": "TIMED OUT",
+    "skipped": "SKIPPED",
 }
 
 
@@ -65,6 +118,8 @@ class SchedulerContentWidget(QWidget):
         self.setAttribute(Qt.WA_StyledBackground, True)
         self._main = main_window
         self._schedule_row_map: dict[str, "QLabel"] = {}
+        self._jitter_offsets: dict[str, float] = {}
+        self._pipeline_names: dict[str, str] | None = None  # read once per schedules refresh
         self._schedule_status_map: dict[str, "QLabel"] = {}
         self._countdown_timer = QTimer(self)
         self._countdown_timer.timeout.connect(self._countdown_tick)
@@ -84,6 +139,12 @@ class SchedulerContentWidget(QWidget):
         title.setObjectName("detailTitle")
         layout.addWidget(title)
 
+        self._daemon_label = QLabel()
+        self._daemon_label.setObjectName("daemonStatusLabel")
+        self._daemon_label.setWordWrap(True)
+        self._daemon_label.setVisible(False)
+        layout.addWidget(self._daemon_label)
+
         tabs_row = QHBoxLayout()
         tabs_row.setSpacing(4)
         self._schedules_btn = QPushButton("Schedules")
@@ -261,18 +322,11 @@ class SchedulerContentWidget(QWidget):
         log_header.addWidget(close_btn)
         log_layout.addLayout(log_header)
 
-        self._history_log_edit = QPlainTextEdit()
-        self._history_log_edit.setReadOnly(True)
-        self._history_log_edit.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
-        log_font = QFont("Consolas")
-        log_font.setStyleHint(QFont.StyleHint.Monospace)
-        log_font.setPointSize(9)
-        self._history_log_edit.setFont(log_font)
+        self._history_log_edit = LogView(self._palette)
         self._history_log_edit.setPlaceholderText("Select a history entry to view its log.")
-        self._history_log_highlighter = ShellHighlighter(
-            self._history_log_edit.document(), self._palette
-        )
         log_layout.addWidget(self._history_log_edit, 1)
+        self._main.run_log_appended.connect(self._on_run_log_appended)
+        self._main.run_log_finished.connect(self._on_run_log_finished)
 
         splitter.addWidget(self._history_log_viewer_panel)
         splitter.setStretchFactor(0, 0)
@@ -288,8 +342,16 @@ class SchedulerContentWidget(QWidget):
         self._history_log_viewer_panel.setVisible(False)
 
     def update_log_highlighter_palette(self, palette: dict) -> None:
-        if hasattr(self, "_history_log_highlighter"):
-            self._history_log_highlighter.update_palette(palette)
+        if hasattr(self, "_history_log_edit"):
+            self._history_log_edit.update_palette(palette)
+
+    def _on_run_log_appended(self, run_id: str, offset: int, text: str, runs: list) -> None:
+        if run_id == self._selected_history_run_id:
+            self._history_log_edit.append_log(offset, text, runs)
+
+    def _on_run_log_finished(self, run_id: str) -> None:
+        if run_id == self._selected_history_run_id:
+            self._history_log_edit.finish()
 
     def _on_history_row_clicked(self, run):
         self._selected_history_run_id = run.get("id")
@@ -297,16 +359,25 @@ class SchedulerContentWidget(QWidget):
             row_w.setProperty("selected", rid == self._selected_history_run_id)
             row_w.style().unpolish(row_w)
             row_w.style().polish(row_w)
-        log_text = load_log(run["id"]) if run.get("id") else ""
         self._history_log_edit.setPlaceholderText("")
-        self._history_log_edit.setPlainText(log_text if log_text else "No log recorded.")
+        live = self._main.live_log_snapshot(run["id"]) if run.get("id") else None
+        if live is not None:
+            self._history_log_edit.set_log(*live, follow=True)
+        else:
+            log_text = load_log(run["id"]) if run.get("id") else ""
+            if log_text:
+                self._history_log_edit.set_log(log_text, load_log_styles(run["id"]))
+            else:
+                self._history_log_edit.set_log("No log recorded.")
         self._history_log_viewer_panel.setVisible(True)
 
     # ------------------------------------------------------------------
     # Refresh
     # ------------------------------------------------------------------
 
+    @perf.timed("ui.scheduler.refresh_schedules")
     def refresh_schedules(self):
+        self._pipeline_names = None
         self._schedule_row_map.clear()
         self._schedule_status_map.clear()
         while self._schedules_layout.count() > 2:
@@ -317,6 +388,7 @@ class SchedulerContentWidget(QWidget):
                 w.setParent(None)
 
         schedules = load_schedules()
+        self._jitter_offsets = jitter_offsets(schedules)
         distinct_schedule_names = sorted({s.get("name", "") or "" for s in schedules if s.get("name")})
         self._schedules_schedule_name_completer.setModel(QStringListModel(distinct_schedule_names))
 
@@ -360,6 +432,7 @@ class SchedulerContentWidget(QWidget):
             row_w = self._make_schedule_row(schedule)
             self._schedules_layout.insertWidget(self._schedules_layout.count() - 1, row_w)
 
+    @perf.timed("ui.scheduler.refresh_history")
     def refresh_history(self):
         self._history_row_map.clear()
         while self._history_layout.count() > 2:
@@ -400,7 +473,7 @@ class SchedulerContentWidget(QWidget):
 
         filter_status = self._history_filter.currentText()
         if filter_status != "All":
-            runs = [r for r in runs if r.get("status") == filter_status]
+            runs = [r for r in runs if status_matches(r.get("status"), filter_status)]
         schedule_name_filter = self._history_schedule_name_edit.text().strip().lower()
         if schedule_name_filter:
             runs = [r for r in runs if schedule_name_filter in ((r.get("schedule_name", "") or "").lower())]
@@ -426,26 +499,45 @@ class SchedulerContentWidget(QWidget):
             row_w = self._make_history_row(run)
             self._history_layout.insertWidget(self._history_layout.count() - 1, row_w)
 
+    def set_daemon_status(self, status: dict | None) -> None:
+        """Shows whether schedules are being run by a headless daemon instead of this window."""
+        if status is None:
+            self._daemon_label.setVisible(False)
+            return
+        self._daemon_label.setText(
+            f"Schedules are run by the headless scheduler (pid {status.get('pid', '?')}). "
+            "This window shows its history and logs but does not start scheduled runs itself."
+        )
+        self._daemon_label.setVisible(True)
+
+    def on_history_changed(self) -> None:
+        if self.isVisible() and self._tab_stack.currentIndex() == 1:
+            self.refresh_history()
+
     def refresh_current_view(self):
         if self._tab_stack.currentIndex() == 0:
             self.refresh_schedules()
         else:
             self.refresh_history()
 
+    @perf.timed("timer.scheduler_countdown")
     def _countdown_tick(self):
         if not self.isVisible() or self._tab_stack.currentIndex() != 0:
             return
         schedules = load_schedules()
+        offsets = jitter_offsets(schedules)
         for schedule in schedules:
             sid = schedule.get("id")
             next_lbl = self._schedule_row_map.get(sid)
             if next_lbl is not None:
-                next_lbl.setText(format_next_run_countdown(schedule))
+                next_lbl.setText(format_next_run_countdown(schedule, offsets.get(sid, 0.0)))
             status_lbl = self._schedule_status_map.get(sid)
             if status_lbl is not None:
                 script_path = schedule.get("script_path", "")
                 script_row = self._main._get_row(script_path) if script_path else None
                 running = self._main._is_row_running(script_row) if script_row is not None else False
+                running = running or script_path in self._main.daemon_running_paths()
+                running = running or self._main.pipeline_schedule_running(sid)
                 status_lbl.setText("Running" if running else "—")
 
     # ------------------------------------------------------------------
@@ -507,14 +599,22 @@ class SchedulerContentWidget(QWidget):
         grid.addWidget(name_lbl, 0, 0)
 
         script_path = schedule.get("script_path", "")
-        rel = self._relative_script_path(script_path)
-        script_lbl = QLabel(rel)
+        if schedule.get("pipeline_id"):
+            script_lbl = QLabel(f"Pipeline: {self._pipeline_name(schedule['pipeline_id'])}")
+        else:
+            script_lbl = QLabel(self._relative_script_path(script_path))
         grid.addWidget(script_lbl, 0, 1)
 
         rule_lbl = QLabel(format_rule_display(schedule))
+        tooltip = f"Missed runs: {format_misfire_policy(schedule)}\nJitter: {format_jitter(schedule)}"
+        if not schedule.get("pipeline_id"):
+            tooltip = (
+                f"If still running: {format_overlap_policy(schedule)}\nRetries: {format_retries(schedule)}\n{tooltip}"
+            )
+        rule_lbl.setToolTip(tooltip)
         grid.addWidget(rule_lbl, 0, 2)
 
-        next_run_text = format_next_run_countdown(schedule)
+        next_run_text = format_next_run_countdown(schedule, self._jitter_offsets.get(schedule["id"], 0.0))
         next_lbl = QLabel(next_run_text)
         self._schedule_row_map[schedule["id"]] = next_lbl
         grid.addWidget(next_lbl, 0, 3)
@@ -522,6 +622,7 @@ class SchedulerContentWidget(QWidget):
         script_path = schedule.get("script_path", "")
         script_row = self._main._get_row(script_path) if script_path else None
         running = self._main._is_row_running(script_row) if script_row is not None else False
+        running = running or self._main.pipeline_schedule_running(schedule["id"])
         status_lbl = QLabel("Running" if running else "—")
         self._schedule_status_map[schedule["id"]] = status_lbl
         grid.addWidget(status_lbl, 0, 4)
@@ -618,6 +719,11 @@ class SchedulerContentWidget(QWidget):
             time_parts.append(f"Started: {started_str}")
         if finished_str:
             time_parts.append(f"Finished: {finished_str}")
+        duration = run_duration_sec(run)
+        if duration is not None:
+            time_parts.append(f"Duration: {format_elapsed(duration)}")
+        if run.get("attempt", 1) > 1:
+            time_parts.append(f"Attempt: {run['attempt']}")
         time_column_text = "\n".join(time_parts) if time_parts else "—"
         time_lbl = QLabel(time_column_text)
         grid.addWidget(time_lbl, 0, 2)
@@ -630,10 +736,14 @@ class SchedulerContentWidget(QWidget):
         grid.addWidget(status_lbl, 0, 3)
 
         sub_text = None
-        if status == "failed":
+        if status in ("failed", "skipped"):
             sub_text = run.get("error_message", "Unknown error")
+        elif status == "waiting":
+            sub_text = run.get("error_message")
+        elif status == "timed_out":
+            sub_text = "Pipeline step killed after its timeout"
         elif status == "killed":
-            sub_text = "Previous instance terminated by scheduler"
+            sub_text = run.get("error_message") or "Previous instance terminated by scheduler"
 
         sub_lbl = None
         if sub_text:
@@ -671,10 +781,20 @@ class SchedulerContentWidget(QWidget):
                 rule_type=data["rule_type"],
                 rule=data["rule"],
                 enabled=data["enabled"],
+                pipeline_id=data["pipeline_id"],
+                overlap_policy=data["overlap_policy"],
+                max_instances=data["max_instances"],
+                misfire_policy=data["misfire_policy"],
+                max_catchup=data["max_catchup"],
+                jitter_sec=data["jitter_sec"],
+                jitter_mode=data["jitter_mode"],
+                max_retries=data["max_retries"],
+                retry_delay_sec=data["retry_delay_sec"],
             )
-            schedules = load_schedules()
-            schedules.append(schedule)
-            save_schedules(schedules)
+            with storage_lock():
+                schedules = load_schedules()
+                schedules.append(schedule)
+                save_schedules(schedules)
             self.refresh_schedules()
 
     def _on_edit_schedule(self, schedule):
@@ -684,37 +804,50 @@ class SchedulerContentWidget(QWidget):
         )
         if dialog.exec() == QDialog.DialogCode.Accepted:
             data = dialog.get_schedule_data()
+            with storage_lock():
+                schedules = load_schedules()
+                for s in schedules:
+                    if s["id"] == schedule["id"]:
+                        old_rule_type = s.get("rule_type")
+                        old_rule = s.get("rule")
+                        was_enabled = s.get("enabled", False)
+                        s["name"] = data["name"]
+                        s["script_path"] = data["script_path"]
+                        if data["pipeline_id"]:
+                            s["pipeline_id"] = data["pipeline_id"]
+                        else:
+                            s.pop("pipeline_id", None)
+                        s["rule_type"] = data["rule_type"]
+                        s["rule"] = data["rule"]
+                        s["enabled"] = data["enabled"]
+                        s["overlap_policy"] = data["overlap_policy"]
+                        s["max_instances"] = data["max_instances"]
+                        s["misfire_policy"] = data["misfire_policy"]
+                        s["max_catchup"] = data["max_catchup"]
+                        s["jitter_sec"] = data["jitter_sec"]
+                        s["jitter_mode"] = data["jitter_mode"]
+                        s["max_retries"] = data["max_retries"]
+                        s["retry_delay_sec"] = data["retry_delay_sec"]
+                        rule_changed = old_rule_type != data["rule_type"] or old_rule != data["rule"]
+                        if rule_changed or (data["enabled"] and not was_enabled):
+                            reset_schedule_clock(s)
+                        if rule_changed:
+                            s.pop("last_triggered_at", None)
+                        break
+                save_schedules(schedules)
+            self.refresh_schedules()
+
+    def _on_toggle_enabled(self, schedule_id):
+        with storage_lock():
             schedules = load_schedules()
             for s in schedules:
-                if s["id"] == schedule["id"]:
-                    old_rule_type = s.get("rule_type")
-                    old_rule = s.get("rule")
-                    s["name"] = data["name"]
-                    s["script_path"] = data["script_path"]
-                    s["rule_type"] = data["rule_type"]
-                    s["rule"] = data["rule"]
-                    s["enabled"] = data["enabled"]
-                    rule_changed = old_rule_type != data["rule_type"] or old_rule != data["rule"]
-                    if data["rule_type"] == "interval" and rule_changed:
-                        s["interval_base_at"] = now_iso()
-                    if data["rule_type"] != "interval":
-                        s.pop("interval_base_at", None)
-                    if rule_changed:
-                        s.pop("last_triggered_at", None)
+                if s["id"] == schedule_id:
+                    was_enabled = s.get("enabled", False)
+                    s["enabled"] = not was_enabled
+                    if s["enabled"]:
+                        reset_schedule_clock(s)
                     break
             save_schedules(schedules)
-            self.refresh_schedules()
-
-    def _on_toggle_enabled(self, schedule_id):
-        schedules = load_schedules()
-        for s in schedules:
-            if s["id"] == schedule_id:
-                was_enabled = s.get("enabled", False)
-                s["enabled"] = not was_enabled
-                if s["enabled"] and s.get("rule_type") == "interval":
-                    s["interval_base_at"] = now_iso()
-                break
-        save_schedules(schedules)
         self.refresh_schedules()
 
     def _on_delete_schedule(self, schedule):
@@ -726,15 +859,21 @@ class SchedulerContentWidget(QWidget):
             QMessageBox.StandardButton.No,
         )
         if reply == QMessageBox.StandardButton.Yes:
-            schedules = load_schedules()
-            schedules = [s for s in schedules if s["id"] != schedule["id"]]
-            save_schedules(schedules)
+            with storage_lock():
+                schedules = load_schedules()
+                schedules = [s for s in schedules if s["id"] != schedule["id"]]
+                save_schedules(schedules)
             self.refresh_schedules()
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
+    def _pipeline_name(self, pipeline_id: str) -> str:
+        if self._pipeline_names is None:
+            self._pipeline_names = {p.get("id"): p.get("name", "") for p in load_pipelines()}
+        return self._pipeline_names.get(pipeline_id) or "(deleted)"
+
     def _relative_script_path(self, script_path: str) -> str:
         if not script_path:
             return "—"
@@ -814,6 +953,7 @@ class ScheduleDialog(QDialog):
         self.setWindowTitle("Edit Schedule" if self._is_edit else "New Schedule")
         self.setMinimumWidth(500)
         self._script_paths: dict[str, str] = {}
+        self._pipelines = load_pipelines()
         self._build_form()
         if self._is_edit:
             self._populate_from_schedule()
@@ -838,9 +978,34 @@ class ScheduleDialog(QDialog):
         name_block.addWidget(self._name_edit)
         top_layout.addLayout(name_block)
 
-        script_block = QVBoxLayout()
+        target_block = QVBoxLayout()
+        target_block.setSpacing(4)
+        target_block.addWidget(QLabel("Runs"))
+        target_row = QHBoxLayout()
+        self._script_radio = QRadioButton("Script")
+        self._pipeline_radio = QRadioButton("Pipeline")
+        self._target_group = QButtonGroup(self)
+        self._target_group.addButton(self._script_radio, 0)
+        self._target_group.addButton(self._pipeline_radio, 1)
+        self._script_radio.setChecked(True)
+        self._pipeline_radio.setEnabled(bool(self._pipelines))
+        if not self._pipelines:
+            self._pipeline_radio.setToolTip("No pipelines yet: add them to Scheduler/pipelines.json or with the CLI.")
+        target_row.addWidget(self._script_radio)
+        target_row.addWidget(self._pipeline_radio)
+        target_row.addStretch()
+        target_block.addLayout(target_row)
+        top_layout.addLayout(target_block)
+
+        self._pipeline_combo = QComboBox()
+        for pipeline in self._pipelines:
+            self._pipeline_combo.addItem(pipeline.get("name", ""), pipeline.get("id"))
+        top_layout.addWidget(self._pipeline_combo)
+
+        self._script_section = QWidget()
+        script_block = QVBoxLayout(self._script_section)
+        script_block.setContentsMargins(0, 0, 0, 0)
         script_block.setSpacing(4)
-        script_block.addWidget(QLabel("Script"))
         script_row = QHBoxLayout()
         self._script_combo = QComboBox()
         self._script_combo.setEditable(False)
@@ -857,7 +1022,8 @@ class ScheduleDialog(QDialog):
         browse_btn.clicked.connect(self._on_browse)
         script_row.addWidget(browse_btn)
         script_block.addLayout(script_row)
-        top_layout.addLayout(script_block)
+        top_layout.addWidget(self._script_section)
+        self._script_radio.toggled.connect(self._on_target_changed)
 
         rule_type_block = QVBoxLayout()
         rule_type_block.setSpacing(4)
@@ -941,6 +1107,79 @@ class ScheduleDialog(QDialog):
         divider.setObjectName("divider")
         layout.addWidget(divider)
 
+        self._overlap_section = QWidget()
+        overlap_layout = QVBoxLayout(self._overlap_section)
+        overlap_layout.setContentsMargins(0, 0, 0, 0)
+        overlap_layout.setSpacing(4)
+        overlap_layout.addWidget(QLabel("If the script is still running"))
+        overlap_row = QHBoxLayout()
+        self._overlap_combo = QComboBox()
+        for policy, label in OVERLAP_POLICY_OPTIONS:
+            self._overlap_combo.addItem(label, policy)
+        overlap_row.addWidget(self._overlap_combo, 1)
+        self._max_instances_label = QLabel("up to")
+        overlap_row.addWidget(self._max_instances_label)
+        self._max_instances_spin = SpinBoxWithButtons()
+        self._max_instances_spin.setRange(2, MAX_INSTANCES_LIMIT)
+        self._max_instances_spin.setValue(DEFAULT_MAX_INSTANCES)
+        overlap_row.addWidget(self._max_instances_spin)
+        overlap_layout.addLayout(overlap_row)
+        overlap_layout.addWidget(QLabel("If the run fails (exits with an error)"))
+        retry_row = QHBoxLayout()
+        retry_row.addWidget(QLabel("Retry"))
+        self._max_retries_spin = SpinBoxWithButtons()
+        self._max_retries_spin.setRange(0, MAX_RETRIES_LIMIT)
+        self._max_retries_spin.setSpecialValueText("never")
+        retry_row.addWidget(self._max_retries_spin)
+        self._retry_delay_label = QLabel("times, waiting")
+        retry_row.addWidget(self._retry_delay_label)
+        self._retry_delay_spin = SpinBoxWithButtons()
+        self._retry_delay_spin.setRange(0, MAX_RETRY_DELAY_SEC)
+        self._retry_delay_spin.setValue(DEFAULT_RETRY_DELAY_SEC)
+        retry_row.addWidget(self._retry_delay_spin)
+        self._retry_unit_label = QLabel("seconds")
+        retry_row.addWidget(self._retry_unit_label)
+        retry_row.addStretch()
+        overlap_layout.addLayout(retry_row)
+        layout.addWidget(self._overlap_section)
+        self._max_retries_spin.valueChanged.connect(self._on_retries_changed)
+        self._on_retries_changed()
+        self._overlap_combo.currentIndexChanged.connect(self._on_overlap_changed)
+        self._on_overlap_changed()
+        self._on_target_changed()
+
+        layout.addWidget(QLabel("Runs missed while the scheduler was not running"))
+        misfire_row = QHBoxLayout()
+        self._misfire_combo = QComboBox()
+        for policy, label in MISFIRE_POLICY_OPTIONS:
+            self._misfire_combo.addItem(label, policy)
+        misfire_row.addWidget(self._misfire_combo, 1)
+        self._max_catchup_label = QLabel("up to")
+        misfire_row.addWidget(self._max_catchup_label)
+        self._max_catchup_spin = SpinBoxWithButtons()
+        self._max_catchup_spin.setRange(1, MAX_CATCHUP_LIMIT)
+        self._max_catchup_spin.setValue(DEFAULT_MAX_CATCHUP)
+        misfire_row.addWidget(self._max_catchup_spin)
+        layout.addLayout(misfire_row)
+        self._misfire_combo.currentIndexChanged.connect(self._on_misfire_changed)
+        self._on_misfire_changed()
+
+        layout.addWidget(QLabel("When schedules share a start time"))
+        jitter_row = QHBoxLayout()
+        self._jitter_combo = QComboBox()
+        for mode, label in JITTER_OPTIONS:
+            self._jitter_combo.addItem(label, mode)
+        jitter_row.addWidget(self._jitter_combo, 1)
+        self._jitter_spin = SpinBoxWithButtons()
+        self._jitter_spin.setRange(1, MAX_JITTER_SEC)
+        self._jitter_spin.setValue(60)
+        jitter_row.addWidget(self._jitter_spin)
+        self._jitter_unit_label = QLabel("seconds")
+        jitter_row.addWidget(self._jitter_unit_label)
+        layout.addLayout(jitter_row)
+        self._jitter_combo.currentIndexChanged.connect(self._on_jitter_changed)
+        self._on_jitter_changed()
+
         self._enabled_check = QCheckBox("Schedule active immediately")
         self._enabled_check.setChecked(True)
         layout.addWidget(self._enabled_check)
@@ -961,6 +1200,33 @@ class ScheduleDialog(QDialog):
         btn_row.addWidget(save_btn)
         layout.addLayout(btn_row)
 
+    def _on_target_changed(self):
+        is_script = self._script_radio.isChecked()
+        self._script_section.setVisible(is_script)
+        self._pipeline_combo.setVisible(not is_script)
+        self._overlap_section.setVisible(is_script)
+
+    def _on_overlap_changed(self):
+        parallel = self._overlap_combo.currentData() == "parallel"
+        self._max_instances_label.setVisible(parallel)
+        self._max_instances_spin.setVisible(parallel)
+
+    def _on_retries_changed(self):
+        retries = self._max_retries_spin.value() > 0
+        self._retry_delay_label.setVisible(retries)
+        self._retry_delay_spin.setVisible(retries)
+        self._retry_unit_label.setVisible(retries)
+
+    def _on_misfire_changed(self):
+        catch_up_all = self._misfire_combo.currentData() == "all"
+        self._max_catchup_label.setVisible(catch_up_all)
+        self._max_catchup_spin.setVisible(catch_up_all)
+
+    def _on_jitter_changed(self):
+        jitter = bool(self._jitter_combo.currentData())
+        self._jitter_spin.setVisible(jitter)
+        self._jitter_unit_label.setVisible(jitter)
+
     def _on_rule_type_changed(self):
         is_time = self._time_radio.isChecked()
         self._time_section.setVisible(is_time)
@@ -992,6 +1258,12 @@ class ScheduleDialog(QDialog):
         s = self._schedule
         self._name_edit.setText(s.get("name", ""))
 
+        if s.get("pipeline_id"):
+            idx = self._pipeline_combo.findData(s["pipeline_id"])
+            if idx >= 0:
+                self._pipeline_radio.setChecked(True)
+                self._pipeline_combo.setCurrentIndex(idx)
+
         script_path = s.get("script_path", "")
         if script_path:
             if self._project_path:
@@ -1037,6 +1309,19 @@ class ScheduleDialog(QDialog):
                     self._interval_minutes_spin.setValue(rule.get("value", 5))
                     self._interval_hours_spin.setValue(0)
 
+        idx = self._overlap_combo.findData(s.get("overlap_policy", DEFAULT_OVERLAP_POLICY))
+        self._overlap_combo.setCurrentIndex(max(idx, 0))
+        self._max_instances_spin.setValue(s.get("max_instances", DEFAULT_MAX_INSTANCES))
+        self._max_retries_spin.setValue(s.get("max_retries", 0))
+        self._retry_delay_spin.setValue(s.get("retry_delay_sec", DEFAULT_RETRY_DELAY_SEC))
+        idx = self._misfire_combo.findData(s.get("misfire_policy", DEFAULT_MISFIRE_POLICY))
+        self._misfire_combo.setCurrentIndex(max(idx, 0))
+        self._max_catchup_spin.setValue(s.get("max_catchup", DEFAULT_MAX_CATCHUP))
+        if s.get("jitter_sec"):
+            idx = self._jitter_combo.findData(s.get("jitter_mode", DEFAULT_JITTER_MODE))
+            self._jitter_combo.setCurrentIndex(max(idx, 0))
+            self._jitter_spin.setValue(s["jitter_sec"])
+
         self._enabled_check.setChecked(s.get("enabled", True))
 
     def _on_save(self):
@@ -1045,7 +1330,7 @@ class ScheduleDialog(QDialog):
         if errors:
             QMessageBox.critical(self, "Validation Error", "\n".join(errors))
             return
-        if not os.path.isfile(data["script_path"]):
+        if not data["pipeline_id"] and not os.path.isfile(data["script_path"]):
             QMessageBox.critical(
                 self, "Validation Error", f"Script file not found: {data['script_path']}",
             )
@@ -1055,12 +1340,10 @@ class ScheduleDialog(QDialog):
     def get_schedule_data(self) -> dict:
         name = self._name_edit.text().strip()
 
-        script_display = self._script_combo.currentText()
-        script_path = self._script_paths.get(script_display, "")
-        if not script_path and self._project_path:
-            candidate = os.path.join(self._project_path, script_display.replace("/", os.sep))
-            if os.path.isfile(candidate):
-                script_path = candidate
+        if self._pipeline_radio.isChecked():
+            script_path, pipeline_id = "", self._pipeline_combo.currentData()
+        else:
+            script_path, pipeline_id = self._selected_script_path(), None
 
         rule_type = "time" if self._time_radio.isChecked() else "interval"
 
@@ -1081,7 +1364,25 @@ class ScheduleDialog(QDialog):
         return {
             "name": name,
             "script_path": script_path,
+            "pipeline_id": pipeline_id,
             "rule_type": rule_type,
             "rule": rule,
             "enabled": self._enabled_check.isChecked(),
+            "overlap_policy": self._overlap_combo.currentData(),
+            "max_instances": self._max_instances_spin.value(),
+            "misfire_policy": self._misfire_combo.currentData(),
+            "max_catchup": self._max_catchup_spin.value(),
+            "jitter_sec": self._jitter_spin.value() if self._jitter_combo.currentData() else 0,
+            "jitter_mode": self._jitter_combo.currentData() or DEFAULT_JITTER_MODE,
+            "max_retries": 0 if pipeline_id else self._max_retries_spin.value(),
+            "retry_delay_sec": self._retry_delay_spin.value(),
         }
+
+    def _selected_script_path(self) -> str:
+        script_display = self._script_combo.currentText()
+        script_path = self._script_paths.get(script_display, "")
+        if not script_path and self._project_path:
+            candidate = os.path.join(self._project_path, script_display.replace("/", os.sep))
+            if os.path.isfile(candidate):
+                script_path = candidate
+        return script_path
@@ -1,5 +1,42 @@
 import os
 
+SCRIPT_SUFFIX = ".sh"
+
+
+def scan_dir(path: str) -> tuple[dict[str, tuple[int, int]], list[str]]:
+    """
+    Returns ({script_path: (mtime_ns, size)}, [subdir_paths]) for one directory, non-recursive.
+    Symlinked directories are not listed as subdirs, so a symlink loop is never walked (like os.walk).
+    """
+    files: dict[str, tuple[int, int]] = {}
+    subdirs: list[str] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.endswith(SCRIPT_SUFFIX) and entry.is_file():
+                        st = entry.stat()
+                        files[entry.path] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs
+
+
+def default_category(script_path: str, project_path: str) -> str:
+    """Category implied by the top-level folder: "backend", "frontend" or "none"."""
+    rel = os.path.relpath(script_path, project_path)
+    parts = os.path.normpath(rel).split(os.sep)
+    if parts and parts[0].lower() == "backend":
+        return "backend"
+    if parts and parts[0].lower() == "frontend":
+        return "frontend"
+    return "none"
+
+
 class ScriptManager:
     """Finds all .sh files under the project folder. Category is chosen per script in the UI."""
 
@@ -14,3 +51,18 @@ class ScriptManager:
                     full_path = os.path.join(root, f)
                     scripts.append({"name": f, "path": full_path})
         return scripts
+
+    def scan(self) -> tuple[list[dict], dict[str, tuple[dict[str, tuple[int, int]], list[str]]]]:
+        """
+        Like get_scripts, but also returns the tree it walked as {dir: scan_dir(dir)}, so the project
+        watcher can start from it instead of walking the tree a second time.
+        """
+        scripts = []
+        tree = {}
+        stack = [self.project_path]
+        while stack:
+            d = stack.pop()
+            files, subdirs = tree[d] = scan_dir(d)
+            scripts.extend({"name": os.path.basename(p), "path": p} for p in files)
+            stack.extend(subdirs)
+        return scripts, tree
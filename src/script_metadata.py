@@ -0,0 +1,119 @@
+"""
+Script header metadata — shebang, leading comment block and `# @arg` / `# @env` annotations.
+Only the first HEADER_READ_BYTES of a file are read. Results are cached per path and keyed by
+(mtime_ns, size), so a script is re-parsed only after it changes on disk.
+Pure logic module with no UI dependencies.
+"""
+import os
+import re
+import threading
+
+HEADER_READ_BYTES = 8192
+ANNOTATION_RE = re.compile(r"^@(arg|env|desc|description)\b\s*(.*)$")
+
+
+def _parse_annotation_value(value: str) -> dict:
+    """'NAME rest of text' -> {"name": "NAME", "description": "rest of text"}."""
+    name, _, desc = value.strip().partition(" ")
+    return {"name": name, "description": desc.strip().lstrip("-—:").strip()}
+
+
+def parse_header(text: str) -> dict:
+    """Parse the header of a script. text only needs to cover the leading comment block."""
+    lines = text.splitlines()
+    shebang = None
+    idx = 0
+    if lines and lines[0].startswith("#!"):
+        shebang = lines[0][2:].strip()
+        idx = 1
+
+    while idx < len(lines) and not lines[idx].strip():
+        idx += 1
+
+    description_lines: list[str] = []
+    explicit_description: list[str] = []
+    args: list[dict] = []
+    env: list[dict] = []
+    while idx < len(lines):
+        line = lines[idx].strip()
+        if not line.startswith("#") or line.startswith("#!"):
+            break
+        body = line.lstrip("#").strip()
+        match = ANNOTATION_RE.match(body)
+        if match:
+            kind, value = match.groups()
+            if kind == "arg" and value:
+                args.append(_parse_annotation_value(value))
+            elif kind == "env" and value:
+                env.append(_parse_annotation_value(value))
+            elif kind in ("desc", "description") and value:
+                explicit_description.append(value.strip())
+        elif body and not set(body) <= set("#-=*"):
+            description_lines.append(body)
+        idx += 1
+
+    description = " ".join(explicit_description or description_lines)
+    return {
+        "shebang": shebang,
+        "description": description,
+        "args": args,
+        "env": env,
+    }
+
+
+def extract_metadata(path: str, stat_result: os.stat_result | None = None) -> dict:
+    """Read the header of path and return its metadata dict. Raises OSError if unreadable."""
+    st = stat_result if stat_result is not None else os.stat(path)
+    with open(path, "rb") as f:
+        head = f.read(HEADER_READ_BYTES)
+    text = head.decode("utf-8", errors="replace")
+    if len(head) == HEADER_READ_BYTES and "\n" in text:
+        # Drop the trailing partial line of a truncated read.
+        text = text[: text.rfind("\n")]
+    meta = parse_header(text)
+    meta["path"] = path
+    meta["size"] = st.st_size
+    meta["mtime"] = st.st_mtime
+    meta["mtime_ns"] = st.st_mtime_ns
+    return meta
+
+
+class MetadataCache:
+    """Thread-safe per-path metadata cache keyed by (mtime_ns, size)."""
+
+    def __init__(self):
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> dict | None:
+        """Returns metadata for path, re-reading the header only if the file changed. None if unreadable."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return None
+        with self._lock:
+            cached = self._entries.get(path)
+        if cached is not None and cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+            return cached
+        try:
+            meta = extract_metadata(path, st)
+        except OSError:
+            self.invalidate(path)
+            return None
+        with self._lock:
+            self._entries[path] = meta
+        return meta
+
+    def peek(self, path: str) -> dict | None:
+        """Returns cached metadata without touching the filesystem (may be stale or missing)."""
+        with self._lock:
+            return self._entries.get(path)
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,528 @@
+"""
+Precomputed script search index with fzf-style ranked fuzzy matching.
+Each script gets an integer id and is indexed once by its normalized relative path (lowercase, "/"
+separators). Postings are int bitsets over ids (bit i set = script i), so unions and intersections
+across tens of thousands of scripts are single big-int operations: file name tokens, folder tokens,
+the characters of the path, adjacent pairs of token initials and path length. Trigram postings over
+the distinct tokens resolve substring lookups.
+A query term is resolved into ranked tiers:
+  0. the term spells the initials of consecutive tokens ("dbp" -> deploy_backend_prod)
+  1. a file-name token starts with the term
+  2. a folder token starts with the term
+  3. a token contains the term (via trigram postings)
+  4. the term is a fuzzy subsequence of the path (only if needed; verified per script, only on
+     scripts that contain every character of the term, and on at most FUZZY_VERIFY_LIMIT of them)
+  5. the script's description contains the term
+A term spanning separators ("deploy_b") is matched as a plain substring of the path (tier 1 in the
+file name, tier 2 in the folders); when its parts narrow the scripts poorly, with str.find over all
+paths joined into one string instead of per script.
+Only the results that will be shown (at most `limit`) get the full fzf-style score.
+Pure logic module with no UI dependencies.
+"""
+import bisect
+import itertools
+import os
+import re
+
+SEARCH_RESULT_LIMIT = 500
+FUZZY_VERIFY_LIMIT = 1000  # candidates verified per fuzzy term, shortest paths first
+PATH_SCAN_THRESHOLD = 4000  # above this many candidates, substrings are found in the joined paths
+BOUNDARY_CHARS = frozenset("/_-. ")
+TOKEN_SPLIT_RE = re.compile(r"[/_\-. ]+")
+SCORE_MATCH = 16
+BONUS_BOUNDARY = 10
+BONUS_CONSECUTIVE = 8
+BONUS_NAME = 12
+BONUS_EXACT = 24
+PENALTY_GAP_START = 3
+PENALTY_GAP_EXTENSION = 1
+TIER_INITIALS = 0
+TIER_NAME_PREFIX = 1
+TIER_FOLDER_PREFIX = 2
+TIER_CONTAINS = 3
+TIER_FUZZY = 4
+TIER_DESCRIPTION = 5
+
+
+def normalize_rel_path(path: str, project_path: str | None) -> str:
+    if project_path:
+        prefix = os.path.join(project_path, "")
+        if path.startswith(prefix):
+            return path[len(prefix):].replace("\\", "/").lower()
+        try:
+            return os.path.relpath(path, project_path).replace("\\", "/").lower()
+        except ValueError:
+            pass
+    return os.path.basename(path).lower()
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _pairs(text: str) -> set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _bits_from_ids(ids) -> int:
+    ids = ids if isinstance(ids, list) else list(ids)
+    if not ids:
+        return 0
+    buf = bytearray((max(ids) >> 3) + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _iter_bits(bits: int):
+    """Ids of the set bits, ascending."""
+    digits = bin(bits)[:1:-1]
+    i = digits.find("1")
+    while i >= 0:
+        yield i
+        i = digits.find("1", i + 1)
+
+
+def _subsequence_regex(term: str) -> re.Pattern:
+    """'abc' -> a[^b]*b[^c]*c, which matches like a.*?b.*?c without backtracking."""
+    parts = [re.escape(term[0])]
+    for ch in term[1:]:
+        parts.append(f"[^{re.escape(ch)}]*{re.escape(ch)}")
+    return re.compile("".join(parts))
+
+
+def fuzzy_score(pattern: str, text: str, name_offset: int = 0) -> int | None:
+    """
+    Score pattern as a subsequence of text (both lowercase), fzf v1 style: find the first
+    occurrence window, shrink it from the right, then reward boundary and consecutive matches.
+    When pattern occurs contiguously, its last occurrence (the file name, if it occurs there) is
+    scored directly. Returns None when pattern is not a subsequence of text.
+    """
+    pos = text.rfind(pattern)
+    if pos >= 0:
+        score = (SCORE_MATCH + BONUS_CONSECUTIVE) * len(pattern) - BONUS_CONSECUTIVE
+        if pos == 0 or text[pos - 1] in BOUNDARY_CHARS:
+            score += BONUS_BOUNDARY
+        score += BONUS_BOUNDARY * sum(1 for ch in pattern[:-1] if ch in BOUNDARY_CHARS)
+        if pos >= name_offset:
+            score += BONUS_NAME + BONUS_EXACT
+        return score
+
+    find = text.find
+    pos = -1
+    for ch in pattern:
+        pos = find(ch, pos + 1)
+        if pos < 0:
+            return None
+    start = pos
+    rfind = text.rfind
+    for ch in reversed(pattern[:-1]):
+        start = rfind(ch, 0, start)
+
+    score = 0
+    prev = -2
+    pos = start - 1
+    for ch in pattern:
+        pos = find(ch, pos + 1)
+        if pos == prev + 1:
+            score += BONUS_CONSECUTIVE
+        elif prev >= 0:
+            score -= PENALTY_GAP_START + PENALTY_GAP_EXTENSION * (pos - prev - 2)
+        if pos == 0 or text[pos - 1] in BOUNDARY_CHARS:
+            score += BONUS_BOUNDARY
+        prev = pos
+    score += SCORE_MATCH * len(pattern)
+    if start >= name_offset:
+        score += BONUS_NAME
+    if text.find(pattern, name_offset) >= 0:
+        score += BONUS_EXACT
+    return score
+
+
+class ScriptSearchIndex:
+    """In-memory index over script paths. Scripts are identified by their absolute path."""
+
+    def __init__(self):
+        self._project_path: str | None = None
+        self._texts: list[str | None] = []       # id -> normalized rel path (None when removed)
+        self._paths: list[str | None] = []
+        self._name_offsets: list[int] = []
+        self._initials: list[str] = []           # id -> first letter of each token, in path order
+        self._ids: dict[str, int] = {}
+        self._live = 0
+        self._name_tokens: dict[str, int] = {}
+        self._folder_tokens: dict[str, int] = {}
+        self._chars: dict[str, int] = {}
+        self._initial_pairs: dict[str, int] = {}
+        self._lengths: dict[int, int] = {}
+        self._trigram_tokens: dict[str, set[str]] = {}
+        self._sorted_tokens: list[str] | None = None
+        self._sorted_lengths: list[int] | None = None
+        self._path_text: str | None = None  # texts joined by "\n" (removed ones empty), rebuilt on change
+        self._path_starts: list[int] = []
+        self._descriptions: dict[int, str] = {}
+        self._description_text: str | None = None  # descriptions joined by "\n", rebuilt on change
+        self._description_starts: list[int] = []
+        self._description_ids: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def build(self, paths, project_path: str | None) -> None:
+        """Index paths from scratch. Postings are collected as id lists and turned into bitsets once."""
+        self.__init__()
+        self._project_path = project_path
+        collected: list[dict] = [{}, {}, {}, {}, {}]
+        for path in paths:
+            if path in self._ids:
+                continue
+            idx = self._add_entry(path)
+            for postings, keys in zip(collected, self._keys(idx)):
+                for key in keys:
+                    postings.setdefault(key, []).append(idx)
+        self._live = _bits_from_ids(range(len(self._texts)))
+        for target, postings in zip(self._postings(), collected):
+            for key, ids in postings.items():
+                target[key] = _bits_from_ids(ids)
+        for token in set(self._name_tokens) | set(self._folder_tokens):
+            for tri in _trigrams(token):
+                self._trigram_tokens.setdefault(tri, set()).add(token)
+        self._prefix_tokens("")
+
+    def _postings(self) -> tuple[dict, ...]:
+        return self._name_tokens, self._folder_tokens, self._chars, self._initial_pairs, self._lengths
+
+    def _add_entry(self, path: str) -> int:
+        text = normalize_rel_path(path, self._project_path)
+        idx = len(self._texts)
+        self._texts.append(text)
+        self._paths.append(path)
+        self._name_offsets.append(text.rfind("/") + 1)
+        self._initials.append("".join(t[0] for t in TOKEN_SPLIT_RE.split(text) if t))
+        self._ids[path] = idx
+        self._path_text = None
+        return idx
+
+    def _keys(self, idx: int) -> tuple:
+        """Keys of the script in each of _postings(), in the same order."""
+        text = self._texts[idx]
+        name_offset = self._name_offsets[idx]
+        name_tokens = set(TOKEN_SPLIT_RE.split(text[name_offset:]))
+        folder_tokens = set(TOKEN_SPLIT_RE.split(text[:name_offset]))
+        name_tokens.discard("")
+        folder_tokens.discard("")
+        return name_tokens, folder_tokens, set(text), _pairs(self._initials[idx]), (len(text),)
+
+    def add(self, path: str) -> None:
+        if path in self._ids:
+            return
+        idx = self._add_entry(path)
+        bit = 1 << idx
+        self._live |= bit
+        for postings, keys in zip(self._postings(), self._keys(idx)):
+            for key in keys:
+                if key not in postings:
+                    if postings is self._name_tokens or postings is self._folder_tokens:
+                        if key not in self._name_tokens and key not in self._folder_tokens:
+                            for tri in _trigrams(key):
+                                self._trigram_tokens.setdefault(tri, set()).add(key)
+                            self._sorted_tokens = None
+                    elif postings is self._lengths:
+                        self._sorted_lengths = None
+                postings[key] = postings.get(key, 0) | bit
+
+    def remove(self, path: str) -> None:
+        idx = self._ids.pop(path, None)
+        if idx is None:
+            return
+        clear = ~(1 << idx)
+        self._live &= clear
+        for postings, keys in zip(self._postings(), self._keys(idx)):
+            for key in keys:
+                if key in postings:
+                    postings[key] &= clear
+        self._texts[idx] = None
+        self._paths[idx] = None
+        self._path_text = None
+        if self._descriptions.pop(idx, None) is not None:
+            self._description_text = None
+
+    def set_description(self, path: str, description: str) -> None:
+        """Attach a description; matched as the lowest tier when the path does not match."""
+        idx = self._ids.get(path)
+        if idx is None:
+            return
+        description = description.lower()
+        if self._descriptions.get(idx, "") == description:
+            return
+        if description:
+            self._descriptions[idx] = description
+        else:
+            del self._descriptions[idx]
+        self._description_text = None
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def _prefix_tokens(self, term: str) -> list[str]:
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(set(self._name_tokens) | set(self._folder_tokens))
+        tokens = self._sorted_tokens
+        lo = bisect.bisect_left(tokens, term)
+        hi = bisect.bisect_left(tokens, term + "\uffff", lo)
+        return tokens[lo:hi]
+
+    def _contains_tokens(self, term: str) -> list[str]:
+        if len(term) < 3:
+            return []
+        postings = [self._trigram_tokens.get(t) for t in _trigrams(term)]
+        if any(not p for p in postings):
+            return []
+        postings.sort(key=len)
+        return [t for t in postings[0].intersection(*postings[1:]) if term in t and not t.startswith(term)]
+
+    @staticmethod
+    def _union(postings: dict[str, int], tokens) -> int:
+        bits = 0
+        for token in tokens:
+            bits |= postings.get(token, 0)
+        return bits
+
+    def _initials_bits(self, term: str) -> int:
+        """Scripts whose consecutive token initials spell term (two letters or more)."""
+        if len(term) < 2:
+            return 0
+        bits = self._live
+        for pair in _pairs(term):
+            bits &= self._initial_pairs.get(pair, 0)
+            if not bits:
+                return 0
+        if len(term) == 2:
+            return bits
+        initials = self._initials
+        return _bits_from_ids(i for i in _iter_bits(bits) if term in initials[i])
+
+    def _token_tiers(self, term: str) -> dict[int, int]:
+        """{tier: bits} (disjoint) for the set-based tiers of a term without separators."""
+        prefix = self._prefix_tokens(term)
+        contains = self._contains_tokens(term)
+        tiers: dict[int, int] = {}
+        seen = 0
+        for tier, bits in (
+            (TIER_INITIALS, self._initials_bits(term)),
+            (TIER_NAME_PREFIX, self._union(self._name_tokens, prefix)),
+            (TIER_FOLDER_PREFIX, self._union(self._folder_tokens, prefix)),
+            (TIER_CONTAINS, self._union(self._name_tokens, contains) | self._union(self._folder_tokens, contains)),
+        ):
+            bits &= ~seen
+            if bits:
+                tiers[tier] = bits
+                seen |= bits
+        return tiers
+
+    def _exact_tiers(self, term: str) -> dict[int, int]:
+        """Set-based tiers of a term. Terms spanning separators ("deploy_b") are narrowed by the
+        postings of their parts (single characters like "2" only if nothing longer is there, they match
+        too many tokens to be worth it), then verified as plain substrings; a match in the file name
+        ranks first."""
+        parts = [p for p in TOKEN_SPLIT_RE.split(term) if p]
+        if len(parts) == 1 and parts[0] == term:
+            return self._token_tiers(term)
+        candidates = self._live
+        for part in [p for p in parts if len(p) > 1] or parts[:1]:
+            part_bits = 0
+            for bits in self._token_tiers(part).values():
+                part_bits |= bits
+            candidates &= part_bits
+            if not candidates:
+                return {}
+        texts = self._texts
+        offsets = self._name_offsets
+        count = candidates.bit_count()
+        found = self._scan_paths(term, count // 4) if count > PATH_SCAN_THRESHOLD else None
+        if found is not None:
+            name_ids, folder_ids = found
+        else:
+            name_ids = []
+            folder_ids = []
+            for i in _iter_bits(candidates):
+                pos = texts[i].rfind(term)
+                if pos >= 0:
+                    (name_ids if pos >= offsets[i] else folder_ids).append(i)
+        tiers = {TIER_NAME_PREFIX: _bits_from_ids(name_ids), TIER_FOLDER_PREFIX: _bits_from_ids(folder_ids)}
+        return {tier: bits for tier, bits in tiers.items() if bits}
+
+    def _scan_paths(self, term: str, limit: int) -> tuple[list[int], list[int]] | None:
+        """
+        Ids whose path contains term, split into (in the file name, only in the folders). None once
+        more than limit paths match, where checking the candidates one by one is cheaper.
+        """
+        if self._path_text is None:
+            self._path_starts = []
+            offset = 0
+            for text in self._texts:
+                self._path_starts.append(offset)
+                offset += len(text or "") + 1
+            self._path_text = "\n".join(text or "" for text in self._texts)
+        text = self._path_text
+        starts = self._path_starts
+        offsets = self._name_offsets
+        last: dict[int, int] = {}  # id -> position of the last match in its path
+        pos = text.find(term)
+        while pos >= 0:
+            i = bisect.bisect_right(starts, pos) - 1
+            last[i] = pos - starts[i]
+            if len(last) > limit:
+                return None
+            pos = text.find(term, pos + 1)
+        name_ids = [i for i, pos in last.items() if pos >= offsets[i]]
+        folder_ids = [i for i, pos in last.items() if pos < offsets[i]]
+        return name_ids, folder_ids
+
+    def _fuzzy_bits(self, term: str, pool: int, limit: int | None) -> int:
+        """
+        Scripts in pool matching term as a subsequence, at most limit of them. Candidates are verified
+        shortest path first and at most FUZZY_VERIFY_LIMIT of them, so the cost of a fuzzy term does
+        not grow with the project.
+        """
+        for ch in set(term):
+            pool &= self._chars.get(ch, 0)
+            if not pool:
+                return 0
+        subseq = _subsequence_regex(term).search
+        texts = self._texts
+        hits: list[int] = []
+        for i in self._shortest(pool, FUZZY_VERIFY_LIMIT):
+            if subseq(texts[i]):
+                hits.append(i)
+                if limit is not None and len(hits) >= limit:
+                    break
+        return _bits_from_ids(hits)
+
+    def _description_bits(self, term: str, pool: int) -> int:
+        """Scripts in pool whose description contains term, found with str.find over all descriptions."""
+        if not self._descriptions:
+            return 0
+        if self._description_text is None:
+            self._description_ids = sorted(self._descriptions)
+            self._description_starts = []
+            offset = 0
+            for i in self._description_ids:
+                self._description_starts.append(offset)
+                offset += len(self._descriptions[i]) + 1
+            self._description_text = "\n".join(self._descriptions[i] for i in self._description_ids)
+        text = self._description_text
+        starts = self._description_starts
+        hits: list[int] = []
+        pos = text.find(term)
+        while pos >= 0:
+            k = bisect.bisect_right(starts, pos) - 1
+            hits.append(self._description_ids[k])
+            pos = text.find(term, starts[k + 1]) if k + 1 < len(starts) else -1
+        return _bits_from_ids(hits) & pool
+
+    @staticmethod
+    def _fold(combined: dict[int, int] | None, tiers: dict[int, int]) -> dict[int, int]:
+        """Scripts in both, keyed by summed tier."""
+        if combined is None:
+            return tiers
+        folded: dict[int, int] = {}
+        for s, a in combined.items():
+            for t, b in tiers.items():
+                hit = a & b
+                if hit:
+                    folded[s + t] = folded.get(s + t, 0) | hit
+        return folded
+
+    def _match(self, terms: list[str], limit: int | None) -> dict[int, int]:
+        """{summed tier: bits} of scripts matching every term."""
+        exact = [self._exact_tiers(term) for term in terms]
+        combined: dict[int, int] | None = None
+        for tiers in exact:
+            combined = self._fold(combined, tiers)
+            if not combined:
+                break
+        if limit is not None and sum(bits.bit_count() for bits in combined.values()) >= limit:
+            return combined
+
+        # Not enough set-based hits: include fuzzy and description matches, narrowing each term by
+        # the scripts that matched the previous ones. A fuzzy hit must contain every query character.
+        required = self._live
+        for ch in set("".join(terms)):
+            required &= self._chars.get(ch, 0)
+        combined = None
+        for term, tiers in zip(terms, exact):
+            pool = self._live
+            if combined is not None:
+                pool = 0
+                for bits in combined.values():
+                    pool |= bits
+            tiers = {tier: bits & pool for tier, bits in tiers.items() if bits & pool}
+            matched = 0
+            for bits in tiers.values():
+                matched |= bits
+            room = None
+            if limit is not None and len(terms) == 1:
+                room = max(0, limit - matched.bit_count())
+            fuzzy = self._fuzzy_bits(term, pool & required & ~matched, room) if room != 0 else 0
+            if fuzzy:
+                tiers[TIER_FUZZY] = fuzzy
+                matched |= fuzzy
+            described = self._description_bits(term, pool & ~matched)
+            if described:
+                tiers[TIER_DESCRIPTION] = described
+            combined = self._fold(combined, tiers)
+            if not combined:
+                break
+        return combined
+
+    def _by_length(self, bits: int):
+        """Ids from bits, shortest paths first."""
+        if self._sorted_lengths is None:
+            self._sorted_lengths = sorted(self._lengths)
+        for length in self._sorted_lengths:
+            hit = bits & self._lengths[length]
+            if hit:
+                yield from _iter_bits(hit)
+                bits &= ~hit
+                if not bits:
+                    return
+
+    def _shortest(self, bits: int, count: int | None) -> list[int]:
+        """Up to count ids from bits, shortest paths first (all of them, in id order, if they fit)."""
+        if count is None or bits.bit_count() <= count:
+            return list(_iter_bits(bits))
+        return list(itertools.islice(self._by_length(bits), count))
+
+    def search(self, query: str, limit: int | None = SEARCH_RESULT_LIMIT) -> list[str]:
+        """
+        Returns matching script paths, best match first, at most limit of them (None = all).
+        Space-separated terms must all match.
+        """
+        terms = query.lower().split()
+        if not terms:
+            paths = [p for p in self._paths if p is not None]
+            return paths if limit is None else paths[:limit]
+        combined = self._match(terms, limit)
+        if not combined:
+            return []
+
+        selected: list[tuple[int, int]] = []
+        for tier in sorted(combined):
+            # Too many equally-tiered matches: keep the shortest paths, then score those.
+            ids = self._shortest(combined[tier], None if limit is None else limit - len(selected))
+            selected.extend((tier, i) for i in ids)
+            if limit is not None and len(selected) >= limit:
+                break
+
+        texts = self._texts
+        offsets = self._name_offsets
+
+        def _rank(item: tuple[int, int]):
+            tier, i = item
+            score = sum(fuzzy_score(t, texts[i], offsets[i]) or 0 for t in terms)
+            return tier, -score, texts[i]
+
+        selected.sort(key=_rank)
+        return [self._paths[i] for _tier, i in selected]
@@ -0,0 +1,37 @@
+"""
+Startup phase timings printed by `main.py --profile-startup`.
+mark() records the end of a phase; report() prints every phase's duration once startup is done.
+Both are no-ops until enable() is called.
+Pure logic module with no UI dependencies.
+"""
+import sys
+import time
+
+_enabled = False
+_started_at = 0.0
+_phases: list[tuple[str, float]] = []
+
+
+def enable() -> None:
+    global _enabled, _started_at
+    _enabled = True
+    _started_at = time.perf_counter()
+    _phases.clear()
+
+
+def mark(phase: str) -> None:
+    if _enabled:
+        _phases.append((phase, time.perf_counter()))
+
+
+def report() -> None:
+    global _enabled
+    if not _enabled:
+        return
+    _enabled = False
+    previous = _started_at
+    lines = ["Startup profile (ms):"]
+    for phase, at in _phases:
+        lines.append(f"  {phase:<24} {1000 * (at - previous):8.1f}   {1000 * (at - _started_at):8.1f}")
+        previous = at
+    print("\n".join(lines), file=sys.stderr, flush=True)
@@ -1,6 +1,7 @@
 """
 Centralized palette and application stylesheet.
 """
+import functools
 
 DARK_PALETTE = {
     "bg_main": "#0d0f11",
@@ -91,7 +92,9 @@ LIGHT_PALETTE = {
 }
 
 
+@functools.cache
 def get_stylesheet(theme: str = "dark") -> str:
+    """The application stylesheet for theme; built once per theme, then served from the cache."""
     p = DARK_PALETTE if theme == "dark" else LIGHT_PALETTE
     return f"""
 QApplication, QMainWindow, QWidget {{
@@ -206,17 +209,32 @@ QWidget#sidebarRow {{
 QWidget#sidebarRow:hover {{
     background-color: {p["menu_item_hover"]};
 }}
-QWidget#sidebarRow[selected="true"] {{
-    background-color: {p["sidebar_selected_bg"]};
-    border-left: 2px solid {p["sidebar_selected_border"]};
+QLabel#contentIndexStatus {{
+    color: {p["text_muted"]};
+    font-size: 8pt;
 }}
-QLabel#dotLabel[running="true"] {{
-    color: {p["dot_running"]};
-    font-weight: 700;
+QLabel#daemonStatusLabel {{
+    color: {p["text_secondary"]};
+    background-color: {p["bg_card"]};
+    border: 1px solid {p["border"]};
+    border-radius: 6px;
+    padding: 6px 10px;
 }}
-QLabel#dotLabel[running="false"] {{
-    color: {p["dot_stopped"]};
-    font-weight: 700;
+QListWidget#contentResultsList {{
+    background-color: transparent;
+    color: {p["text_primary"]};
+    border: none;
+}}
+QListWidget#contentResultsList::item {{
+    padding: 3px 4px;
+    border-radius: 4px;
+}}
+QListWidget#contentResultsList::item:hover {{
+    background-color: {p["menu_item_hover"]};
+}}
+QListWidget#contentResultsList::item:selected {{
+    background-color: {p["sidebar_selected_bg"]};
+    color: {p["text_primary"]};
 }}
 QWidget#detailPanel {{
     background-color: {p["bg_detail"]};
@@ -230,6 +248,17 @@ QLabel#detailSectionHeader {{
     color: {p["text_title"]};
     font-weight: 700;
 }}
+QLabel#detailDescription {{
+    color: {p["text_secondary"]};
+}}
+QLabel#detailAnnotations {{
+    color: {p["text_muted"]};
+    font-size: 8pt;
+}}
+QLabel#viewerModeLabel {{
+    color: {p["text_muted"]};
+    font-size: 8pt;
+}}
 QFrame#graphsBox {{
     background-color: {p["graphs_box_bg"]};
     border: 1px solid {p["border"]};
@@ -485,6 +514,12 @@ QLabel#emptyStateLabel {{
 QLabel#historyStatusLabel {{
     font-weight: 600;
 }}
+QLabel#historyStatusLabel[status_type="waiting"] {{
+    color: {p["text_muted"]};
+}}
+QLabel#historyStatusLabel[status_type="succeeded"] {{
+    color: {p["run_btn_bg"]};
+}}
 QLabel#historyStatusLabel[status_type="started"] {{
     color: {p["status_running"]};
 }}
@@ -497,6 +532,12 @@ QLabel#historyStatusLabel[status_type="exited"] {{
 QLabel#historyStatusLabel[status_type="failed"] {{
     color: {p["kill_btn_bg"]};
 }}
+QLabel#historyStatusLabel[status_type="timed_out"] {{
+    color: {p["kill_btn_bg"]};
+}}
+QLabel#historyStatusLabel[status_type="skipped"] {{
+    color: {p["text_muted"]};
+}}
 QLabel#historySubLabel {{
     color: {p["text_muted"]};
     font-size: 8pt;
@@ -4,6 +4,8 @@ import platform
 import signal
 import sys
 
+from cgroups import kill_cgroup
+
 KILL_GRACEFUL_WAIT = 2.0
 KILL_FORCE_WAIT = 1.0
 
@@ -90,11 +92,16 @@ def run_script_in_gitbash_captured(
     log_file_path: str,
     terminal_path: str | None = None,
     venv_activate_path: str | None = None,
+    scope_argv: list[str] | None = None,
+    exit_file_path: str | None = None,
 ) -> subprocess.Popen:
     """
     Runs a .sh script with output captured to a log file. No terminal window.
     Script stdout/stderr are redirected to log_file_path via tee. Caller must
-    poll the file and persist to history_logs.
+    poll the file and persist to history_logs. scope_argv (Linux, see
+    cgroups.scope_argv) runs the shell in the run's own cgroup. The script's
+    exit code is written to exit_file_path: the process's own return code is
+    the trailing shell's, not the script's.
     """
     system = platform.system()
     is_windows = system == "Windows"
@@ -108,7 +115,11 @@ def run_script_in_gitbash_captured(
         inner_cmd = f"bash {script_name}"
 
     log_path_bash = os.path.abspath(log_file_path).replace("\\", "/")
-    command = f"( trap '' INT; ({inner_cmd}) 2>&1 | tee '{log_path_bash}' ); exec bash"
+    record_exit = ""
+    if exit_file_path:
+        exit_path_bash = os.path.abspath(exit_file_path).replace("\\", "/")
+        record_exit = f"; echo \"${{PIPESTATUS[0]}}\" > '{exit_path_bash}'"
+    command = f"( trap '' INT; ({inner_cmd}) 2>&1 | tee '{log_path_bash}'{record_exit} ); exec bash"
 
     if is_windows:
         exe = (terminal_path or "").strip()
@@ -119,11 +130,18 @@ def run_script_in_gitbash_captured(
             shell=False,
         )
 
+    if scope_argv:
+        return subprocess.Popen(
+            scope_argv + ["/bin/bash", "-c", command],
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,
+        )
     return subprocess.Popen(
         command,
         shell=True,
         executable="/bin/bash",
         cwd=cwd,
+        stdin=subprocess.DEVNULL,  # no terminal to type into; keeps `exec bash` off the caller's tty
     )
 
 
@@ -191,11 +209,15 @@ def get_process_tree_after_spawn(process: subprocess.Popen) -> list[int]:
     return _get_process_tree_windows(process.pid)
 
 
-def kill_script_process(process: subprocess.Popen, kill_pids: list[int] | None = None) -> None:
+def kill_script_process(
+    process: subprocess.Popen, kill_pids: list[int] | None = None, cgroup: str | None = None,
+) -> None:
     """
     Terminates the terminal process and on Windows the full tree (window may
     be a child of the process Popen returned). kill_pids: list of PIDs
     captured with get_process_tree_after_spawn to kill the correct processes.
+    cgroup: the run's own cgroup (see cgroups.run_cgroup); whatever is left in
+    it afterwards is killed too.
     """
     if process is None:
         return
@@ -233,6 +255,9 @@ def kill_script_process(process: subprocess.Popen, kill_pids: list[int] | None =
                     process.kill()
     except (ProcessLookupError, OSError):
         pass
+    finally:
+        if cgroup:
+            kill_cgroup(cgroup)
 
 
 def get_resource_path(relative_path):